@@ -37,6 +37,8 @@ from obi_one.scientific.unions_and_references.combined_neuron_sets import (
 L = logging.getLogger(__name__)
 
 INPUT_RESISTANCE_DYNAMIC_PARAM = "input_resistance"
+DEFAULT_CIRCUIT_METRICS_WORKERS = 4
+MAX_CIRCUIT_METRICS_WORKERS = 16
 router = APIRouter(prefix="/declared", tags=["declared"], dependencies=[Depends(user_verified)])
 
 
@@ -84,6 +86,14 @@ def circuit_metrics_endpoint(
         CircuitStatsLevelOfDetail,
         Query(description="Level of detail for edge populations analysis"),
     ] = CircuitStatsLevelOfDetail.none,
+    max_workers: Annotated[
+        int,
+        Query(
+            ge=1,
+            le=MAX_CIRCUIT_METRICS_WORKERS,
+            description="Maximum number of populations analyzed concurrently",
+        ),
+    ] = DEFAULT_CIRCUIT_METRICS_WORKERS,
 ) -> CircuitMetricsOutput:
     try:
         level_of_detail_nodes_dict = {"_ALL_": level_of_detail_nodes}
@@ -93,6 +103,7 @@ def circuit_metrics_endpoint(
             db_client=db_client,
             level_of_detail_nodes=level_of_detail_nodes_dict,
             level_of_detail_edges=level_of_detail_edges_dict,
+            max_workers=max_workers,
         )
     except entitysdk.exception.EntitySDKError as err:
         raise HTTPException(
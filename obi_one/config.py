@@ -1,3 +1,6 @@
+from pathlib import Path
+from typing import Literal
+
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -5,6 +8,13 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class CircuitExtractionSettings(BaseModel):
     benchmarking_enabled: bool = True
     run_validation: bool = False
+    # Number of threads transferring morphology, .hoc and .mod files
+    copy_workers: int = 8
+    # How asset files are transferred: "copy", "hardlink" or "reflink" (falling back to copying)
+    asset_transfer_mode: Literal["copy", "hardlink", "reflink"] = "copy"
+    # Reference the original circuit's morphology containers instead of copying them; the
+    # extracted circuit is then not self-contained
+    reference_morphology_containers: bool = False
 
 
 class CaveClientConfig(BaseModel):
@@ -18,6 +28,74 @@ class CaveClientConfig(BaseModel):
     retry_status_forcelist: tuple[int, ...] = (429, 502, 503, 504)
 
 
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "obi-one"
+
+
+class DirectoryCacheSettings(BaseModel):
+    enabled: bool = False
+    cache_dir: Path
+    max_size_gb: float
+
+    @property
+    def max_size_bytes(self) -> int:
+        return int(self.max_size_gb * 1024**3)
+
+
+class MechanismBuildCacheSettings(DirectoryCacheSettings):
+    # Reuse compiled NEURON/Neurodamus mechanisms across simulation executions on the same machine
+    cache_dir: Path = DEFAULT_CACHE_DIR / "mechanisms"
+    max_size_gb: float = 5.0
+    # Builds used more recently are not evicted, as running simulations may still load them
+    min_idle_hours: float = 24.0
+
+
+class CircuitMetricsCacheSettings(DirectoryCacheSettings):
+    # Reuse circuit metrics (per population) of immutable circuit assets across requests
+    cache_dir: Path = DEFAULT_CACHE_DIR / "circuit_metrics"
+    max_size_gb: float = 1.0
+
+
+class EntityStagingCacheSettings(DirectoryCacheSettings):
+    # Stage entities (e.g., SONATA circuits) once per machine and link them into coordinates
+    cache_dir: Path = DEFAULT_CACHE_DIR / "entities"
+    max_size_gb: float = 50.0
+    link_mode: Literal["hardlink", "symlink"] = "hardlink"
+    # Entries used more recently are not evicted, as symlinked coordinates may still read them
+    min_idle_hours: float = 24.0
+
+
+class CAVEQueryCacheSettings(DirectoryCacheSettings):
+    # Reuse synapse tables of (immutable) CAVE materialization versions across runs
+    cache_dir: Path = DEFAULT_CACHE_DIR / "cave_queries"
+    max_size_gb: float = 10.0
+    # Number of postsynaptic neurons per batched synapse query filling cache misses
+    batch_size: int = 10
+    # Max. number of rows returned by a CAVE query; results this long may have been truncated
+    query_row_limit: int = 500_000
+
+
+class EMSynapseMappingSettings(BaseModel):
+    # Number of neurons resolved, fetched and mapped concurrently (1: one neuron at a time)
+    max_workers: int = 1
+
+
+class MorphologyCacheSettings(BaseModel):
+    # Number of morphologies (with path-distance calculators and segment tables) kept in memory
+    maxsize: int = 32
+    # Number of threads loading the (distinct) morphologies of a compartment set
+    load_workers: int = 8
+
+
+class NeuronSimulationSettings(BaseModel):
+    # Upper bound on MPI processes of a simulation (None: the number of available cores); also the
+    # number of cores reserved per simulation task when running tasks in parallel
+    max_mpi_processes: int | None = 4
+    # Memory needed by each MPI process (NEURON, circuit access); limits the number of processes
+    memory_per_mpi_process_gb: float = 1.0
+    # Relative cost of an afferent synapse, compared to a morphology section
+    synapse_cost: float = 0.1
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_prefix="OBI_ONE_",
@@ -30,5 +108,19 @@ class Settings(BaseSettings):
 
     cave_client_config: CaveClientConfig = CaveClientConfig()
 
+    mechanism_build_cache: MechanismBuildCacheSettings = MechanismBuildCacheSettings()
+
+    circuit_metrics_cache: CircuitMetricsCacheSettings = CircuitMetricsCacheSettings()
+
+    entity_staging_cache: EntityStagingCacheSettings = EntityStagingCacheSettings()
+
+    cave_query_cache: CAVEQueryCacheSettings = CAVEQueryCacheSettings()
+
+    em_synapse_mapping: EMSynapseMappingSettings = EMSynapseMappingSettings()
+
+    morphology_cache: MorphologyCacheSettings = MorphologyCacheSettings()
+
+    neuron_simulation: NeuronSimulationSettings = NeuronSimulationSettings()
+
 
 settings = Settings()
@@ -0,0 +1,192 @@
+"""Concurrency-safe staging of entities, optionally through a machine-wide cache.
+
+Staged entities (e.g., SONATA circuits) are written to a temporary sibling of their destination
+and renamed into place once complete, while a file lock serializes concurrent stagings of the
+same destination. With the machine-wide cache enabled, each entity is staged only once per
+machine and then materialized (hardlinked or symlinked) into the requested destinations.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from enum import StrEnum
+from pathlib import Path
+from typing import Any
+
+from entitysdk.models import Asset
+from entitysdk.models.entity import Entity
+from pydantic import BaseModel
+
+from obi_one.config import settings
+from obi_one.utils.directory_cache import DirectoryCache, file_lock
+
+L = logging.getLogger(__name__)
+
+type StageFunction = Callable[[Path], Any]
+
+
+class LinkMode(StrEnum):
+    hardlink = "hardlink"
+    symlink = "symlink"
+
+
+def _asset_fingerprints(model: BaseModel) -> list[str]:
+    """Identifiers and checksums of all assets of a model, incl. those of nested entities."""
+    fingerprints = []
+    for name in type(model).model_fields:
+        value = getattr(model, name)
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, Asset):
+                fingerprints.append(f"{item.id}:{item.sha256_digest}:{item.size}")
+            elif isinstance(item, BaseModel):
+                fingerprints.extend(_asset_fingerprints(item))
+    return fingerprints
+
+
+def entity_cache_key(entity: Entity, kind: str) -> str:
+    """Cache key of an entity staged in a given way (kind), based on its asset checksums."""
+    digest = hashlib.sha256("|".join(sorted(_asset_fingerprints(entity))).encode()).hexdigest()
+    return f"{type(entity).__name__}_{entity.id}_{kind}_{digest[:16]}"
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+@contextmanager
+def _atomic_destination(dest: Path) -> Generator[Path, None, None]:
+    """Yields a temporary sibling of dest, which is renamed to dest if the context succeeds."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.tmp-{uuid.uuid4().hex}")
+    try:
+        yield tmp
+    except BaseException:
+        _remove(tmp)
+        raise
+    tmp.rename(dest)
+
+
+def _link_or_copy(source: str, dest: str) -> None:
+    """Hardlinks a file, falling back to copying it (e.g., across file systems)."""
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copy2(source, dest)
+
+
+def materialize(source: Path, dest: Path, link_mode: LinkMode = LinkMode.hardlink) -> None:
+    """Atomically creates dest as a link (tree) of the file or directory source.
+
+    With hardlinks, the materialized files share their contents with the cache, so they must be
+    treated as read-only, but they remain valid when the cache entry is evicted.
+    """
+    with _atomic_destination(dest) as tmp:
+        if link_mode == LinkMode.symlink:
+            tmp.symlink_to(source.resolve(), target_is_directory=source.is_dir())
+        elif source.is_dir():
+            shutil.copytree(source, tmp, symlinks=True, copy_function=_link_or_copy)
+        else:
+            _link_or_copy(str(source), str(tmp))
+
+
+class EntityStagingCache:
+    """Machine-wide cache of staged entities keyed on entity id and asset checksums.
+
+    Concurrent stagings of the same entity on the same machine share a single download; least
+    recently used entries are evicted once the cache exceeds its size limit, unless used within
+    min_idle_seconds.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_size_bytes: int | None = None,
+        link_mode: LinkMode = LinkMode.hardlink,
+        min_idle_seconds: float = 0.0,
+    ) -> None:
+        """Initialize object."""
+        self._cache = DirectoryCache(
+            cache_dir, max_size_bytes=max_size_bytes, min_idle_seconds=min_idle_seconds
+        )
+        self.link_mode = link_mode
+
+    @classmethod
+    def from_settings(cls) -> "EntityStagingCache | None":
+        """Returns the cache configured in the settings, or None if disabled."""
+        cache_settings = settings.entity_staging_cache
+        if not cache_settings.enabled:
+            return None
+        return cls(
+            cache_settings.cache_dir,
+            max_size_bytes=cache_settings.max_size_bytes,
+            link_mode=LinkMode(cache_settings.link_mode),
+            min_idle_seconds=cache_settings.min_idle_hours * 3600,
+        )
+
+    def stage(self, entity: Entity, *, kind: str, dest_path: Path, stage: StageFunction) -> None:
+        """Materializes a cached staging of an entity at dest_path, staging it on a cache miss.
+
+        The stage function is called with the (non-existing) path to stage the entity to.
+        """
+        key = entity_cache_key(entity, kind)
+
+        def _create(entry_dir: Path) -> dict:
+            stage(entry_dir / dest_path.name)
+            return {"name": dest_path.name}
+
+        while True:
+            entry_dir, metadata = self._cache.get_or_create(key, _create)
+            with self._cache.lock(key):  # Protects the entry from eviction while linking
+                if self._cache.is_complete(key):
+                    materialize(entry_dir / metadata["name"], dest_path, self.link_mode)
+                    return
+            L.info("Cache entry %s evicted before materialization; retrying", key)
+
+
+def stage_entity(
+    entity: Entity,
+    *,
+    kind: str,
+    dest_path: Path,
+    stage: StageFunction,
+    entity_cache: bool = False,
+) -> None:
+    """Stages an entity to dest_path.
+
+    Args:
+        entity: Entity to stage.
+        kind: Identifies how the entity is staged (part of the cache key).
+        dest_path: File or directory to stage the entity to.
+        stage: Function staging the entity to the (non-existing) path it is called with.
+        entity_cache: If False, dest_path must not exist. If True, an existing dest_path is
+            reused (e.g., by all coordinates of a campaign); otherwise it is materialized from
+            the machine-wide entity staging cache if enabled, or staged. In both cases,
+            concurrent callers wait for a single staging and dest_path only appears once
+            complete.
+    """
+    if not entity_cache:
+        if dest_path.exists():
+            msg = f"Staging destination '{dest_path}' already exists and is not empty."
+            raise FileExistsError(msg)
+        stage(dest_path)
+        return
+
+    with file_lock(dest_path.with_name(f".{dest_path.name}.lock")):
+        if dest_path.exists():
+            L.info("Reusing staged entity %s at %s", entity.id, dest_path)
+            return
+
+        cache = EntityStagingCache.from_settings()
+        if cache is not None:
+            cache.stage(entity, kind=kind, dest_path=dest_path, stage=stage)
+            return
+
+        with _atomic_destination(dest_path) as tmp:
+            stage(tmp)
@@ -11,3 +11,15 @@ class ProtocolNotFoundError(Exception):
         """Exception raised when a protocol is not found in the trace."""
         message = msg
         super().__init__(message)
+
+
+class TaskExecutionError(OBIONEError):
+    """Exception raised when one or more single config tasks failed."""
+
+    def __init__(self, failures: dict[int, BaseException]) -> None:
+        """Initialize with the exceptions of the failed tasks, keyed by single config idx."""
+        self.failures = failures
+        message = f"{len(failures)} task(s) failed: " + ", ".join(
+            f"idx {idx} ({type(error).__name__}: {error})" for idx, error in failures.items()
+        )
+        super().__init__(message)
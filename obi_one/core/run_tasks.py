@@ -1,16 +1,26 @@
 import json
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from pathlib import Path
 from typing import Any
 
 import entitysdk
 
 from obi_one.core.deserialize import deserialize_obi_object_from_json_data
+from obi_one.core.exception import TaskExecutionError
 from obi_one.core.registry import task_registry
 from obi_one.core.scan_generation import ScanGenerationTask
+from obi_one.core.serialization_constants import TASK_COMPLETE_FILENAME
 from obi_one.core.single import SingleConfigMixin
 from obi_one.db_sdk import db_sdk
 from obi_one.types import TaskType
 
+L = logging.getLogger(__name__)
+
+_worker_db_client: entitysdk.client.Client | None = None
+
 
 def run_task_for_single_config(
     single_config: SingleConfigMixin,
@@ -26,16 +36,184 @@ def run_task_for_single_config(
     )
 
 
+def _complete_marker(single_config: SingleConfigMixin) -> Path:
+    return Path(single_config.coordinate_output_root) / TASK_COMPLETE_FILENAME
+
+
+def _init_worker(db_client: entitysdk.client.Client | None) -> None:
+    global _worker_db_client  # ruff: ignore[global-statement]
+    _worker_db_client = db_client
+
+
+def _run_task_in_worker(single_config: SingleConfigMixin, *, entity_cache: bool) -> Any:
+    return run_task_for_single_config(
+        single_config, db_client=_worker_db_client, entity_cache=entity_cache
+    )
+
+
+def _number_of_cores(single_config: SingleConfigMixin, max_workers: int) -> int:
+    """Cores reserved for the task of a single config, capped so that it can always run."""
+    task_type = task_registry.get_single_configs_task_type(single_config)
+    return min(max(task_type.number_of_cores, 1), max_workers)
+
+
+def _run_sequentially(
+    single_configs: list[SingleConfigMixin],
+    indices: list[int],
+    *,
+    db_client: entitysdk.client.Client | None,
+    entity_cache: bool,
+    fail_fast: bool,
+    resume: bool,
+) -> tuple[dict[int, Any], dict[int, BaseException]]:
+    """Runs the tasks of the given single configs one after the other in this process.
+
+    With resume, each coordinate is marked as completed as soon as its task succeeds.
+
+    Returns:
+        Tuple of (results, exceptions) dicts keyed by position in single_configs.
+    """
+    results: dict[int, Any] = {}
+    exceptions: dict[int, BaseException] = {}
+    for i in indices:
+        try:
+            results[i] = run_task_for_single_config(
+                single_configs[i],
+                db_client=db_client,  # ty:ignore[invalid-argument-type]
+                entity_cache=entity_cache,
+            )
+        except Exception as e:
+            if fail_fast:
+                raise
+            exceptions[i] = e
+        else:
+            if resume:
+                _complete_marker(single_configs[i]).touch()
+    return results, exceptions
+
+
+def _run_in_process_pool(
+    single_configs: list[SingleConfigMixin],
+    indices: list[int],
+    *,
+    db_client: entitysdk.client.Client | None,
+    entity_cache: bool,
+    max_workers: int,
+    fail_fast: bool,
+    resume: bool,
+) -> tuple[dict[int, Any], dict[int, BaseException]]:
+    """Runs the tasks of the given single configs in a pool of worker processes.
+
+    Tasks are started in order as long as the sum of their number_of_cores resource hints does
+    not exceed max_workers. Workers are forked, so that they inherit the (unpicklable) db_client.
+    With resume, each coordinate is marked as completed as soon as its task succeeds.
+
+    Returns:
+        Tuple of (results, exceptions) dicts keyed by position in single_configs.
+    """
+    results: dict[int, Any] = {}
+    exceptions: dict[int, BaseException] = {}
+    queue = deque((i, _number_of_cores(single_configs[i], max_workers)) for i in indices)
+    running: dict[Future, tuple[int, int]] = {}
+    free_cores = max_workers
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_worker,
+        initargs=(db_client,),
+    ) as executor:
+        while queue or running:
+            while queue and queue[0][1] <= free_cores:
+                i, cores = queue.popleft()
+                future = executor.submit(
+                    _run_task_in_worker, single_configs[i], entity_cache=entity_cache
+                )
+                running[future] = (i, cores)
+                free_cores -= cores
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i, cores = running.pop(future)
+                free_cores += cores
+                try:
+                    results[i] = future.result()
+                except Exception as e:  # ruff: ignore[blind-except]
+                    exceptions[i] = e
+                    if fail_fast:
+                        queue.clear()  # Let running tasks finish, but start no new ones
+                else:
+                    if resume:
+                        _complete_marker(single_configs[i]).touch()
+    return results, exceptions
+
+
 def run_task_for_single_configs(
     single_configs: list[SingleConfigMixin],
     *,
     db_client: entitysdk.client.Client = None,  # ty:ignore[invalid-parameter-default]
     entity_cache: bool = False,
+    max_workers: int = 1,
+    fail_fast: bool = True,
+    resume: bool = False,
 ) -> list[Any]:
-    return [
-        run_task_for_single_config(single_config, db_client=db_client, entity_cache=entity_cache)
-        for single_config in single_configs
-    ]
+    """Runs the tasks of a list of single configs, optionally in parallel.
+
+    Args:
+        single_configs: Single configs to run the tasks of.
+        db_client: Entity SDK client.
+        entity_cache: Whether tasks stage entities through the local entity cache.
+        max_workers: Number of cores to use. With more than one, tasks run in separate worker
+            processes, respecting the number_of_cores resource hint of each task type.
+        fail_fast: If True, the exception of the first failed task is re-raised and no further
+            tasks are started. Otherwise, all tasks are run and a TaskExecutionError listing all
+            failures is raised at the end.
+        resume: If True, coordinates completed by a previous run with resume=True are skipped
+            (their result is None), and completed coordinates are marked as such.
+
+    Returns:
+        The results of the tasks, in the order of single_configs.
+    """
+    if max_workers < 1:
+        msg = f"max_workers must be at least 1, got {max_workers}!"
+        raise ValueError(msg)
+
+    indices = []
+    for i, single_config in enumerate(single_configs):
+        if resume and _complete_marker(single_config).exists():
+            L.info("Skipping completed coordinate %s", single_config.idx)
+            continue
+        indices.append(i)
+
+    if max_workers == 1:
+        results, exceptions = _run_sequentially(
+            single_configs,
+            indices,
+            db_client=db_client,
+            entity_cache=entity_cache,
+            fail_fast=fail_fast,
+            resume=resume,
+        )
+    else:
+        results, exceptions = _run_in_process_pool(
+            single_configs,
+            indices,
+            db_client=db_client,
+            entity_cache=entity_cache,
+            max_workers=max_workers,
+            fail_fast=fail_fast,
+            resume=resume,
+        )
+
+    for i, e in exceptions.items():
+        L.error("Task of single config %s failed: %r", single_configs[i].idx, e)
+    if exceptions:
+        if fail_fast:
+            raise next(iter(exceptions.values()))
+        failures = {single_configs[i].idx: e for i, e in sorted(exceptions.items())}
+        raise TaskExecutionError(failures) from next(iter(failures.values()))
+
+    return [results.get(i) for i in range(len(single_configs))]
 
 
 def run_tasks_for_generated_scan(
@@ -43,9 +221,17 @@ def run_tasks_for_generated_scan(
     *,
     db_client: entitysdk.client.Client = None,  # ty:ignore[invalid-parameter-default]
     entity_cache: bool = False,
+    max_workers: int = 1,
+    fail_fast: bool = True,
+    resume: bool = False,
 ) -> Any:
     return run_task_for_single_configs(
-        scan_generation.single_configs, db_client=db_client, entity_cache=entity_cache
+        scan_generation.single_configs,
+        db_client=db_client,
+        entity_cache=entity_cache,
+        max_workers=max_workers,
+        fail_fast=fail_fast,
+        resume=resume,
     )
 
 
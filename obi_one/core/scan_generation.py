@@ -2,16 +2,19 @@ import abc
 import copy
 import json
 import logging
+import math
 from collections import OrderedDict
+from collections.abc import Iterator
 from importlib.metadata import version
 from itertools import product
 from pathlib import Path
 from typing import Any
 
 import entitysdk
-from pydantic import PrivateAttr, SerializeAsAny, ValidationError, field_validator
+from pydantic import PrivateAttr, SerializeAsAny, field_validator
 
 from obi_one.core.block import Block
+from obi_one.core.block_reference import BlockReference
 from obi_one.core.deserializable_types import load_class
 from obi_one.core.exception import OBIONEError
 from obi_one.core.param import MultiValueScanParam, SingleValueScanParam
@@ -23,6 +26,32 @@ from obi_one.core.task import Task
 L = logging.getLogger(__name__)
 
 
+def _has_own_private_state(block: Block) -> bool:
+    """Whether a block declares private attributes beyond those of Block.
+
+    Tasks set such attributes on the blocks of their single config (e.g., the default node set of
+    a stimulus), so these blocks must not be shared between single configs.
+    """
+    return not type(block).__private_attributes__.keys() <= Block.__private_attributes__.keys()
+
+
+def _referenced_blocks(block: Block) -> list[Block]:
+    """Blocks referenced (through BlockReferences) by the given block."""
+    referenced = []
+
+    def _collect(value: object) -> None:
+        if isinstance(value, BlockReference):
+            if value.has_block():
+                referenced.append(value.block)
+        elif isinstance(value, (tuple, list)):
+            for item in value:
+                _collect(item)
+
+    for block_attr_value in block.__dict__.values():
+        _collect(block_attr_value)
+    return referenced
+
+
 class ScanGenerationTask(Task, abc.ABC):
     """Task for creating multiple SingleConfigs where lists with multiple parameters are found.
 
@@ -120,11 +149,27 @@ class ScanGenerationTask(Task, abc.ABC):
 
         return d
 
-    def coordinate_parameters(self) -> list[SingleCoordinateScanParams]:
+    def iter_coordinate_parameters(self) -> Iterator[SingleCoordinateScanParams]:
         """Must be implemented by a subclass of Scan."""
-        msg = "coordinate_parameters() must be implemented by a subclass of Scan."
+        msg = "iter_coordinate_parameters() must be implemented by a subclass of Scan."
         raise NotImplementedError(msg)
 
+    @property
+    def number_of_coordinates(self) -> int:
+        """Must be implemented by a subclass of Scan."""
+        msg = "number_of_coordinates must be implemented by a subclass of Scan."
+        raise NotImplementedError(msg)
+
+    def coordinate_parameters(self, *, display: bool = False) -> list[SingleCoordinateScanParams]:
+        """Returns the list of all coordinate parameters (see iter_coordinate_parameters)."""
+        self._coordinate_parameters = list(self.iter_coordinate_parameters())
+
+        # Optionally display the coordinate parameters
+        if display:
+            self.display_coordinate_parameters()
+
+        return self._coordinate_parameters
+
     def set_nested_single_coordinate_scan_param_value(
         self, single_coord_config_subelement: Any, location_list: list, value: Any
     ) -> Any:
@@ -146,15 +191,55 @@ class ScanGenerationTask(Task, abc.ABC):
         )
         return single_coord_config_subelement
 
-    def create_single_configs(self) -> list[SingleConfigMixin]:
-        """Coordinate instance.
+    def _blocks_by_location(self) -> dict[tuple[str, ...], Block]:
+        """All Blocks of self.form by their location (attribute name [, dictionary key])."""
+        blocks = {}
+        for attr_name, attr_value in self.form.__dict__.items():
+            if isinstance(attr_value, dict) and all(
+                isinstance(dict_val, Block) for dict_val in attr_value.values()
+            ):
+                for block_key, block in attr_value.items():
+                    blocks[attr_name, block_key] = block
+            elif isinstance(attr_value, Block):
+                blocks[attr_name,] = attr_value
+        return blocks
+
+    def _unchanged_blocks(self) -> list[Block]:
+        """Blocks of self.form which are identical in all single configs.
 
-        - Returns a list of "coordinate instances" by:
-            - Iterating through self.coordinate_parameters()
-            - Creating a single "coordinate instance" for each single coordinate parameter
+        These are all Blocks which neither contain multi value parameters, nor have private state
+        of their own, nor (directly or indirectly) reference such a Block.
+        """
+        blocks = self._blocks_by_location()
+        changed = {
+            id(block)
+            for location, block in blocks.items()
+            for multi_value in self.multiple_value_parameters()
+            if tuple(multi_value.location_list[: len(location)]) == location
+        }
+        changed |= {id(block) for block in blocks.values() if _has_own_private_state(block)}
+
+        # Blocks referencing changed blocks need to be copied as well, so that their references
+        # point to the blocks of the same single config
+        while True:
+            newly_changed = {
+                id(block)
+                for block in blocks.values()
+                if id(block) not in changed
+                and any(id(ref) in changed for ref in _referenced_blocks(block))
+            }
+            if not newly_changed:
+                break
+            changed |= newly_changed
+
+        return [block for block in blocks.values() if id(block) not in changed]
+
+    def iter_single_configs(self) -> Iterator[SingleConfigMixin]:
+        """Yields the single configs of all coordinates, one at a time.
 
         - Each "coordinate instance" is created by:
-            - Making a deep copy of the form
+            - Copying the form. Blocks which are identical in all coordinates, and have no private
+                state set by tasks, are shared with self.form rather than deep copied.
             - Editing the multi value parameters (lists) to have the values of the single
                 coordinate parameters
                 (i.e. timestamps.timestamps_1.interval = [1.0, 5.0] ->
@@ -162,12 +247,11 @@ class ScanGenerationTask(Task, abc.ABC):
             - Casting the form to its single_config_class_name type
                 (i.e. CircuitSimulationScanConfig -> CircuitSimulationSingleConfig)
         """
-        single_configs = []
+        shared_blocks = {id(block): block for block in self._unchanged_blocks()}
 
-        # Iterate through coordinate_parameters
-        for idx, single_coordinate_scan_params in enumerate(self.coordinate_parameters()):
-            # Make a deep copy of self.form
-            single_coord_config = copy.deepcopy(self.form)
+        for idx, single_coordinate_scan_params in enumerate(self.iter_coordinate_parameters()):
+            # Copy self.form; deepcopy returns the objects in the memo as they are
+            single_coord_config = copy.deepcopy(self.form, dict(shared_blocks))
 
             # Iterate through parameters in the single_coordinate_parameters tuple
             # Change the value of the multi parameter from a list to the single value of the
@@ -177,22 +261,18 @@ class ScanGenerationTask(Task, abc.ABC):
                     single_coord_config, scan_param.location_list, scan_param.value
                 )
 
-            try:
-                # Cast the form to its single_config_class_name type
-                single_coord_config = single_coord_config.cast_to_single_coord()
-
-                # Set the variables of the coordinate instance related to the scan
-                single_coord_config.idx = idx  # ty:ignore[invalid-assignment]
-                single_coord_config.single_coordinate_scan_params = single_coordinate_scan_params  # ty:ignore[invalid-assignment]
+            # Cast the form to its single_config_class_name type
+            single_coord_config = single_coord_config.cast_to_single_coord()
 
-                # Append the coordinate instance to self._coordinate_instances
-                single_configs.append(single_coord_config)
+            # Set the variables of the coordinate instance related to the scan
+            single_coord_config.idx = idx  # ty:ignore[invalid-assignment]
+            single_coord_config.single_coordinate_scan_params = single_coordinate_scan_params  # ty:ignore[invalid-assignment]
 
-            except ValidationError as e:
-                raise ValidationError(e) from e
+            yield single_coord_config  # ty:ignore[invalid-yield]
 
-        # Return single_configs
-        return single_configs
+    def create_single_configs(self) -> list[SingleConfigMixin]:
+        """Returns the list of all single configs (see iter_single_configs)."""
+        return list(self.iter_single_configs())
 
     def serialize(self, output_path: Path) -> dict:
         """Serialize a Scan object.
@@ -234,7 +314,15 @@ class ScanGenerationTask(Task, abc.ABC):
     def execute(
         self,
         db_client: entitysdk.client.Client = None,  # ty:ignore[invalid-parameter-default]
+        *,
+        keep_single_configs: bool = True,
     ) -> None:
+        """Generates and serializes the single configs of all coordinates.
+
+        Single configs are serialized as they are generated. With keep_single_configs=False
+        they are not kept in memory afterwards (and single_configs is unavailable), so that
+        scans with many coordinates are generated in constant memory.
+        """
         Path.mkdir(self.output_root, parents=True, exist_ok=True)
 
         # Serialize the scan
@@ -249,11 +337,10 @@ class ScanGenerationTask(Task, abc.ABC):
                 db_client=db_client,
             )
 
-        # Create the single_configs
-        self._single_configs = self.create_single_configs()
-
-        # Iterate through single_configs
-        for single_coord_config in self._single_configs:
+        # Create and serialize the single configs one at a time
+        self._single_configs = []
+        single_entities = []
+        for single_coord_config in self.iter_single_configs():
             single_coord_config.initialize_coordinate_output_root(
                 self.output_root, self.coordinate_directory_option
             )
@@ -269,97 +356,91 @@ class ScanGenerationTask(Task, abc.ABC):
                     campaign=campaign,  # ty:ignore[invalid-argument-type]
                     db_client=db_client,
                 )
+            single_entities.append(single_coord_config.single_entity)
+
+            if keep_single_configs:
+                self._single_configs.append(single_coord_config)
 
         # Create the campaign generation entity
         if db_client and hasattr(self.form, "create_campaign_generation_entity"):
-            single_entities = [sc.single_entity for sc in self._single_configs]
             self.form.create_campaign_generation_entity(single_entities, db_client=db_client)  # ty:ignore[invalid-argument-type]
 
 
 class GridScanGenerationTask(ScanGenerationTask):
     """Description."""
 
-    def coordinate_parameters(self, *, display: bool = False) -> list[SingleCoordinateScanParams]:
-        """Description."""
-        single_values_by_multi_value = []
-        multi_value_parameters = self.multiple_value_parameters()
-
-        if len(multi_value_parameters):
-            for multi_value in multi_value_parameters:
-                single_values = [
-                    SingleValueScanParam(
-                        location_list=multi_value.location_list,
-                        value=value,
-                        index_in_scan_dimension=index,
-                    )
-                    for index, value in enumerate(multi_value.values)
-                ]
-
-                single_values_by_multi_value.append(single_values)
+    @property
+    def number_of_coordinates(self) -> int:
+        """Number of coordinates of the scan (without generating them)."""
+        return math.prod(
+            len(multi_value.values) for multi_value in self.multiple_value_parameters()
+        )
 
-            self._coordinate_parameters = []
-            for scan_params in product(*single_values_by_multi_value):
-                self._coordinate_parameters.append(
-                    SingleCoordinateScanParams(scan_params=scan_params)  # ty:ignore[invalid-argument-type]
-                )
+    def iter_coordinate_parameters(self) -> Iterator[SingleCoordinateScanParams]:
+        """Yields the coordinate parameters of the cartesian product of all multi values."""
+        multi_value_parameters = self.multiple_value_parameters()
 
-        else:
-            self._coordinate_parameters = [
-                SingleCoordinateScanParams(
-                    nested_coordinate_subpath_str=self.form.single_coord_scan_default_subpath  # ty:ignore[invalid-argument-type]
+        if len(multi_value_parameters) == 0:
+            yield SingleCoordinateScanParams(
+                nested_coordinate_subpath_str=self.form.single_coord_scan_default_subpath  # ty:ignore[invalid-argument-type]
+            )
+            return
+
+        single_values_by_multi_value = [
+            [
+                SingleValueScanParam(
+                    location_list=multi_value.location_list,
+                    value=value,
+                    index_in_scan_dimension=index,
                 )
+                for index, value in enumerate(multi_value.values)
             ]
+            for multi_value in multi_value_parameters
+        ]
 
-        # Optionally display the coordinate parameters
-        if display:
-            self.display_coordinate_parameters()
-
-        # Return the coordinate parameters
-        return self._coordinate_parameters
+        for scan_params in product(*single_values_by_multi_value):
+            yield SingleCoordinateScanParams(scan_params=scan_params)  # ty:ignore[invalid-argument-type]
 
 
 class CoupledScanGenerationTask(ScanGenerationTask):
     """Description."""
 
-    def coordinate_parameters(self, *, display: bool = False) -> list[SingleCoordinateScanParams]:
-        """Description."""
-        previous_len = -1
+    def _coupled_length(self) -> int | None:
+        """Common length of all multi value parameters (None if there are none)."""
+        previous_len = None
+        for multi_value in self.multiple_value_parameters():
+            current_len = len(multi_value.values)
+            if previous_len not in {None, current_len}:
+                msg = f"Multi value parameters have different lengths: {previous_len} and \
+                        {current_len}"
+                raise ValueError(msg)
+            previous_len = current_len
+        return previous_len
 
-        multi_value_parameters = self.multiple_value_parameters()
-        if len(multi_value_parameters):
-            for multi_value in multi_value_parameters:
-                current_len = len(multi_value.values)
-                if previous_len not in {-1, current_len}:
-                    msg = f"Multi value parameters have different lengths: {previous_len} and \
-                            {current_len}"
-                    raise ValueError(msg)
-
-                previous_len = current_len
-
-            n_coords = current_len
-
-            self._coordinate_parameters = []
-            for coord_i in range(n_coords):
-                scan_params = [
-                    SingleValueScanParam(
-                        location_list=multi_value.location_list,
-                        value=multi_value.values[coord_i],
-                        index_in_scan_dimension=coord_i,
-                    )
-                    for multi_value in multi_value_parameters
-                ]
-                self._coordinate_parameters.append(
-                    SingleCoordinateScanParams(scan_params=scan_params)
-                )
+    @property
+    def number_of_coordinates(self) -> int:
+        """Number of coordinates of the scan (without generating them)."""
+        n_coords = self._coupled_length()
+        return 1 if n_coords is None else n_coords
+
+    def iter_coordinate_parameters(self) -> Iterator[SingleCoordinateScanParams]:
+        """Yields the coordinate parameters, coupling the i-th values of all multi values."""
+        n_coords = self._coupled_length()
+
+        if n_coords is None:
+            yield SingleCoordinateScanParams(
+                nested_coordinate_subpath_str=self.form.single_coord_scan_default_subpath  # ty:ignore[invalid-argument-type]
+            )
+            return
 
-        else:
-            self._coordinate_parameters = [
-                SingleCoordinateScanParams(
-                    nested_coordinate_subpath_str=self.form.single_coord_scan_default_subpath  # ty:ignore[invalid-argument-type]
+        multi_value_parameters = self.multiple_value_parameters()
+        for coord_i in range(n_coords):
+            scan_params = [
+                SingleValueScanParam(
+                    location_list=multi_value.location_list,
+                    value=multi_value.values[coord_i],
+                    index_in_scan_dimension=coord_i,
                 )
+                for multi_value in multi_value_parameters
             ]
-
-        if display:
-            self.display_coordinate_parameters()
-
-        return self._coordinate_parameters
+            yield SingleCoordinateScanParams(scan_params=scan_params)
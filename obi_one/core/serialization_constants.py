@@ -2,3 +2,4 @@
 
 SCAN_CONFIG_FILENAME = "obi_one_scan.json"
 COORDINATE_CONFIG_FILENAME = "obi_one_coordinate.json"
+TASK_COMPLETE_FILENAME = ".obi_one_task_complete"
@@ -1,5 +1,6 @@
 import abc
 import logging
+from typing import ClassVar
 
 from entitysdk import Client
 from entitysdk.models import TaskActivity
@@ -11,6 +12,9 @@ L = logging.getLogger(__name__)
 
 
 class Task(OBIBaseModel, abc.ABC):
+    # Resource hint for schedulers running several tasks concurrently (number of cores used)
+    number_of_cores: ClassVar[int] = 1
+
     @staticmethod
     def _get_execution_activity(
         db_client: Client | None = None,
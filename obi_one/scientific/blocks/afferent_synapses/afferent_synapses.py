@@ -9,6 +9,7 @@ from pydantic import Field, model_validator
 from obi_one.core.block import Block
 from obi_one.core.schema import SchemaKey, UIElement
 from obi_one.scientific.library.find_afferent_synapses import (
+    PathDistanceRows,
     add_section_types,
     all_syns_on,
     apply_filters,
@@ -62,7 +63,7 @@ class AfferentSynapsesBlock(Block, abc.ABC):
 
     def gather_synapse_info(
         self, circ: snap.Circuit, node_population: str, node_id: int
-    ) -> tuple[pandas.DataFrame, numpy.ndarray, numpy.ndarray]:
+    ) -> tuple[pandas.DataFrame, numpy.ndarray, numpy.ndarray | PathDistanceRows]:
         prop_filters = {}
         node_props = []
         if self.pre_synapse_class is not None:
@@ -78,7 +79,8 @@ class AfferentSynapsesBlock(Block, abc.ABC):
         add_section_types(syns, morph)
         drop_nan = not self.consider_nan_pass
         syns = apply_filters(syns, prop_filters, drop_nan=drop_nan)
-        soma_pds, pw_pds = relevant_path_distances(PD, syns)
+        # Pairwise path distances are only computed for the rows the selection actually uses
+        soma_pds, pw_pds = relevant_path_distances(PD, syns, lazy_pairwise=True)
         if self.merge_multiple_syns_con:
             syns, soma_pds, pw_pds = merge_multiple_syns_per_connection(syns, soma_pds, pw_pds)
         return syns, soma_pds, pw_pds
@@ -314,7 +316,10 @@ class ClusteredSynapsesByMaxDistance(AfferentSynapsesBlock):
             raise ValueError(msg)
 
     def _select_syns(
-        self, syns: pandas.DataFrame, soma_pds: numpy.ndarray, pw_pds: numpy.ndarray
+        self,
+        syns: pandas.DataFrame,
+        soma_pds: numpy.ndarray,
+        pw_pds: numpy.ndarray | PathDistanceRows,
     ) -> pandas.DataFrame:  # ty:ignore[invalid-method-override]
         return select_clusters_by_max_distance(
             syns,
@@ -356,7 +361,10 @@ class ClusteredSynapsesByCount(AfferentSynapsesBlock):
             raise ValueError(msg)
 
     def _select_syns(
-        self, syns: pandas.DataFrame, soma_pds: numpy.ndarray, pw_pds: numpy.ndarray
+        self,
+        syns: pandas.DataFrame,
+        soma_pds: numpy.ndarray,
+        pw_pds: numpy.ndarray | PathDistanceRows,
     ) -> pandas.DataFrame:  # ty:ignore[invalid-method-override]
         return select_clusters_by_count(
             syns,
@@ -392,7 +400,10 @@ class ClusteredPDSynapsesByMaxDistance(ClusteredSynapsesByMaxDistance):
             raise ValueError(msg)
 
     def _select_syns(
-        self, syns: pandas.DataFrame, soma_pds: numpy.ndarray, pw_pds: numpy.ndarray
+        self,
+        syns: pandas.DataFrame,
+        soma_pds: numpy.ndarray,
+        pw_pds: numpy.ndarray | PathDistanceRows,
     ) -> pandas.DataFrame:
         return select_clusters_by_max_distance(
             syns,
@@ -430,7 +441,10 @@ class ClusteredPDSynapsesByCount(ClusteredSynapsesByCount):
             raise ValueError(msg)
 
     def _select_syns(
-        self, syns: pandas.DataFrame, soma_pds: numpy.ndarray, pw_pds: numpy.ndarray
+        self,
+        syns: pandas.DataFrame,
+        soma_pds: numpy.ndarray,
+        pw_pds: numpy.ndarray | PathDistanceRows,
     ) -> pandas.DataFrame:
         return select_clusters_by_count(
             syns,
@@ -9,3 +9,6 @@ VIRTUAL_NEURON_SET_TITLE_SUFFIX = "(Virtual)"
 POINT_NEURON_SET_TITLE_SUFFIX = "(Point)"
 ALL_POPULATION_TYPES_NEURON_SET_TITLE_SUFFIX = "(Biophysical + Point + Virtual)"
 MULTI_POPULATION_NEURON_SET_TITLE_SUFFIX = "(multi-population)"
+
+# Number of nodes per chunk when evaluating neuron property filters
+PROPERTY_FILTER_CHUNK_SIZE = 1_000_000
@@ -70,7 +70,7 @@ class PopulationBaseNeuronSet(NeuronSet, abc.ABC):
 
     def _resolve_ids(self, circuit: Circuit) -> list[int]:
         """Returns the full list of neuron IDs (w/o subsampling)."""
-        c = circuit.sonata_circuit
+        c = circuit.writable_sonata_circuit()
         expression = self._get_expression(circuit)
         name = "__TMP_NODE_SET__"
         add_node_set_to_circuit(c, {name: expression})
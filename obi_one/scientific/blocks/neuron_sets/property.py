@@ -1,7 +1,10 @@
 import abc
 import logging
+from collections.abc import Callable
 from typing import Annotated, ClassVar, Self
 
+import libsonata
+import numpy as np
 import pandas as pd
 from pydantic import Field, model_validator
 
@@ -10,6 +13,7 @@ from obi_one.core.schema import SchemaKey, UIElement
 from obi_one.scientific.blocks.neuron_sets.constants import (
     BIOPHYSICAL_NEURON_SET_TITLE_SUFFIX,
     POINT_NEURON_SET_TITLE_SUFFIX,
+    PROPERTY_FILTER_CHUNK_SIZE,
     PROPERTY_NEURON_SET_TITLE_PREFIX,
     VIRTUAL_NEURON_SET_TITLE_SUFFIX,
 )
@@ -27,6 +31,43 @@ from obi_one.scientific.library.entity_property_types import (
 
 L = logging.getLogger("obi-one")
 
+_DYNAMICS_PREFIX = "@dynamics:"
+
+
+def _property_matcher(
+    population: libsonata.NodePopulation, key: str, values: list
+) -> Callable[[libsonata.Selection], np.ndarray]:
+    """Returns a function evaluating whether the nodes of a selection have one of the values.
+
+    As in NeuronPropertyFilter.filter, values are compared as strings. Enumerated properties
+    are compared on their integer codes and integer properties as integers.
+    """
+    str_values = [str(value) for value in values]
+    if key in population.enumeration_names:
+        enumeration_values = np.asarray(population.enumeration_values(key)).astype(str)
+        codes = np.flatnonzero(np.isin(enumeration_values, str_values))
+        return lambda selection: np.isin(population.get_enumeration(key, selection), codes)
+
+    if key.startswith(_DYNAMICS_PREFIX):
+        name = key.removeprefix(_DYNAMICS_PREFIX)
+
+        def _get(selection: libsonata.Selection) -> np.ndarray:
+            return np.asarray(population.get_dynamics_attribute(name, selection))
+    else:
+
+        def _get(selection: libsonata.Selection) -> np.ndarray:
+            return np.asarray(population.get_attribute(key, selection))
+
+    int_values = [int(v) for v in str_values if v.lstrip("-").isdigit() and str(int(v)) == v]
+
+    def _match(selection: libsonata.Selection) -> np.ndarray:
+        chunk = _get(selection)
+        if chunk.dtype.kind in "iu":
+            return np.isin(chunk, int_values)
+        return np.isin(chunk.astype(str), str_values)
+
+    return _match
+
 
 class NeuronPropertyFilter(OBIBaseModel):
     filter_dict: dict[
@@ -67,6 +108,33 @@ class NeuronPropertyFilter(OBIBaseModel):
                 ret = ret.reset_index(drop=True)
         return ret
 
+    def select(
+        self,
+        population: libsonata.NodePopulation,
+        chunk_size: int = PROPERTY_FILTER_CHUNK_SIZE,
+    ) -> libsonata.Selection:
+        """Selects the nodes of a population matching the filter.
+
+        The filter is evaluated chunk by chunk directly on the (enumeration) attributes, such
+        that memory use is bounded independent of the population size.
+        """
+        matchers = [
+            _property_matcher(population, key, values) for key, values in self.filter_dict.items()
+        ]
+        node_ids = []
+        for start in range(0, population.size, chunk_size):
+            stop = min(start + chunk_size, population.size)
+            selection = libsonata.Selection([(start, stop)])
+            mask = np.ones(stop - start, dtype=bool)
+            for matcher in matchers:
+                mask &= matcher(selection)
+                if not mask.any():
+                    break
+            node_ids.append(np.flatnonzero(mask) + start)
+        if not node_ids:
+            return libsonata.Selection(np.zeros(0, dtype=np.int64))
+        return libsonata.Selection(np.concatenate(node_ids))
+
     def test_validity(self, circuit: Circuit, node_population: str) -> None:
         circuit_prop_names = circuit.sonata_circuit.nodes[node_population].property_names
 
@@ -111,17 +179,12 @@ class PropertyPopulationBaseNeuronSet(PopulationBaseNeuronSet, abc.ABC):
         """Resolve property filter in a given population, returning matching neuron IDs."""
         c = circuit.sonata_circuit
         try:
-            df = (
-                c.nodes[population]
-                .get(
-                    properties=self.property_filter.filter_keys  # ty:ignore[unresolved-attribute]
-                )
-                .reset_index()
+            selection = self.property_filter.select(  # ty:ignore[unresolved-attribute]
+                c.nodes[population].to_libsonata
             )
-            df = self.property_filter.filter(df)  # ty:ignore[unresolved-attribute]
         except Exception:  # ruff: ignore[blind-except]
             return []
-        return df["node_ids"].to_numpy().tolist()
+        return selection.flatten().tolist()
 
     def _resolve_ids(self, circuit: Circuit) -> list[int]:
         """Returns the full list of neuron IDs (w/o subsampling)."""
@@ -1,4 +1,5 @@
 from abc import abstractmethod
+from collections import defaultdict
 from pathlib import Path
 
 import h5py
@@ -115,13 +116,15 @@ class SpikeStimulus(StimulusWithTimestamps):
         source_gids = source_neuron_set.get_neuron_ids(circuit)[source_node_population]
 
         # Generate spikes
-        spikes_by_gid = self.generate_spikes_by_gid(source_gids=source_gids)
+        node_ids, timestamps = self.generate_spike_arrays(source_gids=source_gids)
 
         # Write spikes to file
         spike_file = f"{self.block_name}_spikes.h5"
         spike_file_relative_path = Path(spike_file)
         spike_file_absolute_path = spike_file_directory / spike_file
-        self.write_spike_file(spikes_by_gid, spike_file_absolute_path, source_node_population)
+        self.write_spike_arrays(
+            node_ids, timestamps, spike_file_absolute_path, source_node_population
+        )
 
         return spike_file_relative_path
 
@@ -155,6 +158,44 @@ class SpikeStimulus(StimulusWithTimestamps):
     def generate_spikes_by_gid(self, source_gids: list[int]) -> dict[int, list[float]]:
         pass
 
+    def generate_spike_arrays(self, source_gids: list[int]) -> tuple[np.ndarray, np.ndarray]:
+        """Returns all spikes as flat (node_ids, timestamps) arrays.
+
+        Defaults to flattening generate_spikes_by_gid; stimuli with a vectorized spike generator
+        override this to avoid building per-gid lists.
+        """
+        return self.spikes_by_gid_to_arrays(self.generate_spikes_by_gid(source_gids))
+
+    @staticmethod
+    def spikes_by_gid_to_arrays(
+        spikes_by_gid: dict[int, list[float]],
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Flattens spike trains per gid into (node_ids, timestamps) arrays."""
+        times = []
+        gids = []
+        for gid, spike_times in spikes_by_gid.items():
+            times.extend(spike_times)
+            gids.extend([gid] * len(spike_times))
+        return np.array(gids, dtype=np.uint64), np.array(times, dtype=np.float64)
+
+    @staticmethod
+    def spike_arrays_to_spikes_by_gid(
+        node_ids: np.ndarray, timestamps: np.ndarray
+    ) -> dict[int, list[float]]:
+        """Groups (node_ids, timestamps) arrays into time-sorted spike trains per gid."""
+        spikes_by_gid: dict[int, list[float]] = defaultdict(list)
+        if len(node_ids) == 0:
+            return spikes_by_gid
+        sort_idx = np.lexsort((timestamps, node_ids))
+        sorted_ids = node_ids[sort_idx]
+        sorted_times = timestamps[sort_idx]
+        unique_ids, split_idx = np.unique(sorted_ids, return_index=True)
+        for gid, spike_times in zip(
+            unique_ids.tolist(), np.split(sorted_times, split_idx[1:]), strict=True
+        ):
+            spikes_by_gid[gid] = spike_times.tolist()
+        return spikes_by_gid
+
     @staticmethod
     def write_spike_file(
         spikes_by_gid: dict[int, list[float]],
@@ -165,19 +206,28 @@ class SpikeStimulus(StimulusWithTimestamps):
 
         Spike file format specs: https://github.com/AllenInstitute/sonata/blob/master/docs/SONATA_DEVELOPER_GUIDE.md#spike-file
         """
+        node_ids, timestamps = SpikeStimulus.spikes_by_gid_to_arrays(spikes_by_gid)
+        SpikeStimulus.write_spike_arrays(node_ids, timestamps, spike_file, source_node_population)
+
+    @staticmethod
+    def write_spike_arrays(
+        node_ids: np.ndarray,
+        timestamps: np.ndarray,
+        spike_file: Path,
+        source_node_population: str | None = None,
+    ) -> None:
+        """Writes SONATA output spikes given as flat (node_ids, timestamps) arrays to file.
+
+        Spikes are sorted by time (stable w.r.t. the input order).
+        """
         out_path = Path(spike_file).parent
         if not out_path.exists():
             out_path.mkdir(parents=True)
 
-        times = []
-        gids = []
-        for gid, spike_times in spikes_by_gid.items():
-            times.extend(spike_times)
-            gids.extend([gid] * len(spike_times))
-
-        sort_idx = np.argsort(times, kind="stable")
-        sorted_times = np.array(times, dtype=np.float64)[sort_idx]
-        sorted_gids = np.array(gids, dtype=np.uint64)[sort_idx]
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        sort_idx = np.argsort(timestamps, kind="stable")
+        sorted_times = timestamps[sort_idx]
+        sorted_gids = np.asarray(node_ids, dtype=np.uint64)[sort_idx]
 
         with h5py.File(spike_file, "w") as f:
             pop = f.create_group(f"/spikes/{source_node_population}")
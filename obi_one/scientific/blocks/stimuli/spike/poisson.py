@@ -1,4 +1,3 @@
-from collections import defaultdict
 from typing import Annotated, ClassVar
 
 import numpy as np
@@ -14,6 +13,7 @@ from obi_one.scientific.library.constants import (
     MAX_SIMULATION_LENGTH_MILLISECONDS,
     MIN_NON_NEGATIVE_FLOAT_VALUE,
 )
+from obi_one.scientific.library.spike_trains import homogeneous_poisson_spikes
 
 
 class PoissonSpikeStimulus(SpikeStimulus):
@@ -62,9 +62,7 @@ class PoissonSpikeStimulus(SpikeStimulus):
         },
     )
 
-    def generate_spikes_by_gid(self, source_gids: list[int]) -> dict[int, list[float]]:
-        rng = np.random.default_rng(self.random_seed)
-
+    def generate_spike_arrays(self, source_gids: list[int]) -> tuple[np.ndarray, np.ndarray]:
         if (
             self.duration
             * 1e-3  # ty:ignore[unsupported-operator]
@@ -79,18 +77,13 @@ class PoissonSpikeStimulus(SpikeStimulus):
             )
             raise OBIONEError(msg)
 
-        spikes_by_gid: dict[int, list[float]] = defaultdict(list)
-        for offset_timestamp in self._offset_timestamps():
-            start_time = offset_timestamp
-            end_time = start_time + self.duration  # ty:ignore[unsupported-operator]
-            for gid in source_gids:
-                t = start_time
-                while t < end_time:
-                    # Draw next spike time from exponential distribution
-                    interval = (
-                        rng.exponential(1.0 / self.frequency) * 1000  # ty:ignore[unsupported-operator]
-                    )  # convert s → ms
-                    t += interval
-                    if t < end_time:
-                        spikes_by_gid[gid].append(t)
-        return spikes_by_gid
+        return homogeneous_poisson_spikes(
+            np.random.default_rng(self.random_seed),
+            source_gids,
+            self._offset_timestamps(),
+            self.duration,  # ty:ignore[invalid-argument-type]
+            self.frequency,  # ty:ignore[invalid-argument-type]
+        )
+
+    def generate_spikes_by_gid(self, source_gids: list[int]) -> dict[int, list[float]]:
+        return self.spike_arrays_to_spikes_by_gid(*self.generate_spike_arrays(source_gids))
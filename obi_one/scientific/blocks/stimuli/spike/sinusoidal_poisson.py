@@ -1,4 +1,3 @@
-from collections import defaultdict
 from typing import Annotated, ClassVar, Self
 
 import numpy as np
@@ -17,15 +16,10 @@ from obi_one.scientific.library.constants import (
     MAX_POISSON_SPIKE_LIMIT,
     MAX_SIMULATION_LENGTH_MILLISECONDS,
 )
-
-
-def _draw_inhomogeneous_poisson_interval_ms(rng: np.random.Generator, lam_max_hz: float) -> float:
-    """Draw a candidate inter-arrival time (ms) for a homogeneous process with rate lam_max."""
-    if lam_max_hz <= 0.0:
-        msg = "Maximum lambda must be positive to draw inter-arrival times."
-        raise ValueError(msg)
-    # Exponential with rate lam_max (in Hz) → seconds, then convert to ms
-    return rng.exponential(1.0 / lam_max_hz) * 1000.0
+from obi_one.scientific.library.spike_trains import (
+    sinusoidal_poisson_spikes,
+    sinusoidal_rate_hz,
+)
 
 
 class SinusoidalPoissonSpikeStimulus(SpikeStimulus):
@@ -136,19 +130,16 @@ class SinusoidalPoissonSpikeStimulus(SpikeStimulus):
     # --- internal helpers ---
     @staticmethod
     def _lambda_t_ms(
-        t_ms: float, minimum_rate: float, maximum_rate: float, mod_freq_hz: float, phase_rad: float
-    ) -> float:
-        """Instantaneous rate λ(t) at time t in ms, returned in Hz."""
-        t_s = t_ms / 1000.0
-        lam = minimum_rate + (maximum_rate - minimum_rate) * (
-            (np.sin(2.0 * np.pi * mod_freq_hz * t_s + phase_rad) + 1.0) / 2.0
-        )
-
-        return max(0.0, lam)
-
-    def generate_spikes_by_gid(self, source_gids: list[int]) -> dict[int, list[float]]:
-        rng = np.random.default_rng(self.random_seed)
-
+        t_ms: float | np.ndarray,
+        minimum_rate: float,
+        maximum_rate: float,
+        mod_freq_hz: float,
+        phase_rad: float,
+    ) -> float | np.ndarray:
+        """Instantaneous rate λ(t) at time(s) t in ms, returned in Hz."""
+        return sinusoidal_rate_hz(t_ms, minimum_rate, maximum_rate, mod_freq_hz, phase_rad)
+
+    def generate_spike_arrays(self, source_gids: list[int]) -> tuple[np.ndarray, np.ndarray]:
         # Upper-bound on expected spikes to guard against pathological params
         total_expected = (
             (self.duration * len(self._offset_timestamps()) / 1000.0)  # ty:ignore[unsupported-operator]
@@ -162,35 +153,18 @@ class SinusoidalPoissonSpikeStimulus(SpikeStimulus):
             )
             raise ValueError(msg)
 
-        spikes_by_gid: dict[int, list[float]] = defaultdict(list)
-        lam_max_hz = self.maximum_rate
-        phase_rad = np.deg2rad(self.phase_degrees)
-
-        for t0 in self._offset_timestamps():
-            start_time = t0
-            end_time = start_time + self.duration  # ty:ignore[unsupported-operator]
-
-            for gid in source_gids:
-                t = start_time
-                while t < end_time:
-                    dt_ms = _draw_inhomogeneous_poisson_interval_ms(rng, lam_max_hz)  # ty:ignore[invalid-argument-type]
-                    if not np.isfinite(dt_ms):
-                        break
-                    t_candidate = t + dt_ms
-                    if t_candidate >= end_time:
-                        break
-
-                    # Accept with probability λ(t_candidate)/λ_max
-                    lam_tc = self._lambda_t_ms(
-                        t_candidate - start_time,
-                        self.minimum_rate,  # ty:ignore[invalid-argument-type]
-                        self.maximum_rate,  # ty:ignore[invalid-argument-type]
-                        self.modulation_frequency_hz,  # ty:ignore[invalid-argument-type]
-                        phase_rad,  # ty:ignore[invalid-argument-type]
-                    )
-                    if lam_max_hz > 0.0 and rng.uniform() <= lam_tc / lam_max_hz:  # ty:ignore[unsupported-operator]
-                        spikes_by_gid[gid].append(t_candidate)
-
-                    t = t_candidate
-
-        return spikes_by_gid
+        return sinusoidal_poisson_spikes(
+            np.random.default_rng(self.random_seed),
+            source_gids,
+            self._offset_timestamps(),
+            self.duration,  # ty:ignore[invalid-argument-type]
+            rate_params=(
+                self.minimum_rate,  # ty:ignore[invalid-argument-type]
+                self.maximum_rate,  # ty:ignore[invalid-argument-type]
+                self.modulation_frequency_hz,  # ty:ignore[invalid-argument-type]
+                np.deg2rad(self.phase_degrees),  # ty:ignore[invalid-argument-type]
+            ),
+        )
+
+    def generate_spikes_by_gid(self, source_gids: list[int]) -> dict[int, list[float]]:
+        return self.spike_arrays_to_spikes_by_gid(*self.generate_spike_arrays(source_gids))
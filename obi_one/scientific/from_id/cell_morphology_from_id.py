@@ -17,6 +17,7 @@ from morph_spines import MorphologyWithSpines, load_morphology_with_spines
 from pydantic import PrivateAttr
 
 from obi_one.core.entity_from_id import EntityFromID, LoadAssetMethod
+from obi_one.core.entity_staging_cache import EntityStagingCache
 
 L = logging.getLogger(__name__)
 
@@ -148,12 +149,26 @@ class CellMorphologyFromID(EntityFromID):
                 if asset.id is None:
                     msg = "Asset must have an id"
                     raise ValueError(msg)
-                db_client.download_file(
-                    entity_id=entity.id,
-                    entity_type=self.entitysdk_class,
-                    asset_id=asset.id,
-                    output_path=str(path_to),  # ty:ignore[invalid-argument-type]
-                )
+                asset_id = asset.id
+
+                def _download(output_path: Path, asset_id: str = asset_id) -> None:
+                    db_client.download_file(
+                        entity_id=entity.id,
+                        entity_type=self.entitysdk_class,
+                        asset_id=asset_id,
+                        output_path=str(output_path),  # ty:ignore[invalid-argument-type]
+                    )
+
+                staging_cache = EntityStagingCache.from_settings()
+                if staging_cache is None:
+                    _download(Path(path_to))
+                else:
+                    staging_cache.stage(
+                        entity,
+                        kind=AssetLabel.morphology_with_spines,
+                        dest_path=Path(path_to),
+                        stage=_download,
+                    )
                 return
         err_str = "Entity does not have a spiny morphology asset!"
         raise EntitySDKError(err_str)
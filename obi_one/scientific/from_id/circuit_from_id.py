@@ -6,6 +6,7 @@ from entitysdk.staging.circuit import stage_circuit
 from pydantic import PrivateAttr
 
 from obi_one.core.entity_from_id import EntityFromID
+from obi_one.core.entity_staging_cache import stage_entity
 from obi_one.core.exception import OBIONEError
 from obi_one.scientific.library.circuit import Circuit
 from obi_one.scientific.library.memodel_circuit import MEModelWithSynapsesCircuit
@@ -24,17 +25,19 @@ class CircuitFromID(EntityFromID):
     ) -> Circuit:
         for asset in self.entity(db_client=db_client).assets:
             if asset.label == "sonata_circuit":
-                if not entity_cache and dest_dir.exists():
-                    msg = f"Circuit directory '{dest_dir}' already exists and is not empty."
-                    raise FileExistsError(msg)
-
-                if (not entity_cache) | (entity_cache and not dest_dir.exists()):
-                    stage_circuit(
+                entity = self.entity(db_client)
+                stage_entity(
+                    entity,
+                    kind="sonata_circuit",
+                    dest_path=dest_dir,
+                    stage=lambda output_dir, entity=entity: stage_circuit(
                         client=db_client,
-                        model=self.entity(db_client),  # ty:ignore[invalid-argument-type]
-                        output_dir=dest_dir,
+                        model=entity,  # ty:ignore[invalid-argument-type]
+                        output_dir=output_dir,
                         max_concurrent=4,
-                    )
+                    ),
+                    entity_cache=entity_cache,
+                )
 
                 circuit = Circuit(
                     name=str(self),
@@ -66,17 +69,19 @@ class MEModelWithSynapsesCircuitFromID(EntityFromID):
     ) -> MEModelWithSynapsesCircuit:
         for asset in self.entity(db_client=db_client).assets:
             if asset.label == "sonata_circuit":
-                if not entity_cache and dest_dir.exists():
-                    msg = f"Circuit directory '{dest_dir}' already exists and is not empty."
-                    raise FileExistsError(msg)
-
-                if (not entity_cache) | (entity_cache and not dest_dir.exists()):
-                    stage_circuit(
+                entity = self.entity(db_client)
+                stage_entity(
+                    entity,
+                    kind="sonata_circuit",
+                    dest_path=dest_dir,
+                    stage=lambda output_dir, entity=entity: stage_circuit(
                         client=db_client,
-                        model=self.entity(db_client),
-                        output_dir=dest_dir,
+                        model=entity,
+                        output_dir=output_dir,
                         max_concurrent=4,
-                    )
+                    ),
+                    entity_cache=entity_cache,
+                )
 
                 circuit = MEModelWithSynapsesCircuit(
                     name=dest_dir.name,
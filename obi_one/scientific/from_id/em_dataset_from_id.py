@@ -1,5 +1,7 @@
 import functools
+import logging
 from collections.abc import Callable
+from pathlib import Path
 from typing import ClassVar
 
 import numpy  # ruff: ignore[unconventional-import-alias]
@@ -14,6 +16,9 @@ from pydantic import PrivateAttr
 from obi_one.config import settings
 from obi_one.core.entity_from_id import EntityFromID
 from obi_one.core.exception import OBIONEError
+from obi_one.utils.directory_cache import DirectoryCache
+
+L = logging.getLogger(__name__)
 
 _C_P_LOCS = ["synapse_x", "synapse_y", "synapse_z"]
 _NM_to_UM = 1e-3
@@ -70,6 +75,77 @@ def _configure_caveclient_retries() -> None:
 _configure_caveclient_retries()
 
 
+class CAVEQueryCache:
+    """Persistent cache of CAVE synapse tables and EM dataset metadata.
+
+    Since materialization versions are immutable, the synapse table of each postsynaptic neuron
+    is stored as a Parquet file keyed on datastack, materialization version and root id.
+    Concurrent queries for the same entry fill it only once; least recently used entries are
+    evicted once the cache exceeds its size limit.
+    """
+
+    _SYNAPSES_FILENAME = "synapses.parquet"
+
+    def __init__(self, cache_dir: Path, max_size_bytes: int | None = None) -> None:
+        """Initialize object."""
+        self._cache = DirectoryCache(cache_dir, max_size_bytes=max_size_bytes)
+
+    @classmethod
+    def from_settings(cls) -> "CAVEQueryCache | None":
+        """Returns the cache configured in the settings, or None if disabled."""
+        cache_settings = settings.cave_query_cache
+        if not cache_settings.enabled:
+            return None
+        return cls(cache_settings.cache_dir, max_size_bytes=cache_settings.max_size_bytes)
+
+    @staticmethod
+    def _synapses_key(datastack: str, cave_version: int, pt_root_id: int) -> str:
+        return f"{datastack}_v{cave_version}_synapses_{pt_root_id}"
+
+    def has_synapses(self, datastack: str, cave_version: int, pt_root_id: int) -> bool:
+        """Returns if the synapse table of a neuron is cached."""
+        return self._cache.is_complete(self._synapses_key(datastack, cave_version, pt_root_id))
+
+    def get_synapses(
+        self, datastack: str, cave_version: int, pt_root_id: int
+    ) -> tuple[pandas.DataFrame, str | None] | None:
+        """Returns the cached synapse table and table notice of a neuron, or None."""
+        key = self._synapses_key(datastack, cave_version, pt_root_id)
+        metadata = self._cache.get(key)
+        if metadata is None:
+            return None
+        try:
+            syns = pandas.read_parquet(self._cache.entry_dir(key) / self._SYNAPSES_FILENAME)
+        except FileNotFoundError:  # Evicted in the meantime
+            return None
+        return syns, metadata["notice_text"]
+
+    def put_synapses(
+        self,
+        datastack: str,
+        cave_version: int,
+        pt_root_id: int,
+        syns: pandas.DataFrame,
+        notice_text: str | None,
+    ) -> None:
+        """Stores the synapse table and table notice of a neuron."""
+
+        def _create(entry_dir: Path) -> dict:
+            syns.to_parquet(entry_dir / self._SYNAPSES_FILENAME)
+            return {"notice_text": notice_text}
+
+        self._cache.get_or_create(self._synapses_key(datastack, cave_version, pt_root_id), _create)
+
+    def viewer_resolution(self, datastack: str, fetch: Callable[[], list]) -> numpy.ndarray:
+        """Returns the cached viewer resolution of a datastack, fetching it on a cache miss."""
+
+        def _create(_entry_dir: Path) -> dict:
+            return {"viewer_resolution": [float(x) for x in fetch()]}
+
+        _, metadata = self._cache.get_or_create(f"{datastack}_info", _create)
+        return numpy.array(metadata["viewer_resolution"])
+
+
 class EMDataSetFromID(EntityFromID):
     entitysdk_class: ClassVar[type[Entity]] = EMDenseReconstructionDataset
     _entity: EMDenseReconstructionDataset | None = PrivateAttr(default=None)
@@ -84,13 +160,18 @@ class EMDataSetFromID(EntityFromID):
         db_client: Client | None = None,
         col_location: str = "ctr_pt_position",
     ) -> tuple[pandas.DataFrame, str]:
-        client = self._make_cave_client(db_client, cave_version=cave_version)  # ty:ignore[invalid-argument-type]
-        if self._viewer_resolution is None:
-            self._viewer_resolution = client.info.viewer_resolution()  # ty:ignore[unresolved-attribute]
-
         if not isinstance(pt_root_id, list):
             pt_root_id = [pt_root_id]  # ty:ignore[invalid-assignment]
-        syns = client.materialize.synapse_query(post_ids=pt_root_id)  # ty:ignore[unresolved-attribute]
+
+        cache = CAVEQueryCache.from_settings() if cave_version is not None else None
+        if cache is None:
+            client = self._make_cave_client(db_client, cave_version=cave_version)  # ty:ignore[invalid-argument-type]
+            if self._viewer_resolution is None:
+                self._viewer_resolution = client.info.viewer_resolution()  # ty:ignore[unresolved-attribute]
+            syns = client.materialize.synapse_query(post_ids=pt_root_id)  # ty:ignore[unresolved-attribute]
+            notice_text = self._synapse_table_notice(client)
+        else:
+            syns, notice_text = self._cached_synapses(cache, pt_root_id, cave_version, db_client)  # ty:ignore[invalid-argument-type]
 
         syn_locs = syns[col_location].apply(
             lambda _x: pandas.Series(
@@ -99,11 +180,114 @@ class EMDataSetFromID(EntityFromID):
         )
         syns = pandas.concat([syns, syn_locs], axis=1).reset_index(drop=True)
         syns.index.name = "synapse_id"
+        return syns, notice_text
+
+    @_graceful_materialize_errors
+    def prefetch_synapses(
+        self, pt_root_ids: list[int], cave_version: int, db_client: Client | None = None
+    ) -> None:
+        """Fills the CAVE query cache (if enabled) for the given postsynaptic neurons.
 
-        notice_text = client.materialize.get_table_metadata(client.materialize.synapse_table).get(  # ty:ignore[unresolved-attribute]
+        Missing synapse tables are fetched with batched multi-neuron queries.
+        """
+        cache = CAVEQueryCache.from_settings()
+        if cache is None or cave_version is None:
+            return
+        datastack = self.entity(db_client=db_client).cave_datastack  # ty:ignore[unresolved-attribute]
+        misses = [
+            pt_root_id
+            for pt_root_id in dict.fromkeys(pt_root_ids)
+            if not cache.has_synapses(datastack, cave_version, pt_root_id)
+        ]
+        if misses:
+            self._fetch_synapses(cache, datastack, misses, cave_version, db_client)  # ty:ignore[invalid-argument-type]
+
+    @staticmethod
+    def _synapse_table_notice(client: CAVEclient) -> str | None:
+        return client.materialize.get_table_metadata(client.materialize.synapse_table).get(  # ty:ignore[unresolved-attribute]
             "notice_text"
         )
-        return syns, notice_text
+
+    @staticmethod
+    def _query_synapses(
+        client: CAVEclient, post_ids: list[int]
+    ) -> list[tuple[list[int], pandas.DataFrame, bool]]:
+        """Queries the synapses of neurons, splitting queries that hit the CAVE row limit.
+
+        Returns:
+            For each part of the neurons, their ids, their synapse table and whether it is complete.
+        """
+        row_limit = settings.cave_query_cache.query_row_limit
+        results = []
+        pending = [post_ids]
+        while pending:
+            batch = pending.pop()
+            L.info(f"Querying synapses of {len(batch)} neurons from CAVE...")
+            syns = client.materialize.synapse_query(post_ids=batch)  # ty:ignore[unresolved-attribute]
+            if len(syns) < row_limit:
+                results.append((batch, syns, True))
+            elif len(batch) > 1:
+                half = len(batch) // 2
+                pending.extend([batch[half:], batch[:half]])
+            else:
+                L.warning(
+                    f"Synapses of neuron {batch[0]} may be truncated at the CAVE row limit"
+                    f" ({row_limit}), not caching them"
+                )
+                results.append((batch, syns, False))
+        return results
+
+    def _fetch_synapses(
+        self,
+        cache: CAVEQueryCache,
+        datastack: str,
+        pt_root_ids: list[int],
+        cave_version: int,
+        db_client: Client,
+    ) -> dict[int, tuple[pandas.DataFrame, str | None]]:
+        """Fetches the synapse tables of neurons with batched queries and caches them.
+
+        Batches whose query hits the CAVE row limit are split. Tables that may still be truncated
+        (i.e., of a single neuron hitting the limit) are returned but not cached.
+
+        Returns:
+            The synapse tables and table notices, by root id.
+        """
+        client = self._make_cave_client(db_client, cave_version=cave_version)
+        notice_text = self._synapse_table_notice(client)
+        batch_size = max(settings.cave_query_cache.batch_size, 1)
+        fetched = {}
+        for start in range(0, len(pt_root_ids), batch_size):
+            batch = pt_root_ids[start : start + batch_size]
+            for post_ids, syns, is_complete in self._query_synapses(client, batch):
+                for pt_root_id in post_ids:
+                    root_syns = syns[syns["post_pt_root_id"] == pt_root_id].reset_index(drop=True)
+                    if is_complete:
+                        cache.put_synapses(
+                            datastack, cave_version, pt_root_id, root_syns, notice_text
+                        )
+                    fetched[pt_root_id] = (root_syns, notice_text)
+        return fetched
+
+    def _cached_synapses(
+        self,
+        cache: CAVEQueryCache,
+        pt_root_ids: list[int],
+        cave_version: int,
+        db_client: Client,
+    ) -> tuple[pandas.DataFrame, str | None]:
+        """Synapse tables of neurons from the cache, fetching (and caching) missing ones."""
+        datastack = self.entity(db_client=db_client).cave_datastack  # ty:ignore[unresolved-attribute]
+        tables = {
+            pt_root_id: cache.get_synapses(datastack, cave_version, pt_root_id)
+            for pt_root_id in dict.fromkeys(pt_root_ids)
+        }
+        misses = [pt_root_id for pt_root_id, table in tables.items() if table is None]
+        if misses:
+            tables.update(self._fetch_synapses(cache, datastack, misses, cave_version, db_client))
+
+        syns = pandas.concat([table[0] for table in tables.values()], axis=0, ignore_index=True)  # ty:ignore[not-subscriptable]
+        return syns, next(iter(tables.values()))[1]  # ty:ignore[not-subscriptable]
 
     @_graceful_materialize_errors
     def neuron_info_df(
@@ -137,9 +321,18 @@ class EMDataSetFromID(EntityFromID):
     @_graceful_materialize_errors
     def viewer_resolution(self, db_client: Client | None = None) -> list:
         if self._viewer_resolution is None:
-            self._viewer_resolution = self._make_cave_client(
-                db_client=db_client  # ty:ignore[invalid-argument-type]
-            ).info.viewer_resolution()  # ty:ignore[unresolved-attribute]
+
+            def _fetch() -> list:
+                return self._make_cave_client(
+                    db_client=db_client  # ty:ignore[invalid-argument-type]
+                ).info.viewer_resolution()  # ty:ignore[unresolved-attribute]
+
+            cache = CAVEQueryCache.from_settings()
+            if cache is None:
+                self._viewer_resolution = _fetch()  # ty:ignore[invalid-assignment]
+            else:
+                datastack = self.entity(db_client=db_client).cave_datastack  # ty:ignore[unresolved-attribute]
+                self._viewer_resolution = cache.viewer_resolution(datastack, _fetch)
         return self._viewer_resolution  # ty:ignore[invalid-return-type]
 
     def _make_cave_client(self, db_client: Client, cave_version: int | None = None) -> CAVEclient:
@@ -4,10 +4,11 @@ from typing import ClassVar
 from entitysdk.client import Client
 from entitysdk.models import MEModel
 from entitysdk.models.entity import Entity
-from entitysdk.staging.memodel import stage_sonata_from_memodel
+from entitysdk.staging.memodel import DEFAULT_CIRCUIT_CONFIG_FILENAME, stage_sonata_from_memodel
 from pydantic import PrivateAttr
 
 from obi_one.core.entity_from_id import EntityFromID
+from obi_one.core.entity_staging_cache import stage_entity
 from obi_one.scientific.library.memodel_circuit import MEModelCircuit
 
 
@@ -22,17 +23,18 @@ class MEModelFromID(EntityFromID):
         dest_dir: Path | None = None,
         entity_cache: bool = False,
     ) -> MEModelCircuit:
-        if not entity_cache and dest_dir.exists():  # ty:ignore[unresolved-attribute]
-            msg = f"Circuit directory '{dest_dir}' already exists and is not empty."
-            raise FileExistsError(msg)
-
-        if (not entity_cache) | (entity_cache and not dest_dir.exists()):  # ty:ignore[unresolved-attribute]
-            circuit_config_path = stage_sonata_from_memodel(
+        memodel = self.entity(db_client)
+        stage_entity(
+            memodel,
+            kind="sonata_from_memodel",
+            dest_path=dest_dir,  # ty:ignore[invalid-argument-type]
+            stage=lambda output_dir: stage_sonata_from_memodel(
                 client=db_client,
-                memodel=self.entity(db_client),  # ty:ignore[invalid-argument-type]
-                output_dir=dest_dir,  # ty:ignore[invalid-argument-type]
-            )
-        else:
-            circuit_config_path = dest_dir / "circuit_config.json"  # ty:ignore[unsupported-operator]
+                memodel=memodel,  # ty:ignore[invalid-argument-type]
+                output_dir=output_dir,
+            ),
+            entity_cache=entity_cache,
+        )
+        circuit_config_path = dest_dir / DEFAULT_CIRCUIT_CONFIG_FILENAME  # ty:ignore[unsupported-operator]
 
         return MEModelCircuit(name="single_cell", path=str(circuit_config_path))
@@ -12,7 +12,12 @@ from obi_one.scientific.library.circuit_metrics import (
     TYPES_OF_POINT_NODES,
     TYPES_OF_VIRTUAL_NODES,
 )
+from obi_one.scientific.library.morphology_cache import morphology_cache
 from obi_one.scientific.library.morphology_loader import load_morphology_nrn_order
+from obi_one.scientific.library.sonata_circuit_helpers import (
+    load_sonata_circuit,
+    writable_sonata_circuit_copy,
+)
 
 CIRCUIT_MOD_DIR = "mod"
 
@@ -30,7 +35,7 @@ class Circuit(OBIBaseModel):
     def __init__(self, name: str, path: str, **kwargs) -> None:
         """Initialize object."""
         super().__init__(name=name, path=path, **kwargs)  # ty:ignore[unknown-argument]
-        c = snap.Circuit(self.path)  # Basic check: Try to load the SONATA circuit w/o error
+        c = self.sonata_circuit  # Basic check: Try to load the SONATA circuit w/o error
 
         if self.matrix_path is not None:
             cmat = ConnectivityMatrix.from_h5(
@@ -51,8 +56,16 @@ class Circuit(OBIBaseModel):
 
     @property
     def sonata_circuit(self) -> snap.Circuit:
-        """Provide access to SONATA circuit object."""
-        return snap.Circuit(self.path)
+        """Provide access to the shared (read-only) SONATA circuit object.
+
+        The object is cached per circuit config path and modification time. Use
+        writable_sonata_circuit() to get a copy that can be modified (e.g., adding node sets).
+        """
+        return load_sonata_circuit(self.path)
+
+    def writable_sonata_circuit(self) -> snap.Circuit:
+        """Returns a private copy of the SONATA circuit object whose node sets can be modified."""
+        return writable_sonata_circuit_copy(self.sonata_circuit)
 
     @property
     def connectivity_matrix(self) -> ConnectivityMatrix:
@@ -268,7 +281,14 @@ class Circuit(OBIBaseModel):
         raise FileNotFoundError(msg)
 
     def load_morphology(self, node_id: int, population: str | None = None) -> morphio.Morphology:
-        return load_morphology_nrn_order(self.get_morphology_path(node_id, population=population))
+        return self.load_morphology_file(self.get_morphology_path(node_id, population=population))
+
+    @staticmethod
+    def load_morphology_file(path: Path) -> morphio.Morphology:
+        """Loads (or reuses from the morphology cache) a morphology file in NEURON order."""
+        return morphology_cache.load(
+            path, "nrn_order", lambda: load_morphology_nrn_order(path)
+        ).morphology
 
     @property
     def mechanisms_dir(self) -> Path:
@@ -1,8 +1,13 @@
+import hashlib
 import json
+import math
 import os.path
 import tempfile
-from collections.abc import Iterator, Mapping
+import threading
+from collections.abc import Callable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
 from enum import IntEnum, StrEnum, auto
+from functools import cached_property, partial
 from os.path import realpath
 from pathlib import Path
 from uuid import UUID
@@ -21,9 +26,14 @@ from libsonata import (
     EdgeStorage,
     NodePopulation,
     NodeStorage,
+    Selection,
 )
 from pydantic import BaseModel
 
+from obi_one.config import settings
+from obi_one.scientific.library.streaming_stats import QuantileSketch, RunningStats
+from obi_one.utils.directory_cache import DirectoryCache
+
 ALL_POPULATIONS = "_ALL_"
 TYPES_OF_CHEMICAL_SYNS = ["chemical", "Exp2Syn_synapse", "point_process"]
 TYPES_OF_ELECTRICAL_SYNS = ["electrical"]
@@ -63,6 +73,11 @@ class CircuitStatsLevelOfDetail(IntEnum):
     full = 3
 
 
+# Maximum number of edges read at once when computing degree and edge property statistics
+EDGE_CHUNK_SIZE = 10_000_000
+# Maximum rank error (fraction of the number of edges) of the edge property medians
+EDGE_STATS_QUANTILE_ERROR = 1e-3
+
 MAX_UNIQUE_VALUES = {
     CircuitStatsLevelOfDetail.basic: 25,
     CircuitStatsLevelOfDetail.advanced: 50,
@@ -128,6 +143,51 @@ class TemporaryAsset:
         self.temp_dir.__exit__(*args)
 
 
+class CircuitConfigAsset:
+    """Circuit config of a circuit's directory asset, fetched on first access."""
+
+    def __init__(self, db_client: Client, circuit_id: str, asset_id: str | UUID) -> None:
+        """Initialize CircuitConfigAsset."""
+        self._db_client = db_client
+        self._circuit_id = circuit_id
+        self._asset_id = asset_id
+        self._lock = threading.Lock()
+
+    @cached_property
+    def _circuit_and_temp_dir(self) -> tuple[SnapCircuit, str]:
+        # db_client.download_content does not support `asset_path` at the time of writing this
+        # Use db_client.fetch_file with temporary directory instead
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_file_path = Path(temp_dir) / "circuit_config.json"
+
+            self._db_client.fetch_file(
+                entity_id=UUID(self._circuit_id),
+                entity_type=Circuit,
+                asset_id=UUID(str(self._asset_id)),
+                output_path=temp_file_path,
+                asset_path=Path("circuit_config.json"),
+                strategy=FetchFileStrategy.link_or_download,
+            )
+
+            circ = SnapCircuit(temp_file_path)
+        return circ, realpath(str(temp_dir))
+
+    def _get(self) -> tuple[SnapCircuit, str]:
+        # Populations may be processed concurrently; fetch the circuit config only once
+        with self._lock:
+            return self._circuit_and_temp_dir
+
+    @property
+    def circuit(self) -> SnapCircuit:
+        """SONATA circuit, with files resolved relative to temp_dir."""
+        return self._get()[0]
+
+    @property
+    def temp_dir(self) -> str:
+        """(Already removed) temporary directory the circuit config was fetched into."""
+        return self._get()[1]
+
+
 def get_names_of_typed_populations(
     config: CircuitConfig, type_str: list[str], population_type: str
 ) -> list[str]:
@@ -274,150 +334,408 @@ def node_location_properties_from_population(pop: NodePopulation) -> dict:
     return vals_dict
 
 
-def edge_property_stats_from_population(pop: EdgePopulation) -> dict:
+def edge_selection_chunks(
+    pop: EdgePopulation, chunk_size: int = EDGE_CHUNK_SIZE
+) -> Iterator[Selection]:
+    """Yields selections of consecutive edges with at most chunk_size edges each."""
+    for start in range(0, pop.size, chunk_size):
+        yield Selection([(start, min(start + chunk_size, pop.size))])
+
+
+def edge_property_stats_from_population(
+    pop: EdgePopulation,
+    chunk_size: int = EDGE_CHUNK_SIZE,
+    quantile_error: float = EDGE_STATS_QUANTILE_ERROR,
+) -> dict:
+    """Summary statistics of all non-enumeration edge properties.
+
+    All properties are processed in a single streaming pass over chunks of consecutive edges, so
+    that memory is bounded by the chunk size. Min, max, mean and std are exact; the median is
+    exact for small populations and otherwise approximate with a rank error of at most
+    quantile_error times the number of edges.
+    """
+    edgeprop_names = [name for name in pop.attribute_names if name not in pop.enumeration_names]
+    num_chunks = math.ceil(pop.size / chunk_size)
+    running_stats = {name: RunningStats() for name in edgeprop_names}
+    sketches = {name: QuantileSketch(quantile_error, num_chunks) for name in edgeprop_names}
+    for selection in edge_selection_chunks(pop, chunk_size):
+        for name in edgeprop_names:
+            vals = pop.get_attribute(name, selection)
+            running_stats[name].update(vals)
+            sketches[name].update(vals)
+
     vals_dict = {}
-    for edgeprop_name in pop.attribute_names:
-        if edgeprop_name in pop.enumeration_names:
+    for name in edgeprop_names:
+        stats = running_stats[name]
+        if stats.count == 0:
+            vals_dict[name] = dict.fromkeys(["mean", "median", "min", "max", "std"], math.nan)
             continue
-        vals = pop.get_attribute(edgeprop_name, pop.select_all())
-        vals_dict[edgeprop_name] = {
-            "mean": np.mean(vals),
-            "median": np.median(vals),
-            "min": np.min(vals),
-            "max": np.max(vals),
-            "std": np.std(vals),
+        vals_dict[name] = {
+            "mean": stats.mean,
+            "median": sketches[name].quantile(0.5),
+            "min": stats.min,
+            "max": stats.max,
+            "std": stats.std,
         }
     return vals_dict
 
 
+def node_degrees_from_population(
+    pop: EdgePopulation,
+    number_of_sources: int,
+    number_of_targets: int,
+    chunk_size: int = EDGE_CHUNK_SIZE,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Returns in-degrees (per target node) and out-degrees (per source node).
+
+    Source and target node IDs are read in chunks of consecutive edges and counted using
+    np.bincount, so that memory is bounded by the chunk size and the number of nodes.
+    """
+    indegs = np.zeros(number_of_targets, dtype=np.int64)
+    outdegs = np.zeros(number_of_sources, dtype=np.int64)
+    for selection in edge_selection_chunks(pop, chunk_size):
+        indegs += np.bincount(pop.target_nodes(selection), minlength=number_of_targets)
+        outdegs += np.bincount(pop.source_nodes(selection), minlength=number_of_sources)
+    return indegs, outdegs
+
+
+def _degree_summary(degs: np.ndarray) -> dict[str, float]:
+    return {
+        "min": np.min(degs),
+        "mean": np.mean(degs),
+        "median": np.median(degs),
+        "max": np.max(degs),
+    }
+
+
 def degree_stats_from_population(
-    pop: EdgePopulation, node_stats_dict: dict
+    pop: EdgePopulation, node_stats_dict: dict, chunk_size: int = EDGE_CHUNK_SIZE
 ) -> dict[str, dict[str, float]]:
-    sz = node_stats_dict[pop.target]["population_length"]
-    indegs = np.array([pop.afferent_edges(i).flat_size for i in range(sz)])
-    sz = node_stats_dict[pop.source]["population_length"]
-    outdegs = np.array([pop.efferent_edges(i).flat_size for i in range(sz)])
+    indegs, outdegs = node_degrees_from_population(
+        pop,
+        number_of_sources=node_stats_dict[pop.source]["population_length"],
+        number_of_targets=node_stats_dict[pop.target]["population_length"],
+        chunk_size=chunk_size,
+    )
     stats = {
-        degtype: {
-            "min": np.min(degs),
-            "mean": np.mean(degs),
-            "median": np.median(degs),
-            "max": np.max(degs),
-        }
-        for degtype, degs in zip(
-            [DegreeTypes.indegree, DegreeTypes.outdegree],
-            [indegs, outdegs],
-            strict=False,
-        )
+        DegreeTypes.indegree: _degree_summary(indegs),
+        DegreeTypes.outdegree: _degree_summary(outdegs),
     }
     if len(indegs) == len(outdegs):
-        ttldegs = indegs + outdegs
-        degdiff = outdegs - indegs
-        add_stats = {
-            degtype: {
-                "min": np.min(degs),
-                "mean": np.mean(degs),
-                "median": np.median(degs),
-                "max": np.max(degs),
-            }
-            for degtype, degs in zip(
-                [DegreeTypes.totaldegree, DegreeTypes.degreedifference],
-                [ttldegs, degdiff],
-                strict=False,
-            )
-        }
-        stats.update(add_stats)
+        stats[DegreeTypes.totaldegree] = _degree_summary(indegs + outdegs)
+        stats[DegreeTypes.degreedifference] = _degree_summary(outdegs - indegs)
     return stats  # ty:ignore[invalid-return-type]
 
 
+def properties_from_node_population(
+    circuit_config: CircuitConfigAsset,
+    nodepop: str,
+    db_client: Client,
+    circuit_id: str,
+    asset_id: str | UUID,
+    lod: CircuitStatsLevelOfDetail,
+    *,
+    is_biophysical: bool,
+) -> dict:
+    max_uv = MAX_UNIQUE_VALUES[lod]
+    np_file_path = circuit_config.circuit.nodes[nodepop].h5_filepath
+    remote_path = Path(np_file_path).relative_to(circuit_config.temp_dir)
+    properties = {}
+    with TemporaryAsset(remote_path, db_client, circuit_id, str(asset_id)) as fn:
+        pop_obj = NodeStorage(fn).open_population(nodepop)
+        properties["population_length"] = pop_obj.size
+        properties["property_list"] = list(pop_obj.attribute_names)
+        properties["property_unique_values"] = unique_node_property_values_from_population(
+            pop_obj, max_uv
+        )
+        properties["property_value_counts"] = number_of_nodes_per_unique_value_from_population(
+            pop_obj, max_uv
+        )
+        if is_biophysical:
+            properties["dynamics_param_names"] = dynamics_params_from_population(pop_obj)
+        if lod > CircuitStatsLevelOfDetail.basic:
+            properties["node_location_info"] = node_location_properties_from_population(pop_obj)
+    return properties
+
+
+def properties_from_edge_population(
+    circuit_config: CircuitConfigAsset,
+    edgepop: str,
+    node_stats_dict: dict,
+    db_client: Client,
+    circuit_id: str,
+    asset_id: str | UUID,
+    lod: CircuitStatsLevelOfDetail,
+) -> dict:
+    properties = {"property_stats": {}, "degrees": {}}
+    ep_file_path = circuit_config.circuit.edges[edgepop].h5_filepath
+    remote_path = Path(ep_file_path).relative_to(circuit_config.temp_dir)
+    with TemporaryAsset(remote_path, db_client, circuit_id, str(asset_id)) as fn:
+        pop_obj = EdgeStorage(fn).open_population(edgepop)
+        properties["number_of_edges"] = pop_obj.size
+        properties["property_list"] = list(pop_obj.attribute_names)
+        properties["source_name"] = pop_obj.source
+        properties["target_name"] = pop_obj.target
+        if lod > CircuitStatsLevelOfDetail.basic:
+            properties["property_stats"] = edge_property_stats_from_population(pop_obj)
+            properties["degrees"] = degree_stats_from_population(pop_obj, node_stats_dict)
+    return properties
+
+
+def reduce_node_properties(properties: dict, lod: CircuitStatsLevelOfDetail) -> dict:
+    """Reduces node population properties computed at a higher level of detail to lod."""
+    max_uv = MAX_UNIQUE_VALUES[lod]
+    reduced = dict(properties)
+    reduced["property_unique_values"] = {
+        name: vals
+        for name, vals in properties["property_unique_values"].items()
+        if len(vals) <= max_uv
+    }
+    reduced["property_value_counts"] = {
+        name: counts
+        for name, counts in properties["property_value_counts"].items()
+        if name in reduced["property_unique_values"]
+    }
+    if lod <= CircuitStatsLevelOfDetail.basic:
+        reduced.pop("node_location_info", None)
+    return reduced
+
+
+def reduce_edge_properties(properties: dict, lod: CircuitStatsLevelOfDetail) -> dict:
+    """Reduces edge population properties computed at a higher level of detail to lod."""
+    reduced = dict(properties)
+    if lod <= CircuitStatsLevelOfDetail.basic:
+        reduced["property_stats"] = {}
+        reduced["degrees"] = {}
+    return reduced
+
+
+def _json_default(obj: object) -> object:
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    msg = f"Object of type {type(obj).__name__} is not JSON serializable"
+    raise TypeError(msg)
+
+
+class CircuitMetricsCache:
+    """Persistent cache of circuit metrics, with per-population granularity.
+
+    Since the assets of a registered circuit are immutable, entries are keyed on circuit ID,
+    asset ID, population and level of detail. Properties computed at a higher level of detail are
+    reused (reduced) for requests at a lower level of detail. Concurrent requests for the same
+    entry compute it only once; least recently used entries are evicted once the cache exceeds
+    its size limit.
+    """
+
+    def __init__(self, cache_dir: Path, max_size_bytes: int | None = None) -> None:
+        """Initialize object."""
+        self._cache = DirectoryCache(cache_dir, max_size_bytes=max_size_bytes)
+
+    @classmethod
+    def from_settings(cls) -> "CircuitMetricsCache | None":
+        """Returns the cache configured in the settings, or None if disabled."""
+        cache_settings = settings.circuit_metrics_cache
+        if not cache_settings.enabled:
+            return None
+        return cls(cache_settings.cache_dir, max_size_bytes=cache_settings.max_size_bytes)
+
+    @staticmethod
+    def _key(
+        circuit_id: str,
+        asset_id: str | UUID,
+        kind: str,
+        name: str,
+        lod: CircuitStatsLevelOfDetail,
+    ) -> str:
+        name_hash = hashlib.sha256(name.encode()).hexdigest()[:16]
+        return f"{circuit_id}_{asset_id}_{kind}_{name_hash}_{lod.name}"
+
+    def get_or_compute(
+        self,
+        *,
+        circuit_id: str,
+        asset_id: str | UUID,
+        kind: str,
+        name: str,
+        lod: CircuitStatsLevelOfDetail,
+        compute: Callable[[], dict],
+        reduce: Callable[[dict, CircuitStatsLevelOfDetail], dict] | None = None,
+    ) -> dict:
+        """Returns cached properties, computing (and caching) them on a cache miss.
+
+        If reduce is given, properties cached at a higher level of detail are reduced to lod
+        instead of being computed again.
+        """
+        if reduce is not None:
+            for higher_lod in CircuitStatsLevelOfDetail:
+                if higher_lod <= lod:
+                    continue
+                properties = self._cache.get(
+                    self._key(circuit_id, asset_id, kind, name, higher_lod)
+                )
+                if properties is not None:
+                    return reduce(properties, lod)
+
+        def _create(_entry_dir: Path) -> dict:
+            return json.loads(json.dumps(compute(), default=_json_default))
+
+        _, properties = self._cache.get_or_create(
+            self._key(circuit_id, asset_id, kind, name, lod), _create
+        )
+        return properties
+
+
+def _map_populations(
+    func: Callable[[str], dict], populations: list[str], max_workers: int
+) -> list[dict]:
+    """Applies func to all populations, concurrently if max_workers > 1, preserving the order.
+
+    Threads are used since fetching assets and reading/analyzing H5 files is mostly I/O and
+    NumPy work that does not hold the GIL.
+    """
+    if max_workers <= 1 or len(populations) <= 1:
+        return [func(pop) for pop in populations]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(populations))) as executor:
+        return list(executor.map(func, populations))
+
+
+def properties_from_circuit_config(
+    circuit_config: CircuitConfigAsset,
+    db_client: Client,
+    circuit_id: str,
+    asset_id: str | UUID,
+    cache: CircuitMetricsCache | None = None,
+) -> dict:
+    def _compute() -> dict:
+        config = circuit_config.circuit.to_libsonata
+        return {
+            "properties": properties_from_config(config),
+            "nodesets": names_from_node_sets_file(
+                config, circuit_config.temp_dir, db_client, circuit_id, asset_id
+            ),
+        }
+
+    if cache is None:
+        return _compute()
+    return cache.get_or_compute(
+        circuit_id=circuit_id,
+        asset_id=asset_id,
+        kind="config",
+        name="",
+        lod=CircuitStatsLevelOfDetail.none,
+        compute=_compute,
+    )
+
+
 def properties_from_nodes_files(
-    circ: SnapCircuit,
-    temp_dir: str,
+    circuit_config: CircuitConfigAsset,
+    config_properties: dict,
     db_client: Client,
     circuit_id: str,
     asset_id: str | UUID,
     level_of_detail_specs: dict[str, CircuitStatsLevelOfDetail],
+    cache: CircuitMetricsCache | None = None,
+    max_workers: int = 1,
 ) -> dict:
     default_lod = level_of_detail_specs[ALL_POPULATIONS]
-    lst_req_props = [
-        "population_length",
-        "property_list",
-        "property_unique_values",
-        "property_value_counts",
+    biophys_pops = config_properties["names_of_biophys_node_populations"]
+    nodepops = [
+        nodepop
+        for nodepop in (
+            config_properties["names_of_virtual_node_populations"]
+            + biophys_pops
+            + config_properties["names_of_point_node_populations"]
+        )
+        if level_of_detail_specs.get(nodepop, default_lod) > CircuitStatsLevelOfDetail.none
     ]
-    properties_dict = {}
-    config = circ.to_libsonata
-    for nodepop in get_names_of_typed_node_populations(
-        config, TYPES_OF_VIRTUAL_NODES + TYPES_OF_BIOPHYS_NODES + TYPES_OF_POINT_NODES
-    ):
+
+    def _population_properties(nodepop: str) -> dict:
         lod = level_of_detail_specs.get(nodepop, default_lod)
-        if lod > CircuitStatsLevelOfDetail.none:
-            np_file_path = circ.nodes[nodepop].h5_filepath
-            remote_path = Path(np_file_path).relative_to(temp_dir)
-            properties_dict[nodepop] = {k: {} for k in lst_req_props}
-            max_uv = MAX_UNIQUE_VALUES[lod]
-            with TemporaryAsset(remote_path, db_client, circuit_id, str(asset_id)) as fn:
-                pop_obj = NodeStorage(fn).open_population(nodepop)
-                properties_dict[nodepop]["population_length"] = pop_obj.size
-                properties_dict[nodepop]["property_list"] = list(pop_obj.attribute_names)
-                properties_dict[nodepop]["property_unique_values"] = (
-                    unique_node_property_values_from_population(pop_obj, max_uv)
-                )
-                properties_dict[nodepop]["property_value_counts"] = (
-                    number_of_nodes_per_unique_value_from_population(pop_obj, max_uv)
-                )
-                if nodepop in get_names_of_typed_node_populations(config, TYPES_OF_BIOPHYS_NODES):
-                    properties_dict[nodepop]["dynamics_param_names"] = (
-                        dynamics_params_from_population(pop_obj)
-                    )
-                if lod > CircuitStatsLevelOfDetail.basic:
-                    properties_dict[nodepop]["node_location_info"] = (
-                        node_location_properties_from_population(pop_obj)
-                    )
+        compute = partial(
+            properties_from_node_population,
+            circuit_config,
+            nodepop,
+            db_client,
+            circuit_id,
+            asset_id,
+            lod,
+            is_biophysical=nodepop in biophys_pops,
+        )
+        if cache is None:
+            return compute()
+        return cache.get_or_compute(
+            circuit_id=circuit_id,
+            asset_id=asset_id,
+            kind="nodes",
+            name=nodepop,
+            lod=lod,
+            compute=compute,
+            reduce=reduce_node_properties,
+        )
 
-    return properties_dict
+    return dict(
+        zip(
+            nodepops,
+            _map_populations(_population_properties, nodepops, max_workers),
+            strict=True,
+        )
+    )
 
 
 def properties_from_edges_files(
-    circ: SnapCircuit,
-    temp_dir: str,
+    circuit_config: CircuitConfigAsset,
+    config_properties: dict,
     node_stats_dict: dict,
     db_client: Client,
     circuit_id: str,
     asset_id: str | UUID,
     level_of_detail_specs: dict[str, CircuitStatsLevelOfDetail],
+    cache: CircuitMetricsCache | None = None,
+    max_workers: int = 1,
 ) -> dict:
     default_lod = level_of_detail_specs[ALL_POPULATIONS]
-    lst_req_props = ["number_of_edges", "property_list", "property_stats", "degrees"]
-    properties_dict = {}
-    config = circ.to_libsonata
-    for edgepop in get_names_of_typed_edge_populations(
-        config, TYPES_OF_CHEMICAL_SYNS + TYPES_OF_ELECTRICAL_SYNS
-    ):
-        if level_of_detail_specs.get(edgepop, default_lod) > CircuitStatsLevelOfDetail.none:
-            properties_dict[edgepop] = {k: {} for k in lst_req_props}
-
-            ep_file_path = circ.edges[edgepop].h5_filepath
-            remote_path = Path(ep_file_path).relative_to(temp_dir)
-            with (
-                TemporaryAsset(remote_path, db_client, circuit_id, str(asset_id)) as fn,
-            ):
-                pop_obj = EdgeStorage(fn).open_population(edgepop)
-                properties_dict[edgepop]["number_of_edges"] = pop_obj.size
-                properties_dict[edgepop]["property_list"] = list(pop_obj.attribute_names)
-                properties_dict[edgepop]["source_name"] = pop_obj.source
-                properties_dict[edgepop]["target_name"] = pop_obj.target
-                if (
-                    level_of_detail_specs.get(edgepop, default_lod)
-                    > CircuitStatsLevelOfDetail.basic
-                ):
-                    properties_dict[edgepop]["property_stats"] = (
-                        edge_property_stats_from_population(pop_obj)
-                    )
-                    properties_dict[edgepop]["degrees"] = degree_stats_from_population(
-                        pop_obj, node_stats_dict
-                    )
-    return properties_dict
+    edgepops = [
+        edgepop
+        for edgepop in (
+            config_properties["names_of_chemical_edge_populations"]
+            + config_properties["names_of_electrical_edge_populations"]
+        )
+        if level_of_detail_specs.get(edgepop, default_lod) > CircuitStatsLevelOfDetail.none
+    ]
+
+    def _population_properties(edgepop: str) -> dict:
+        lod = level_of_detail_specs.get(edgepop, default_lod)
+        compute = partial(
+            properties_from_edge_population,
+            circuit_config,
+            edgepop,
+            node_stats_dict,
+            db_client,
+            circuit_id,
+            asset_id,
+            lod,
+        )
+        if cache is None:
+            return compute()
+        return cache.get_or_compute(
+            circuit_id=circuit_id,
+            asset_id=asset_id,
+            kind="edges",
+            name=edgepop,
+            lod=lod,
+            compute=compute,
+            reduce=reduce_edge_properties,
+        )
+
+    return dict(
+        zip(
+            edgepops,
+            _map_populations(_population_properties, edgepops, max_workers),
+            strict=True,
+        )
+    )
 
 
 class CircuitMetricsNodePopulation(BaseModel):
@@ -509,7 +827,13 @@ def get_circuit_metrics(  # ruff: ignore[too-many-locals, complex-structure]
     db_client: Client,
     level_of_detail_nodes: dict[str, CircuitStatsLevelOfDetail] | None = None,
     level_of_detail_edges: dict[str, CircuitStatsLevelOfDetail] | None = None,
+    max_workers: int = 1,
 ) -> CircuitMetricsOutput:
+    """Computes circuit metrics at the requested levels of detail.
+
+    Node populations and subsequently edge populations are processed using up to max_workers
+    concurrent threads.
+    """
     level_of_detail_nodes, level_of_detail_edges = _assert_level_of_detail_specs(
         level_of_detail_nodes, level_of_detail_edges
     )
@@ -527,32 +851,37 @@ def get_circuit_metrics(  # ruff: ignore[too-many-locals, complex-structure]
 
     asset_id = directory_assets[0].id
 
-    # db_client.download_content does not support `asset_path` at the time of writing this
-    # Use db_client.fetch_file with temporary directory instead
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_file_path = Path(temp_dir) / "circuit_config.json"
-
-        db_client.fetch_file(
-            entity_id=UUID(circuit_id),
-            entity_type=Circuit,
-            asset_id=asset_id,
-            output_path=temp_file_path,
-            asset_path=Path("circuit_config.json"),
-            strategy=FetchFileStrategy.link_or_download,
-        )
-
-        circ = SnapCircuit(temp_file_path)
-        config = circ.to_libsonata
+    # The circuit config is only fetched if any properties need to be computed
+    circuit_config = CircuitConfigAsset(db_client, circuit_id, asset_id)
+    cache = CircuitMetricsCache.from_settings()
 
-    temp_dir = realpath(str(temp_dir))
-    dict_props = properties_from_config(config)
-    nodesets = names_from_node_sets_file(config, temp_dir, db_client, circuit_id, asset_id)
+    config_info = properties_from_circuit_config(
+        circuit_config, db_client, circuit_id, asset_id, cache
+    )
+    dict_props = config_info["properties"]
+    nodesets = config_info["nodesets"]
 
     node_props = properties_from_nodes_files(
-        circ, temp_dir, db_client, circuit_id, asset_id, level_of_detail_nodes
+        circuit_config,
+        dict_props,
+        db_client,
+        circuit_id,
+        asset_id,
+        level_of_detail_nodes,
+        cache,
+        max_workers=max_workers,
     )
+    # Edge populations require the node population sizes for their degree statistics
     edge_props = properties_from_edges_files(
-        circ, temp_dir, node_props, db_client, circuit_id, asset_id, level_of_detail_edges
+        circuit_config,
+        dict_props,
+        node_props,
+        db_client,
+        circuit_id,
+        asset_id,
+        level_of_detail_edges,
+        cache,
+        max_workers=max_workers,
     )
 
     biophys_pops = []
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import json
 import logging
-from operator import itemgetter
-from typing import TYPE_CHECKING, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Self
 
-from pydantic import BaseModel, Field
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+from obi_one.config import settings
 
 if TYPE_CHECKING:
     from collections.abc import Iterable, Mapping
+    from pathlib import Path
+    from typing import TextIO
 
     import morphio
 
@@ -27,32 +33,76 @@ class CompartmentLocation(BaseModel):
 
 
 class MaterializedCompartmentSet(BaseModel):
-    """Internal SONATA compartment-set representation generated from MorphologyLocations."""
+    """Internal SONATA compartment-set representation generated from MorphologyLocations.
+
+    Compartments are stored column-wise, as arrays of node ids, section ids and offsets.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
     name: str = Field(min_length=1)
     population: str = Field(min_length=1)
-    compartment_entries: tuple[tuple[int, int, float], ...] = Field(default_factory=tuple)
+    node_ids: np.ndarray = Field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    section_ids: np.ndarray = Field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    offsets: np.ndarray = Field(default_factory=lambda: np.zeros(0, dtype=np.float64))
 
-    def to_sonata_dict(self) -> dict[str, Any]:
-        """Return SONATA-compliant { name : {...} } structure."""
-        triplets = [
-            [int(node_id), int(section_id), float(offset)]
-            for (node_id, section_id, offset) in self.compartment_entries
-        ]
+    @field_validator("node_ids", "section_ids", mode="before")
+    @classmethod
+    def _as_int_array(cls, value: Any) -> np.ndarray:
+        return np.asarray(value, dtype=np.int64).reshape(-1)
 
-        triplets.sort(key=itemgetter(0, 1, 2))
+    @field_validator("offsets", mode="before")
+    @classmethod
+    def _as_float_array(cls, value: Any) -> np.ndarray:
+        return np.asarray(value, dtype=np.float64).reshape(-1)
 
-        deduped: list[list[float | int]] = []
-        last: list[float | int] | None = None
-        for triplet in triplets:
-            if triplet != last:
-                deduped.append(triplet)
-                last = triplet
+    @model_validator(mode="after")
+    def _check_compartments(self) -> Self:
+        if not len(self.node_ids) == len(self.section_ids) == len(self.offsets):
+            msg = "Node ids, section ids and offsets of a compartment set must have equal lengths."
+            raise ValueError(msg)
+        if (self.node_ids < 0).any() or (self.section_ids < 0).any():
+            msg = "Node ids and section ids of a compartment set must be non-negative."
+            raise ValueError(msg)
+        if not ((self.offsets >= 0.0) & (self.offsets <= 1.0)).all():
+            msg = "Offsets of a compartment set must be between 0 and 1."
+            raise ValueError(msg)
+        return self
+
+    @property
+    def compartment_entries(self) -> tuple[tuple[int, int, float], ...]:
+        return tuple(
+            zip(
+                self.node_ids.tolist(),
+                self.section_ids.tolist(),
+                self.offsets.tolist(),
+                strict=True,
+            )
+        )
+
+    def sorted_unique(self) -> MaterializedCompartmentSet:
+        """Returns the compartment set sorted by node id, section id and offset, without
+        duplicates.
+        """
+        order = np.lexsort((self.offsets, self.section_ids, self.node_ids))
+        columns = (self.node_ids[order], self.section_ids[order], self.offsets[order])
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = np.any([np.diff(column) != 0 for column in columns], axis=0)
+        return self.model_copy(
+            update={
+                "node_ids": columns[0][keep],
+                "section_ids": columns[1][keep],
+                "offsets": columns[2][keep],
+            }
+        )
 
+    def to_sonata_dict(self) -> dict[str, Any]:
+        """Return SONATA-compliant { name : {...} } structure."""
+        triplets = [list(triplet) for triplet in self.sorted_unique().compartment_entries]
         return {
             self.name: {
                 "population": self.population,
-                "compartment_set": deduped,
+                "compartment_set": triplets,
             }
         }
 
@@ -65,7 +115,43 @@ class MaterializedCompartmentSet(BaseModel):
         locations: Iterable[CompartmentLocation],
     ) -> MaterializedCompartmentSet:
         triplets = [(loc.node_id, loc.section_id, loc.offset) for loc in locations]
-        return cls(name=name, population=population, compartment_entries=tuple(triplets))
+        node_ids, section_ids, offsets = zip(*triplets, strict=True) if triplets else ((), (), ())
+        return cls(
+            name=name,
+            population=population,
+            node_ids=node_ids,
+            section_ids=section_ids,
+            offsets=offsets,
+        )
+
+
+def write_compartment_sets_json(
+    compartment_sets: Iterable[MaterializedCompartmentSet], fp: TextIO
+) -> None:
+    """Writes compartment sets to a SONATA compartment sets JSON file, directly from their arrays.
+
+    Equivalent to dumping the merged to_sonata_dict() outputs, but with one compartment per line.
+    """
+    fp.write("{")
+    for i, compartment_set in enumerate(compartment_sets):
+        unique = compartment_set.sorted_unique()
+        rows = ",\n      ".join(
+            map(
+                "[{}, {}, {!r}]".format,
+                unique.node_ids.tolist(),
+                unique.section_ids.tolist(),
+                unique.offsets.tolist(),
+            )
+        )
+        compartments = "[\n      " + rows + "\n    ]" if rows else "[]"
+        fp.write(
+            f"{',' if i else ''}\n"
+            f"  {json.dumps(compartment_set.name)}: {{\n"
+            f'    "population": {json.dumps(compartment_set.population)},\n'
+            f'    "compartment_set": {compartments}\n'
+            "  }"
+        )
+    fp.write("\n}\n")
 
 
 def build_compartment_set_from_locations_block(
@@ -75,7 +161,9 @@ def build_compartment_set_from_locations_block(
     locations_block: MorphologyLocationsBlock,
     morphologies: Mapping[int, morphio.Morphology],
 ) -> MaterializedCompartmentSet:
-    locations: list[CompartmentLocation] = []
+    node_ids: list[np.ndarray] = []
+    section_ids: list[np.ndarray] = []
+    offsets: list[np.ndarray] = []
 
     for node_id, morph in morphologies.items():
         df = locations_block.points_on(morph)
@@ -99,22 +187,62 @@ def build_compartment_set_from_locations_block(
             )
             raise KeyError(msg)
 
-        for _, row in df.iterrows():
-            locations.append(
-                CompartmentLocation(
-                    node_id=int(node_id),
-                    section_id=int(row["section_id"]),
-                    offset=float(row[offset_col]),
-                )
-            )
+        node_ids.append(np.full(len(df), int(node_id), dtype=np.int64))
+        section_ids.append(df["section_id"].to_numpy())
+        offsets.append(df[offset_col].to_numpy())
 
-    return MaterializedCompartmentSet.from_locations(
+    if not node_ids:
+        return MaterializedCompartmentSet(name=name, population=population)
+    return MaterializedCompartmentSet(
         name=name,
         population=population,
-        locations=locations,
+        node_ids=np.concatenate(node_ids),
+        section_ids=np.concatenate(section_ids),
+        offsets=np.concatenate(offsets),
     )
 
 
+def _load_morphologies(
+    circuit: Circuit, node_ids: list[int], population: str
+) -> dict[int, morphio.Morphology]:
+    """Loads the morphologies of neurons, each distinct morphology file only once and in parallel.
+
+    Neurons whose morphology is unavailable are skipped with a warning.
+    """
+    errors: dict[int, Exception] = {}
+    paths: dict[int, Path] = {}
+    for node_id in node_ids:
+        try:
+            paths[node_id] = circuit.get_morphology_path(node_id, population=population)
+        except (FileNotFoundError, KeyError, ValueError) as exc:
+            errors[node_id] = exc
+
+    def _load(path: Path) -> morphio.Morphology | Exception:
+        try:
+            return circuit.load_morphology_file(path)
+        except (FileNotFoundError, KeyError, ValueError) as exc:
+            return exc
+
+    unique_paths = list(dict.fromkeys(paths.values()))
+    max_workers = max(min(settings.morphology_cache.load_workers, len(unique_paths)), 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        by_path = dict(zip(unique_paths, executor.map(_load, unique_paths), strict=True))
+
+    morphologies: dict[int, morphio.Morphology] = {}
+    for node_id in node_ids:
+        morph = errors.get(node_id) or by_path[paths[node_id]]
+        if isinstance(morph, Exception):
+            L.warning(
+                "Unable to load morphology for node %s in population '%s': %s",
+                node_id,
+                population,
+                morph,
+            )
+            continue
+        morphologies[node_id] = morph
+    return morphologies
+
+
 def build_compartment_set_for_neuron_set(
     *,
     name: str,
@@ -137,20 +265,9 @@ def build_compartment_set_for_neuron_set(
         )
         raise ValueError(msg) from exc
 
-    morphologies: dict[int, morphio.Morphology] = {}
-    for node_id in node_ids:
-        node_id_int = int(getattr(node_id, "id", node_id))
-        try:
-            morph = circuit.load_morphology(node_id_int, population=selected_population)
-        except (FileNotFoundError, KeyError, ValueError) as exc:
-            L.warning(
-                "Unable to load morphology for node %s in population '%s': %s",
-                node_id_int,
-                selected_population,
-                exc,
-            )
-            continue
-        morphologies[node_id_int] = morph
+    morphologies = _load_morphologies(
+        circuit, [int(getattr(node_id, "id", node_id)) for node_id in node_ids], selected_population
+    )
 
     return build_compartment_set_from_locations_block(
         name=name,
@@ -9,7 +9,7 @@ MIN_TIMESTEP_MILLISECONDS = 0.025
 DEFAULT_SIMULATION_LENGTH_MILLISECONDS = 1000.0
 DEFAULT_STIMULUS_LENGTH_MILLISECONDS = 200.0
 DEFAULT_PULSE_STIMULUS_LENGTH_MILLISECONDS = 50.0
-MAX_POISSON_SPIKE_LIMIT = 5000000
+MAX_POISSON_SPIKE_LIMIT = 20000000
 
 SIMULATION_TIMESTEP_MILLISECONDS = 0.025
 
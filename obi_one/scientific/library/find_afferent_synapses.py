@@ -4,7 +4,9 @@ import bluepysnap as snap
 import morphio
 import numpy  # ruff: ignore[unconventional-import-alias]
 import pandas  # ruff: ignore[unconventional-import-alias]
-from scipy import stats
+from scipy import sparse, stats
+
+from obi_one.scientific.library.morphology_cache import CachedMorphology, morphology_cache
 
 try:
     from conntility.subcellular import MorphologyPathDistanceCalculator
@@ -12,11 +14,21 @@ except ImportError:
     warnings.warn("Connectome functionalities not available", UserWarning, stacklevel=1)
 
 
+def _load_cached_morphology(node: snap.nodes.NodePopulation, node_id: int) -> CachedMorphology:
+    try:
+        path = node.morph.get_filepath(node_id, extension="h5")
+    except snap.BluepySnapError:  # Morphology container: identified by the loaded object
+        return morphology_cache.for_morphology(node.morph.get(node_id, extension="h5"))
+    return morphology_cache.load(path, "snap", lambda: node.morph.get(node_id, extension="h5"))
+
+
 def morphology_and_pathdistance_calculator(
     circ: snap.Circuit, node_population: str, node_id: int
 ) -> tuple[morphio.Morphology, MorphologyPathDistanceCalculator]:
     """Loads for a specified neuron its morphology and creates a path-distance calculator object.
 
+    Both are shared through the morphology cache with other neurons using the same morphology.
+
     Args:
       circ (bluepysnap.Circuit): The circuit the neuron resides in
       node_population (str): Name of the node population of the neuron
@@ -24,12 +36,11 @@ def morphology_and_pathdistance_calculator(
     """
     node = circ.nodes[node_population]
     try:
-        morph = node.morph.get(node_id, extension="h5")
+        cached = _load_cached_morphology(node, node_id)
     except Exception as err:
         msg = f"Error loading hdf5 morphology for {node_population} - {node_id}"
         raise RuntimeError(msg) from err
-    PD = MorphologyPathDistanceCalculator(morph)  # ruff: ignore[non-lowercase-variable-in-function]
-    return morph, PD
+    return cached.morphology, cached.path_distance_calculator
 
 
 def all_syns_on(
@@ -149,10 +160,47 @@ def apply_filters(
     return syns
 
 
+class PathDistanceRows:
+    """Pairwise path distances between dendritic locations, computed row by row when indexed.
+
+    Can be used in place of the full len(syns) x len(syns) matrix of pairwise path distances
+    where only some of its rows are needed, e.g., by the cluster selection functions.
+
+    Args:
+      PD (conntility.subcellular.PathDistanceCalculator): Calculator for the relevant morphology.
+      syns (pandas.DataFrame): Dataframe that includes morphology locations in its columns, as
+        they are specified in SONATA, e.g, "afferent_section_id".
+    """
+
+    def __init__(
+        self,
+        PD: MorphologyPathDistanceCalculator,  # ruff: ignore[invalid-argument-name]
+        syns: pandas.DataFrame,
+    ) -> None:
+        """Initialize object."""
+        self._PD = PD
+        self._syns = syns
+
+    def __len__(self) -> int:
+        """Number of locations."""
+        return len(self._syns)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self), len(self)
+
+    def __getitem__(self, idx: int | numpy.ndarray) -> numpy.ndarray:
+        """Path distances from the location(s) at (positional) index idx to all locations."""
+        rows = self._PD.path_distances(self._syns.iloc[numpy.atleast_1d(idx)], locs_to=self._syns)
+        return rows[0] if numpy.ndim(idx) == 0 else rows
+
+
 def relevant_path_distances(
     PD: MorphologyPathDistanceCalculator,  # ruff: ignore[invalid-argument-name]
     syns: pandas.DataFrame,
-) -> tuple[numpy.ndarray, numpy.ndarray]:
+    *,
+    lazy_pairwise: bool = False,
+) -> tuple[numpy.ndarray, numpy.ndarray | PathDistanceRows]:
     """Calculates and return path distances to the soma and all pairwise path distances for
     dendritic locations in a dataframe.
 
@@ -160,8 +208,11 @@ def relevant_path_distances(
       PD (conntility.subcellular.PathDistanceCalculator): Calculator for the relevant morphology.
       syns (pandas.DataFrame): Dataframe that includes morphology locations in its columns, as
         they are specified in SONATA, e.g, "afferent_section_id".
+      lazy_pairwise (bool, default=False): If set to True, pairwise path distances are returned
+        as a PathDistanceRows object that only computes the rows that are actually used,
+        instead of the full len(syns) x len(syns) matrix.
     """
-    pw_pds = PD.path_distances(syns)
+    pw_pds = PathDistanceRows(PD, syns) if lazy_pairwise else PD.path_distances(syns)
 
     soma = pandas.DataFrame(
         {"afferent_section_id": [0], "afferent_segment_id": [0], "afferent_segment_offset": [0.0]}
@@ -334,6 +385,22 @@ def select_by_path_distance(
     ]
 
 
+def _pick_cluster_center(
+    soma_pds: numpy.ndarray,
+    remaining: numpy.ndarray,
+    soma_pd_mean: float | None = None,
+    soma_pd_sd: float | None = None,
+) -> int:
+    """Picks the center of the next cluster among the remaining synapses, optionally biased by
+    their soma path distances. Returns its index into remaining.
+    """
+    if soma_pd_mean is not None and soma_pd_sd is not None:
+        return _pd_gaussian_selector(
+            soma_pds[remaining], soma_pd_mean, soma_pd_sd, 1, raise_insufficient=True
+        )[0]
+    return numpy.random.choice(len(remaining))  # ruff: ignore[numpy-legacy-random]
+
+
 def select_clusters_by_max_distance(
     syns: pandas.DataFrame,
     soma_pds: numpy.ndarray,
@@ -355,7 +422,8 @@ def select_clusters_by_max_distance(
         of properties as long as they are in different columns.
       soma_pds (numpy.array): An array of path distance values for all synapses.
       pw_pds (numpy.array, len(syns) X len(syns)): Pairwise path distances between all pairs
-      of locations in syns.
+      of locations in syns. Only the rows of cluster centers are accessed, so a
+      PathDistanceRows object can be used instead.
       n_clusters (int): Number of clusters to generate.
       cluster_max_distance (float): The maximum path distance of synapses within a cluster
       from the center of that cluster. All synapses within that distance will be picked.
@@ -367,24 +435,22 @@ def select_clusters_by_max_distance(
       of clusters cannot be generated, an exception is raised.
     """
     syns_out = []
+    available = numpy.ones(len(syns), dtype=bool)
     for _ in range(n_clusters):
-        if raise_insufficient and (len(syns) == 0):
+        if not available.any():
             if raise_insufficient:
                 msg = f"Fewer than the requested count of {n_clusters} clusters possible!"
                 raise RuntimeError(msg)
             break
-        if soma_pd_mean is not None and soma_pd_sd is not None:
-            ctr = _pd_gaussian_selector(
-                soma_pds, soma_pd_mean, soma_pd_sd, 1, raise_insufficient=True
-            )[0]
-        else:
-            ctr = numpy.random.choice(len(syns))  # ruff: ignore[numpy-legacy-random]
-        clstr_ids = pw_pds[ctr] < cluster_max_distance
-        syns_out.append(syns.loc[clstr_ids])
-        syns = syns.loc[~clstr_ids]
-        pw_pds = pw_pds[numpy.ix_(~clstr_ids, ~clstr_ids)]
-        if soma_pds is not None:
-            soma_pds = soma_pds[~clstr_ids]
+        remaining = numpy.flatnonzero(available)
+        ctr = remaining[
+            _pick_cluster_center(
+                soma_pds, remaining, soma_pd_mean=soma_pd_mean, soma_pd_sd=soma_pd_sd
+            )
+        ]
+        clstr_ids = remaining[pw_pds[ctr][remaining] < cluster_max_distance]
+        syns_out.append(syns.iloc[clstr_ids])
+        available[clstr_ids] = False
     return pandas.concat(
         syns_out, axis=0, names=["cluster_id"], keys=range(len(syns_out))
     ).reset_index(0)
@@ -411,7 +477,8 @@ def select_clusters_by_count(
         of properties as long as they are in different columns.
       soma_pds (numpy.array): An array of path distance values for all synapses.
       pw_pds (numpy.array, len(syns) X len(syns)): Pairwise path distances between all pairs
-      of locations in syns.
+      of locations in syns. Only the rows of cluster centers are accessed, so a
+      PathDistanceRows object can be used instead.
       n_clusters (int): Number of clusters to generate.
       n_per_cluster (int): After picking a synapse as the center of a cluster, its
       n_per_cluster - 1 nearest neighbors are also included. However, synapses that have been
@@ -425,43 +492,79 @@ def select_clusters_by_count(
       of clusters cannot be generated, an exception is raised.
     """
     syns_out = []
+    available = numpy.ones(len(syns), dtype=bool)
     for _ in range(n_clusters):
-        if len(syns) < n_per_cluster:
+        remaining = numpy.flatnonzero(available)
+        if len(remaining) < n_per_cluster:
             if raise_insufficient:
                 msg = f"Fewer than the requested count of {n_clusters} clusters possible!"
                 raise RuntimeError(msg)
             break
-        if soma_pd_mean is not None and soma_pd_sd is not None:
-            ctr = _pd_gaussian_selector(
-                soma_pds, soma_pd_mean, soma_pd_sd, 1, raise_insufficient=True
-            )[0]
-        else:
-            ctr = numpy.random.choice(len(syns))  # ruff: ignore[numpy-legacy-random]
-        clstr_ids = numpy.argsort(pw_pds[ctr])[:n_per_cluster]
-        other_ids = numpy.setdiff1d(range(len(syns)), clstr_ids)
+        ctr = remaining[
+            _pick_cluster_center(
+                soma_pds, remaining, soma_pd_mean=soma_pd_mean, soma_pd_sd=soma_pd_sd
+            )
+        ]
+        clstr_ids = remaining[numpy.argsort(pw_pds[ctr][remaining])[:n_per_cluster]]
         syns_out.append(syns.iloc[clstr_ids])
-        syns = syns.iloc[other_ids]
-        pw_pds = pw_pds[numpy.ix_(other_ids, other_ids)]
-        if soma_pds is not None:
-            soma_pds = soma_pds[other_ids]
+        available[clstr_ids] = False
     return pandas.concat(
         syns_out, axis=0, names=["cluster_id"], keys=range(len(syns_out))
     ).reset_index(0)
 
 
+def _group_sums(
+    pw_pds: numpy.ndarray | PathDistanceRows,
+    membership: sparse.csr_array,
+    chunk_size: int = 1000,
+) -> numpy.ndarray:
+    """Sums of pairwise path distances over all pairs of locations in each pair of groups.
+
+    Args:
+      pw_pds: Pairwise path distances between n locations (only accessed in chunks of rows).
+      membership (scipy.sparse.csr_array, n_groups x n): Group membership of the locations.
+      chunk_size (int): Number of rows of pw_pds used at once.
+    """
+    if isinstance(pw_pds, numpy.ndarray):
+        row_sums = membership @ pw_pds
+    else:
+        row_sums = numpy.zeros(membership.shape, dtype=float)
+        for start in range(0, membership.shape[1], chunk_size):
+            chunk = numpy.arange(start, min(start + chunk_size, membership.shape[1]))
+            row_sums += membership[:, chunk] @ pw_pds[chunk]
+    return (membership @ row_sums.T).T
+
+
 def merge_multiple_syns_per_connection(
-    syns: pandas.DataFrame, soma_pds: numpy.ndarray, pw_pds: numpy.ndarray
+    syns: pandas.DataFrame,
+    soma_pds: numpy.ndarray,
+    pw_pds: numpy.ndarray | PathDistanceRows,
 ) -> tuple[pandas.DataFrame, numpy.ndarray, numpy.ndarray]:
+    """Merges synapses from the same source neuron into a single entry per connection.
+
+    Soma path distances of connections are the means over their synapses; pairwise path
+    distances between connections the means over all pairs of their synapses. They are computed
+    as sums over the synapses of each connection (grouped reductions), without indexing the
+    full matrix of pairwise path distances per pair of connections.
+
+    Args:
+      syns (pandas.DataFrame): DataFrame with synapse properties, incl. "source_population" and
+        "@source_node".
+      soma_pds (numpy.array): Soma path distances of the synapses.
+      pw_pds (numpy.array, len(syns) X len(syns)): Pairwise path distances between the
+        synapses, or a PathDistanceRows object.
+    """
     syns = syns.reset_index(drop=True)
-    grp_ = (
-        syns.reset_index(drop=False)
-        .groupby(["source_population", "@source_node"])["index"]
-        .apply(list)
+    grp_ = syns.groupby(["source_population", "@source_node"])
+    group_ids = grp_.ngroup().to_numpy()
+    n_groups = grp_.ngroups
+    counts = numpy.bincount(group_ids, minlength=n_groups)
+    membership = sparse.csr_array(
+        (numpy.ones(len(syns)), (group_ids, numpy.arange(len(syns)))), shape=(n_groups, len(syns))
     )
-    mn_soma_pd = grp_.apply(lambda _x: soma_pds[_x].mean())
-    mn_pw_pds = grp_.apply(lambda _x: grp_.apply(lambda _y: pw_pds[numpy.ix_(_x, _y)].mean()))
 
-    syns_out = mn_soma_pd.index.to_frame().reset_index(drop=True)
-    mn_soma_pd = mn_soma_pd.to_numpy()
-    mn_pw_pds = mn_pw_pds.to_numpy()
+    mn_soma_pd = numpy.bincount(group_ids, weights=soma_pds, minlength=n_groups) / counts
+    mn_pw_pds = _group_sums(pw_pds, membership) / numpy.outer(counts, counts)
+
+    syns_out = grp_.size().index.to_frame().reset_index(drop=True)
     return syns_out, mn_soma_pd, mn_pw_pds
@@ -54,56 +54,82 @@ _V_DTYPE_DICT = {"float64": 0.0, "float32": 0.0, "int64": -1, "int32": -1}
 _V_COLNAME_DICT = {}
 
 
+class MeshPointIndex:
+    """KD-tree over the spine and soma mesh points of a morphology, built once and shared by all
+    mesh point queries.
+
+    Args:
+        mesh_pt_df: Dataframe of mesh points with x, y, z and spine_sharing_id columns.
+    """
+
+    def __init__(self, mesh_pt_df: pandas.DataFrame) -> None:
+        """Initialize object."""
+        self.mesh_pt_df = mesh_pt_df
+        self._tree = KDTree(mesh_pt_df[["x", "y", "z"]])
+        self._ids = mesh_pt_df[_C_SP_INDEX].to_numpy()
+
+    def query(self, pts: pandas.DataFrame, k: int) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Distances and positional indices (both n x k) of the k nearest mesh points."""
+        dist, idx = self._tree.query(pts, k=k)
+        return dist.reshape((len(pts), k)), idx.reshape((len(pts), k))
+
+    def nearest(self, pts: pandas.DataFrame) -> pandas.DataFrame:
+        """Spine sharing id of and distance from the nearest mesh point of each point."""
+        dist, idx = self.query(pts, k=1)
+        return pandas.DataFrame(
+            {_C_SP_INDEX: self._ids[idx[:, 0]], "distance": dist[:, 0]}, index=pts.index
+        )
+
+    def competing_distances(self, pts: pandas.DataFrame, k: int = 100) -> pandas.Series:
+        """Distance from the nearest mesh point with a different spine sharing id than the
+        nearest mesh point of each point (-1 if there is none).
+
+        Points without such a mesh point among their k nearest ones are re-queried with a four
+        times larger k.
+        """
+        competitor_dists = pandas.Series(
+            -numpy.ones(len(pts)), index=pts.index, name="competing_distance"
+        )
+        todo = numpy.arange(len(pts))
+        max_k = len(self.mesh_pt_df)
+        k = min(k, max_k)
+
+        while len(todo) > 0:
+            dist, idx = self.query(pts.iloc[todo], k=k)
+            competitor_ids = self._ids[idx]
+            is_different = competitor_ids != competitor_ids[:, :1]
+            found = is_different.any(axis=1)
+            first_different = is_different[found].argmax(axis=1)
+            competitor_dists.iloc[todo[found]] = dist[found, first_different]
+
+            todo = todo[~found]
+            if k == max_k:
+                break
+            k = min(k * 4, max_k)
+        return competitor_dists
+
+    def resolution(self) -> float:
+        """Mean distance of mesh points from their nearest neighbor."""
+        dist, _ = self.query(self.mesh_pt_df[["x", "y", "z"]], k=2)
+        return dist[:, 1].mean()
+
+
 def find_nearest_mesh_points(
-    mesh_pt_df: pandas.DataFrame, pts: pandas.DataFrame
+    mesh_pt_df: pandas.DataFrame, pts: pandas.DataFrame, index: MeshPointIndex | None = None
 ) -> pandas.DataFrame:
-    tree = KDTree(mesh_pt_df[["x", "y", "z"]])
-    dist, idx = tree.query(pts, k=1)
-    idx = mesh_pt_df.index[idx]
-    res = pandas.concat(
-        [mesh_pt_df.loc[idx, [_C_SP_INDEX]], pandas.DataFrame({"distance": dist}, index=idx)],
-        axis=1,
-    )
-    res.index = pts.index
-    return res
+    return (index or MeshPointIndex(mesh_pt_df)).nearest(pts)
 
 
 def add_competing_mesh_distances(
-    mesh_pt_df: pandas.DataFrame, pts: pandas.DataFrame
+    mesh_pt_df: pandas.DataFrame, pts: pandas.DataFrame, index: MeshPointIndex | None = None
 ) -> pandas.Series:
-    tree = KDTree(mesh_pt_df[["x", "y", "z"]])
-    competitor_dists = pandas.Series(
-        -numpy.ones(len(pts)), index=pts.index, name="competing_distance"
-    )
-    mask = competitor_dists < 0
-    mask_idx = competitor_dists[mask].index
-    max_k = len(mesh_pt_df)
-    k = numpy.minimum(100, max_k)
-
-    while len(mask_idx) > 0:
-        dist, idx = tree.query(pts.loc[mask_idx], k=k)
-        competitor_ids = mesh_pt_df.spine_sharing_id.to_numpy()[idx]
-        is_different = competitor_ids[:, 0] != competitor_ids[:, -1]
-        first_different = [
-            numpy.nonzero(x)[0][0] + 1
-            for x in numpy.diff(competitor_ids[is_different], axis=1) != 0
-        ]
-        competitor_dists[mask_idx[is_different]] = dist[is_different][
-            range(len(first_different)), first_different
-        ]
-
-        mask = competitor_dists < 0
-        mask_idx = competitor_dists[mask].index
-        if k == max_k:
-            break
-        k = numpy.minimum(k * 4, max_k)
-    return competitor_dists
+    return (index or MeshPointIndex(mesh_pt_df)).competing_distances(pts)
 
 
-def estimate_mesh_resolution(mesh_pt_df: pandas.DataFrame) -> float:
-    tree = KDTree(mesh_pt_df[["x", "y", "z"]])
-    dist, _ = tree.query(mesh_pt_df[["x", "y", "z"]], k=2)
-    return dist[:, 1].mean()
+def estimate_mesh_resolution(
+    mesh_pt_df: pandas.DataFrame, index: MeshPointIndex | None = None
+) -> float:
+    return (index or MeshPointIndex(mesh_pt_df)).resolution()
 
 
 def synapse_info_df(
@@ -143,60 +169,43 @@ def morph_to_segs_df(morph: Morphology) -> pandas.DataFrame:
 
 
 def morph_to_spine_and_soma_df(m: MorphologyWithSpines) -> pandas.DataFrame:
-    all_spine_points = pandas.concat(
+    spine_points = [m.spines.spine_mesh_points(i) for i in range(m.spines.spine_count)]
+    soma_points = numpy.asarray(m.soma.soma_mesh_points)
+    points = numpy.concatenate([*spine_points, soma_points], axis=0).reshape((-1, 3))
+    sharing_ids = numpy.concatenate(
         [
-            pandas.DataFrame(m.spines.spine_mesh_points(i), columns=["x", "y", "z"]).dropna()  # ty:ignore[invalid-argument-type]
-            for i in range(m.spines.spine_count)
-        ],
-        axis=0,
-        keys=m.spines.spine_table.index.to_numpy(),
-        names=[_C_SP_INDEX],
-    ).reset_index(0)
-    soma_points = pandas.DataFrame(m.soma.soma_mesh_points, columns=["x", "y", "z"]).dropna()  # ty:ignore[invalid-argument-type]
-    soma_points[_C_SP_INDEX] = -1
-
-    spine_and_soma_points = pandas.concat([all_spine_points, soma_points], axis=0).reset_index(
-        drop=True
+            numpy.repeat(m.spines.spine_table.index.to_numpy(), [len(p) for p in spine_points]),
+            numpy.full(len(soma_points), -1),
+        ]
     )
+    is_valid = ~numpy.isnan(points).any(axis=1)
+
+    spine_and_soma_points = pandas.DataFrame(points[is_valid], columns=["x", "y", "z"])  # ty:ignore[invalid-argument-type]
+    spine_and_soma_points.insert(0, _C_SP_INDEX, sharing_ids[is_valid])
     return spine_and_soma_points
 
 
-def map_points_to_segs_df(segs: pandas.DataFrame, pts: numpy.ndarray) -> pandas.DataFrame:
-    chunk_sz = 250
-    if len(pts) <= chunk_sz:
-        res = _map_points_to_segs_df(segs, pts.to_numpy())  # ty:ignore[unresolved-attribute]
-    else:
-        chunk_ab = numpy.arange(0, len(pts) + chunk_sz, chunk_sz)
-        res = []
-        for a, b in zip(chunk_ab[:-1], chunk_ab[1:], strict=False):  # ruff: ignore[zip-instead-of-pairwise]
-            res.append(_map_points_to_segs_df(segs, pts.iloc[a:b].to_numpy()))  # ty:ignore[unresolved-attribute]
-        res = pandas.concat(res, axis=0)
-    res.index = pts.index  # ty:ignore[unresolved-attribute]
-    return res
+def _point_segment_distances(
+    pts: numpy.ndarray, starts: numpy.ndarray, ends: numpy.ndarray
+) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Distances of points from segments (element-wise for pairs of points and segments).
 
+    Returns:
+        Tuple of (distances of the points from the segments, distances of the projections of the
+        points onto the segment lines from the segment starts, segment lengths) arrays.
+    """
+    d_seg = ends - starts  # vector from starts to ends of segs
+    l_seg = numpy.linalg.norm(d_seg, axis=-1)  # lengths of segs
+    d_seg /= l_seg[..., numpy.newaxis] + 1e-15
+    # normalization. Direction from starts to ends of segs
 
-def _map_points_to_segs_df(segs: pandas.DataFrame, pts: numpy.ndarray) -> pandas.DataFrame:
-    d_seg = (
-        segs[_C_SEG_E].to_numpy() - segs[_C_SEG_S].to_numpy()
-    )  # vector from starts to ends of all segs
-    l_seg = numpy.linalg.norm(d_seg, axis=1)  # lengths of segs
-    d_seg /= l_seg.reshape((-1, 1)) + 1e-15
-    # normalization. Direction from starts to ends of all segs
-
-    d_spine_seg = pts.reshape((-1, 1, 3)) - segs[_C_SEG_S].to_numpy().reshape(
-        (1, -1, 3)
-    )  # vectors from seg starts to points
-    d_spine_segend = pts.reshape((-1, 1, 3)) - segs[_C_SEG_E].to_numpy().reshape(
-        (1, -1, 3)
-    )  # vectors from seg ends to points
+    d_spine_seg = pts - starts  # vectors from seg starts to points
     d_spine_seg_l = numpy.linalg.norm(d_spine_seg, axis=-1)  # distance from seg starts to points
-    d_spine_segend_l = numpy.linalg.norm(
-        d_spine_segend, axis=-1
-    )  # distance from seg ends to points
-    d_spine_seg /= d_spine_seg_l.reshape((*d_spine_seg_l.shape, 1)) + 1e-15
+    d_spine_segend_l = numpy.linalg.norm(pts - ends, axis=-1)  # distance from seg ends to points
+    d_spine_seg /= d_spine_seg_l[..., numpy.newaxis] + 1e-15
     # normalization. Direction from seg starts to points
 
-    cos_spine_seg = (d_spine_seg * d_seg.reshape((1, -1, 3))).sum(
+    cos_spine_seg = (d_spine_seg * d_seg).sum(
         axis=-1
     )  # cos of angles between directions to ends and directions to points
     cos_spine_seg = numpy.minimum(numpy.maximum(cos_spine_seg, -1), 1)
@@ -209,19 +218,126 @@ def _map_points_to_segs_df(segs: pandas.DataFrame, pts: numpy.ndarray) -> pandas
     )  # Distance of points from infinite lines defined by segs
     before_start = d_spine_seg_proj < 0
     dists_arr[before_start] = d_spine_seg_l[before_start]
-    after_end = d_spine_seg_proj > l_seg.reshape((1, -1))
+    after_end = d_spine_seg_proj > l_seg
     dists_arr[after_end] = d_spine_segend_l[after_end]
-    mpd_ = numpy.argmin(dists_arr, axis=1)
+    return dists_arr, d_spine_seg_proj, l_seg
+
+
+class SegmentIndex:
+    """Spatial index for finding the nearest segment of points.
+
+    Sample points are placed along each segment such that every location on a segment lies
+    within max_gap of one of its samples, and are indexed in a KD-tree. For each point, an upper
+    bound of its distance from the nearest segment is obtained from the segments of its k nearest
+    samples. All segments that could be closer own a sample within that bound plus max_gap, so
+    refining over these candidates yields the exact nearest segment.
+
+    Args:
+        starts: Segment start points (n x 3).
+        ends: Segment end points (n x 3).
+        spacing: Maximum distance between samples along a segment. Defaults to the median
+            segment length.
+    """
+
+    def __init__(
+        self, starts: numpy.ndarray, ends: numpy.ndarray, spacing: float | None = None
+    ) -> None:
+        """Initialize object."""
+        self.starts = numpy.asarray(starts)
+        self.ends = numpy.asarray(ends)
+        lengths = numpy.linalg.norm(self.ends - self.starts, axis=1)
+        if spacing is None:
+            spacing = float(numpy.median(lengths)) if len(lengths) else 1.0
+        n_samples = numpy.maximum(numpy.ceil(lengths / max(spacing, 1e-12)), 1).astype(int)
+
+        self._owner = numpy.repeat(numpy.arange(len(lengths)), n_samples)
+        sample_idx = numpy.arange(len(self._owner)) - numpy.repeat(
+            numpy.cumsum(n_samples) - n_samples, n_samples
+        )
+        frac = (sample_idx + 0.5) / n_samples[self._owner]
+        samples = self.starts[self._owner] + frac[:, numpy.newaxis] * (
+            self.ends[self._owner] - self.starts[self._owner]
+        )
+        self.max_gap = float(numpy.max(lengths / (2 * n_samples), initial=0.0))
+        self._tree = KDTree(samples)
+
+    def _distances(
+        self, pts: numpy.ndarray, pt_idx: numpy.ndarray, seg_idx: numpy.ndarray
+    ) -> tuple[numpy.ndarray, numpy.ndarray]:
+        dists, proj, _ = _point_segment_distances(
+            pts[pt_idx], self.starts[seg_idx], self.ends[seg_idx]
+        )
+        return dists, proj
+
+    def nearest(
+        self, pts: numpy.ndarray, k: int = 8
+    ) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """Finds the nearest segment of each point.
+
+        Ties are resolved in favor of the segment with the lowest index.
+
+        Returns:
+            Tuple of (segment indices, distances from the segments, distances of the projections
+            of the points onto the segment lines from the segment starts) arrays.
+        """
+        pts = numpy.asarray(pts, dtype=float).reshape((-1, 3))
+        k = min(k, self._tree.n)
+        _, nn = self._tree.query(pts, k=k)
+        nn = nn.reshape((len(pts), k))
+        pt_idx = numpy.repeat(numpy.arange(len(pts)), k)
+        upper, _ = self._distances(pts, pt_idx, self._owner[nn.ravel()])
+        upper = upper.reshape((len(pts), k)).min(axis=1)
+
+        # Candidates: all segments with a sample within the upper bound plus the maximum gap
+        radii = (upper + self.max_gap) * (1 + 1e-6) + 1e-6  # Margin for rounding errors
+        candidates = self._tree.query_ball_point(pts, radii)
+        counts = numpy.fromiter((len(c) for c in candidates), dtype=int, count=len(pts))
+        pt_idx = numpy.repeat(numpy.arange(len(pts)), counts)
+        seg_idx = self._owner[numpy.concatenate([numpy.asarray(c, dtype=int) for c in candidates])]
+        pairs = numpy.unique(numpy.stack([pt_idx, seg_idx], axis=1), axis=0)
+        pt_idx, seg_idx = pairs[:, 0], pairs[:, 1]
+
+        dists, proj = self._distances(pts, pt_idx, seg_idx)
+        order = numpy.lexsort((seg_idx, dists, pt_idx))
+        first = order[numpy.unique(pt_idx[order], return_index=True)[1]]
+        return seg_idx[first], dists[first], proj[first]
+
+
+def map_points_to_segs_df(segs: pandas.DataFrame, pts: pandas.DataFrame) -> pandas.DataFrame:
+    """Maps points to their nearest segments (using a spatial index of the segments).
+
+    Returns:
+        Dataframe (indexed like pts) of the section and segment ids of the nearest segments, the
+        offsets of the points along them and their distances from the segment surfaces.
+    """
+    chunk_sz = 10000
+    index = SegmentIndex(segs[_C_SEG_S].to_numpy(), segs[_C_SEG_E].to_numpy())
+    res = [
+        _map_points_to_segs_df(segs, pts.iloc[a : a + chunk_sz].to_numpy(), index)
+        for a in range(0, len(pts), chunk_sz)
+    ]
+    res = pandas.concat(res, axis=0) if res else _map_points_to_segs_df(segs, pts.to_numpy())
+    res.index = pts.index
+    return res
+
+
+def _map_points_to_segs_df(
+    segs: pandas.DataFrame, pts: numpy.ndarray, index: SegmentIndex | None = None
+) -> pandas.DataFrame:
+    if index is None:
+        index = SegmentIndex(segs[_C_SEG_S].to_numpy(), segs[_C_SEG_E].to_numpy())
+    if len(pts):
+        mpd_, dists, proj = index.nearest(pts)
+    else:
+        mpd_, dists, proj = (numpy.empty(0, dtype=int), numpy.empty(0), numpy.empty(0))
+    l_seg = numpy.linalg.norm(index.ends[mpd_] - index.starts[mpd_], axis=-1)
 
     mpd = segs.iloc[mpd_][[_STR_SEC_ID, _STR_SEG_ID]]
-    mpd[_STR_SEG_OFF] = numpy.maximum(
-        numpy.minimum(d_spine_seg_proj[range(d_spine_seg_proj.shape[0]), mpd_], l_seg[mpd_]), 0.0
-    )
-    mpd["distance"] = dists_arr[numpy.arange(dists_arr.shape[0]), mpd_]
+    mpd[_STR_SEG_OFF] = numpy.maximum(numpy.minimum(proj, l_seg), 0.0)
+    mpd["distance"] = dists
 
-    midx = pandas.MultiIndex.from_frame(mpd[[_STR_SEC_ID, _STR_SEG_ID]])
-    r = segs.set_index([_STR_SEC_ID, _STR_SEG_ID]).loc[midx, ["start_d", "end_d"]].mean(axis=1)
-    mpd["distance"] -= r.to_numpy()
+    r = segs[["start_d", "end_d"]].to_numpy()[mpd_].mean(axis=1)
+    mpd["distance"] -= r
 
     return mpd.reset_index(drop=True)
 
@@ -247,20 +363,28 @@ def calc_section_offset(
     return numpy.minimum(rel_off, 1.0)
 
 
-def segment_interpolator(seg: tuple, o: float) -> pandas.Series:
-    a, b = seg
-    c = b[:3] - a[:3]
-    return pandas.Series(a[:3] + o * c / numpy.linalg.norm(c), index=_C_CENTER)
-
-
 def calc_center_positions(df: pandas.DataFrame, morph: MorphologyWithSpines) -> pandas.DataFrame:
-    return df.apply(
-        lambda row: segment_interpolator(
-            morph.section(int(row[_STR_SEC_ID]) - 1).segments[int(row[_STR_SEG_ID])],  # ty:ignore[unresolved-attribute]
-            row[_STR_SEG_OFF],
-        ),
-        axis=1,
+    if df.empty:
+        return pandas.DataFrame(columns=_C_CENTER, index=df.index)
+    sec_ids = df[_STR_SEC_ID].to_numpy(dtype=int) - 1
+    seg_ids = df[_STR_SEG_ID].to_numpy(dtype=int)
+    dtype = numpy.asarray(morph.points).dtype  # ty:ignore[unresolved-attribute]
+    starts = numpy.empty((len(df), 3), dtype=dtype)
+    ends = numpy.empty((len(df), 3), dtype=dtype)
+
+    # Gather segment start and end points section by section
+    order = numpy.argsort(sec_ids, kind="stable")
+    unique_sec_ids, first = numpy.unique(sec_ids[order], return_index=True)
+    for sec_id, rows in zip(unique_sec_ids, numpy.split(order, first[1:]), strict=True):
+        points = numpy.asarray(morph.section(int(sec_id)).points)[:, :3]  # ty:ignore[unresolved-attribute]
+        starts[rows] = points[seg_ids[rows]]
+        ends[rows] = points[seg_ids[rows] + 1]
+
+    c = ends - starts
+    centers = starts + df[_STR_SEG_OFF].to_numpy()[:, numpy.newaxis] * c / numpy.linalg.norm(
+        c, axis=1, keepdims=True
     )
+    return pandas.DataFrame(centers, index=df.index, columns=_C_CENTER)
 
 
 def rename_directed_dataframe_colums(
@@ -378,9 +502,10 @@ def map_afferents_to_spiny_morphology(
 ) -> pandas.DataFrame:
     segs_df = morph_to_segs_df(m)  # ty:ignore[invalid-argument-type]
     spine_and_soma_points = morph_to_spine_and_soma_df(m)
+    mesh_index = MeshPointIndex(spine_and_soma_points)
 
     mpd_nrt = map_points_to_segs_df(segs_df, syns[_C_P_LOCS])
-    mpd_spn = find_nearest_mesh_points(spine_and_soma_points, syns[_C_P_LOCS])
+    mpd_spn = mesh_index.nearest(syns[_C_P_LOCS])
 
     is_on_spine = (mpd_spn["distance"] <= mpd_nrt["distance"]) & (mpd_spn[_C_SP_INDEX] != -1)
     is_on_soma = (mpd_spn["distance"] <= mpd_nrt["distance"]) & (mpd_spn[_C_SP_INDEX] == -1)
@@ -396,7 +521,7 @@ def map_afferents_to_spiny_morphology(
     df_concat = pandas.concat([df_soma, df_shaft, df_spine], axis=0).sort_index()
 
     if add_quality_info:
-        competing_dist = add_competing_mesh_distances(spine_and_soma_points, syns[_C_P_LOCS])
+        competing_dist = mesh_index.competing_distances(syns[_C_P_LOCS])
         competing_dist[is_on_shaft] = mpd_spn.loc[is_on_shaft, "distance"]
         competing_dist[is_on_soma] = numpy.minimum(
             competing_dist[is_on_soma].to_numpy(), mpd_nrt.loc[is_on_soma, "distance"].to_numpy()
@@ -405,5 +530,5 @@ def map_afferents_to_spiny_morphology(
             competing_dist[is_on_spine].to_numpy(), mpd_nrt.loc[is_on_spine, "distance"].to_numpy()
         )
         df_concat["competing_distance"] = competing_dist
-        return df_concat, estimate_mesh_resolution(spine_and_soma_points)  # ty:ignore[invalid-return-type]
+        return df_concat, mesh_index.resolution()  # ty:ignore[invalid-return-type]
     return df_concat
@@ -0,0 +1,162 @@
+"""Bounded in-memory cache of morphologies and the derived data used by location blocks.
+
+Afferent synapse and morphology location blocks are often evaluated for many neurons sharing the
+same morphology file, or repeatedly for the same neuron in a scan. Entries are keyed on the
+morphology path and load options, such that the morphology, its path-distance calculator and its
+segment table are only built once. Morphologies that were not loaded through the cache are
+identified by object identity.
+"""
+
+import threading
+import warnings
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from functools import cached_property
+from typing import NamedTuple
+
+import morphio
+import numpy  # ruff: ignore[unconventional-import-alias]
+import pandas  # ruff: ignore[unconventional-import-alias]
+
+from obi_one.config import settings
+
+try:
+    from conntility.subcellular import MorphologyPathDistanceCalculator
+except ImportError:
+    warnings.warn("Connectome functionalities not available", UserWarning, stacklevel=1)
+
+
+class SegmentTable(NamedTuple):
+    """Flat arrays with one entry per segment of a morphology, in section order."""
+
+    section_id: numpy.ndarray  # 1-based, as in SONATA
+    segment_id: numpy.ndarray
+    section_type: numpy.ndarray
+    segment_length: numpy.ndarray
+
+    @classmethod
+    def from_morphology(cls, m: morphio.Morphology) -> "SegmentTable":
+        offsets = m.section_offsets.astype(numpy.int64)
+        n_segments = numpy.maximum(numpy.diff(offsets) - 1, 0)
+        points = m.points
+        # Segments between the last point of a section and the first one of the next are invalid
+        is_segment = numpy.ones(max(len(points) - 1, 0), dtype=bool)
+        is_segment[offsets[1:-1] - 1] = False
+        segment_length = numpy.linalg.norm(numpy.diff(points, axis=0), axis=1)[is_segment]
+
+        first_segment = numpy.cumsum(n_segments) - n_segments
+        return cls(
+            section_id=numpy.repeat(numpy.arange(1, len(n_segments) + 1), n_segments),
+            segment_id=numpy.arange(n_segments.sum()) - numpy.repeat(first_segment, n_segments),
+            section_type=numpy.repeat(m.section_types.astype(int), n_segments),
+            segment_length=segment_length,
+        )
+
+    def to_frame(self, columns: dict[str, str]) -> pandas.DataFrame:
+        """DataFrame of the segments, with the given names of the columns (field -> name)."""
+        return pandas.DataFrame({name: getattr(self, field) for field, name in columns.items()})
+
+
+class CachedMorphology:
+    """A morphology with lazily built (and then reused) derived data."""
+
+    def __init__(self, morphology: morphio.Morphology) -> None:
+        """Initialize object."""
+        self.morphology = morphology
+
+    @cached_property
+    def path_distance_calculator(self) -> MorphologyPathDistanceCalculator:
+        return MorphologyPathDistanceCalculator(self.morphology)
+
+    @cached_property
+    def segments(self) -> SegmentTable:
+        return SegmentTable.from_morphology(self.morphology)
+
+    @cached_property
+    def section_lengths(self) -> numpy.ndarray:
+        return numpy.array(
+            [
+                numpy.linalg.norm(numpy.diff(sec.points, axis=0), axis=1).sum()
+                for sec in self.morphology.sections
+            ]
+        )
+
+
+class MorphologyCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class MorphologyCache:
+    """Thread-safe LRU cache of CachedMorphology entries.
+
+    Args:
+        maxsize: Maximum number of cached morphologies.
+    """
+
+    def __init__(self, maxsize: int = 32) -> None:
+        """Initialize object."""
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, CachedMorphology] = OrderedDict()
+        self._keys_by_id: dict[int, Hashable] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _lookup(self, key: Hashable) -> CachedMorphology | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def _insert(self, key: Hashable, entry: CachedMorphology) -> CachedMorphology:
+        with self._lock:
+            if key in self._entries:  # Inserted concurrently
+                return self._entries[key]
+            self._entries[key] = entry
+            self._keys_by_id[id(entry.morphology)] = key
+            while len(self._entries) > self.maxsize:
+                _, evicted = self._entries.popitem(last=False)
+                self._keys_by_id.pop(id(evicted.morphology), None)
+            return entry
+
+    def load(
+        self, path: str, options: Hashable, load: Callable[[], morphio.Morphology]
+    ) -> CachedMorphology:
+        """Returns the cached morphology at path loaded with options, loading it on a miss."""
+        key = (str(path), options)
+        entry = self._lookup(key)
+        if entry is None:
+            entry = self._insert(key, CachedMorphology(load()))
+        return entry
+
+    def for_morphology(self, m: morphio.Morphology) -> CachedMorphology:
+        """Returns the entry of an already loaded morphology, creating it on a miss."""
+        # Entries hold a reference to their morphology, so its id cannot be reused while cached
+        key = self._keys_by_id.get(id(m), ("id", id(m)))
+        entry = self._lookup(key)
+        if entry is None or entry.morphology is not m:
+            entry = self._insert(key, CachedMorphology(m))
+        return entry
+
+    def info(self) -> MorphologyCacheInfo:
+        """Hit and miss counters and size of the cache."""
+        with self._lock:
+            return MorphologyCacheInfo(self._hits, self._misses, self.maxsize, len(self._entries))
+
+    def clear(self) -> None:
+        """Removes all entries and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_id.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+morphology_cache = MorphologyCache(maxsize=settings.morphology_cache.maxsize)
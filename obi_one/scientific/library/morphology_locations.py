@@ -7,6 +7,8 @@ import pandas as pd
 from scipy import stats
 from scipy.stats._distn_infrastructure import rv_frozen
 
+from obi_one.scientific.library.morphology_cache import morphology_cache
+
 try:
     from conntility.subcellular import MorphologyPathDistanceCalculator
 except ImportError:
@@ -24,6 +26,23 @@ _SEG_MIN = "min_seg_offset"
 _SEG_MAX = "max_seg_offset"
 _PRE_IDX = "source_index"
 
+_PD_KWARGS = {"str_section_id": _SEC_ID, "str_segment_id": _SEG_ID, "str_offset": _SEG_OFF}
+
+
+def _segments_of(m: morphio.Morphology, lst_sec_types: list | None = None) -> pd.DataFrame:
+    """All segments of a morphology (of the given section types), in section order."""
+    segments = morphology_cache.for_morphology(m).segments.to_frame(
+        {
+            "segment_id": _SEG_ID,
+            "section_id": _SEC_ID,
+            "section_type": _SEC_TYP,
+            "segment_length": _SEG_LEN,
+        }
+    )
+    if lst_sec_types is not None:
+        segments = segments.loc[segments[_SEC_TYP].isin(lst_sec_types)].reset_index(drop=True)
+    return segments
+
 
 def path_distance_all_segments_from(
     locs_ref: pd.DataFrame,
@@ -49,27 +68,10 @@ def path_distance_all_segments_from(
         lst_sec_types (list, default=None): List of section types to consider.
         If None, all types are considered.
     """
-    kwargs = {"str_section_id": _SEC_ID, "str_segment_id": _SEG_ID, "str_offset": _SEG_OFF}
-    locs_all = pd.concat(
-        [
-            pd.DataFrame(
-                {
-                    _SEG_ID: np.arange(m.sections[i].n_points - 1),
-                    _SEC_ID: np.ones(m.sections[i].n_points - 1, dtype=int) * (i + 1),
-                    _SEC_TYP: np.ones(m.sections[i].n_points - 1, dtype=int)
-                    * int(m.sections[i].type),
-                    _SEG_LEN: np.linalg.norm(np.diff(m.sections[i].points, axis=0), axis=1),
-                }
-            )
-            for i in range(len(m.sections))
-        ],
-        axis=0,
-    ).reset_index(drop=True)
-    if lst_sec_types is not None:
-        locs_all = locs_all.loc[locs_all[_SEC_TYP].isin(lst_sec_types)].reset_index(drop=True)
+    locs_all = _segments_of(m, lst_sec_types)
     locs_all[_SEG_OFF] = normalized_seg_loc * locs_all[_SEG_LEN]
 
-    path_distances = path_distance_calculator.path_distances(locs_ref, locs_all, **kwargs)
+    path_distances = path_distance_calculator.path_distances(locs_ref, locs_all, **_PD_KWARGS)
     path_distances = [
         pd.Series(path_distances_, name=_SOM_PAD) for path_distances_ in path_distances
     ]
@@ -93,73 +95,114 @@ def select_segments_as_cluster_centers(
     return locs.iloc[selected_ids]
 
 
-def find_normalized_interval_below_zero(a: float, b: float) -> tuple[float, float]:
+def find_normalized_interval_below_zero(
+    a: np.ndarray | float, b: np.ndarray | float
+) -> tuple[np.ndarray, np.ndarray]:
     """Find sub-interval of [0, 1] where f is < 0.
 
     Being given a and b, and assuming f(0) = a, f(1) = b, this function calculates the
-    sub-interval of [0, 1] where f is < 0.
+    sub-interval of [0, 1] where f is < 0. Works elementwise on arrays.
 
     Args:
-        a (float): f(0)
-        b (float): f(1)
+        a (np.ndarray | float): f(0)
+        b (np.ndarray | float): f(1)
     """
-    min_norm_path_distances = float(0)
-    max_norm_path_distances = float(1)
-    if (b - a) > 0:  # becomes invalid near the end
-        max_norm_path_distances = np.minimum(-a / (b - a), max_norm_path_distances)
-    elif (b - a) == 0:
-        max_norm_path_distances = 0.0
-    else:
-        min_norm_path_distances = np.maximum(-a / (b - a), min_norm_path_distances)
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    slope = b - a
+    with np.errstate(divide="ignore", invalid="ignore"):
+        zero_crossing = -a / slope
+    min_norm_path_distances = np.where(slope < 0, np.maximum(zero_crossing, 0.0), 0.0)
+    max_norm_path_distances = np.where(
+        slope > 0,  # becomes invalid near the end
+        np.minimum(zero_crossing, 1.0),
+        np.where(slope == 0, 0.0, 1.0),
+    )
     return min_norm_path_distances, max_norm_path_distances
 
 
-def min_max_offset_in_segment(row: pd.Series, max_distance: float) -> pd.Series:
-    """Determines offsets from segment starting point closer than max_distance. \
+def min_max_offset_in_segment(
+    pd_start: np.ndarray, pd_end: np.ndarray, seg_len: np.ndarray, max_distance: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Determines offsets from segment starting points closer than max_distance. \
 
-    Determines which offsets from the starting point of a segment are closer in path distance \
+    Determines which offsets from the starting points of segments are closer in path distance \
         than a specified maximum value.
 
     Args:
-        row (pd.Series): Must specify path distance at the start and end of the segment,
-        plus the length of the segment. For the names of the corresponding entries check the code.
+        pd_start (np.ndarray): Path distances at the start of the segments.
+        pd_end (np.ndarray): Path distances at the end of the segments.
+        seg_len (np.ndarray): Lengths of the segments.
         max_distance (float): Maximum path distance allowed.
-    """
-    a = row[_SOM_PAD + "_start"] - max_distance
-    b = row[_SOM_PAD + "_end"] - max_distance
-    seg_len = row[_SEG_LEN]
-    min_norm_path_distances, max_norm_path_distances = find_normalized_interval_below_zero(a, b)
 
-    return pd.Series(
-        {_SEG_MIN: min_norm_path_distances * seg_len, _SEG_MAX: max_norm_path_distances * seg_len}
+    Returns:
+        Minimum and maximum offsets in the segments.
+    """
+    min_norm_path_distances, max_norm_path_distances = find_normalized_interval_below_zero(
+        pd_start - max_distance, pd_end - max_distance
     )
+    return min_norm_path_distances * seg_len, max_norm_path_distances * seg_len
 
 
-def min_max_offset_for_center_segment(row: pd.Series, max_distance: float) -> pd.Series:
-    """Determines offsets from segment starting point closer than max_distance. \
+def min_max_offset_for_center_segment(
+    pd_start: np.ndarray, pd_end: np.ndarray, seg_len: np.ndarray, max_distance: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Determines offsets from segment starting points closer than max_distance. \
 
-    Determines which offsets from the starting point of a segment are closer in path distance \
-        than a specified maximum value. Specialized version to be used for the segment that \
-        contains the point that path distances are relative to.
+    Determines which offsets from the starting points of segments are closer in path distance \
+        than a specified maximum value. Specialized version to be used for the segments that \
+        contain the points that path distances are relative to.
 
     Args:
-        row (pd.Series): Must specify path distance at the start and end of the segment,
-        plus the length of the segment. For the names of the corresponding entries check the code.
+        pd_start (np.ndarray): Path distances at the start of the segments.
+        pd_end (np.ndarray): Path distances at the end of the segments.
+        seg_len (np.ndarray): Lengths of the segments.
         max_distance (float): Maximum path distance allowed.
+
+    Returns:
+        Minimum and maximum offsets in the segments.
     """
-    a = row[_SOM_PAD + "_start"] - max_distance
-    b = row[_SOM_PAD + "_end"] - max_distance
-    seg_len = row[_SEG_LEN]
     c = -max_distance
-    min_norm_path_distances, _ = find_normalized_interval_below_zero(a, c)
-    _, max_norm_path_distances = find_normalized_interval_below_zero(c, b)
+    min_norm_path_distances, _ = find_normalized_interval_below_zero(pd_start - max_distance, c)
+    _, max_norm_path_distances = find_normalized_interval_below_zero(c, pd_end - max_distance)
+    return (
+        0.5 * min_norm_path_distances * seg_len,
+        (0.5 + 0.5 * max_norm_path_distances) * seg_len,
+    )
 
-    return pd.Series(
-        {
-            _SEG_MIN: 0.5 * min_norm_path_distances * seg_len,
-            _SEG_MAX: (0.5 + 0.5 * max_norm_path_distances) * seg_len,
-        }
+
+def path_distances_to_segment_ends(
+    locs_ref: pd.DataFrame,
+    m: morphio.Morphology,
+    path_distance_calculator: MorphologyPathDistanceCalculator,
+    lst_sec_types: list | None = None,
+) -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """Path distances from reference locations to the start and end points of all segments.
+
+    Both are calculated in a single pass of the path distance calculator.
+
+    Args:
+        locs_ref (pd.DataFrame): Defines the reference locations. For details how, see
+        conntility.subcellular.MorphologyPathDistanceCalculator.
+        m (morphio.Morphology): Morphology to use.
+        path_distance_calculator (conntility.subcellular.MorphologyPathDistanceCalculator): \
+            Path distance calculator must be created on morphology m.
+        lst_sec_types (list, default=None): List of section types to consider.
+        If None, all types are considered.
+
+    Returns:
+        The segments, and path distances to their start and end points (one row per reference
+        location, one column per segment).
+    """
+    segments = _segments_of(m, lst_sec_types)
+    ends = pd.concat(
+        [
+            segments.assign(**{_SEG_OFF: normalized_seg_loc * segments[_SEG_LEN]})
+            for normalized_seg_loc in (0.0, 1.0)
+        ],
+        ignore_index=True,
     )
+    path_distances = path_distance_calculator.path_distances(locs_ref, ends, **_PD_KWARGS)
+    return segments, path_distances[:, : len(segments)], path_distances[:, len(segments) :]
 
 
 def candidate_segments_all_morphology(locs: pandas.DataFrame) -> pd.DataFrame:
@@ -203,24 +246,26 @@ def candidate_segments_for_center(
         lst_sec_types (list, default=None): List of section types allowed. If None, then all \
             types are allowed.
     """
-    loc_center = locs.loc[ids_center]
-    res_seg_start = path_distance_all_segments_from(
-        loc_center, m, path_distance_calculator, 0.0, lst_sec_types=lst_sec_types
-    ).rename(columns={_SOM_PAD: _SOM_PAD + "_start"})
-    res_seg_end = path_distance_all_segments_from(
-        loc_center, m, path_distance_calculator, 1.0, lst_sec_types=lst_sec_types
-    ).rename(columns={_SOM_PAD: _SOM_PAD + "_end"})
-
-    res = pd.concat([res_seg_start, res_seg_end[[_SOM_PAD + "_end"]]], axis=1)
-
-    valid = (res[_SOM_PAD + "_start"] < max_dist) | (res[_SOM_PAD + "_end"] < max_dist)
-    valid[list(enumerate(ids_center))] = True
-    cands = res.loc[valid]
+    segments, pd_start, pd_end = path_distances_to_segment_ends(
+        locs.loc[ids_center], m, path_distance_calculator, lst_sec_types=lst_sec_types
+    )
+    seg_len = segments[_SEG_LEN].to_numpy()
+    seg_min, seg_max = min_max_offset_in_segment(pd_start, pd_end, seg_len, max_dist)
+
+    center_idx = np.arange(len(ids_center))
+    center_seg = np.asarray(ids_center)
+    center = (center_idx, center_seg)
+    seg_min[center], seg_max[center] = min_max_offset_for_center_segment(
+        pd_start[center], pd_end[center], seg_len[center_seg], max_dist
+    )
 
-    intervals = cands.apply(min_max_offset_in_segment, args=(max_dist,), axis=1)
-    for tpl in enumerate(ids_center):
-        intervals.loc[tpl] = min_max_offset_for_center_segment(res.loc[tpl], max_dist)
-    return intervals
+    valid = (pd_start < max_dist) | (pd_end < max_dist)
+    valid[center] = True
+    idx_center, idx_seg = np.nonzero(valid)
+    return pd.DataFrame(
+        {_SEG_MIN: seg_min[idx_center, idx_seg], _SEG_MAX: seg_max[idx_center, idx_seg]},
+        index=pd.MultiIndex.from_arrays([idx_center, idx_seg], names=[_CEN_IDX, None]),
+    )
 
 
 def select_places_from_candidate_list(
@@ -295,9 +340,7 @@ def add_normalized_section_offset(
         path_distance_calculator (conntility.subcellular.MorphologyPathDistanceCalculator): Must \
             be defined on m.
     """
-    sec_lengths = np.array(
-        [np.linalg.norm(np.diff(sec.points, axis=0), axis=1).sum() for sec in m.sections]
-    )
+    sec_lengths = morphology_cache.for_morphology(m).section_lengths
     sec_o = (
         path_distance_calculator.offset[dataframe[_SEC_ID] - 1, dataframe[_SEG_ID]]
         + dataframe[_SEG_OFF].to_numpy()
@@ -378,7 +421,7 @@ def generate_neurite_locations_on(
     if seed is not None:
         np.random.seed(seed)  # ruff: ignore[numpy-legacy-random]
 
-    path_distance_calculator = MorphologyPathDistanceCalculator(m)
+    path_distance_calculator = morphology_cache.for_morphology(m).path_distance_calculator
 
     soma = pd.DataFrame({_SEC_ID: [0], _SEG_ID: [0], _SEG_OFF: [0]})
 
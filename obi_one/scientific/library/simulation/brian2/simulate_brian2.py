@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 # ruff: file-ignore[assert]
 import contextlib
+import hashlib
 import heapq
+import json
 import logging
 import math
 import os
@@ -13,7 +15,7 @@ from collections.abc import Callable, Iterator
 from datetime import UTC, datetime
 from functools import partial, singledispatch
 from pathlib import Path
-from typing import Protocol
+from typing import NamedTuple, Protocol
 
 import bluepysnap
 import bluepysnap.frame_report
@@ -40,6 +42,8 @@ from obi_one.db_sdk.registration.simulation_result import register_simulation_re
 REQUIRED_PATH = click.Path(exists=True, readable=True, dir_okay=False, resolve_path=True)
 L = logging.getLogger(__name__)
 KNOWN_UNITS = {u for u in dir(brian2.units) if not u.startswith("_")}
+# Recorded report frames buffered in memory, per report, before being flushed to disk
+REPORT_BUFFER_BYTES = 64 * 1024**2
 
 
 class NetworkOperation(BaseModel):
@@ -77,9 +81,8 @@ class Brian2Network(BaseModel):
     neurons: brian2.NeuronGroup
     synapses: brian2.Synapses
     spike_monitor: brian2.SpikeMonitor
-    state_monitor: brian2.StateMonitor | None
+    reports: list["SomaReport"]
     inputs: list
-    report_id_mapping: np.ndarray
     events: list[Event]
 
 
@@ -91,33 +94,30 @@ class CurrentStimulator(ABC):
             raise RuntimeError(msg)
         self.config = config
 
-    def get_selection(
-        self, node_sets: libsonata.NodeSets, population: libsonata.NodePopulation
-    ) -> libsonata.Selection:
-        """Return the selection of neurons from `population` that this stimulus applies to."""
-        if self.config.node_set == "All":
-            return population.select_all()
-        return node_sets.materialize(self.config.node_set, population)
-
-    def get_currents(self, dt: float, simulation_length: float) -> brian2.TimedArray:
-        """Uses `_get_currents` to create a TimedArray to be used for simulation."""
-        v = self._get_currents(dt, simulation_length)
-        return brian2.TimedArray(v * brian2.units.nA, dt=dt * brian2.units.ms)
-
-    @abstractmethod
     def _get_currents(self, dt: float, simulation_length: float) -> np.ndarray:
         """Get array of current values to be injected.
 
         Starts at t=0, each array element is the value at that time, the timestep is `dt`.
         """
+        ret = np.zeros(math.ceil(simulation_length / dt) + 1, dtype=np.float32)
+        start, values = self.get_window(dt, simulation_length)
+        ret[start : start + len(values)] = values
+        return ret
+
+    @abstractmethod
+    def get_window(self, dt: float, simulation_length: float) -> tuple[int, np.ndarray]:
+        """Get the current values to be injected while the stimulus is active.
+
+        Returns the index of the first timestep (of size `dt`, starting at t=0) that the
+        stimulus is active, and the values from there on; the current is 0 elsewhere.
+        """
 
 
 class Linear(CurrentStimulator):
     """A continuous linear injection of current."""
 
-    def _get_currents(self, dt: float, simulation_length: float) -> np.ndarray:
+    def get_window(self, dt: float, simulation_length: float) -> tuple[int, np.ndarray]:
         n_total = math.ceil(simulation_length / dt) + 1
-        ret = np.zeros(n_total, dtype=np.float32)
         n_delay = math.ceil(self.config.delay / dt)
         if self.config.delay + self.config.duration <= simulation_length:
             n_ramp = math.ceil((self.config.delay + self.config.duration) / dt) + 1
@@ -128,46 +128,43 @@ class Linear(CurrentStimulator):
                 simulation_length - self.config.delay
             ) / self.config.duration * (self.config.amp_end - self.config.amp_start)
 
-        n_ramp = min(n_ramp, n_total - n_delay)
-        ret[n_delay : (n_delay + n_ramp)] = np.linspace(self.config.amp_start, amp_end, n_ramp)
-        return ret
+        n_ramp = max(min(n_ramp, n_total - n_delay), 0)
+        return n_delay, np.linspace(self.config.amp_start, amp_end, n_ramp, dtype=np.float32)
 
 
 class Pulse(CurrentStimulator):
     """Series of current pulse injections."""
 
-    def _get_currents(self, dt: float, simulation_length: float) -> np.ndarray:
+    def get_window(self, dt: float, simulation_length: float) -> tuple[int, np.ndarray]:
         n_total = math.ceil(simulation_length / dt) + 1
-        ret = np.zeros(n_total, dtype=np.float32)
 
         n_delay = math.ceil(self.config.delay / dt)
         n_end = min(math.ceil((self.config.delay + self.config.duration) / dt), n_total)
         pulse_samples = math.ceil(self.config.width / dt)
         period_samples = math.ceil(1.0 / (self.config.frequency * dt))
 
-        for start in range(n_delay, n_end, period_samples):
-            end = min(start + pulse_samples, n_end)
-            ret[start:end] = self.config.amp_start
+        ret = np.zeros(max(n_end - n_delay, 0), dtype=np.float32)
+        for start in range(0, len(ret), period_samples):
+            ret[start : start + pulse_samples] = self.config.amp_start
 
-        return ret
+        return n_delay, ret
 
 
 class Sinusoidal(CurrentStimulator):
     """A generated sinusoidal current."""
 
-    def _get_currents(self, dt: float, simulation_length: float) -> np.ndarray:
+    def get_window(self, dt: float, simulation_length: float) -> tuple[int, np.ndarray]:
         assert dt == self.config.dt, f"simulation dt: {dt} != input dt: {self.config.dt}"
 
         n_total = math.ceil(simulation_length / dt) + 1
-        ret = np.zeros(n_total, dtype=np.float32)
 
         n_delay = math.ceil(self.config.delay / dt)
         n_end = min(math.ceil((self.config.delay + self.config.duration) / dt), n_total)
 
-        t = np.arange(n_end - n_delay) * dt
-        ret[n_delay:n_end] = self.config.amp_start * np.sin(2 * np.pi * self.config.frequency * t)
-
-        return ret
+        t = np.arange(max(n_end - n_delay, 0)) * dt
+        return n_delay, (
+            self.config.amp_start * np.sin(2 * np.pi * self.config.frequency * t)
+        ).astype(np.float32)
 
 
 @singledispatch
@@ -279,25 +276,20 @@ def _get_close_spikes(ids: np.ndarray, times: np.ndarray, window: float) -> np.n
     return result_mask
 
 
-def _build_synapses(
-    source: brian2.NeuronGroup | brian2.SpikeGeneratorGroup,
-    target: brian2.NeuronGroup,
-    synapse_template: SynapseTemplate,
-    edge_pop: libsonata.EdgePopulation,
-    selection: libsonata.Selection,
-) -> brian2.Synapses:
-    """Create, connect, and configure a brian2.Synapses object from an edge population.
+class Connectivity(NamedTuple):
+    """Connectivity arrays of the edges instantiated as brian2.Synapses."""
 
-    Args:
-        source: The presynaptic group (NeuronGroup or SpikeGeneratorGroup).
-        target: The postsynaptic NeuronGroup.
-        synapse_template: Template defining synapse model, on_pre, delay, and dynamics.
-        edge_pop: The libsonata EdgePopulation to read connectivity and attributes from.
-        selection: The libsonata Selection specifying which edges to instantiate.
+    src: np.ndarray
+    tgt: np.ndarray
+    dynamics: dict[str, np.ndarray]  # unitless edge attributes, by `SynapseTemplate.dynamics`
 
-    Returns:
-        A fully configured brian2.Synapses object.
-    """
+
+def _read_connectivity(
+    edge_pop: libsonata.EdgePopulation,
+    selection: libsonata.Selection,
+    synapse_template: SynapseTemplate,
+) -> Connectivity:
+    """Read the connectivity of the `selection` of edges from an edge population."""
     src = edge_pop.source_nodes(selection).flatten()
     tgt = edge_pop.target_nodes(selection).flatten()
 
@@ -310,6 +302,108 @@ def _build_synapses(
         "Multiple synapses per connection, not currently supported"
     )
 
+    return Connectivity(
+        src=np.array(src, np.int64),
+        tgt=np.array(tgt, np.int64),
+        dynamics={
+            name: np.asarray(edge_pop.get_attribute(name, selection))
+            for name in synapse_template.dynamics
+        },
+    )
+
+
+class NetworkCache:
+    """On-disk cache of what can be reused between trials of the same circuit.
+
+    * the compiled Cython code objects; brian2 keys them on the generated code, so they are
+      reused by any trial with the same model equations
+    * the connectivity arrays of the circuit synapses, keyed on the edges file (path, size and
+      modification time), the edge population and the synapse template
+
+    Connectivity is also kept in memory, for trials run in the same process with the same cache.
+    Stimuli, seeds and connection overrides are applied on top of the cached state in every trial.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Ibid."""
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._connectivity: dict[str, Connectivity] = {}
+
+    def activate(self) -> None:
+        """Make brian2 compile the code objects into, and load them from, the cache."""
+        brian2.prefs.codegen.runtime.cython.cache_dir = str(self.path / "cython")
+
+    @staticmethod
+    def _connectivity_key(
+        edges_file: Path, edge_pop: libsonata.EdgePopulation, synapse_template: SynapseTemplate
+    ) -> str:
+        stat = edges_file.stat()
+        key = {
+            "edges_file": str(edges_file.resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "population": edge_pop.name,
+            "model": synapse_template.params.model,
+            "on_pre": synapse_template.params.on_pre,
+            "dynamics": sorted(synapse_template.dynamics),
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    def connectivity(
+        self,
+        edges_file: Path,
+        edge_pop: libsonata.EdgePopulation,
+        synapse_template: SynapseTemplate,
+    ) -> Connectivity:
+        """Connectivity of all the edges of `edge_pop`, read from the cache when possible."""
+        key = self._connectivity_key(edges_file, edge_pop, synapse_template)
+        if key in self._connectivity:
+            return self._connectivity[key]
+
+        path = self.path / "connectivity" / f"{key}.npz"
+        if path.exists():
+            L.info("Loading cached connectivity: %s", path)
+            with np.load(path) as data:
+                connectivity = Connectivity(
+                    src=data["src"],
+                    tgt=data["tgt"],
+                    dynamics={name: data[f"dynamics_{name}"] for name in synapse_template.dynamics},
+                )
+        else:
+            connectivity = _read_connectivity(edge_pop, edge_pop.select_all(), synapse_template)
+            path.parent.mkdir(exist_ok=True)
+            # write to a temporary file first, such that concurrent trials never see partial files
+            with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".npz", delete=False) as fd:
+                np.savez(
+                    fd,
+                    src=connectivity.src,
+                    tgt=connectivity.tgt,
+                    **{f"dynamics_{name}": v for name, v in connectivity.dynamics.items()},
+                )
+            Path(fd.name).replace(path)
+
+        self._connectivity[key] = connectivity
+        return connectivity
+
+
+def _build_synapses(
+    source: brian2.NeuronGroup | brian2.SpikeGeneratorGroup,
+    target: brian2.NeuronGroup,
+    synapse_template: SynapseTemplate,
+    connectivity: Connectivity,
+) -> brian2.Synapses:
+    """Create, connect, and configure a brian2.Synapses object from connectivity arrays.
+
+    Args:
+        source: The presynaptic group (NeuronGroup or SpikeGeneratorGroup).
+        target: The postsynaptic NeuronGroup.
+        synapse_template: Template defining synapse model, on_pre, delay, and dynamics.
+        connectivity: The source and target node ids, and the attributes, of the edges.
+
+    Returns:
+        A fully configured brian2.Synapses object.
+    """
     syn = brian2.Synapses(
         source,
         target,
@@ -317,7 +411,7 @@ def _build_synapses(
         on_pre=synapse_template.params.on_pre,
     )
 
-    syn.connect(i=np.array(src, np.int64), j=np.array(tgt, np.int64))
+    syn.connect(i=connectivity.src, j=connectivity.tgt)
     syn.pre.delay = (
         0.0 * brian2.units.ms
         if synapse_template.params.delay is None
@@ -325,8 +419,7 @@ def _build_synapses(
     )
 
     for name, unit in synapse_template.dynamics.items():
-        values = edge_pop.get_attribute(name, selection) * unit
-        setattr(syn, name, values)
+        setattr(syn, name, connectivity.dynamics[name] * unit)
 
     return syn
 
@@ -394,17 +487,51 @@ def _get_spike_replay(
         source=replay,
         target=n0,
         synapse_template=synapse_template,
-        edge_pop=edge_pop,
-        selection=selection,
+        connectivity=_read_connectivity(edge_pop, selection, synapse_template),
     )
 
     return (replay, replay_connectivity)
 
 
-class Inputs:
+class NodeSetCache:
+    """Node ids of the node sets of a simulation, materialized once per node set."""
+
     def __init__(self, simulation: bluepysnap.Simulation) -> None:
+        """Ibid."""
+        self._node_sets = simulation.node_sets.to_libsonata
+        self._population = simulation.circuit.nodes[
+            _get_single_node_population(simulation.circuit)
+        ].to_libsonata
+        self._ids: dict[str, np.ndarray] = {}
+
+    def ids(self, node_set: str) -> np.ndarray:
+        """Node ids of the single node population that are in `node_set`."""
+        if node_set not in self._ids:
+            if node_set == "All":
+                selection = self._population.select_all()
+            else:
+                selection = self._node_sets.materialize(node_set, self._population)
+            self._ids[node_set] = selection.flatten()
+        return self._ids[node_set]
+
+
+def _get_stim_indices(targets: np.ndarray) -> np.ndarray:
+    """Columns (1-based, 0 for none) of the targets of each neuron, one neuron per row.
+
+    The k-th target column of a neuron is in its k-th index; `targets` is (neurons, columns).
+    """
+    neurons, columns = np.nonzero(targets)
+    slots = np.cumsum(targets, axis=1)[neurons, columns] - 1
+    stim_index = np.zeros((len(targets), max(targets.sum(axis=1).max(), 1)), dtype=np.int32)
+    stim_index[neurons, slots] = columns + 1
+    return stim_index
+
+
+class Inputs:
+    def __init__(self, simulation: bluepysnap.Simulation, node_sets: NodeSetCache) -> None:
         """Ibid."""
         self.simulation = simulation
+        self.node_sets = node_sets
         # `injectors` need the `I_inj` variable in the template, and require that
         # the equations of NeuronGroup includes changes
         self._injectors = [
@@ -416,11 +543,14 @@ class Inputs:
     def update_model_and_get_stims(self, model: str, neuron_count: int) -> tuple[str, dict, dict]:
         """Update model from template with requirements for Inputs.
 
-        Strategy is to create "injectors" which are `brian2.TimedArray`'s with the values
-        that are played to the particular neurons.  The neurons use an `indicator` which
-        is a boolean mask where `True` is set if the particular neuron is set.
+        Strategy is to sum the currents of the "injectors" targeting the same neurons (e.g.,
+        the same node set) in a single column of a 2D `brian2.TimedArray`, the first column
+        being zero.  Each neuron sums the columns of the node sets it belongs to, which it
+        selects with `stim_index_<i>` variables, as many as the largest number of distinct node
+        sets a neuron belongs to; unused ones select the zero column.  Each injector only
+        computes its values while it is active, so no full-length waveform is allocated per input.
 
-        Thus, the memory usage is O(Neurons_count + simulation_duration / dt) per input
+        Thus, the memory usage is O(Neurons_count * inputs + node_sets * duration / dt)
         """
         if "I_inj" not in model:
             msg = f"Missing `I_inj` in equations: {model}; needed for current injection"
@@ -428,42 +558,38 @@ class Inputs:
 
         model = re.sub(r".*I_inj\s*:\s*amp.*", "", model)
 
-        population = self.simulation.circuit.nodes[
-            _get_single_node_population(self.simulation.circuit)
-        ].to_libsonata
-        node_sets = self.simulation.node_sets.to_libsonata
+        if not self._injectors:
+            return model + "\nI_inj = 0 * amp : amp\n", {}, {}
+
+        dt, tstop = self.simulation.dt, self.simulation.run.tstop
 
-        lines = []
-        objs = {}
-        indicators = {}
-        seen_node_set = {}
-        injection_sum = "\nI_inj = 0 * amp"
+        stimulated = np.zeros((neuron_count, len(self._injectors)), dtype=bool)
         for i, injection in enumerate(self._injectors):
-            if injection.config.node_set in seen_node_set:
-                objs[
-                    f"stim{seen_node_set[injection.config.node_set]}"
-                ].values += injection.get_currents(  # ruff: ignore[pandas-use-of-dot-values]
-                    self.simulation.dt, self.simulation.run.tstop
-                ).values
-                continue
-
-            injection_sum += f" + I_inj{i}"
-            lines.extend(
-                (
-                    f"I_inj{i} = stim{i}(t) * is_stimulated{i} : amp",
-                    f"is_stimulated{i} : 1",
-                )
-            )
-            idx = injection.get_selection(population=population, node_sets=node_sets).flatten()
-            mask = np.zeros((neuron_count,), dtype=bool)
-            mask[idx] = True
-            indicators[f"is_stimulated{i}"] = mask
-            objs[f"stim{i}"] = injection.get_currents(self.simulation.dt, self.simulation.run.tstop)
-            seen_node_set[injection.config.node_set] = i
+            stimulated[self.node_sets.ids(injection.config.node_set), i] = True
+        # injectors targeting the same neurons share a column
+        targets, column = np.unique(stimulated, axis=1, return_inverse=True)
+        column = column.reshape(-1) + 1
 
-        model += "\n" + "\n".join(lines) + injection_sum + ": amp\n"
+        currents = np.zeros((math.ceil(tstop / dt) + 1, targets.shape[1] + 1), dtype=np.float32)
+        for i, injection in enumerate(self._injectors):
+            start, values = injection.get_window(dt, tstop)
+            currents[start : start + len(values), column[i]] += values
+
+        stim_index = _get_stim_indices(targets)
+        slot_count = stim_index.shape[1]
+        model += (
+            "\nI_inj = "
+            + " + ".join(f"stim(t, stim_index_{k})" for k in range(slot_count))
+            + " : amp\n"
+            + "".join(f"stim_index_{k} : integer (constant)\n" for k in range(slot_count))
+        )
+        stim = brian2.TimedArray(currents * brian2.units.nA, dt=dt * brian2.units.ms)
 
-        return model, objs, indicators
+        return (
+            model,
+            {"stim": stim},
+            {f"stim_index_{k}": stim_index[:, k] for k in range(slot_count)},
+        )
 
 
 def _get_non_current_inputs(
@@ -487,46 +613,120 @@ def _get_non_current_inputs(
     return n0, inputs
 
 
+class SomaReport:
+    """Records a SONATA soma report, streaming it to disk while the simulation runs.
+
+    Only the neurons of the report's node set are monitored, at the report's own `dt`, and only
+    between its `start_time` and `end_time`.  The recorded frames are appended to a resizable
+    `data` dataset whenever `REPORT_BUFFER_BYTES` worth of frames have been buffered, so memory
+    use does not grow with the simulation length.
+    """
+
+    def __init__(
+        self,
+        config: libsonata.SimulationConfig.Report,
+        node_ids: np.ndarray,
+        population_name: str,
+        neurons: brian2.NeuronGroup,
+        tstop: float,
+    ) -> None:
+        """Ibid."""
+        self.config = config
+        self.node_ids = node_ids
+        self.population_name = population_name
+        self.dt = config.dt
+        # the monitor's clock ticks at multiples of `dt`, so the first frame is the first
+        # multiple of `dt` at or after `start_time`
+        self.start = math.ceil(config.start_time / self.dt - 1e-9) * self.dt
+        self.end = min(config.end_time, tstop)
+        self.unit = brian2.units.mV
+        self.monitor = brian2.StateMonitor(
+            neurons, ["v"], record=node_ids, dt=self.dt * brian2.units.ms
+        )
+        self.monitor.active = False
+        self.frames_per_flush = max(1, REPORT_BUFFER_BYTES // (8 * max(len(node_ids), 1)))
+
+        Path(config.file_name).parent.mkdir(exist_ok=True, parents=True)
+        _create_soma_report(
+            Path(config.file_name),
+            population_name,
+            node_ids,
+            unit=self.unit,
+            start=self.start,
+            end=self.end,
+            dt=self.dt,
+        )
+
+    @property
+    def at(self) -> list[float]:
+        """Times at which recording starts, buffered frames are flushed, and recording ends."""
+        if self.end <= self.start:
+            return []
+        flush_interval = self.frames_per_flush * self.dt
+        n_flushes = math.ceil((self.end - self.start) / flush_interval)
+        return [self.start + i * flush_interval for i in range(n_flushes)] + [self.end]
+
+    def __call__(self, t: float, _net: "Brian2Network") -> NetworkOperation:
+        self.flush()
+        self.monitor.active = self.start <= t < self.end
+        return NetworkOperation(add=[], remove=[])
+
+    def flush(self) -> None:
+        """Append the buffered frames to the report file, and empty the monitor."""
+        if not len(self.monitor.t):
+            return
+        L.debug("Flushing %d frames to %s", len(self.monitor.t), self.config.file_name)
+        _append_soma_report(
+            Path(self.config.file_name), self.population_name, (self.monitor.v[:] / self.unit).T
+        )
+        self.monitor.resize(0)
+
+
 def _get_reports(
     simulation: bluepysnap.Simulation, neurons: brian2.NeuronGroup
-) -> tuple[brian2.StateMonitor | None, np.ndarray]:
+) -> list[SomaReport]:
     """Get voltage reports."""
     node_sets = simulation.node_sets.to_libsonata
-    population = simulation.circuit.nodes[
-        _get_single_node_population(simulation.circuit)
-    ].to_libsonata
+    population_name = _get_single_node_population(simulation.circuit)
+    population = simulation.circuit.nodes[population_name].to_libsonata
 
-    selection = libsonata.Selection([])
+    ret = []
     for name, report in simulation.reports.items():
-        if isinstance(report, bluepysnap.frame_report.SomaReport):
-            config = report.to_libsonata
-            if config.sections != libsonata.SimulationConfig.Report.Sections.soma:
-                msg = f"only sections == `soma` is supported, found: `{config.sections}`"
-                raise RuntimeError(msg)
-            if config.variable_name != "v":
-                msg = "`variable_name`s other than `v` are not supported"
-                raise RuntimeError(msg)
-            if config.dt != simulation.run.dt:
-                msg = "`dt` other than simulation.run.dt are not supported"
-                raise RuntimeError(msg)
-            if not config.enabled:
-                L.warning("Skipping report: `%s` since not enabled", name)
-
-            if node_set := config.cells or simulation.to_libsonata.node_set:
-                selection |= node_sets.materialize(node_set, population)
-            else:
-                selection = population.select_all()
-        else:
+        if not isinstance(report, bluepysnap.frame_report.SomaReport):
             msg = f"`{type(report)}` report type not handled, named {name}"
             raise TypeError(msg)
 
-    if not selection:
-        return None, np.array([])
+        config = report.to_libsonata
+        if config.sections != libsonata.SimulationConfig.Report.Sections.soma:
+            msg = f"only sections == `soma` is supported, found: `{config.sections}`"
+            raise RuntimeError(msg)
+        if config.variable_name != "v":
+            msg = "`variable_name`s other than `v` are not supported"
+            raise RuntimeError(msg)
+        steps = config.dt / simulation.run.dt
+        if round(steps) < 1 or not math.isclose(steps, round(steps), rel_tol=1e-6):
+            msg = "`dt` must be a multiple of simulation.run.dt"
+            raise RuntimeError(msg)
+        if not config.enabled:
+            L.warning("Skipping report: `%s` since not enabled", name)
+            continue
+
+        if node_set := config.cells or simulation.to_libsonata.node_set:
+            selection = node_sets.materialize(node_set, population)
+        else:
+            selection = population.select_all()
+
+        ret.append(
+            SomaReport(
+                config,
+                np.sort(selection.flatten()),
+                population_name,
+                neurons,
+                tstop=simulation.run.tstop,
+            )
+        )
 
-    ids = np.sort(selection.flatten())
-    id_mapping = np.zeros(ids[-1] + 1, dtype=np.min_scalar_type(ids[-1]))
-    id_mapping[ids] = np.arange(len(ids))
-    return brian2.StateMonitor(neurons, ["v"], record=ids), id_mapping
+    return ret
 
 
 def _write_spikes(
@@ -626,9 +826,12 @@ def _create_neurons(simulation: bluepysnap.Simulation, inputs: Inputs) -> brian2
 
 
 def _create_synapses(
-    circuit: bluepysnap.Circuit, neurons: brian2.NeuronGroup
+    circuit: bluepysnap.Circuit, neurons: brian2.NeuronGroup, cache: NetworkCache | None = None
 ) -> tuple[brian2.Synapses, SynapseTemplate]:
-    """Create synapses for circuit; all synapses are instantiated."""
+    """Create synapses for circuit; all synapses are instantiated.
+
+    If a `cache` is given, the connectivity is read from it when possible.
+    """
     assert len(circuit.edges.population_names) == 1, "Only one population supported"
     edges = circuit.edges[next(iter(circuit.edges.population_names))]
     edge_pop = edges.to_libsonata
@@ -642,19 +845,24 @@ def _create_synapses(
         template = set(edge_pop.get_attribute("model_template", edge_pop.select_all()))
         template = next(iter(template))
 
-    models_dir = Path(
-        circuit.to_libsonata.edge_population_properties(edge_pop.name).point_neuron_models_dir
-    )
+    properties = circuit.to_libsonata.edge_population_properties(edge_pop.name)
+    models_dir = Path(properties.point_neuron_models_dir)
     ext, name = template.split(":")
     with (models_dir / f"{name}.{ext}").open() as fd:
         synapse_template = SynapseTemplate.model_validate_json(fd.read())
 
+    if cache is None:
+        connectivity = _read_connectivity(edge_pop, edge_pop.select_all(), synapse_template)
+    else:
+        connectivity = cache.connectivity(
+            Path(properties.elements_path), edge_pop, synapse_template
+        )
+
     syn = _build_synapses(
         source=neurons,
         target=neurons,
         synapse_template=synapse_template,
-        edge_pop=edge_pop,
-        selection=edge_pop.select_all(),
+        connectivity=connectivity,
     )
 
     return syn, synapse_template
@@ -724,13 +932,13 @@ class ConnectionOverride:
 
 
 class InputPoisson:
-    def __init__(self, config: libsonata.SimulationConfig.Poisson, sim_config_path: Path) -> None:
+    def __init__(self, config: libsonata.SimulationConfig.Poisson, node_sets: NodeSetCache) -> None:
         """Ibid."""
         if config.compartment_set:
             msg = "`compartment_set` not supported"
             raise RuntimeError(msg)
         self.config = config
-        self.sim_config_path = sim_config_path
+        self.node_sets = node_sets
         # the __call__should happen twice, once to create the stimuli (at `delay`),
         # and once to stop it (at `delay + duration`)
         self._inputs = []
@@ -749,21 +957,22 @@ class InputPoisson:
                 self.config.weight,
             )
             assert self.config.delay <= t <= self.config.delay + self.config.duration
-            simulation = bluepysnap.Simulation(self.sim_config_path)
-            population_name = _get_single_node_population(simulation.circuit)
-            selections = simulation.node_sets.to_libsonata.materialize(
-                self.config.node_set, simulation.circuit.nodes[population_name].to_libsonata
+            targets = self.node_sets.ids(self.config.node_set)
+            if not len(targets):
+                return NetworkOperation(add=[], remove=[])
+
+            # a single group of independent Poisson sources, one per target, whatever the
+            # fragmentation of the node set
+            rates = np.full(len(targets), self.config.rate) * brian2.units.Hz
+            sources = brian2.PoissonGroup(len(targets), rates=rates)
+            synapses = brian2.Synapses(
+                sources,
+                net.neurons,
+                on_pre="v_post += poisson_weight",
+                namespace={"poisson_weight": self.config.weight * brian2.units.mV},
             )
-
-            for start, end in selections.ranges:
-                p = brian2.PoissonInput(
-                    target=net.neurons[start:end],
-                    target_var="v",
-                    N=1,
-                    rate=self.config.rate * brian2.units.Hz,
-                    weight=self.config.weight * brian2.units.mV,
-                )
-                self._inputs.append(p)
+            synapses.connect(i=np.arange(len(targets)), j=np.asarray(targets, np.int64))
+            self._inputs = [sources, synapses]
 
             return NetworkOperation(add=list(self._inputs), remove=[])
 
@@ -792,31 +1001,35 @@ def _gather_connection_overrides(simulation: bluepysnap.Simulation) -> list[Even
     return ret
 
 
-def _gather_poisson(simulation: bluepysnap.Simulation) -> list[Event]:
+def _gather_poisson(simulation: bluepysnap.Simulation, node_sets: NodeSetCache) -> list[Event]:
     ret = []
     for input_ in simulation.inputs.values():
         if isinstance(input_, libsonata.SimulationConfig.Poisson):
-            pi = InputPoisson(input_, Path(simulation._simulation_config_path))  # ruff: ignore[private-member-access]
+            pi = InputPoisson(input_, node_sets)
             ret.extend(Event(at=at, func=pi) for at in pi.at)
 
     return ret
 
 
-def _build_brian2_network(simulation: bluepysnap.Simulation) -> Brian2Network:
+def _build_brian2_network(
+    simulation: bluepysnap.Simulation, cache: NetworkCache | None = None
+) -> Brian2Network:
     """Create a Brian2 network from a SONATA configuration."""
     brian2.defaultclock.dt = simulation.run.dt * brian2.units.ms
     brian2.seed(simulation.run.random_seed)
 
-    current_inputs = Inputs(simulation)
-    events = _gather_connection_overrides(simulation) + _gather_poisson(simulation)
+    node_sets = NodeSetCache(simulation)
+    current_inputs = Inputs(simulation, node_sets)
+    events = _gather_connection_overrides(simulation) + _gather_poisson(simulation, node_sets)
 
     neurons = _create_neurons(simulation, current_inputs)
 
-    synapses, synapse_template = _create_synapses(simulation.circuit, neurons)
+    synapses, synapse_template = _create_synapses(simulation.circuit, neurons, cache)
 
     spike_monitor = brian2.SpikeMonitor(neurons)
 
-    state_monitor, report_id_mapping = _get_reports(simulation, neurons)
+    reports = _get_reports(simulation, neurons)
+    events += [Event(at=at, func=report) for report in reports for at in report.at]
 
     neurons, inputs = _get_non_current_inputs(simulation, neurons, synapse_template)
 
@@ -825,50 +1038,53 @@ def _build_brian2_network(simulation: bluepysnap.Simulation) -> Brian2Network:
         synapses=synapses,
         spike_monitor=spike_monitor,
         inputs=inputs,
-        state_monitor=state_monitor,
-        report_id_mapping=report_id_mapping,
+        reports=reports,
         events=events,
     )
 
     return net
 
 
-def _write_soma_report(
+def _create_soma_report(
     output_path: Path,
     name: str,
     node_ids: np.ndarray,
-    values: np.ndarray,
     unit: brian2.units.Unit,
     start: float,
     end: float,
     dt: float,
 ) -> None:
-    """Write soma report in SONATA format."""
-    values = values[:, math.floor(start / dt) : min(math.ceil(end / dt) + 1, values.shape[1])]
+    """Create a soma report in SONATA format, with an empty `data` dataset to be appended to."""
     string_dtype = h5py.special_dtype(vlen=str)
     with h5py.File(output_path, "w") as h5f:
         g = h5f.create_group(f"/report/{name}")
-        g.create_dataset("data", data=values.T / unit, dtype=np.float32).attrs.create(
-            "units", data=str(unit), dtype=string_dtype
-        )
+        g.create_dataset(
+            "data", shape=(0, len(node_ids)), maxshape=(None, len(node_ids)), dtype=np.float32
+        ).attrs.create("units", data=str(unit), dtype=string_dtype)
         mapping = h5f.create_group(f"/report/{name}/mapping")
         mapping.create_dataset("node_ids", data=node_ids, dtype=np.uint64)
-        mapping.create_dataset(
-            "index_pointers", data=np.arange(values.shape[0] + 1), dtype=np.uint64
-        )
-        mapping.create_dataset("element_ids", data=np.zeros(values.shape[0]), dtype=np.uint32)
+        mapping.create_dataset("index_pointers", data=np.arange(len(node_ids) + 1), dtype=np.uint64)
+        mapping.create_dataset("element_ids", data=np.zeros(len(node_ids)), dtype=np.uint32)
         mapping.create_dataset("time", data=(start, end, dt), dtype=np.double).attrs.create(
             "units", data="ms", dtype=string_dtype
         )
 
 
+def _append_soma_report(output_path: Path, name: str, values: np.ndarray) -> None:
+    """Append frames (one row per timestep) to the `data` dataset of a soma report."""
+    with h5py.File(output_path, "a") as h5f:
+        data = h5f[f"/report/{name}/data"]
+        n_frames = data.shape[0]
+        data.resize(n_frames + len(values), axis=0)
+        data[n_frames:] = values
+
+
 def _write_reports(
     simulation: bluepysnap.Simulation,
     spike_monitor: brian2.SpikeMonitor,
-    state_monitor: brian2.StateMonitor | None,
-    report_id_mapping: np.ndarray,
+    reports: list[SomaReport],
 ) -> None:
-    """Write all reports configured in `simulation`."""
+    """Write the spikes, and the frames of the soma reports that were not flushed yet."""
     L.debug("Writing reports")
     output_dir = Path(simulation.output.output_dir)
     output_dir.mkdir(exist_ok=True, parents=True)
@@ -882,57 +1098,31 @@ def _write_reports(
         node_ids=spike_monitor.i[:],
     )
 
-    if state_monitor is None:
-        return
-
-    node_sets = simulation.node_sets.to_libsonata
-    population_name = _get_single_node_population(simulation.circuit)
-    population = simulation.circuit.nodes[population_name].to_libsonata
-
-    for report in simulation.reports.values():
-        if not isinstance(report, bluepysnap.frame_report.SomaReport):
-            continue
-
-        config = report.to_libsonata
-        if not config.enabled:
-            continue
-
-        if node_set := config.cells or simulation.to_libsonata.node_set:
-            selection = node_sets.materialize(node_set, population)
-        else:
-            selection = population.select_all()
-
-        ids = np.sort(selection.flatten())
-
-        Path(config.file_name).parent.mkdir(exist_ok=True, parents=True)
-
-        _write_soma_report(
-            config.file_name,
-            population_name,
-            ids,
-            state_monitor.v[report_id_mapping[ids], :],
-            unit=brian2.units.mV,
-            start=config.start_time,
-            end=min(config.end_time, simulation.run.tstop),
-            dt=simulation.run.dt,
-        )
+    for report in reports:
+        report.flush()
 
 
 def run_sonata_brian2_trial(
-    simulation_config_path: Path, *, profile: bool = False
+    simulation_config_path: Path, *, profile: bool = False, cache: NetworkCache | None = None
 ) -> Brian2Network:
-    """Returns the path to the spikes file."""
+    """Returns the path to the spikes file.
+
+    Trials sharing a `cache` reuse its compiled code and connectivity.
+    """
     simulation = bluepysnap.Simulation(simulation_config_path)
 
+    if cache is not None:
+        cache.activate()
+
     brian2.start_scope()
-    net = _build_brian2_network(simulation)
+    net = _build_brian2_network(simulation, cache)
 
     network = brian2.Network(
         net.neurons,
         net.synapses,
         net.spike_monitor,
         *net.inputs,
-        *([] if net.state_monitor is None else [net.state_monitor]),
+        *(report.monitor for report in net.reports),
     )
 
     L.info(
@@ -960,7 +1150,7 @@ def run_sonata_brian2_trial(
             if ops.remove:
                 network.remove(*ops.remove)
 
-    _write_reports(simulation, net.spike_monitor, net.state_monitor, net.report_id_mapping)
+    _write_reports(simulation, net.spike_monitor, net.reports)
 
     if profile:
         print(brian2.profiling_summary(net=network))  # ruff: ignore[print]
@@ -974,11 +1164,18 @@ def cli() -> None:
 
 @cli.command()
 @click.option("--simulation-path", type=REQUIRED_PATH)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    envvar="BRIAN2_CACHE_DIR",
+    help="Directory of compiled code and connectivity, reused by trials of the same circuit",
+)
 @click.option("--profile", is_flag=True, help="Turn on internal brian2 profiling")
 @click.option("-v", "--verbose", count=True, help="Increase verbosity (-v for INFO, -vv for DEBUG)")
 def sonata_simulation(
     simulation_path: str,
     verbose: int,
+    cache_dir: Path | None,
     *,
     profile: bool,
 ) -> None:
@@ -988,7 +1185,8 @@ def sonata_simulation(
     if verbose > 1:
         brian2.BrianLogger.log_level_debug()
 
-    run_sonata_brian2_trial(Path(simulation_path), profile=profile)
+    cache = None if cache_dir is None else NetworkCache(cache_dir)
+    run_sonata_brian2_trial(Path(simulation_path), profile=profile, cache=cache)
 
 
 def _init_entitysdk_client(
@@ -1054,6 +1252,7 @@ def sonata_main(
     simulation_execution_id: uuid.UUID,
     workdir: Path,
     profile: bool,
+    cache_dir: Path | None = None,
 ) -> None:
     L.info("Loading simulation %s", simulation_id)
     model = client.get_entity(entity_id=simulation_id, entity_type=models.Simulation)
@@ -1070,7 +1269,8 @@ def sonata_main(
         activity_id=simulation_execution_id,
         activity_type=models.SimulationExecution,
     ):
-        run_sonata_brian2_trial(simulation_config_file, profile=profile)
+        cache = None if cache_dir is None else NetworkCache(cache_dir)
+        run_sonata_brian2_trial(simulation_config_file, profile=profile, cache=cache)
 
     L.info("Registering simulation result")
     L.info("Uploading assets for simulation")
@@ -1109,6 +1309,12 @@ def sonata_main(
 @click.option("--project-id", type=click.UUID)
 @click.option("--simulation-id", type=click.UUID)
 @click.option("--simulation-execution-id", type=click.UUID)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    envvar="BRIAN2_CACHE_DIR",
+    help="Directory of compiled code and connectivity, reused by trials of the same circuit",
+)
 @click.option("--profile", is_flag=True, help="Turn on internal brian2 profiling")
 @click.option("-v", "--verbose", count=True, help="Increase verbosity (-v for INFO, -vv for DEBUG)")
 def sonata_simulation_task(
@@ -1116,6 +1322,7 @@ def sonata_simulation_task(
     project_id: uuid.UUID,
     simulation_id: uuid.UUID,
     simulation_execution_id: uuid.UUID,
+    cache_dir: Path | None,
     *,
     profile: bool,
     verbose: int,
@@ -1141,6 +1348,7 @@ def sonata_simulation_task(
             simulation_execution_id=simulation_execution_id,
             workdir=Path(tmpdir),
             profile=profile,
+            cache_dir=cache_dir,
         )
 
 
@@ -0,0 +1,172 @@
+"""Cost-aware decomposition of the cells of a NEURON simulation over MPI processes.
+
+The cost of simulating a detailed cell grows with its number of sections and afferent synapses,
+which vary by orders of magnitude between morphologies. Cells are therefore assigned to MPI
+processes by a longest-processing-time-first (LPT) bin-packing of their estimated costs, rather
+than in equal-count chunks of node ids.
+"""
+
+import heapq
+import logging
+import os
+from pathlib import Path
+
+import bluepysnap as snap
+import morphio
+import numpy as np
+import psutil
+from pydantic import BaseModel
+
+from obi_one.config import settings
+from obi_one.utils.io import load_json
+
+L = logging.getLogger(__name__)
+
+# Morphology formats tried, in order, when loading the morphology of a cell
+_MORPHOLOGY_EXTENSIONS = ("h5", "asc", "swc")
+
+
+class CellDecomposition(BaseModel):
+    """Assignment of the node ids of a simulation's node set to MPI ranks."""
+
+    population: str
+    ranks: list[list[int]]
+
+    @property
+    def number_of_processes(self) -> int:
+        return len(self.ranks)
+
+    def write(self, path: Path) -> Path:
+        path.write_text(self.model_dump_json(), encoding="utf-8")
+        return path
+
+
+def get_simulation_node_set(simulation_config: Path) -> tuple[str, list[int]]:
+    """Population and node ids of the node set simulated by a SONATA simulation config."""
+    config_data = load_json(simulation_config)
+    node_set_data = load_json(Path(simulation_config).parent / config_data["node_sets_file"])
+
+    node_set_name = config_data.get("node_set", "All")
+    if node_set_name not in node_set_data:
+        msg = f"Node set '{node_set_name}' not found in node sets file"
+        raise KeyError(msg)
+
+    return node_set_data[node_set_name]["population"], node_set_data[node_set_name]["node_id"]
+
+
+def _section_counts(nodes: snap.nodes.NodePopulation, node_ids: list[int]) -> np.ndarray:
+    """Number of sections (including the soma) of the morphology of each cell, NaN if unknown."""
+    names = nodes.get(node_ids, properties="morphology")
+    counts = np.full(len(node_ids), np.nan)
+    for name, positions in names.reset_index(drop=True).groupby(names.to_numpy()).groups.items():
+        for extension in _MORPHOLOGY_EXTENSIONS:
+            try:
+                morphology = nodes.morph.get(node_ids[positions[0]], extension=extension)
+            except (snap.BluepySnapError, morphio.MorphioError):
+                continue
+            counts[positions] = len(morphology.sections) + 1
+            break
+        else:
+            L.warning("Unable to load morphology '%s' to estimate its cost", name)
+    return counts
+
+
+def _afferent_synapse_counts(
+    circuit: snap.Circuit, population: str, node_ids: list[int]
+) -> np.ndarray:
+    """Number of afferent edges of each cell, over all edge populations targeting `population`."""
+    counts = np.zeros(len(node_ids))
+    ids = np.asarray(node_ids, dtype=np.int64)
+    order = np.argsort(ids)
+    for edges in circuit.edges.values():
+        if edges.target.name != population:
+            continue
+        edge_population = edges.to_libsonata
+        try:
+            selection = edge_population.afferent_edges(ids.tolist())
+        except RuntimeError:
+            L.warning("Edge population '%s' has no indices, synapses not counted", edges.name)
+            continue
+        targets = edge_population.target_nodes(selection)
+        positions = order[np.searchsorted(ids, targets, sorter=order)]
+        counts += np.bincount(positions, minlength=len(ids))
+    return counts
+
+
+def estimate_cell_costs(simulation_config: Path) -> tuple[str, list[int], np.ndarray]:
+    """Estimated relative simulation cost of each cell of the simulated node set.
+
+    The cost of a cell is its number of sections, plus `synapse_cost` times its number of afferent
+    synapses. Cells whose morphology cannot be loaded get the median cost of the others.
+    """
+    population, node_ids = get_simulation_node_set(simulation_config)
+    circuit = snap.Simulation(simulation_config).circuit
+
+    costs = _section_counts(circuit.nodes[population], node_ids)
+    if np.isnan(costs).all():
+        costs[:] = 1.0
+    else:
+        costs[np.isnan(costs)] = np.nanmedian(costs)
+    costs += settings.neuron_simulation.synapse_cost * _afferent_synapse_counts(
+        circuit, population, node_ids
+    )
+    return population, node_ids, costs
+
+
+def lpt_partition(costs: np.ndarray, number_of_bins: int) -> list[np.ndarray]:
+    """Indices of the costs in each bin, packed longest-processing-time first.
+
+    Each cost, from the largest, goes to the bin with the lowest total so far. Indices within a
+    bin are sorted.
+    """
+    bins: list[list[int]] = [[] for _ in range(number_of_bins)]
+    loads = [(0.0, i) for i in range(number_of_bins)]
+    # stable, such that equal costs keep their order
+    for index in np.argsort(-np.asarray(costs), kind="stable"):
+        load, i = heapq.heappop(loads)
+        bins[i].append(int(index))
+        heapq.heappush(loads, (load + float(costs[index]), i))
+    return [np.sort(np.asarray(b, dtype=np.int64)) for b in bins]
+
+
+def get_max_number_of_processes() -> int:
+    """Configured maximum number of MPI processes, at most the number of available cores."""
+    if hasattr(os, "sched_getaffinity"):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 1
+    if settings.neuron_simulation.max_mpi_processes is None:
+        return cores
+    return min(settings.neuron_simulation.max_mpi_processes, cores)
+
+
+def get_number_of_processes(costs: np.ndarray) -> int:
+    """Number of MPI processes to simulate cells of the given costs with.
+
+    Bounded by the number of cells, by the available cores and memory, and by the number of
+    processes beyond which the most expensive cell alone is more than a process' share of the
+    total cost, such that more processes would not shorten the simulation.
+    """
+    if not len(costs):
+        return 1
+    memory_per_process = settings.neuron_simulation.memory_per_mpi_process_gb * 1024**3
+    max_processes_memory = int(psutil.virtual_memory().available // memory_per_process)
+    useful_processes = int(np.ceil(np.sum(costs) / np.max(costs)))
+    return max(
+        min(len(costs), get_max_number_of_processes(), max_processes_memory, useful_processes), 1
+    )
+
+
+def decompose_simulation(simulation_config: Path) -> CellDecomposition:
+    """Pick the number of MPI processes of a simulation and assign its cells to them."""
+    population, node_ids, costs = estimate_cell_costs(simulation_config)
+    number_of_processes = get_number_of_processes(costs)
+    bins = lpt_partition(costs, number_of_processes)
+    L.info(
+        "Decomposed %d cells over %d MPI processes, estimated cost per process: %s",
+        len(node_ids),
+        number_of_processes,
+        [round(float(costs[b].sum()), 1) for b in bins],
+    )
+    ids = np.asarray(node_ids, dtype=np.int64)
+    return CellDecomposition(population=population, ranks=[ids[b].tolist() for b in bins])
@@ -13,17 +13,13 @@ from pathlib import Path
 from typing import Any
 
 from bluecellulab import CircuitSimulation
-from bluecellulab.reports.manager import ReportManager
-from bluecellulab.reports.utils import (
-    collect_local_payload,
-    collect_local_spikes,
-    gather_payload_to_rank0,
-    gather_recording_sites,
-    payload_to_cells,
-    prepare_recordings_for_reports,
-)
+from bluecellulab.reports.utils import collect_local_spikes, prepare_recordings_for_reports
 from neuron import h
 
+from obi_one.scientific.library.simulation.neuron.reports import (
+    write_compartment_reports,
+    write_spike_report,
+)
 from obi_one.types import SimulationBackend
 from obi_one.utils.io import load_json
 
@@ -145,6 +141,7 @@ def run(
     simulator: SimulationBackend,
     *,
     libnrnmech_path: Path,
+    decomposition_file: Path | None = None,
 ) -> None:
     """Run the simulation with the specified backend.
 
@@ -154,6 +151,8 @@ def run(
         simulation_config: Path to the simulation configuration file
         simulator: Which simulator to use. Must be one of: 'bluecellulab' or 'neurodamus'.
         libnrnmech_path: Path to mechanisms shared object
+        decomposition_file: Path to the assignment of cells to MPI ranks (BlueCelluLab only);
+            cells are split in equal-count chunks if not given
 
     Raises:
         ValueError: If the requested backend is not implemented.
@@ -161,7 +160,11 @@ def run(
     logger.info("Starting simulation with %s backend", simulator)
     match simulator:
         case SimulationBackend.bluecellulab:
-            run_bluecellulab(simulation_config=simulation_config, libnrnmech_path=libnrnmech_path)  # ty:ignore[invalid-argument-type]
+            run_bluecellulab(
+                simulation_config=simulation_config,
+                libnrnmech_path=libnrnmech_path,  # ty:ignore[invalid-argument-type]
+                decomposition_file=decomposition_file,
+            )
         case SimulationBackend.neurodamus:
             run_neurodamus(
                 simulation_config=simulation_config,
@@ -175,6 +178,7 @@ def run_bluecellulab(
     simulation_config: str | Path,
     *,
     libnrnmech_path: str,
+    decomposition_file: Path | None = None,
 ) -> None:
     """Run a simulation using BlueCelluLab backend."""
     with neuron_mpi_process(libnrnmech_path=libnrnmech_path) as process:
@@ -189,7 +193,11 @@ def run_bluecellulab(
             v_init = config_data["conditions"]["v_init"]
 
             total_cells, cell_ids_for_this_rank = _distribute_cells(
-                config_data, simulation_config, process.rank, process.size
+                config_data,
+                simulation_config,
+                process.rank,
+                process.size,
+                decomposition_file=decomposition_file,
             )
             if not cell_ids_for_this_rank:
                 logger.warning("Rank %d: No cells to process", process.rank)
@@ -223,7 +231,7 @@ def run_bluecellulab(
             sim.instantiate_gids(cell_ids_for_this_rank, **instantiate_params)  # ty:ignore[invalid-argument-type]
 
             logger.info("Rank %d: Setting up recordings...", process.rank)
-            recording_index, local_sites_index = prepare_recordings_for_reports(
+            _, local_sites_index = prepare_recordings_for_reports(
                 sim.cells,
                 sim.circuit_access.config,
             )
@@ -231,23 +239,13 @@ def run_bluecellulab(
             logger.info("Rank %d: Running simulation...", process.rank)
             sim.run(t_stop, v_init, cvode=False)
 
-            logger.info("Rank %d: Gathering results...", process.rank)
-            gathered_sites, all_payload, all_spikes = _gather_results(
+            logger.info("Rank %d: Writing reports and outputs...", process.rank)
+            _write_reports(
                 sim=sim,
                 process=process,
-                recording_index=recording_index,
                 cell_ids_for_this_rank=cell_ids_for_this_rank,
                 local_sites_index=local_sites_index,
             )
-
-            if process.rank == 0:
-                logger.info("Rank %d: Writing reports and ouputs...", process.rank)
-                _save_reports_and_outputs(
-                    sim=sim,
-                    gathered_sites=gathered_sites,
-                    all_payload=all_payload,
-                    all_spikes=all_spikes,
-                )
         except RuntimeError:
             logger.exception("Rank %d failed", process.rank)
             raise
@@ -256,8 +254,25 @@ def run_bluecellulab(
 
 
 def _distribute_cells(
-    config_data: dict[str, Any], simulation_config: str | Path, rank: int, size: int
+    config_data: dict[str, Any],
+    simulation_config: str | Path,
+    rank: int,
+    size: int,
+    *,
+    decomposition_file: Path | None = None,
 ) -> tuple[int, list[tuple[str, int]]]:
+    if decomposition_file is not None:
+        decomposition = load_json(decomposition_file)
+        if len(decomposition["ranks"]) != size:
+            err_msg = f"Decomposition is for {len(decomposition['ranks'])} ranks, running on {size}"
+            raise RuntimeError(err_msg)
+        rank_node_ids = decomposition["ranks"][rank]
+        logger.info("Rank %d node IDs: %s", rank, rank_node_ids)
+        return (
+            sum(len(ids) for ids in decomposition["ranks"]),
+            [(decomposition["population"], i) for i in rank_node_ids],
+        )
+
     base_dir = Path(simulation_config).parent
     node_sets_file = base_dir / config_data["node_sets_file"]
 
@@ -285,40 +300,29 @@ def _distribute_cells(
     return num_nodes, [(population, i) for i in rank_node_ids]
 
 
-def _gather_results(
+def _write_reports(
     *,
     sim: Any,
-    cell_ids_for_this_rank: Any,
     process: MPIProcess,
-    recording_index: Any,
+    cell_ids_for_this_rank: Any,
     local_sites_index: Any,
-) -> tuple[Any, Any, Any]:
-    gathered_sites = process.parallel_context.py_gather(local_sites_index, 0)
-
-    local_payload = collect_local_payload(
-        sim.cells,
-        cell_ids_for_this_rank,
-        recording_index,
+) -> None:
+    """Write the reports and spikes, each rank writing the data of its own cells."""
+    config = sim.circuit_access.config
+    write_compartment_reports(
+        config=config,
+        sim_dt=sim.dt,
+        cells=sim.cells,
+        sites_index=local_sites_index,
+        parallel_context=process.parallel_context,
     )
-    local_spikes = collect_local_spikes(sim, cell_ids_for_this_rank)
-    all_payload, all_spikes = gather_payload_to_rank0(
-        process.parallel_context, local_payload, local_spikes
+    write_spike_report(
+        config=config,
+        sim_dt=sim.dt,
+        spikes=collect_local_spikes(sim, cell_ids_for_this_rank),
+        parallel_context=process.parallel_context,
     )
 
-    return gathered_sites, all_payload, all_spikes
-
-
-def _save_reports_and_outputs(
-    sim: Any,
-    gathered_sites: list[Any],
-    all_payload: list[dict[Any, Any]],
-    all_spikes: dict[str, dict[int, list[float]]],
-) -> None:
-    all_sites_index = gather_recording_sites(gathered_sites)
-    cells_for_writer = payload_to_cells(all_payload, all_sites_index)  # ty:ignore[invalid-argument-type]
-    report_mgr = ReportManager(sim.circuit_access.config, sim.dt)  # type: ignore[name-defined]
-    report_mgr.write_all(cells=cells_for_writer, spikes_by_pop=all_spikes)
-
 
 def run_neurodamus(
     simulation_config: str | Path,  # ruff: ignore[unused-function-argument]
@@ -350,6 +354,12 @@ def main() -> None:
         "--simulation-backend", type=str, required=True, help="Simulator backend to use."
     )
     parser.add_argument("--save-nwb", action="store_true", help="Save results in NWB format")
+    parser.add_argument(
+        "--decomposition-file",
+        type=Path,
+        default=None,
+        help="Path to the assignment of cells to MPI ranks",
+    )
 
     args = parser.parse_args()
 
@@ -364,6 +374,7 @@ def main() -> None:
         simulation_config=args.config,
         simulator=args.simulation_backend,
         libnrnmech_path=args.libnrnmech_path,
+        decomposition_file=args.decomposition_file,
     )
 
 
@@ -0,0 +1,123 @@
+"""Content-addressed, machine-wide cache of compiled NEURON/Neurodamus mechanisms."""
+
+import functools
+import hashlib
+import logging
+import os
+import platform
+import shutil
+import subprocess  # ruff: ignore[suspicious-subprocess-import]
+from collections.abc import Callable
+from pathlib import Path
+
+from obi_one.config import settings
+from obi_one.scientific.library.simulation.neuron.schemas import (
+    MechanismBuild,
+    NeurodamusMechanismBuild,
+    NeuronMechanismBuild,
+)
+from obi_one.types import SimulationBackend
+from obi_one.utils.directory_cache import DirectoryCache
+
+L = logging.getLogger(__name__)
+
+_BACKEND_COMPILERS = {
+    SimulationBackend.bluecellulab: "nrnivmodl",
+    SimulationBackend.neurodamus: "neurodamus-compile-mods",
+}
+
+type CompileFunction = Callable[..., MechanismBuild]
+
+
+@functools.cache
+def toolchain_fingerprint(simulation_backend: SimulationBackend) -> str:
+    """Identifies the compiler toolchain used for a backend (compiler path and NEURON version)."""
+    compiler = _BACKEND_COMPILERS.get(simulation_backend, str(simulation_backend))
+    parts = [platform.machine(), str(shutil.which(compiler))]
+    try:
+        nrniv_version = subprocess.run(
+            ["nrniv", "--version"],  # ruff: ignore[start-process-with-partial-path]
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        nrniv_version = "unknown"
+    parts.append(nrniv_version)
+    if simulation_backend == SimulationBackend.neurodamus:
+        parts.append(os.environ.get("NEURODAMUS_PYTHON", ""))
+    return "|".join(parts)
+
+
+def mechanisms_hash(mechanisms_dir: Path, simulation_backend: SimulationBackend) -> str:
+    """Hash of all files in a mechanisms directory, the backend and its compiler toolchain."""
+    digest = hashlib.sha256()
+    digest.update(str(simulation_backend).encode())
+    digest.update(toolchain_fingerprint(simulation_backend).encode())
+    for path in sorted(p for p in mechanisms_dir.rglob("*") if p.is_file()):
+        digest.update(path.relative_to(mechanisms_dir).as_posix().encode())
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+class MechanismBuildCache:
+    """Persistent cache of mechanism builds keyed on mechanism file contents and toolchain.
+
+    Concurrent executions on the same machine share a single build; least recently used builds
+    are evicted once the cache exceeds its size limit, unless used within min_idle_seconds.
+    """
+
+    def __init__(
+        self, cache_dir: Path, max_size_bytes: int | None = None, min_idle_seconds: float = 0.0
+    ) -> None:
+        """Initialize object."""
+        self._cache = DirectoryCache(
+            cache_dir, max_size_bytes=max_size_bytes, min_idle_seconds=min_idle_seconds
+        )
+
+    @classmethod
+    def from_settings(cls) -> "MechanismBuildCache | None":
+        """Returns the cache configured in the settings, or None if disabled."""
+        cache_settings = settings.mechanism_build_cache
+        if not cache_settings.enabled:
+            return None
+        return cls(
+            cache_settings.cache_dir,
+            max_size_bytes=cache_settings.max_size_bytes,
+            min_idle_seconds=cache_settings.min_idle_hours * 3600,
+        )
+
+    def get_or_compile(
+        self,
+        *,
+        mechanisms_dir: Path,
+        simulation_backend: SimulationBackend,
+        compile_func: CompileFunction,
+    ) -> MechanismBuild:
+        """Returns a cached mechanism build, compiling it with compile_func on a cache miss.
+
+        compile_func is called with the keyword arguments output_dir, mechanisms_dir and
+        simulation_backend.
+        """
+        key = f"{simulation_backend}-{mechanisms_hash(mechanisms_dir, simulation_backend)}"
+
+        def _compile(entry_dir: Path) -> dict:
+            mechanism_build = compile_func(
+                output_dir=entry_dir,
+                mechanisms_dir=mechanisms_dir,
+                simulation_backend=simulation_backend,
+            )
+            return {
+                name: str(Path(path).relative_to(entry_dir))
+                for name, path in mechanism_build.model_dump().items()
+            }
+
+        entry_dir, relative_paths = self._cache.get_or_create(key, _compile)
+        build_cls = (
+            NeuronMechanismBuild
+            if simulation_backend == SimulationBackend.bluecellulab
+            else NeurodamusMechanismBuild
+        )
+        return build_cls.model_validate(
+            {name: entry_dir / path for name, path in relative_paths.items()}
+        )
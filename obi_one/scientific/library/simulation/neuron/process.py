@@ -1,9 +1,16 @@
 import logging
-import math
 import os
+import tempfile
 from pathlib import Path
 from typing import cast
 
+from obi_one.scientific.library.simulation.neuron.decomposition import (
+    decompose_simulation,
+    estimate_cell_costs,
+    get_max_number_of_processes,
+    get_number_of_processes,
+)
+from obi_one.scientific.library.simulation.neuron.mechanism_cache import MechanismBuildCache
 from obi_one.scientific.library.simulation.neuron.schemas import (
     BluecellulabSimulationParameters,
     MechanismBuild,
@@ -22,6 +29,11 @@ L = logging.getLogger(__name__)
 # Path to cli that will be executed below
 ENTRYPOINT_PATH = Path(__file__).parent.resolve() / "entrypoint.py"
 
+# Cores reserved per simulation task when running tasks in parallel: the most MPI processes a
+# simulation is decomposed into (settings.neuron_simulation.max_mpi_processes, capped at the
+# available cores)
+MAX_MPI_PROCESSES = get_max_number_of_processes()
+
 
 def run_simulation(
     parameters: SimulationParameters,
@@ -47,30 +59,34 @@ def _run_bluecellulab_simulation(
     parameters: BluecellulabSimulationParameters,
     simulation_entrypoint_path: Path,
 ) -> None:
-    number_of_mpi_processes = _get_number_of_mpi_processes(parameters.number_of_cells)
-
-    run_and_log(
-        [
-            "mpiexec",
-            "-n",
-            str(number_of_mpi_processes),
-            "python",
-            str(simulation_entrypoint_path),
-            "--config",
-            str(parameters.config_file),
-            "--libnrnmech-path",
-            str(parameters.mechanism_build.libnrnmech_path),
-            "--simulation-backend",
-            str(SimulationBackend.bluecellulab),
-            "--save-nwb",
-        ]
-    )
+    decomposition = decompose_simulation(parameters.config_file)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        decomposition_file = decomposition.write(Path(tmpdir) / "decomposition.json")
+        run_and_log(
+            [
+                "mpiexec",
+                "-n",
+                str(decomposition.number_of_processes),
+                "python",
+                str(simulation_entrypoint_path),
+                "--config",
+                str(parameters.config_file),
+                "--libnrnmech-path",
+                str(parameters.mechanism_build.libnrnmech_path),
+                "--simulation-backend",
+                str(SimulationBackend.bluecellulab),
+                "--decomposition-file",
+                str(decomposition_file),
+                "--save-nwb",
+            ]
+        )
 
 
 def _run_neurodamus_simulation(
     parameters: NeurodamusSimulationParameters,
 ) -> None:
-    number_of_mpi_processes = _get_number_of_mpi_processes(parameters.number_of_cells)
+    number_of_mpi_processes = _get_number_of_mpi_processes(parameters.config_file)
 
     neurodamus_python = os.environ["NEURODAMUS_PYTHON"]
 
@@ -94,9 +110,10 @@ def _run_neurodamus_simulation(
     )
 
 
-def _get_number_of_mpi_processes(num_cells: int) -> int:
-    # Clamp between 1 and 4
-    return min(max(math.floor(num_cells / 2), 1), 4)
+def _get_number_of_mpi_processes(config_file: Path) -> int:
+    # Neurodamus balances the load of its ranks itself, only their number is chosen here
+    _population, _node_ids, costs = estimate_cell_costs(config_file)
+    return get_number_of_processes(costs)
 
 
 def _collect_simulation_outputs(results_dir: Path) -> SimulationResults:
@@ -124,7 +141,31 @@ def compile_mechanisms(
     mechanisms_dir: Path,
     simulation_backend: SimulationBackend,
 ) -> MechanismBuild:
+    """Compile mechanisms into output_dir.
+
+    If the mechanism build cache is enabled (settings.mechanism_build_cache), an existing build of
+    identical mechanisms is reused instead, or a new build is added to the cache.
+    """
+    mechanism_build_cache = MechanismBuildCache.from_settings()
+    if mechanism_build_cache is not None:
+        return mechanism_build_cache.get_or_compile(
+            mechanisms_dir=mechanisms_dir,
+            simulation_backend=simulation_backend,
+            compile_func=_compile_mechanisms,
+        )
+    return _compile_mechanisms(
+        output_dir=output_dir,
+        mechanisms_dir=mechanisms_dir,
+        simulation_backend=simulation_backend,
+    )
+
 
+def _compile_mechanisms(
+    *,
+    output_dir: Path,
+    mechanisms_dir: Path,
+    simulation_backend: SimulationBackend,
+) -> MechanismBuild:
     match simulation_backend:
         case SimulationBackend.bluecellulab:
             return _compile_neuron_mechanisms(
@@ -0,0 +1,323 @@
+"""Distributed writing of the SONATA reports of a BlueCelluLab simulation.
+
+Traces and spikes are written by the MPI rank that recorded them, rather than gathered to rank 0:
+
+- For each compartment report, rank 0 gathers the mapping (node and element ids) of every rank,
+  lays out the report file with its data storage allocated, and broadcasts where each rank's
+  columns go. Each rank then writes its traces directly into the file.
+- For the spike report, each rank writes its spikes sorted by time to a shard file, and rank 0
+  assembles the spike file by a streaming k-way merge of the shards.
+
+Ranks write to disjoint parts of the same file through memory mapping, which requires the ranks
+to share a node-local file system, as they do when the simulation runs on a single node.
+
+The nodes of a compartment report are in rank order, and sorted by node id within each rank only.
+Unlike spike reports, SONATA compartment reports do not require a global order: readers locate
+nodes through the mapping.
+"""
+
+import heapq
+import itertools
+import logging
+import operator
+from collections.abc import Iterator
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import h5py
+import numpy as np
+from bluecellulab.reports.utils import SUPPORTED_REPORT_TYPES
+from bluecellulab.reports.writers.spikes import SpikeReportWriter
+
+L = logging.getLogger(__name__)
+
+# Number of spikes read from each shard, and written to the spike file, at a time
+SPIKE_MERGE_BLOCK_SIZE = 2**16
+
+_SORTING = h5py.enum_dtype({"none": 0, "by_id": 1, "by_time": 2}, basetype="u1")
+
+
+class ReportMapping(NamedTuple):
+    """Mapping of the part of a compartment report recorded by one rank."""
+
+    node_ids: np.ndarray
+    element_counts: np.ndarray
+    element_ids: np.ndarray
+    number_of_times: int | None
+
+
+class ReportLayout(NamedTuple):
+    """Location of the data of a compartment report file, and of the columns of each rank."""
+
+    offset: int
+    shape: tuple[int, int]
+    columns: list[int]
+
+
+def get_report_window(
+    report_cfg: dict[str, Any], sim_dt: float, tstart: float, tstop: float | None
+) -> tuple[np.ndarray, slice]:
+    """SONATA time array of a report, and the slice of the recorded traces it covers."""
+    start_time = float(report_cfg.get("start_time", 0.0))
+    end_time = float(report_cfg.get("end_time", 0.0))
+    report_dt = float(report_cfg.get("dt", sim_dt))
+
+    if tstop is not None:
+        end_time = min(end_time, tstop)
+
+    if report_dt < sim_dt:
+        L.warning(
+            "Report dt=%s ms is finer than simulation dt=%s ms, clamping it to the latter",
+            report_dt,
+            sim_dt,
+        )
+        report_dt = sim_dt
+
+    step = round(report_dt / sim_dt)
+    if not np.isclose(step * sim_dt, report_dt, atol=1e-9):
+        msg = f"Report dt={report_dt} is not an integer multiple of simulation dt={sim_dt}"
+        raise ValueError(msg)
+
+    window = slice(round((start_time - tstart) / sim_dt), round((end_time - tstart) / sim_dt), step)
+    return np.array([start_time, end_time, report_dt], dtype=np.float64), window
+
+
+def collect_report_slice(
+    *,
+    cells: dict[Any, Any],
+    sites_index: dict[Any, list[dict[str, Any]]],
+    report_name: str,
+    population: str,
+    window: slice,
+) -> tuple[ReportMapping, np.ndarray]:
+    """Mapping and data of a report for the cells of this rank.
+
+    Cells are ordered by node id and elements by section id, as the SONATA specification requires
+    within each node. Traces that cannot be retrieved are skipped with a warning.
+    """
+    node_ids: list[int] = []
+    element_counts: list[int] = []
+    element_ids: list[int] = []
+    traces: list[np.ndarray] = []
+
+    local_cells = sorted(
+        (cell_id for cell_id in sites_index if cell_id[0] == population), key=operator.itemgetter(1)
+    )
+    for cell_id in local_cells:
+        entries = sorted(
+            (site["section_id"], site["rec_name"])
+            for site in sites_index[cell_id]
+            if site["report"] == report_name and site.get("section_id") is not None
+        )
+        element_count = 0
+        for section_id, rec_name in entries:
+            try:
+                trace = cells[cell_id].get_recording(rec_name)
+            except Exception as e:  # ruff: ignore[blind-except]
+                L.warning(
+                    "Missing recording '%s' for %s in '%s': %s", rec_name, cell_id, report_name, e
+                )
+                continue
+            element_ids.append(section_id)
+            traces.append(np.asarray(trace)[window])
+            element_count += 1
+        if element_count:
+            node_ids.append(cell_id[1])
+            element_counts.append(element_count)
+
+    mapping = ReportMapping(
+        node_ids=np.asarray(node_ids, dtype=np.uint64),
+        element_counts=np.asarray(element_counts, dtype=np.uint64),
+        element_ids=np.asarray(element_ids, dtype=np.uint32),
+        number_of_times=len(traces[0]) if traces else None,
+    )
+    data = np.stack(traces, axis=1).astype(np.float32) if traces else np.empty((0, 0), np.float32)
+    return mapping, data
+
+
+def create_report_file(
+    path: Path,
+    *,
+    population: str,
+    report_cfg: dict[str, Any],
+    time: np.ndarray,
+    mappings: list[ReportMapping],
+) -> ReportLayout | None:
+    """Write the mapping of a compartment report, and allocate its data for the ranks to fill.
+
+    The data is stored contiguously, with the columns of the ranks in rank order, and so are the
+    node ids of the mapping. None is returned, and no file is written, if no rank recorded anything.
+    """
+    number_of_times = next(
+        (m.number_of_times for m in mappings if m.number_of_times is not None), None
+    )
+    if number_of_times is None:
+        L.warning("No data for report '%s'", path.name)
+        return None
+
+    element_counts = np.concatenate([m.element_counts for m in mappings])
+    element_ids = np.concatenate([m.element_ids for m in mappings])
+    shape = (number_of_times, len(element_ids))
+
+    variable = report_cfg.get("variable_name", "v")
+    units = report_cfg.get("unit", "mV" if variable == "v" else "unknown")
+
+    dcpl = h5py.h5p.create(h5py.h5p.DATASET_CREATE)
+    dcpl.set_alloc_time(h5py.h5d.ALLOC_TIME_EARLY)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with h5py.File(path, "w") as h5f:
+        group = h5f.create_group(f"report/{population}")
+        data = group.create_dataset(
+            "data", shape=shape, dtype=np.float32, dcpl=dcpl, fill_time="never"
+        )
+        data.attrs["units"] = str(units)
+        offset = data.id.get_offset()
+
+        mapping = group.create_group("mapping")
+        mapping.create_dataset("node_ids", data=np.concatenate([m.node_ids for m in mappings]))
+        mapping.create_dataset(
+            "index_pointers",
+            data=np.concatenate([[0], np.cumsum(element_counts)]).astype(np.uint64),
+        )
+        mapping.create_dataset("element_ids", data=element_ids)
+        mapping.create_dataset("time", data=time).attrs["units"] = "ms"
+
+    columns = np.cumsum([0] + [len(m.element_ids) for m in mappings[:-1]]).tolist()
+    return ReportLayout(offset=offset, shape=shape, columns=columns)
+
+
+def write_report_slice(path: Path, layout: ReportLayout, rank: int, data: np.ndarray) -> None:
+    """Write the traces of a rank into its columns of a report file created by rank 0."""
+    if not data.size:
+        return
+    report = np.memmap(path, dtype=np.float32, mode="r+", offset=layout.offset, shape=layout.shape)
+    column = layout.columns[rank]
+    report[:, column : column + data.shape[1]] = data
+    report.flush()
+
+
+def _validate_report_config(report_name: str, report_cfg: dict[str, Any]) -> None:
+    """Check the source of a compartment report, as bluecellulab's ReportManager does."""
+    if report_cfg["type"] == "compartment_set":
+        for key in ("cells", "sections", "compartments"):
+            if report_cfg.get(key) is not None:
+                msg = f"'{key}' may not be set in 'compartment_set' report '{report_name}'"
+                raise ValueError(msg)
+    else:
+        if (report_cfg.get("compartments") or "center") not in {"center", "all"}:
+            msg = f"Invalid 'compartments' value in report '{report_name}'"
+            raise ValueError(msg)
+        if report_cfg.get("cells") is None:
+            msg = f"'cells' must be specified in compartment report '{report_name}'"
+            raise ValueError(msg)
+
+
+def _get_report_population(config: Any, report_cfg: dict[str, Any]) -> str | None:
+    if report_cfg["type"] == "compartment_set":
+        source = config.get_compartment_sets().get(report_cfg.get("compartment_set"))
+    else:
+        source = config.get_node_sets().get(report_cfg.get("cells"))
+    return source["population"] if source else None
+
+
+def write_compartment_reports(
+    *,
+    config: Any,
+    sim_dt: float,
+    cells: dict[Any, Any],
+    sites_index: dict[Any, list[dict[str, Any]]],
+    parallel_context: Any,
+) -> None:
+    """Write the compartment reports of a simulation, each rank writing the traces it recorded.
+
+    Must be called by all ranks. Invalid report sources raise a ValueError, as in bluecellulab.
+    """
+    rank = int(parallel_context.id())
+    for report_name, report_cfg in config.get_report_entries().items():
+        if report_cfg.get("type") not in SUPPORTED_REPORT_TYPES:
+            continue
+        _validate_report_config(report_name, report_cfg)
+        population = _get_report_population(config, report_cfg)
+        if population is None:
+            L.warning("Source of report '%s' not found, skipping it", report_name)
+            continue
+
+        time, window = get_report_window(report_cfg, sim_dt, config.tstart, config.tstop)
+        mapping, data = collect_report_slice(
+            cells=cells,
+            sites_index=sites_index,
+            report_name=report_name,
+            population=population,
+            window=window,
+        )
+        mappings = parallel_context.py_gather(mapping, 0)
+
+        path = Path(config.report_file_path(report_cfg, report_name))
+        layout = None
+        if rank == 0:
+            layout = create_report_file(
+                path, population=population, report_cfg=report_cfg, time=time, mappings=mappings
+            )
+        layout = parallel_context.py_broadcast(layout, 0)
+
+        if layout is not None:
+            write_report_slice(path, layout, rank, data)
+        parallel_context.barrier()
+
+
+def _iter_spikes(group: h5py.Group) -> Iterator[tuple[float, int]]:
+    timestamps, node_ids = group["timestamps"], group["node_ids"]
+    for start in range(0, len(timestamps), SPIKE_MERGE_BLOCK_SIZE):
+        block = slice(start, start + SPIKE_MERGE_BLOCK_SIZE)
+        yield from zip(timestamps[block].tolist(), node_ids[block].tolist(), strict=True)
+
+
+def merge_spike_shards(path: Path, shard_paths: list[Path]) -> None:
+    """Assemble a SONATA spike file from shards each sorted by time, in bounded memory."""
+    with ExitStack() as stack, h5py.File(path, "w") as h5f:
+        shards = [stack.enter_context(h5py.File(p, "r"))["spikes"] for p in shard_paths]
+        spikes = h5f.create_group("spikes")
+
+        for population in dict.fromkeys(itertools.chain.from_iterable(shards)):
+            groups = [shard[population] for shard in shards if population in shard]
+            count = sum(len(group["timestamps"]) for group in groups)
+
+            group = spikes.create_group(population)
+            group.attrs.create("sorting", 2 if count else 0, dtype=_SORTING)
+            timestamps = group.create_dataset("timestamps", shape=(count,), dtype=np.float64)
+            timestamps.attrs["units"] = "ms"
+            node_ids = group.create_dataset("node_ids", shape=(count,), dtype=np.uint64)
+
+            merged = heapq.merge(*(_iter_spikes(g) for g in groups))
+            for start in range(0, count, SPIKE_MERGE_BLOCK_SIZE):
+                block_times, block_ids = zip(
+                    *itertools.islice(merged, SPIKE_MERGE_BLOCK_SIZE), strict=True
+                )
+                stop = start + len(block_times)
+                timestamps[start:stop] = np.asarray(block_times, dtype=np.float64)
+                node_ids[start:stop] = np.asarray(block_ids, dtype=np.uint64)
+
+
+def write_spike_report(
+    *,
+    config: Any,
+    sim_dt: float,
+    spikes: dict[str, dict[int, list[float]]],
+    parallel_context: Any,
+) -> None:
+    """Write the spike report of a simulation from the spikes recorded by each rank.
+
+    Must be called by all ranks.
+    """
+    rank = int(parallel_context.id())
+    path = Path(config.spikes_file_path)
+    shard_path = path.with_name(f"{path.stem}.rank{rank}{path.suffix}")
+    SpikeReportWriter({}, shard_path, sim_dt).write(spikes)
+
+    shard_paths = parallel_context.py_gather(shard_path, 0)
+    if rank == 0:
+        merge_spike_shards(path, shard_paths)
+        for shard in shard_paths:
+            shard.unlink()
@@ -1,14 +1,101 @@
 import json
 import logging
 import os
-from collections.abc import Mapping
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from functools import cached_property
 from pathlib import Path
 from typing import Any
 
 import bluepysnap as snap
 
+from obi_one.scientific.library.compartment_sets import (
+    MaterializedCompartmentSet,
+    write_compartment_sets_json,
+)
+
 L = logging.getLogger(__name__)
 
+# Max. number of shared SONATA circuit objects kept alive at the same time
+SONATA_CIRCUIT_CACHE_SIZE = 8
+
+_sonata_circuit_cache: OrderedDict[tuple[str, int, int], snap.Circuit] = OrderedDict()
+_sonata_circuit_cache_lock = threading.Lock()
+
+
+def _sonata_circuit_cache_key(circuit_config: str | Path) -> tuple[str, int, int] | None:
+    """Returns the cache key (absolute path, mtime, size) of a circuit config, if existing."""
+    path = Path(circuit_config).absolute()
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+
+def load_sonata_circuit(circuit_config: str | Path) -> snap.Circuit:
+    """Returns a shared SONATA circuit object for the given circuit config.
+
+    Circuit objects are cached per config path and modification time, so that the circuit config,
+    node sets and node/edge storages are only parsed once, no matter how often they are accessed.
+    A modified config file invalidates the cached object.
+
+    The returned object is shared and must not be modified. Callers that need to modify it (e.g.,
+    by adding node sets) must work on a copy obtained through writable_sonata_circuit_copy().
+    """
+    key = _sonata_circuit_cache_key(circuit_config)
+    if key is None:
+        # Not an existing file: Nothing to cache (loading will raise an error, if invalid)
+        return snap.Circuit(circuit_config)
+
+    with _sonata_circuit_cache_lock:
+        sonata_circuit = _sonata_circuit_cache.get(key)
+        if sonata_circuit is not None:
+            _sonata_circuit_cache.move_to_end(key)
+            return sonata_circuit
+
+    sonata_circuit = snap.Circuit(circuit_config)
+
+    with _sonata_circuit_cache_lock:
+        # Drop outdated objects of the same config
+        for old_key in [k for k in _sonata_circuit_cache if k[0] == key[0] and k != key]:
+            del _sonata_circuit_cache[old_key]
+        sonata_circuit = _sonata_circuit_cache.setdefault(key, sonata_circuit)
+        _sonata_circuit_cache.move_to_end(key)
+        while len(_sonata_circuit_cache) > SONATA_CIRCUIT_CACHE_SIZE:
+            _sonata_circuit_cache.popitem(last=False)
+
+    return sonata_circuit
+
+
+def clear_sonata_circuit_cache() -> None:
+    """Removes all shared SONATA circuit objects from the cache."""
+    with _sonata_circuit_cache_lock:
+        _sonata_circuit_cache.clear()
+
+
+def is_shared_sonata_circuit(sonata_circuit: snap.Circuit) -> bool:
+    """Returns if a SONATA circuit object is a shared (cached) one."""
+    with _sonata_circuit_cache_lock:
+        return any(c is sonata_circuit for c in _sonata_circuit_cache.values())
+
+
+def writable_sonata_circuit_copy(sonata_circuit: snap.Circuit) -> snap.Circuit:
+    """Returns a copy of a SONATA circuit object whose node sets can be modified.
+
+    The parsed circuit config is shared with the original object, whereas the node sets are copied
+    and node/edge accessors are re-created lazily so that they resolve the copied node sets.
+    """
+    # Not copy.copy(), which re-runs __init__ (i.e., re-parses the config) through __setstate__
+    writable = object.__new__(type(sonata_circuit))
+    vars(writable).update(vars(sonata_circuit))
+    for attr in ("node_sets", "nodes", "edges"):
+        if isinstance(getattr(type(writable), attr, None), cached_property):
+            vars(writable).pop(attr, None)
+    writable.node_sets = snap.circuit.NodeSets.from_dict(sonata_circuit.node_sets.content)
+    return writable
+
 
 def add_node_set_to_circuit(
     sonata_circuit: snap.Circuit,
@@ -18,7 +105,16 @@ def add_node_set_to_circuit(
 ) -> None:
     """Adds the node set definition to a SONATA circuit object to make it accessible
     (in-place).
+
+    Shared SONATA circuit objects (see load_sonata_circuit) cannot be modified. Use a copy
+    obtained through writable_sonata_circuit_copy() instead.
     """
+    if is_shared_sonata_circuit(sonata_circuit):
+        msg = (
+            "Cannot add node sets to a shared SONATA circuit object! Use a writable copy"
+            " (e.g., Circuit.writable_sonata_circuit()) instead."
+        )
+        raise ValueError(msg)
     existing_node_sets = sonata_circuit.node_sets.content
     if not overwrite_if_exists:
         for k in node_set_dict:
@@ -62,12 +158,16 @@ def write_circuit_node_set_file(
 def write_circuit_compartment_set_file(
     sonata_circuit: snap.Circuit,
     output_path: str,
-    compartment_sets: Mapping[str, Any],
+    compartment_sets: Mapping[str, Any] | Sequence[MaterializedCompartmentSet],
     file_name: str | None = None,
     *,
     overwrite_if_exists: bool = False,
 ) -> Path:
-    """Writes a new compartment set file of a given SONATA circuit object."""
+    """Writes a new compartment set file of a given SONATA circuit object.
+
+    Compartment sets are given either as a SONATA-compliant dict, or as materialized compartment
+    sets that are written directly from their arrays.
+    """
     if file_name is None:
         # Use circuit's compartment set file name by default
         file_name = os.path.split(sonata_circuit.config["compartment_sets_file"])[1]
@@ -86,6 +186,9 @@ def write_circuit_compartment_set_file(
         raise ValueError(msg)
 
     with Path(output_file).open("w", encoding="utf-8") as f:
-        json.dump(compartment_sets, f, indent=2)
+        if isinstance(compartment_sets, Mapping):
+            json.dump(compartment_sets, f, indent=2)
+        else:
+            write_compartment_sets_json(compartment_sets, f)
 
     return output_file
@@ -0,0 +1,111 @@
+"""Vectorized generation of Poisson spike trains.
+
+All generators draw the spikes of all source node IDs and all stimulus windows in bulk and return
+flat (node_ids, timestamps) arrays, ready to be written to a SONATA spike file.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+_MS_PER_S = 1000.0
+
+
+def _poisson_window_spikes(
+    rng: np.random.Generator,
+    source_gids: Sequence[int] | np.ndarray,
+    num_windows: int,
+    duration_ms: float,
+    rate_hz: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Draws homogeneous Poisson spikes for all (window, gid) pairs.
+
+    Returns:
+        Tuple of (node_ids, window indices, spike times relative to the window start) arrays.
+    """
+    gids = np.asarray(source_gids, dtype=np.uint64)
+    expected_count = rate_hz * duration_ms / _MS_PER_S
+    if expected_count <= 0.0 or len(gids) == 0 or num_windows == 0:
+        counts = np.zeros((num_windows, len(gids)), dtype=np.int64)
+    else:
+        counts = rng.poisson(expected_count, size=(num_windows, len(gids)))
+
+    node_ids = np.repeat(np.tile(gids, num_windows), counts.ravel())
+    window_idx = np.repeat(np.arange(num_windows), counts.sum(axis=1))
+    relative_times = rng.uniform(0.0, duration_ms, size=len(node_ids))
+    return node_ids, window_idx, relative_times
+
+
+def homogeneous_poisson_spikes(
+    rng: np.random.Generator,
+    source_gids: Sequence[int] | np.ndarray,
+    window_starts: Sequence[float] | np.ndarray,
+    duration_ms: float,
+    rate_hz: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Generates homogeneous Poisson spike trains for all source gids and windows.
+
+    Spikes are drawn by count-then-uniform sampling: the number of spikes per (window, gid) is
+    Poisson distributed and the spike times are uniformly distributed within each window
+    [start, start + duration).
+
+    Returns:
+        Tuple of (node_ids, timestamps) arrays (unsorted).
+    """
+    starts = np.asarray(window_starts, dtype=np.float64)
+    node_ids, window_idx, relative_times = _poisson_window_spikes(
+        rng, source_gids, len(starts), duration_ms, rate_hz
+    )
+    return node_ids, starts[window_idx] + relative_times
+
+
+def sinusoidal_rate_hz(
+    t_ms: float | np.ndarray,
+    minimum_rate: float,
+    maximum_rate: float,
+    mod_freq_hz: float,
+    phase_rad: float,
+) -> float | np.ndarray:
+    """Instantaneous rate (Hz) of a sinusoidally modulated process at time(s) t_ms."""
+    t_s = np.asarray(t_ms) / _MS_PER_S
+    lam = minimum_rate + (maximum_rate - minimum_rate) * (
+        (np.sin(2.0 * np.pi * mod_freq_hz * t_s + phase_rad) + 1.0) / 2.0
+    )
+    return np.maximum(0.0, lam)
+
+
+def sinusoidal_poisson_spikes(
+    rng: np.random.Generator,
+    source_gids: Sequence[int] | np.ndarray,
+    window_starts: Sequence[float] | np.ndarray,
+    duration_ms: float,
+    rate_params: tuple[float, float, float, float],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Generates inhomogeneous Poisson spike trains with a sinusoidal rate by thinning.
+
+    Candidate spikes are drawn from a homogeneous process with the maximum rate and accepted
+    with probability rate(t) / maximum_rate, where t is relative to the start of each window.
+
+    Args:
+        rng: Random number generator.
+        source_gids: Source node IDs.
+        window_starts: Start times (ms) of the stimulus windows.
+        duration_ms: Duration (ms) of each window.
+        rate_params: Tuple of (minimum_rate, maximum_rate, mod_freq_hz, phase_rad), see
+            sinusoidal_rate_hz.
+
+    Returns:
+        Tuple of (node_ids, timestamps) arrays (unsorted).
+    """
+    maximum_rate = rate_params[1]
+    if maximum_rate <= 0.0:
+        msg = "Maximum rate must be positive to draw inter-arrival times."
+        raise ValueError(msg)
+
+    starts = np.asarray(window_starts, dtype=np.float64)
+    node_ids, window_idx, relative_times = _poisson_window_spikes(
+        rng, source_gids, len(starts), duration_ms, maximum_rate
+    )
+    lam = sinusoidal_rate_hz(relative_times, *rate_params)
+    accepted = rng.uniform(size=len(node_ids)) * maximum_rate <= lam
+    return node_ids[accepted], starts[window_idx[accepted]] + relative_times[accepted]
@@ -0,0 +1,105 @@
+"""Streaming (single pass, bounded memory) summary statistics of large arrays read in chunks."""
+
+import math
+
+import numpy as np
+
+
+class RunningStats:
+    """Exact count, min, max, mean and (population) standard deviation of a stream of chunks.
+
+    Chunks are merged using the parallel variant of Welford's algorithm (Chan et al.), which is
+    numerically stable also for large counts.
+    """
+
+    def __init__(self) -> None:
+        """Initialize object."""
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray) -> None:
+        """Adds a chunk of values."""
+        n_b = len(values)
+        if n_b == 0:
+            return
+        values = np.asarray(values, dtype=np.float64)
+        mean_b = float(np.mean(values))
+        m2_b = float(np.sum(np.square(values - mean_b)))
+
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self._m2 += m2_b + delta**2 * self.count * n_b / n
+        self.count = n
+        self.min = min(self.min, float(np.min(values)))
+        self.max = max(self.max, float(np.max(values)))
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation (ddof=0, as np.std)."""
+        if self.count == 0:
+            return math.nan
+        return math.sqrt(self._m2 / self.count)
+
+
+class QuantileSketch:
+    """Approximate quantiles of a stream of chunks with a bounded rank error.
+
+    The sketch keeps a sorted list of weighted sample values. Whenever it grows beyond its
+    capacity, it is compacted to capacity points of equal weight placed at evenly spaced ranks,
+    which shifts the rank of any value by at most total_weight / capacity. With capacity set to
+    number_of_chunks / relative_error, the accumulated rank error stays below
+    relative_error * count. As long as no compaction was necessary, quantiles are exact.
+
+    Args:
+        relative_error: Maximum rank error as a fraction of the total count.
+        expected_number_of_chunks: Number of chunks that will be added.
+    """
+
+    def __init__(self, relative_error: float, expected_number_of_chunks: int = 1) -> None:
+        """Initialize object."""
+        if not 0.0 < relative_error < 1.0:
+            msg = f"Relative error must be in (0, 1), got {relative_error}!"
+            raise ValueError(msg)
+        self.capacity = math.ceil(max(expected_number_of_chunks, 1) / relative_error)
+        self._values = np.empty(0, dtype=np.float64)
+        self._weights = np.empty(0, dtype=np.float64)
+        self._is_exact = True
+
+    @property
+    def count(self) -> float:
+        """Total weight (number of values) added."""
+        return float(np.sum(self._weights))
+
+    def update(self, values: np.ndarray) -> None:
+        """Adds a chunk of values."""
+        if len(values) == 0:
+            return
+        values = np.concatenate([self._values, np.asarray(values, dtype=np.float64)])
+        weights = np.concatenate([self._weights, np.ones(len(values) - len(self._values))])
+        order = np.argsort(values, kind="stable")
+        self._values = values[order]
+        self._weights = weights[order]
+        if len(self._values) > self.capacity:
+            self._compact()
+
+    def _compact(self) -> None:
+        total_weight = np.sum(self._weights)
+        ranks = (np.arange(self.capacity) + 0.5) * total_weight / self.capacity
+        idx = np.searchsorted(np.cumsum(self._weights), ranks, side="left")
+        self._values = self._values[np.minimum(idx, len(self._values) - 1)]
+        self._weights = np.full(self.capacity, total_weight / self.capacity)
+        self._is_exact = False
+
+    def quantile(self, q: float) -> float:
+        """Returns the (approximate) q-th quantile, with q in [0, 1]."""
+        if len(self._values) == 0:
+            return math.nan
+        if self._is_exact:
+            return float(np.quantile(self._values, q))
+        cum_weights = np.cumsum(self._weights)
+        idx = np.searchsorted(cum_weights, q * cum_weights[-1], side="left")
+        return float(self._values[min(idx, len(self._values) - 1)])
@@ -298,6 +298,20 @@ class CircuitExtractionTask(Task):
             self._temp_dir.cleanup()
             self._temp_dir = None
 
+    def _morphology_reference_config_path(self, new_circuit_path: Path) -> Path | None:
+        """Circuit config in which to reference the original morphology containers, if enabled.
+
+        Only local circuits are referenced. Circuits staged from entitycore, temporarily or into
+        the (evictable) entity cache, may be removed after the extraction. Extracted circuits
+        are also only registered in entitycore for such parents, and must then be self-contained.
+        """
+        if not settings.circuit_extraction.reference_morphology_containers:
+            return None
+        if self._circuit_entity is not None:
+            L.warning("Copying morphology containers of a circuit staged from entitycore")
+            return None
+        return new_circuit_path
+
     def _register_output(self, db_client: Client, circuit_path: Path) -> models.Circuit | None:
         """Register the extracted circuit entity with assets and derivation link."""
         parent = self._circuit_entity
@@ -374,7 +388,7 @@ class CircuitExtractionTask(Task):
             nset_def, nset_combined = neuron_set.get_node_set_definition(
                 self._circuit,
             )
-            sonata_circuit = self._circuit.sonata_circuit
+            sonata_circuit = self._circuit.writable_sonata_circuit()
             add_node_set_to_circuit(
                 sonata_circuit,
                 nset_combined | {nset_name: nset_def},
@@ -424,15 +438,23 @@ class CircuitExtractionTask(Task):
         with BenchmarkTracker.section("copy_morph_hoc_mod"):
             original_circuit = self._circuit.sonata_circuit
             new_circuit = snap.Circuit(new_circuit_path)
+            mode = circuit_utils.AssetTransferMode(settings.circuit_extraction.asset_transfer_mode)
+            reference_config_path = self._morphology_reference_config_path(new_circuit_path)
             for pop_name, pop in new_circuit.nodes.items():
                 if pop.config["type"] == "biophysical":
                     # Copying morphologies of any (supported) format
                     if "morphology" in pop.property_names:
-                        circuit_utils.copy_morphologies(pop_name, pop, original_circuit)
+                        circuit_utils.copy_morphologies(
+                            pop_name,
+                            pop,
+                            original_circuit,
+                            mode=mode,
+                            circuit_config_path=reference_config_path,
+                        )
 
                     # Copy .mod files, if any (Even if defined globally, shows up under pop.config)
                     if "mechanisms_dir" in pop.config:
-                        circuit_utils.copy_mod_files(pop_name, pop, original_circuit)
+                        circuit_utils.copy_mod_files(pop_name, pop, original_circuit, mode=mode)
 
                 # Copy .hoc file directory (Even if defined globally, shows up under pop.config)
                 if (
@@ -440,7 +462,7 @@ class CircuitExtractionTask(Task):
                     and "biophysical_neuron_models_dir" in pop.config
                 ):
                     # Note: "biophysical_neuron_models_dir" is used for "point_process" as well
-                    circuit_utils.copy_hoc_files(pop_name, pop, original_circuit)
+                    circuit_utils.copy_hoc_files(pop_name, pop, original_circuit, mode=mode)
 
         # Run circuit validation
         if settings.circuit_extraction.run_validation:
@@ -1,15 +1,22 @@
 import json
 import logging
+import multiprocessing
 import os
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
 
 import numpy  # ruff: ignore[unconventional-import-alias]
 import pandas  # ruff: ignore[unconventional-import-alias]
 from entitysdk import Client
 from matplotlib import pyplot as plt
+from morph_spines import load_morphology_with_spines
 
 from obi_one.config import settings
 from obi_one.core.task import Task
+from obi_one.scientific.from_id.cell_morphology_from_id import CellMorphologyFromID
 from obi_one.scientific.from_id.em_dataset_from_id import EMDataSetFromID
+from obi_one.scientific.from_id.memodel_from_id import MEModelFromID
 from obi_one.scientific.library.map_em_synapses._defaults import (
     default_node_spec_for,
     sonata_config_for,
@@ -37,6 +44,7 @@ from obi_one.scientific.tasks.em_synapse_mapping.register import (
     register_output,
 )
 from obi_one.scientific.tasks.em_synapse_mapping.resolve_neuron import (
+    ResolvedNeuron,
     resolve_neuron,
 )
 from obi_one.scientific.tasks.em_synapse_mapping.util import (
@@ -45,6 +53,125 @@ from obi_one.scientific.tasks.em_synapse_mapping.util import (
 
 L = logging.getLogger(__name__)
 
+type NeuronRef = CellMorphologyFromID | MEModelFromID
+
+
+def _resolve_neurons(
+    neuron_refs: Sequence[NeuronRef],
+    db_client: Client,
+    out_root: Path,
+    spiny_dir: Path,
+    max_workers: int = 1,
+) -> list[ResolvedNeuron]:
+    """Resolves all neurons (concurrently if max_workers > 1), rejecting duplicate pt_root_ids."""
+
+    def _resolve(neuron_ref: NeuronRef) -> ResolvedNeuron:
+        return resolve_neuron(neuron_ref, db_client, out_root, spiny_dir)
+
+    if max_workers > 1 and len(neuron_refs) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(neuron_refs))) as executor:
+            resolved_iter = list(executor.map(_resolve, neuron_refs))
+    else:
+        resolved_iter = map(_resolve, neuron_refs)
+
+    resolved_neurons = []
+    pt_root_id_names: dict[int, str] = {}
+    for resolved_neuron in resolved_iter:
+        if resolved_neuron.pt_root_id in pt_root_id_names:
+            err_str = (
+                f"Duplicate pt_root_id {resolved_neuron.pt_root_id}: "
+                f"'{resolved_neuron.morph_entity.name or resolved_neuron.pt_root_id}' "  # ty:ignore[unresolved-attribute]
+                f"resolves to the same physical neuron as "
+                f"'{pt_root_id_names[resolved_neuron.pt_root_id]}'."
+            )
+            raise ValueError(err_str)
+        resolved_neurons.append(resolved_neuron)
+        pt_root_id_names[resolved_neuron.pt_root_id] = str(resolved_neuron.morph_entity.name)  # ty:ignore[unresolved-attribute]
+    return resolved_neurons
+
+
+def _map_synapses_in_worker(
+    spiny_morph_path: str, syns: pandas.DataFrame
+) -> tuple[pandas.DataFrame, float]:
+    """Maps synapses onto a spiny morphology loaded from file (in a worker process)."""
+    spiny_morph = load_morphology_with_spines(spiny_morph_path)
+    return map_afferents_to_spiny_morphology(spiny_morph, syns, add_quality_info=True)
+
+
+def _mapping_executor(max_workers: int) -> ProcessPoolExecutor:
+    # Workers are forked from a clean server process, as forking while download threads are
+    # running is not safe
+    return ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("forkserver")
+    )
+
+
+def _fetch_and_map_synapses(
+    resolved_neurons: list[ResolvedNeuron],
+    spiny_dir: Path,
+    em_dataset: EMDataSetFromID,
+    db_client: Client,
+    cave_version: int,
+    max_workers: int = 1,
+) -> list[tuple[pandas.DataFrame, list, pandas.DataFrame, float]]:
+    """Fetches the afferent synapses of all neurons and maps them onto their spiny morphologies.
+
+    With max_workers > 1, synapse tables are fetched in threads and each neuron is mapped in a
+    worker process as soon as its synapses are available, such that downloads and mapping of
+    different neurons overlap.
+
+    Returns:
+        Per neuron (in input order), tuple of (synapses, notices, mapped synapses, mesh
+        resolution).
+    """
+
+    def _fetch(rn: ResolvedNeuron) -> tuple[pandas.DataFrame, list]:
+        syns, _coll_pre, _coll_post, notices = synapses_and_nodes_dataframes_from_EM(
+            em_dataset, rn.pt_root_id, db_client, cave_version
+        )
+        return syns, notices
+
+    if max_workers <= 1 or len(resolved_neurons) <= 1:
+        results = []
+        for bio_node_id, rn in enumerate(resolved_neurons):
+            L.info(f"Mapping synapses onto morphology {bio_node_id}...")
+            syns, notices = _fetch(rn)
+            mapped_synapses_df, mesh_res = map_afferents_to_spiny_morphology(
+                rn.spiny_morph, syns, add_quality_info=True
+            )
+            results.append((syns, notices, mapped_synapses_df, mesh_res))
+        return results
+
+    n_workers = min(max_workers, len(resolved_neurons))
+    with (
+        ThreadPoolExecutor(max_workers=n_workers) as fetch_executor,
+        _mapping_executor(n_workers) as map_executor,
+    ):
+        fetch_futures = {
+            fetch_executor.submit(_fetch, rn): bio_node_id
+            for bio_node_id, rn in enumerate(resolved_neurons)
+        }
+        fetched = {}
+        map_futures = {}
+        try:
+            for future in as_completed(fetch_futures):
+                bio_node_id = fetch_futures[future]
+                fetched[bio_node_id] = future.result()
+                L.info(f"Mapping synapses onto morphology {bio_node_id}...")
+                map_futures[bio_node_id] = map_executor.submit(
+                    _map_synapses_in_worker,
+                    str(spiny_dir / resolved_neurons[bio_node_id].fn_morph_h5),  # ty:ignore[unsupported-operator]
+                    fetched[bio_node_id][0],
+                )
+            return [
+                (*fetched[bio_node_id], *map_futures[bio_node_id].result())
+                for bio_node_id in range(len(resolved_neurons))
+            ]
+        except BaseException:
+            for future in [*fetch_futures, *map_futures.values()]:
+                future.cancel()
+            raise
+
 
 class EMSynapseMappingTask(Task):
     """EM synapse mapping task for one or more neurons.
@@ -88,21 +215,14 @@ class EMSynapseMappingTask(Task):
 
         # Resolve all neurons: morphology, provenance, ME model
         L.info("Resolving neurons...")
-        resolved_neurons = []
-        pt_root_id_names: dict[int, str] = {}
-
-        for neuron_entry in init.neurons.elements:  # ty:ignore[unresolved-attribute]
-            resolved_neuron = resolve_neuron(neuron_entry, db_client, out_root, spiny_dir)
-            if resolved_neuron.pt_root_id in pt_root_id_names:
-                err_str = (
-                    f"Duplicate pt_root_id {resolved_neuron.pt_root_id}: "
-                    f"'{resolved_neuron.morph_entity.name or resolved_neuron.pt_root_id}' "  # ty:ignore[unresolved-attribute]
-                    f"resolves to the same physical neuron as "
-                    f"'{pt_root_id_names[resolved_neuron.pt_root_id]}'."
-                )
-                raise ValueError(err_str)
-            resolved_neurons.append(resolved_neuron)
-            pt_root_id_names[resolved_neuron.pt_root_id] = str(resolved_neuron.morph_entity.name)  # ty:ignore[unresolved-attribute]
+        max_workers = settings.em_synapse_mapping.max_workers
+        resolved_neurons = _resolve_neurons(
+            init.neurons.elements,  # ty:ignore[unresolved-attribute]
+            db_client,
+            out_root,
+            spiny_dir,
+            max_workers=max_workers,
+        )
 
         n_neurons = len(resolved_neurons)
         is_multi = n_neurons > 1
@@ -141,20 +261,21 @@ class EMSynapseMappingTask(Task):
         all_external_pre_pt_roots = set()
         all_notices = []
 
-        for bio_node_id, rn in enumerate(resolved_neurons):
-            pt_root_id = rn.pt_root_id
-            L.info(f"Mapping synapses onto morphology {bio_node_id}...")
-
-            syns, _coll_pre, _coll_post, notices = synapses_and_nodes_dataframes_from_EM(
-                em_dataset, pt_root_id, db_client, cave_version
-            )
-
+        # Fill the CAVE query cache (if enabled) with batched queries for all neurons
+        em_dataset.prefetch_synapses(
+            [rn.pt_root_id for rn in resolved_neurons], cave_version, db_client=db_client
+        )
+        mapped_neurons = _fetch_and_map_synapses(
+            resolved_neurons,
+            spiny_dir,
+            em_dataset,
+            db_client,
+            cave_version,
+            max_workers=max_workers,
+        )
+        for bio_node_id, (syns, notices, mapped_synapses_df, mesh_res) in enumerate(mapped_neurons):
             all_notices.extend(notices)
 
-            mapped_synapses_df, mesh_res = map_afferents_to_spiny_morphology(
-                rn.spiny_morph, syns, add_quality_info=True
-            )
-
             stats_name = (
                 f"mapping_stats_neuron_{bio_node_id}.png" if is_multi else "mapping_stats.png"
             )
@@ -162,7 +283,7 @@ class EMSynapseMappingTask(Task):
             plt.close("all")
 
             # Split synapses: internal (pre is in the set) vs external
-            is_internal = syns["pre_pt_root_id"].isin(pt_root_id_names)
+            is_internal = syns["pre_pt_root_id"].isin(pt_root_to_bio_id)
 
             for is_int, edge_list, pre_post_list in [
                 (True, all_internal_edges, all_internal_pre_post),
@@ -460,11 +460,9 @@ class GenerateSimulationTask(Task):
         existing one. This makes behaviour consistent whether random subsampling is used or not.
         It also means, however, that existing node_set names cannot be used as keys in neuron_sets.
         """
-        sonata_circuit = self._circuit.sonata_circuit  # ty:ignore[unresolved-attribute]
+        sonata_circuit = self._circuit.writable_sonata_circuit()  # ty:ignore[unresolved-attribute]
 
         if hasattr(self.config, "neuron_sets"):
-            # circuit.sonata_circuit should be created once. Currently this would break other code.
-
             L.info("self.config.neuron_sets: %s", self.config.neuron_sets)
 
             for neuron_set_key, neuron_set_ in self.config.neuron_sets.items():  # ty:ignore[unresolved-attribute]
@@ -499,7 +497,6 @@ class GenerateSimulationTask(Task):
 
     def _write_materialized_compartment_sets_file(self) -> None:
         if self._materialized_compartment_sets:
-            compartment_sets_dict: dict = {}
             sonata_circuit = self._circuit.sonata_circuit  # ty:ignore[unresolved-attribute]
 
             for cs_key, comp_set in self._materialized_compartment_sets.items():
@@ -507,12 +504,10 @@ class GenerateSimulationTask(Task):
                     msg = "Materialized compartment set name mismatch."
                     raise OBIONEError(msg)
 
-                compartment_sets_dict.update(comp_set.to_sonata_dict())
-
             write_circuit_compartment_set_file(
                 sonata_circuit,
                 str(self.config.coordinate_output_root),
-                compartment_sets=compartment_sets_dict,
+                compartment_sets=list(self._materialized_compartment_sets.values()),
                 file_name=self.COMPARTMENT_SETS_FILE_NAME,
                 overwrite_if_exists=False,
             )
@@ -14,7 +14,11 @@ from obi_one.core.single import SingleConfigMixin
 from obi_one.core.task import Task
 from obi_one.db_sdk.registration.simulation_result import register_simulation_results
 from obi_one.scientific.library.circuit import Circuit
-from obi_one.scientific.library.simulation.neuron.process import compile_mechanisms, run_simulation
+from obi_one.scientific.library.simulation.neuron.process import (
+    MAX_MPI_PROCESSES,
+    compile_mechanisms,
+    run_simulation,
+)
 from obi_one.scientific.library.simulation.neuron.schemas import SimulationMetadata
 from obi_one.scientific.library.simulation.neuron.staging import get_simulation_parameters
 from obi_one.types import SimulationBackend
@@ -37,6 +41,7 @@ class SimulationExecutionTask(Task):
     config: SimulationExecutionSingleConfig
     activity_type: ClassVar[type[Activity]] = models.SimulationExecution
     simulation_backend: ClassVar[SimulationBackend] = SimulationBackend.neurodamus
+    number_of_cores: ClassVar[int] = MAX_MPI_PROCESSES
 
     def _get_simulation_entity(self, db_client: entitysdk.client.Client) -> models.Simulation:  # ruff: ignore[unused-method-argument]
         return cast("Simulation", self.config.single_entity)
@@ -2,20 +2,26 @@
 
 from __future__ import annotations
 
+import fcntl
 import json
 import logging
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from enum import StrEnum
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 import bluepysnap as snap
 import bluepysnap.circuit_validation
 
+from obi_one.config import settings
 from obi_one.core.exception import OBIONEError
 from obi_one.core.path import NamedPath
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     import pandas as pd
 import h5py
 import numpy as np
@@ -29,6 +35,9 @@ from obi_one.utils.filesystem import filter_extension
 
 L = logging.getLogger(__name__)
 
+# Linux ioctl creating a copy-on-write clone (reflink) of a file, e.g., on Btrfs or XFS
+_FICLONE = 0x40049409
+
 # Properties to ignore in SNAP validation
 # TODO: Refine SNAP validation
 # https://github.com/openbraininstitute/prod-build-circuit/issues/49
@@ -232,69 +241,194 @@ def get_morph_dirs(
     return src_morph_dirs, dest_morph_dirs
 
 
+class AssetTransferMode(StrEnum):
+    """How circuit asset files are transferred into an extracted circuit.
+
+    Hardlinks and reflinks fall back to copying if not supported, e.g., across file systems.
+    Hardlinked files share their contents with the original circuit, so they must be treated as
+    read-only.
+    """
+
+    copy = "copy"
+    hardlink = "hardlink"
+    reflink = "reflink"
+
+
+def transfer_file(
+    src_file: Path, dest_file: Path, mode: AssetTransferMode = AssetTransferMode.copy
+) -> None:
+    """Copies, hardlinks or reflinks a file."""
+    if mode == AssetTransferMode.hardlink:
+        try:
+            os.link(src_file, dest_file)
+        except OSError:
+            pass
+        else:
+            return
+    elif mode == AssetTransferMode.reflink:
+        try:
+            with Path(src_file).open("rb") as f_src, Path(dest_file).open("wb") as f_dest:
+                fcntl.ioctl(f_dest.fileno(), _FICLONE, f_src.fileno())
+        except OSError:
+            Path(dest_file).unlink(missing_ok=True)
+        else:
+            return
+    shutil.copyfile(src_file, dest_file)
+
+
+def _file_transfer_jobs(
+    file_pairs: list[tuple[Path, Path]], mode: AssetTransferMode, kind: str
+) -> list[Callable[[], None]]:
+    """Transfer jobs of (source, destination) file pairs, skipping already existing destinations.
+
+    Destinations may exist already, e.g., for morphologies shared among populations.
+    """
+    jobs = []
+    unique_pairs = {dest: src for src, dest in file_pairs}
+    for dest_file, src_file in unique_pairs.items():
+        if not Path(src_file).exists():
+            msg = f"ERROR: {kind} '{src_file}' missing!"
+            raise ValueError(msg)
+        if not Path(dest_file).exists():
+            jobs.append(lambda src=src_file, dest=dest_file: transfer_file(src, dest, mode))
+    return jobs
+
+
+def _run_transfer_jobs(jobs: list[Callable[[], None]]) -> None:
+    """Runs transfer jobs concurrently, re-raising the first error in job order."""
+    if len(jobs) <= 1:
+        for job in jobs:
+            job()
+        return
+    max_workers = max(min(settings.circuit_extraction.copy_workers, len(jobs)), 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for future in [executor.submit(job) for job in jobs]:
+            future.result()
+
+
+def _copy_container_morphologies(
+    src_container: Path,
+    dest_container: Path,
+    morphology_list: list[str],
+    mode: AssetTransferMode,
+) -> None:
+    """Copies morphologies from a source into a (new or existing) destination container.
+
+    If all morphologies of the source container are required, the container file is
+    transferred as a whole.
+    """
+    Path(dest_container).parent.mkdir(parents=True, exist_ok=True)
+    if not Path(dest_container).exists():
+        with h5py.File(src_container) as f_src:
+            is_complete = set(f_src.keys()).issubset(morphology_list)
+        if is_complete:
+            transfer_file(Path(src_container), Path(dest_container), mode)
+            L.info(f"Transferred complete morphology container ({len(morphology_list)})")
+            return
+
+    with h5py.File(src_container) as f_src, h5py.File(dest_container, "a") as f_dest:
+        existing = set(f_dest.keys())
+        missing = [name for name in morphology_list if name not in existing]
+        for morphology_name in missing:
+            f_src.copy(morphology_name, f_dest, name=morphology_name)
+    L.info(
+        f"Copied {len(missing)} morphologies into"
+        f" container ({len(morphology_list) - len(missing)} already existed)"
+    )
+
+
+def reference_morphology_container(
+    circuit_config_path: Path, pop_name: str, container: Path
+) -> None:
+    """Makes a node population of a circuit config use the given h5 morphology container."""
+    with Path(circuit_config_path).open(encoding="utf-8") as config_file:
+        config_dict = json.load(config_file)
+
+    components = config_dict.get("components", {})
+    for nodes in config_dict["networks"]["nodes"]:
+        pop_config = nodes["populations"].get(pop_name)
+        if pop_config is None:
+            continue
+        # Population properties override (and do not merge with) the components
+        alternate_morphologies = pop_config.get(
+            "alternate_morphologies", components.get("alternate_morphologies", {})
+        )
+        pop_config["alternate_morphologies"] = alternate_morphologies | {
+            "h5v1": str(Path(container).resolve())
+        }
+
+    with Path(circuit_config_path).open("w", encoding="utf-8") as config_file:
+        json.dump(config_dict, config_file, indent=4)
+
+
 def copy_morphologies(
     pop_name: str,
     pop: snap.nodes.NodePopulation,  # ty:ignore[possibly-missing-submodule]
     original_circuit: snap.Circuit,
+    *,
+    mode: AssetTransferMode = AssetTransferMode.copy,
+    circuit_config_path: Path | None = None,
 ) -> None:
-    """Copy morphologies for a node population from original to extracted circuit."""
+    """Copy morphologies for a node population from original to extracted circuit.
+
+    Morphology files are transferred concurrently (together with containerized morphologies).
+
+    Args:
+        pop_name: Name of the node population.
+        pop: Node population of the extracted circuit.
+        original_circuit: Circuit the population was extracted from.
+        mode: How morphology files (or complete containers) are transferred.
+        circuit_config_path: If given, containerized morphologies are not copied. Instead, the
+            population in this (extracted) circuit config references the morphology container of
+            the original circuit, which must then remain accessible.
+    """
     L.info(f"Copying morphologies for population '{pop_name}' ({pop.size})")
-    morphology_list = pop.get(properties="morphology").unique()
+    morphology_list = pop.get(properties="morphology").unique().tolist()
 
     src_morph_dirs, dest_morph_dirs = get_morph_dirs(pop_name, pop, original_circuit)
 
     if len(src_morph_dirs) == 0:
         msg = "ERROR: No morphologies of any supported format found!"
         raise ValueError(msg)
+    jobs: list[Callable[[], None]] = []
     for morph_ext, src_dir in src_morph_dirs.items():
         if morph_ext == "h5" and Path(src_dir).is_file():
             # TODO: If there is only one neuron extracted, consider removing
             #       the container
             # https://github.com/openbraininstitute/obi-one/issues/387
+            if circuit_config_path is not None:
+                L.info(f"Referencing morphology container '{src_dir}'")
+                reference_morphology_container(circuit_config_path, pop_name, Path(src_dir))
+                continue
 
             # Copy containerized morphologies into new container
             L.info(f"Copying {len(morphology_list)} containerized .{morph_ext} morphologies")
-            Path(os.path.split(dest_morph_dirs[morph_ext])[0]).mkdir(parents=True, exist_ok=True)
-            src_container = src_dir
-            dest_container = dest_morph_dirs[morph_ext]
-            with (
-                h5py.File(src_container) as f_src,
-                h5py.File(dest_container, "a") as f_dest,
-            ):
-                skip_counter = 0
-                for morphology_name in morphology_list:
-                    if morphology_name in f_dest:
-                        skip_counter += 1
-                    else:
-                        f_src.copy(
-                            f_src[morphology_name],
-                            f_dest,
-                            name=morphology_name,
-                        )
-            L.info(
-                f"Copied {len(morphology_list) - skip_counter} morphologies into"
-                f" container ({skip_counter} already existed)"
+            jobs.append(
+                lambda src=Path(src_dir), dest=Path(dest_morph_dirs[morph_ext]): (
+                    _copy_container_morphologies(src, dest, morphology_list, mode)
+                )
             )
         else:
             # Copy morphology files
             L.info(f"Copying {len(morphology_list)} .{morph_ext} morphologies")
             Path(dest_morph_dirs[morph_ext]).mkdir(parents=True, exist_ok=True)
-            for morphology_name in morphology_list:
-                src_file = Path(src_dir) / f"{morphology_name}.{morph_ext}"
-                dest_file = Path(dest_morph_dirs[morph_ext]) / f"{morphology_name}.{morph_ext}"
-                if not Path(src_file).exists():
-                    msg = f"ERROR: Morphology '{src_file}' missing!"
-                    raise ValueError(msg)
-                if not Path(dest_file).exists():
-                    # Copy only, if not yet existing (could happen for shared
-                    # morphologies among populations)
-                    shutil.copyfile(src_file, dest_file)
+            file_pairs = [
+                (
+                    Path(src_dir) / f"{morphology_name}.{morph_ext}",
+                    Path(dest_morph_dirs[morph_ext]) / f"{morphology_name}.{morph_ext}",
+                )
+                for morphology_name in morphology_list
+            ]
+            jobs.extend(_file_transfer_jobs(file_pairs, mode, "Morphology"))
+    _run_transfer_jobs(jobs)
 
 
 def copy_hoc_files(
     pop_name: str,
     pop: snap.nodes.NodePopulation,  # ty:ignore[possibly-missing-submodule]
     original_circuit: snap.Circuit,
+    *,
+    mode: AssetTransferMode = AssetTransferMode.copy,
 ) -> None:
     """Copy biophysical neuron model (.hoc) files for a node population."""
     hoc_file_list = [
@@ -309,29 +443,24 @@ def copy_hoc_files(
     dest_dir = pop.config["biophysical_neuron_models_dir"]
     Path(dest_dir).mkdir(parents=True, exist_ok=True)
 
-    for hoc_file in hoc_file_list:
-        src_file = Path(source_dir) / hoc_file
-        dest_file = Path(dest_dir) / hoc_file
-        if not Path(src_file).exists():
-            msg = f"ERROR: HOC file '{src_file}' missing!"
-            raise ValueError(msg)
-        if not Path(dest_file).exists():
-            # Copy only, if not yet existing (could happen for shared hoc files
-            # among populations)
-            shutil.copyfile(src_file, dest_file)
+    file_pairs = [(Path(source_dir) / hoc, Path(dest_dir) / hoc) for hoc in hoc_file_list]
+    _run_transfer_jobs(_file_transfer_jobs(file_pairs, mode, "HOC file"))
 
 
 def copy_mod_files(
     pop_name: str,
     pop: snap.nodes.NodePopulation,  # ty:ignore[possibly-missing-submodule]
     original_circuit: snap.Circuit,
+    *,
+    mode: AssetTransferMode = AssetTransferMode.copy,
 ) -> None:
     """Copy mechanisms (.mod) files for a node population."""
     source_dir = original_circuit.nodes[pop_name].config.get("mechanisms_dir")
     if not source_dir or not Path(source_dir).exists():
         return
 
-    mod_file_list = [p.name for p in Path(source_dir).glob("*.mod")]
+    # Dangling entries (e.g., broken links) are skipped like a missing directory
+    mod_file_list = [p.name for p in Path(source_dir).glob("*.mod") if p.is_file()]
     if len(mod_file_list) == 0:
         return
 
@@ -342,13 +471,8 @@ def copy_mod_files(
     dest_dir = pop.config.get("mechanisms_dir")
     Path(dest_dir).mkdir(parents=True, exist_ok=True)
 
-    for mod_file in mod_file_list:
-        src_file = Path(source_dir) / mod_file
-        dest_file = Path(dest_dir) / mod_file
-        if not Path(dest_file).exists():
-            # Copy only, if not yet existing (could happen for shared mod files
-            # among populations)
-            shutil.copyfile(src_file, dest_file)
+    file_pairs = [(Path(source_dir) / mod, Path(dest_dir) / mod) for mod in mod_file_list]
+    _run_transfer_jobs(_file_transfer_jobs(file_pairs, mode, "MOD file"))
 
 
 def _any_not_empty(data_series: pd.Series) -> bool:
@@ -0,0 +1,210 @@
+"""Persistent, size-bounded on-disk cache of directories.
+
+Each cache entry is a directory ``<root>/<key>`` that is populated once by a user-provided
+function. Entries are guarded by a per-entry file lock so that concurrent processes on the same
+machine share a single population, and only become visible once a completion marker has been
+written atomically. Entries are evicted in least-recently-used order once the total size exceeds
+the configured limit, except for entries used within a grace period, which users outside the lock
+(e.g., simulations loading compiled mechanisms) may still be reading.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import shutil
+import time
+from collections.abc import Callable, Collection, Generator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from obi_one.types import StrOrPath
+
+L = logging.getLogger(__name__)
+
+_COMPLETE_MARKER = ".complete.json"
+_LOCK_SUFFIX = ".lock"
+
+
+@contextmanager
+def file_lock(lock_file: StrOrPath, *, shared: bool = False) -> Generator[None, None, None]:
+    """Holds an advisory (fcntl) lock on the given file while the context is active."""
+    lock_file = Path(lock_file)
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    with lock_file.open("a", encoding="utf-8") as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _try_file_lock(lock_file: Path) -> Generator[bool, None, None]:
+    """Tries to acquire an exclusive lock without blocking; yields whether it was acquired."""
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    with lock_file.open("a", encoding="utf-8") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def path_size(path: StrOrPath) -> int:
+    """Returns the size (bytes) of a file or the total size of all files inside a directory.
+
+    Symbolic links are not followed.
+    """
+    path = Path(path)
+    if not path.is_dir() or path.is_symlink():
+        return path.lstat().st_size if path.exists() or path.is_symlink() else 0
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += Path(root, name).lstat().st_size
+    return total
+
+
+class DirectoryCache:
+    """Persistent cache of directories with file locking and LRU eviction.
+
+    Args:
+        root: Cache root directory.
+        max_size_bytes: Maximum total size of all entries. Least recently used entries are
+            evicted when exceeded. No limit if None.
+        min_idle_seconds: Entries used more recently than this are never evicted.
+    """
+
+    def __init__(
+        self,
+        root: StrOrPath,
+        max_size_bytes: int | None = None,
+        min_idle_seconds: float = 0.0,
+    ) -> None:
+        """Initialize object."""
+        self.root = Path(root)
+        self.max_size_bytes = max_size_bytes
+        self.min_idle_seconds = min_idle_seconds
+
+    def entry_dir(self, key: str) -> Path:
+        """Directory of a cache entry."""
+        return self.root / key
+
+    def _lock_file(self, key: str) -> Path:
+        return self.root / f"{key}{_LOCK_SUFFIX}"
+
+    def _marker_file(self, key: str) -> Path:
+        return self.entry_dir(key) / _COMPLETE_MARKER
+
+    @contextmanager
+    def lock(self, key: str) -> Generator[None, None, None]:
+        """Holds the exclusive lock of a cache entry while the context is active."""
+        with file_lock(self._lock_file(key)):
+            yield
+
+    def is_complete(self, key: str) -> bool:
+        """Returns if a cache entry exists and has been fully populated."""
+        return self._marker_file(key).is_file()
+
+    def read_metadata(self, key: str) -> dict[str, Any]:
+        """Returns the metadata stored alongside a complete cache entry."""
+        return json.loads(self._marker_file(key).read_text(encoding="utf-8"))
+
+    def _mark_complete(self, key: str, metadata: dict[str, Any]) -> None:
+        """Atomically writes the completion marker (incl. metadata) of a cache entry."""
+        marker = self._marker_file(key)
+        tmp_marker = marker.with_name(f"{marker.name}.tmp")
+        tmp_marker.write_text(json.dumps(metadata), encoding="utf-8")
+        tmp_marker.replace(marker)
+
+    def _touch(self, key: str) -> None:
+        """Marks a cache entry as recently used."""
+        self._marker_file(key).touch()
+
+    def keys(self) -> list[str]:
+        """Returns the keys of all (complete or incomplete) cache entries."""
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def discard(self, key: str) -> None:
+        """Removes a cache entry (the caller must hold its lock)."""
+        shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Returns the metadata of a complete cache entry (marking it as used), or None."""
+        with self.lock(key):
+            if not self.is_complete(key):
+                return None
+            self._touch(key)
+            return self.read_metadata(key)
+
+    def get_or_create(
+        self, key: str, create: Callable[[Path], dict[str, Any]]
+    ) -> tuple[Path, dict[str, Any]]:
+        """Returns the directory and metadata of a cache entry, populating it if needed.
+
+        The create function is called with the (empty) entry directory and returns a
+        JSON-serializable metadata dict. Concurrent callers for the same key wait for a single
+        population. A failed population leaves no entry behind.
+        """
+        with self.lock(key):
+            if self.is_complete(key):
+                L.info("Cache hit: %s", self.entry_dir(key))
+                self._touch(key)
+                return self.entry_dir(key), self.read_metadata(key)
+
+            L.info("Cache miss: %s", self.entry_dir(key))
+            self.discard(key)  # Remove left-overs of interrupted populations
+            entry_dir = self.entry_dir(key)
+            entry_dir.mkdir(parents=True)
+            try:
+                metadata = create(entry_dir)
+                self._mark_complete(key, metadata)
+            except BaseException:
+                self.discard(key)
+                raise
+
+        self.evict(keep={key})
+        return entry_dir, metadata
+
+    def evict(self, keep: Collection[str] = ()) -> list[str]:
+        """Evicts least recently used entries until the size limit is satisfied.
+
+        Entries in keep, entries currently locked by other users and entries used within the
+        last min_idle_seconds are never evicted.
+
+        Returns:
+            Keys of the evicted entries.
+        """
+        if self.max_size_bytes is None:
+            return []
+
+        entries = []
+        for key in self.keys():
+            marker = self._marker_file(key)
+            last_used = marker.stat().st_mtime if marker.exists() else 0.0
+            entries.append((last_used, key, path_size(self.entry_dir(key))))
+        total_size = sum(size for _, _, size in entries)
+
+        evicted = []
+        in_use_since = time.time() - self.min_idle_seconds
+        for last_used, key, size in sorted(entries):
+            if total_size <= self.max_size_bytes or last_used > in_use_since:
+                break
+            if key in keep:
+                continue
+            with _try_file_lock(self._lock_file(key)) as acquired:
+                if not acquired:
+                    continue
+                self.discard(key)
+            total_size -= size
+            evicted.append(key)
+            L.info("Evicted cache entry: %s", self.entry_dir(key))
+        return evicted
@@ -43,6 +43,24 @@ def test_circuit_metrics_endpoint_returns_metrics(monkeypatch):
     assert response is metrics
 
 
+def test_circuit_metrics_endpoint_passes_max_workers(monkeypatch):
+    calls = []
+
+    def get_circuit_metrics(**kwargs):
+        calls.append(kwargs)
+        return _circuit_metrics()
+
+    monkeypatch.setattr(circuit_properties, "get_circuit_metrics", get_circuit_metrics)
+
+    circuit_properties.circuit_metrics_endpoint(
+        circuit_id="circuit-id",
+        db_client=SimpleNamespace(),
+        max_workers=2,
+    )
+
+    assert calls[0]["max_workers"] == 2
+
+
 def test_circuit_metrics_endpoint_maps_sdk_error_to_500(monkeypatch):
     def raise_entity_sdk_error(**_kwargs):
         raise entitysdk.exception.EntitySDKError
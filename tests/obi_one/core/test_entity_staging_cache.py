@@ -0,0 +1,169 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from entitysdk.models import Asset
+from pydantic import BaseModel
+
+from obi_one.config import settings
+from obi_one.core import entity_staging_cache as test_module
+
+
+class FakeEntity(BaseModel):
+    id: str
+    assets: list[Asset]
+
+
+def _entity(sha256_digest="abc"):
+    asset = Asset.model_construct(id="asset-1", sha256_digest=sha256_digest, size=3)
+    return FakeEntity.model_construct(id="entity-1", assets=[asset])
+
+
+class StageCounter:
+    def __init__(self, *, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def __call__(self, output_dir):
+        self.calls += 1
+        output_dir.mkdir()
+        (output_dir / "circuit_config.json").write_text("{}", encoding="utf-8")
+        if self.fail:
+            msg = "Staging failed"
+            raise RuntimeError(msg)
+
+
+@pytest.fixture
+def staging_cache_settings(tmp_path, monkeypatch):
+    cache_settings = settings.entity_staging_cache.model_copy(
+        update={"enabled": True, "cache_dir": tmp_path / "cache"}
+    )
+    monkeypatch.setattr(settings, "entity_staging_cache", cache_settings)
+    return cache_settings
+
+
+def test_entity_cache_key():
+    key = test_module.entity_cache_key(_entity(), "sonata_circuit")
+    assert key.startswith("FakeEntity_entity-1_sonata_circuit_")
+    assert key == test_module.entity_cache_key(_entity(), "sonata_circuit")
+    assert key != test_module.entity_cache_key(_entity(sha256_digest="def"), "sonata_circuit")
+    assert key != test_module.entity_cache_key(_entity(), "sonata_from_memodel")
+
+
+def test_stage_entity_without_cache(tmp_path):
+    stage = StageCounter()
+    dest = tmp_path / "sonata_circuit"
+    test_module.stage_entity(_entity(), kind="circuit", dest_path=dest, stage=stage)
+    assert (dest / "circuit_config.json").is_file()
+
+    with pytest.raises(FileExistsError, match="already exists"):
+        test_module.stage_entity(_entity(), kind="circuit", dest_path=dest, stage=stage)
+
+
+def test_stage_entity_campaign_cache(tmp_path):
+    stage = StageCounter()
+    dest = tmp_path / "entity_cache" / "sonata_circuit"
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for _ in range(8):
+            executor.submit(
+                test_module.stage_entity,
+                _entity(),
+                kind="circuit",
+                dest_path=dest,
+                stage=stage,
+                entity_cache=True,
+            )
+
+    assert stage.calls == 1
+    assert (dest / "circuit_config.json").is_file()
+    assert sorted(p.name for p in dest.parent.iterdir()) == [
+        ".sonata_circuit.lock",
+        "sonata_circuit",
+    ]
+
+
+def test_stage_entity_failure_leaves_nothing(tmp_path):
+    dest = tmp_path / "sonata_circuit"
+    with pytest.raises(RuntimeError, match="Staging failed"):
+        test_module.stage_entity(
+            _entity(),
+            kind="circuit",
+            dest_path=dest,
+            stage=StageCounter(fail=True),
+            entity_cache=True,
+        )
+    assert not dest.exists()
+    assert [p.name for p in tmp_path.iterdir()] == [".sonata_circuit.lock"]
+
+
+@pytest.mark.usefixtures("staging_cache_settings")
+def test_stage_entity_machine_wide_cache_hardlinks(tmp_path):
+    stage = StageCounter()
+    dests = [tmp_path / f"campaign_{i}" / "sonata_circuit" for i in range(2)]
+    for dest in dests:
+        test_module.stage_entity(
+            _entity(), kind="circuit", dest_path=dest, stage=stage, entity_cache=True
+        )
+
+    assert stage.calls == 1
+    inodes = {(dest / "circuit_config.json").stat().st_ino for dest in dests}
+    assert len(inodes) == 1
+    assert not any(dest.is_symlink() for dest in dests)
+
+
+def test_stage_entity_machine_wide_cache_symlinks(tmp_path, staging_cache_settings, monkeypatch):
+    monkeypatch.setattr(staging_cache_settings, "link_mode", "symlink")
+    dest = tmp_path / "campaign" / "sonata_circuit"
+    test_module.stage_entity(
+        _entity(), kind="circuit", dest_path=dest, stage=StageCounter(), entity_cache=True
+    )
+
+    assert dest.is_symlink()
+    assert dest.resolve().is_relative_to(staging_cache_settings.cache_dir)
+    assert (dest / "circuit_config.json").is_file()
+
+
+def test_eviction_keeps_recently_symlinked_entries(tmp_path, staging_cache_settings, monkeypatch):
+    monkeypatch.setattr(staging_cache_settings, "link_mode", "symlink")
+    monkeypatch.setattr(staging_cache_settings, "max_size_gb", 0.0)
+    dests = [tmp_path / f"campaign_{digest}" / "sonata_circuit" for digest in ("a", "b", "c")]
+
+    def _stage(digest, dest):
+        test_module.stage_entity(
+            _entity(sha256_digest=digest),
+            kind="circuit",
+            dest_path=dest,
+            stage=StageCounter(),
+            entity_cache=True,
+        )
+
+    # Staging "b" exceeds the size limit, but "a" was used within the grace period
+    _stage("a", dests[0])
+    _stage("b", dests[1])
+    assert (dests[0] / "circuit_config.json").is_file()
+
+    # Once idle for longer than the grace period, "a" is evicted
+    monkeypatch.setattr(staging_cache_settings, "min_idle_hours", 0.0)
+    _stage("c", dests[2])
+    assert dests[0].is_symlink()
+    assert not dests[0].exists()
+    assert (dests[2] / "circuit_config.json").is_file()
+
+
+def test_entity_staging_cache_file(tmp_path):
+    cache = test_module.EntityStagingCache(tmp_path / "cache")
+    calls = []
+
+    def _download(output_path):
+        calls.append(output_path)
+        output_path.write_text("morphology", encoding="utf-8")
+
+    for name in ("a.h5", "b.h5"):
+        cache.stage(_entity(), kind="morphology", dest_path=tmp_path / name, stage=_download)
+
+    assert len(calls) == 1
+    assert (tmp_path / "b.h5").read_text(encoding="utf-8") == "morphology"
+
+
+def test_from_settings_disabled():
+    assert settings.entity_staging_cache.enabled is False
+    assert test_module.EntityStagingCache.from_settings() is None
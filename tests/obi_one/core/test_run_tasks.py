@@ -5,7 +5,10 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+import obi_one as obi
 from obi_one.core import run_tasks as test_module
+from obi_one.core.exception import TaskExecutionError
+from obi_one.core.serialization_constants import TASK_COMPLETE_FILENAME
 from obi_one.types import TaskType
 
 
@@ -119,3 +122,100 @@ def test_run_task_type_without_asset_label_creates_default_config(
         entity_cache=False,
         execution_activity_id="act-1",
     )
+
+
+@pytest.fixture
+def compression_scan(tmp_path):
+    folder = tmp_path / "folder"
+    folder.mkdir()
+    (folder / "file.txt").write_text("content", encoding="utf-8")
+
+    def _make_scan(file_formats):
+        form = obi.FolderCompressionScanConfig(
+            initialize=obi.FolderCompressionScanConfig.Initialize(
+                folder_path=obi.NamedPath(name="folder", path=str(folder)),
+                file_format=file_formats,
+            )
+        )
+        scan = obi.GridScanGenerationTask(
+            form=form, output_root=tmp_path / "scan", coordinate_directory_option="ZERO_INDEX"
+        )
+        scan.execute()
+        return scan
+
+    return _make_scan
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_run_task_for_single_configs(compression_scan, max_workers):
+    scan = compression_scan(["gz", "bz2", "xz"])
+    results = test_module.run_tasks_for_generated_scan(scan, max_workers=max_workers)
+
+    assert results == [None, None, None]
+    for single_config in scan.single_configs:
+        fmt = single_config.initialize.file_format
+        assert (single_config.coordinate_output_root / f"compressed.{fmt}").exists()
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_run_task_for_single_configs_fail_fast(compression_scan, max_workers):
+    scan = compression_scan(["zip", "gz"])
+    with pytest.raises(ValueError, match="File format 'zip' not supported"):
+        test_module.run_tasks_for_generated_scan(scan, max_workers=max_workers)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_run_task_for_single_configs_isolates_failures(compression_scan, max_workers):
+    scan = compression_scan(["zip", "gz", "rar"])
+    with pytest.raises(TaskExecutionError, match="2 task") as exc_info:
+        test_module.run_tasks_for_generated_scan(scan, max_workers=max_workers, fail_fast=False)
+
+    assert set(exc_info.value.failures) == {0, 2}
+    assert isinstance(exc_info.value.failures[0], ValueError)
+    assert (scan.single_configs[1].coordinate_output_root / "compressed.gz").exists()
+
+
+def test_run_task_for_single_configs_resume(compression_scan):
+    scan = compression_scan(["gz", "bz2"])
+    test_module.run_tasks_for_generated_scan(scan, resume=True)
+    for single_config in scan.single_configs:
+        assert (single_config.coordinate_output_root / TASK_COMPLETE_FILENAME).exists()
+
+    # Completed coordinates are skipped (re-running would fail since the outputs exist)
+    test_module.run_tasks_for_generated_scan(scan, resume=True)
+    with pytest.raises(ValueError, match="already exists"):
+        test_module.run_tasks_for_generated_scan(scan)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_run_task_for_single_configs_resume_after_failure(compression_scan, max_workers):
+    scan = compression_scan(["gz", "zip"])
+    with pytest.raises(ValueError, match="File format 'zip' not supported"):
+        test_module.run_tasks_for_generated_scan(scan, max_workers=max_workers, resume=True)
+
+    gz, zip_ = scan.single_configs
+    assert (gz.coordinate_output_root / TASK_COMPLETE_FILENAME).exists()
+    assert not (zip_.coordinate_output_root / TASK_COMPLETE_FILENAME).exists()
+
+    # The completed coordinate is skipped, only the failed one is run again
+    with (
+        patch.object(
+            test_module, "run_task_for_single_config", wraps=test_module.run_task_for_single_config
+        ) as run_task,
+        pytest.raises(ValueError, match="not supported"),
+    ):
+        test_module.run_tasks_for_generated_scan(scan, resume=True)
+    assert [c.args[0] for c in run_task.call_args_list] == [zip_]
+
+
+def test_run_task_for_single_configs_invalid_max_workers():
+    with pytest.raises(ValueError, match="max_workers must be at least 1"):
+        test_module.run_task_for_single_configs([], max_workers=0)
+
+
+def test_number_of_cores_is_capped(compression_scan):
+    single_config = compression_scan("gz").single_configs[0]
+    task_type = obi.FolderCompressionTask
+    assert test_module._number_of_cores(single_config, max_workers=4) == 1
+    with patch.object(task_type, "number_of_cores", 8):
+        assert test_module._number_of_cores(single_config, max_workers=4) == 4
@@ -324,3 +324,47 @@ class TestCoupledScanExecute:
         scan.execute()
 
         assert len(scan.single_configs) == 1
+
+
+class TestLazyGeneration:
+    def test_grid_number_of_coordinates(self):
+        config = make_config(file_format=["gz", "bz2", "xz"], file_name=["a", "b"])
+        scan = make_grid_scan(config)
+        assert scan.number_of_coordinates == 6
+        assert scan.number_of_coordinates == len(scan.coordinate_parameters())
+
+    def test_coupled_number_of_coordinates(self):
+        config = make_config(file_format=["gz", "bz2"], file_name=["a", "b"])
+        scan = make_coupled_scan(config)
+        assert scan.number_of_coordinates == 2
+        assert scan.number_of_coordinates == len(scan.coordinate_parameters())
+
+    def test_number_of_coordinates_no_multi_values(self):
+        assert make_grid_scan(make_config()).number_of_coordinates == 1
+        assert make_coupled_scan(make_config()).number_of_coordinates == 1
+
+    def test_iter_coordinate_parameters_is_lazy(self):
+        config = make_config(file_format=["gz", "bz2", "xz"])
+        scan = make_grid_scan(config)
+        coords = scan.iter_coordinate_parameters()
+        first = next(coords)
+        assert isinstance(first, SingleCoordinateScanParams)
+        assert len(list(coords)) == 2
+
+    def test_iter_single_configs_matches_create(self, tmp_path):
+        config = make_config(file_format=["gz", "bz2"])
+        scan = make_grid_scan(config, output_root=tmp_path)
+        scan.coordinate_parameters()
+        singles = list(scan.iter_single_configs())
+        assert [s.idx for s in singles] == [0, 1]
+        assert [s.initialize.file_format for s in singles] == ["gz", "bz2"]
+
+    def test_execute_without_keeping_single_configs(self, tmp_path):
+        output_root = tmp_path / "scan_output"
+        config = make_config(file_format=["gz", "bz2"])
+        scan = make_grid_scan(config, output_root=output_root)
+        scan.execute(keep_single_configs=False)
+
+        assert len(list(output_root.rglob("obi_one_coordinate.json"))) == 2
+        with pytest.raises(OBIONEError):
+            _ = scan.single_configs
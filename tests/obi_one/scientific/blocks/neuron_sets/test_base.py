@@ -80,7 +80,7 @@ def test_add_node_set_to_sonata_circuit(circuit):
     )
     nset.set_block_name("added_nset")
 
-    sonata_circuit = circuit.sonata_circuit
+    sonata_circuit = circuit.writable_sonata_circuit()
     nset_name = nset.add_node_set_definition_to_sonata_circuit(circuit, sonata_circuit)
 
     # The node set name is the block name
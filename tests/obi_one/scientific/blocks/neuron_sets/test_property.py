@@ -137,3 +137,23 @@ def test_property_neuron_set_biophysical_matching(circuit):
 
     ids = nset.get_neuron_ids(circuit)
     assert len(ids["S1nonbarrel_neurons"]) == 9
+
+
+@pytest.mark.parametrize(
+    "filter_dict",
+    [
+        {"layer": ["6"], "synapse_class": ["EXC"]},
+        {"layer": [3, 6], "mtype": ["L6_BPC", "L23_CHC", "unknown"]},
+        {"morphology": ["unknown"]},
+        {"etype": ["cADpyr"], "model_type": ["biophysical"]},
+    ],
+)
+def test_property_filter_select_matches_dataframe_filter(circuit, filter_dict):
+    """Test that chunked selection on enumeration indices matches the DataFrame filter."""
+    property_filter = NeuronPropertyFilter(filter_dict=filter_dict)
+    population = circuit.sonata_circuit.nodes["S1nonbarrel_neurons"]
+    expected = property_filter.filter(population.get(properties=list(filter_dict)).reset_index())
+
+    for chunk_size in (3, 1000):
+        selection = property_filter.select(population.to_libsonata, chunk_size=chunk_size)
+        np.testing.assert_array_equal(selection.flatten(), expected["node_ids"])
@@ -10,9 +10,6 @@ from obi_one.scientific.blocks.neuron_sets.id import (
     VirtualPopulationIDNeuronSet,
 )
 from obi_one.scientific.blocks.stimuli.spike.base import SpikeStimulus
-from obi_one.scientific.blocks.stimuli.spike.sinusoidal_poisson import (
-    _draw_inhomogeneous_poisson_interval_ms,
-)
 from obi_one.scientific.unions_and_references.timestamps import TimestampsReference
 
 from tests.utils import CIRCUIT_DIR
@@ -274,24 +271,6 @@ class TestSinusoidalPoissonSpikeStimulus:
             assert 100.0 <= t <= 300.0
 
 
-class TestDrawInhomogeneousPoissonIntervalMs:
-    def test_zero_rate_raises(self):
-        rng = np.random.default_rng(0)
-        with pytest.raises(ValueError, match="Maximum lambda must be positive"):
-            _draw_inhomogeneous_poisson_interval_ms(rng, 0.0)
-
-    def test_negative_rate_raises(self):
-        rng = np.random.default_rng(0)
-        with pytest.raises(ValueError, match="Maximum lambda must be positive"):
-            _draw_inhomogeneous_poisson_interval_ms(rng, -5.0)
-
-    def test_returns_positive_value(self):
-        rng = np.random.default_rng(42)
-        for _ in range(100):
-            val = _draw_inhomogeneous_poisson_interval_ms(rng, 10.0)
-            assert val > 0.0
-
-
 # ---------------------------------------------------------------------------
 # Integration: write_spike_file
 # ---------------------------------------------------------------------------
@@ -324,6 +303,18 @@ class TestWriteSpikeFile:
         SpikeStimulus.write_spike_file({0: [1.0]}, spike_file, "pop")
         assert spike_file.exists()
 
+    def test_write_spike_arrays_matches_spikes_by_gid(self, tmp_path):
+        stim = obi.PoissonSpikeStimulus(duration=500.0, frequency=20.0, random_seed=3)
+        gids = [3, 1, 2]
+        node_ids, timestamps = stim.generate_spike_arrays(gids)
+        SpikeStimulus.write_spike_arrays(node_ids, timestamps, tmp_path / "a.h5", "pop")
+        SpikeStimulus.write_spike_file(stim.generate_spikes_by_gid(gids), tmp_path / "b.h5", "pop")
+
+        ids_a, times_a = _read_spike_file(tmp_path / "a.h5", "pop")
+        ids_b, times_b = _read_spike_file(tmp_path / "b.h5", "pop")
+        np.testing.assert_array_equal(times_a, times_b)
+        np.testing.assert_array_equal(ids_a, ids_b)
+
 
 # ---------------------------------------------------------------------------
 # Integration: full simulation campaign generation with spike stimuli
@@ -1,6 +1,8 @@
+import json
 from types import SimpleNamespace
 from unittest.mock import MagicMock, call, patch
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -94,7 +96,7 @@ def test_build_compartment_set_rejects_neuron_set_without_selected_population():
 def test_build_compartment_set_skips_unavailable_morphologies():
     neuron_set = MagicMock()
     neuron_set.block.get_neuron_ids.return_value = {
-        "pop": [1, SimpleNamespace(id=2)],
+        "pop": [1, SimpleNamespace(id=2), 3],
     }
     locations_block = MagicMock()
     locations_block.points_on.return_value = pd.DataFrame(
@@ -102,7 +104,8 @@ def test_build_compartment_set_skips_unavailable_morphologies():
     )
     morphology = MagicMock()
     circuit = MagicMock()
-    circuit.load_morphology.side_effect = [FileNotFoundError, morphology]
+    circuit.get_morphology_path.side_effect = [FileNotFoundError, "a.h5", "b.h5"]
+    circuit.load_morphology_file.side_effect = lambda path: {"a.h5": morphology}[path]
 
     result = build_compartment_set_for_neuron_set(
         name="target",
@@ -115,12 +118,76 @@ def test_build_compartment_set_skips_unavailable_morphologies():
 
     assert result.compartment_entries == ((2, 3, 0.75),)
     locations_block.points_on.assert_called_once_with(morphology)
-    assert circuit.load_morphology.call_args_list == [
+    assert circuit.get_morphology_path.call_args_list == [
         call(1, population="pop"),
         call(2, population="pop"),
+        call(3, population="pop"),
     ]
 
 
+def test_build_compartment_set_loads_shared_morphologies_once():
+    neuron_set = MagicMock()
+    neuron_set.block.get_neuron_ids.return_value = {"pop": [1, 2, 3]}
+    locations_block = MagicMock()
+    locations_block.points_on.return_value = pd.DataFrame({"section_id": [3], "offset": [0.5]})
+    circuit = MagicMock()
+    circuit.get_morphology_path.side_effect = ["a.h5", "b.h5", "a.h5"]
+    circuit.load_morphology_file.side_effect = lambda path: f"morphology {path}"
+
+    result = build_compartment_set_for_neuron_set(
+        name="target",
+        circuit=circuit,
+        node_population="pop",
+        population="pop",
+        neuron_set=neuron_set,
+        locations_block=locations_block,
+    )
+
+    assert sorted(c.args for c in circuit.load_morphology_file.call_args_list) == [
+        ("a.h5",),
+        ("b.h5",),
+    ]
+    assert [c.args for c in locations_block.points_on.call_args_list] == [
+        ("morphology a.h5",),
+        ("morphology b.h5",),
+        ("morphology a.h5",),
+    ]
+    np.testing.assert_array_equal(result.node_ids, [1, 2, 3])
+
+
+def test_compartment_set_validates_columns():
+    with pytest.raises(ValueError, match="equal lengths"):
+        MaterializedCompartmentSet(name="target", population="pop", node_ids=[1], offsets=[0.5])
+    with pytest.raises(ValueError, match="between 0 and 1"):
+        MaterializedCompartmentSet(
+            name="target", population="pop", node_ids=[1], section_ids=[2], offsets=[1.5]
+        )
+
+
+def test_write_compartment_sets_from_arrays(tmp_path):
+    rng = np.random.default_rng(0)
+    compartment_sets = [
+        MaterializedCompartmentSet(
+            name="target",
+            population="pop",
+            node_ids=rng.integers(0, 5, 50),
+            section_ids=rng.integers(0, 3, 50),
+            offsets=rng.choice([0.1, 0.25, 1 / 3], 50),
+        ),
+        MaterializedCompartmentSet(name="empty", population="pop"),
+    ]
+    circuit = MagicMock()
+
+    output = write_circuit_compartment_set_file(
+        circuit, str(tmp_path), compartment_sets=compartment_sets, file_name="sets.json"
+    )
+
+    assert json.loads(output.read_text()) == {
+        **compartment_sets[0].to_sonata_dict(),
+        **compartment_sets[1].to_sonata_dict(),
+    }
+
+
 def test_materialization_without_stimuli_returns_empty():
     assert (
         materialize_locations_to_compartment_sets(
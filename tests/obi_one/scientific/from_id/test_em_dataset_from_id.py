@@ -1,11 +1,14 @@
 from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
+import numpy as np
+import pandas as pd
 import pytest
 import requests
 
 from obi_one.config import settings
 from obi_one.core.exception import OBIONEError
+from obi_one.scientific.from_id import em_dataset_from_id as test_module
 from obi_one.scientific.from_id.em_dataset_from_id import (
     EMDataSetFromID,
     _configure_caveclient_retries,
@@ -90,3 +93,113 @@ class TestGracefulMaterializeErrors:
             pytest.raises(ValueError, match="unrelated"),
         ):
             ds.get_versions()
+
+
+class FakeCAVEClient:
+    """Offline CAVE client serving synapse queries from a Parquet file."""
+
+    def __init__(self, synapses_file):
+        self.synapse_queries = []
+        self.info = SimpleNamespace(viewer_resolution=lambda: np.array([4.0, 4.0, 40.0]))
+        self.materialize = SimpleNamespace(
+            synapse_table="synapses",
+            synapse_query=self._synapse_query,
+            get_table_metadata=lambda _table: {"notice_text": "synapse-notice"},
+        )
+        self._synapses_file = synapses_file
+
+    def _synapse_query(self, post_ids):
+        self.synapse_queries.append(list(post_ids))
+        syns = pd.read_parquet(self._synapses_file)
+        return syns[syns["post_pt_root_id"].isin(post_ids)].reset_index(drop=True)
+
+
+@pytest.fixture
+def fake_cave_client(tmp_path):
+    synapses_file = tmp_path / "synapses.parquet"
+    pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4],
+            "pre_pt_root_id": [9, 8, 9, 7],
+            "post_pt_root_id": [111, 222, 111, 333],
+            "post_pt_position": [np.array([1000, 2000, 100]) * (i + 1) for i in range(4)],
+        }
+    ).to_parquet(synapses_file)
+    return FakeCAVEClient(synapses_file)
+
+
+@pytest.fixture
+def cave_query_cache_settings(tmp_path, monkeypatch):
+    cache_settings = settings.cave_query_cache.model_copy(
+        update={"enabled": True, "cache_dir": tmp_path / "cache", "batch_size": 2}
+    )
+    monkeypatch.setattr(settings, "cave_query_cache", cache_settings)
+    return cache_settings
+
+
+def _synapse_info_df(fake_cave_client, pt_root_id, method="synapse_info_df"):
+    ds = _make_dataset()
+    with (
+        patch.object(EMDataSetFromID, "entity", return_value=SimpleNamespace(cave_datastack="ds")),
+        patch.object(EMDataSetFromID, "_make_cave_client", return_value=fake_cave_client) as mock,
+    ):
+        if method == "prefetch_synapses":
+            return ds.prefetch_synapses(pt_root_id, 3), mock.call_count
+        return ds.synapse_info_df(pt_root_id, 3, col_location="post_pt_position"), mock.call_count
+
+
+class TestCAVEQueryCache:
+    def test_synapse_info_df_without_cache(self, fake_cave_client):
+        (syns, notice), _ = _synapse_info_df(fake_cave_client, 111)
+        assert notice == "synapse-notice"
+        assert syns["id"].tolist() == [1, 3]
+        assert syns.index.name == "synapse_id"
+        np.testing.assert_allclose(syns["synapse_x"], [4.0, 12.0])
+        np.testing.assert_allclose(syns["synapse_z"], [4.0, 12.0])
+
+        _synapse_info_df(fake_cave_client, 111)
+        assert fake_cave_client.synapse_queries == [[111], [111]]
+
+    @pytest.mark.usefixtures("cave_query_cache_settings")
+    def test_synapse_info_df_cached(self, fake_cave_client):
+        (syns, notice), _ = _synapse_info_df(fake_cave_client, 111)
+        (cached_syns, cached_notice), n_clients = _synapse_info_df(fake_cave_client, 111)
+
+        assert fake_cave_client.synapse_queries == [[111]]
+        assert n_clients == 0  # Neither synapses nor viewer resolution need a CAVE client
+        assert cached_notice == notice == "synapse-notice"
+        pd.testing.assert_frame_equal(
+            cached_syns.drop(columns="post_pt_position"), syns.drop(columns="post_pt_position")
+        )
+        np.testing.assert_array_equal(
+            np.stack(cached_syns["post_pt_position"]), np.stack(syns["post_pt_position"])
+        )
+
+    def test_prefetch_synapses_batched(self, fake_cave_client, cave_query_cache_settings):
+        _synapse_info_df(fake_cave_client, [111, 222, 333, 111], method="prefetch_synapses")
+        assert fake_cave_client.synapse_queries == [[111, 222], [333]]
+
+        (syns, _), _ = _synapse_info_df(fake_cave_client, [333, 222])
+        assert syns["id"].tolist() == [4, 2]
+        assert len(fake_cave_client.synapse_queries) == 2
+
+        cache = test_module.CAVEQueryCache(cave_query_cache_settings.cache_dir)
+        assert cache.has_synapses("ds", 3, 111)
+        assert not cache.has_synapses("ds", 4, 111)
+
+    def test_prefetch_synapses_disabled(self, fake_cave_client):
+        _synapse_info_df(fake_cave_client, [111, 222], method="prefetch_synapses")
+        assert fake_cave_client.synapse_queries == []
+
+    def test_prefetch_synapses_row_limit(
+        self, fake_cave_client, cave_query_cache_settings, monkeypatch
+    ):
+        monkeypatch.setattr(cave_query_cache_settings, "query_row_limit", 2)
+        _synapse_info_df(fake_cave_client, [111, 222, 333], method="prefetch_synapses")
+        # Batches hitting the row limit are split, single neurons hitting it are not cached
+        assert fake_cave_client.synapse_queries == [[111, 222], [111], [222], [333]]
+
+        cache = test_module.CAVEQueryCache(cave_query_cache_settings.cache_dir)
+        assert not cache.has_synapses("ds", 3, 111)
+        assert cache.has_synapses("ds", 3, 222)
+        assert cache.has_synapses("ds", 3, 333)
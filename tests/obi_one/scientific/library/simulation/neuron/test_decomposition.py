@@ -0,0 +1,134 @@
+import json
+import shutil
+
+import h5py
+import libsonata
+import numpy as np
+import pytest
+
+from obi_one.scientific.library.simulation.neuron import decomposition as test_module
+
+from tests.utils import DATA_DIR
+
+
+@pytest.fixture
+def simulation_config(tmp_path):
+    """Circuit of 4 cells; 0 has the largest morphology, 3 has none, 1 has 100 afferent synapses."""
+    (tmp_path / "swc").mkdir()
+    (tmp_path / "h5").mkdir()
+    shutil.copy(DATA_DIR / "cell_morphology.swc", tmp_path / "swc" / "large.swc")
+    shutil.copy(DATA_DIR / "ch150801A1.h5", tmp_path / "h5" / "small.h5")
+
+    with h5py.File(tmp_path / "nodes.h5", "w") as h5f:
+        population = h5f.create_group("nodes/popA")
+        population.create_dataset("node_type_id", data=np.full(4, -1, dtype=np.int64))
+        population.create_dataset(
+            "0/morphology", data=["large", "small", "small", "missing"], dtype=h5py.string_dtype()
+        )
+        population.create_dataset(
+            "0/model_type", data=["biophysical"] * 4, dtype=h5py.string_dtype()
+        )
+
+    with h5py.File(tmp_path / "edges.h5", "w") as h5f:
+        population = h5f.create_group("edges/popA__popA")
+        population.create_dataset("source_node_id", data=np.zeros(100, dtype=np.uint64))
+        population["source_node_id"].attrs["node_population"] = "popA"
+        population.create_dataset("target_node_id", data=np.ones(100, dtype=np.uint64))
+        population["target_node_id"].attrs["node_population"] = "popA"
+        population.create_dataset("edge_type_id", data=np.full(100, -1, dtype=np.int64))
+        population.create_group("0")
+    libsonata.EdgePopulation.write_indices(str(tmp_path / "edges.h5"), "popA__popA", 4, 4)
+
+    circuit_config = {
+        "version": 2,
+        "networks": {
+            "nodes": [
+                {
+                    "nodes_file": str(tmp_path / "nodes.h5"),
+                    "populations": {
+                        "popA": {
+                            "type": "biophysical",
+                            "morphologies_dir": str(tmp_path / "swc"),
+                            "biophysical_neuron_models_dir": str(tmp_path),
+                            "alternate_morphologies": {"h5v1": str(tmp_path / "h5")},
+                        }
+                    },
+                }
+            ],
+            "edges": [
+                {
+                    "edges_file": str(tmp_path / "edges.h5"),
+                    "populations": {"popA__popA": {"type": "chemical"}},
+                }
+            ],
+        },
+    }
+    (tmp_path / "circuit_config.json").write_text(json.dumps(circuit_config))
+    (tmp_path / "node_sets.json").write_text(
+        json.dumps({"All": {"population": "popA", "node_id": [0, 1, 2, 3]}})
+    )
+    config = {
+        "network": str(tmp_path / "circuit_config.json"),
+        "node_sets_file": "node_sets.json",
+        "node_set": "All",
+        "run": {"tstop": 1, "dt": 0.025, "random_seed": 1},
+    }
+    path = tmp_path / "simulation_config.json"
+    path.write_text(json.dumps(config))
+    return path
+
+
+def test_estimate_cell_costs(simulation_config, monkeypatch):
+    monkeypatch.setattr(test_module.settings.neuron_simulation, "synapse_cost", 0.1)
+    population, node_ids, costs = test_module.estimate_cell_costs(simulation_config)
+
+    assert population == "popA"
+    assert node_ids == [0, 1, 2, 3]
+    # sections + soma, +0.1 per synapse, the median for the missing morphology
+    np.testing.assert_allclose(costs, [377.0, 190.0 + 10.0, 190.0, 190.0])
+
+
+def test_lpt_partition():
+    bins = test_module.lpt_partition(np.array([1.0, 7.0, 3.0, 3.0, 2.0, 4.0]), 3)
+
+    assert [b.tolist() for b in bins] == [[1], [0, 4, 5], [2, 3]]
+    assert [b.tolist() for b in test_module.lpt_partition(np.array([1.0]), 2)] == [[0], []]
+
+
+def test_get_max_number_of_processes(monkeypatch):
+    monkeypatch.setattr(test_module.os, "sched_getaffinity", lambda _: set(range(8)))
+
+    monkeypatch.setattr(test_module.settings.neuron_simulation, "max_mpi_processes", 4)
+    assert test_module.get_max_number_of_processes() == 4
+    monkeypatch.setattr(test_module.settings.neuron_simulation, "max_mpi_processes", 32)
+    assert test_module.get_max_number_of_processes() == 8
+    monkeypatch.setattr(test_module.settings.neuron_simulation, "max_mpi_processes", None)
+    assert test_module.get_max_number_of_processes() == 8
+
+
+def test_get_number_of_processes(monkeypatch):
+    monkeypatch.setattr(test_module.os, "sched_getaffinity", lambda _: set(range(64)))
+    monkeypatch.setattr(test_module.settings.neuron_simulation, "max_mpi_processes", 32)
+    monkeypatch.setattr(test_module.settings.neuron_simulation, "memory_per_mpi_process_gb", 0.0001)
+
+    assert test_module.get_number_of_processes(np.array([])) == 1
+    assert test_module.get_number_of_processes(np.ones(3)) == 3
+    assert test_module.get_number_of_processes(np.ones(300)) == 32
+    # more processes than 4 would not be faster than the most expensive cell alone
+    assert test_module.get_number_of_processes(np.array([10.0] + [1.0] * 30)) == 4
+
+    monkeypatch.setattr(test_module.settings.neuron_simulation, "memory_per_mpi_process_gb", 1e9)
+    assert test_module.get_number_of_processes(np.ones(300)) == 1
+
+
+def test_decompose_simulation(simulation_config, tmp_path, monkeypatch):
+    monkeypatch.setattr(test_module.os, "sched_getaffinity", lambda _: set(range(8)))
+    monkeypatch.setattr(test_module.settings.neuron_simulation, "max_mpi_processes", 2)
+    monkeypatch.setattr(test_module.settings.neuron_simulation, "memory_per_mpi_process_gb", 0.0001)
+    decomposition = test_module.decompose_simulation(simulation_config)
+
+    assert decomposition.number_of_processes == 2
+    assert decomposition.ranks == [[0, 3], [1, 2]]
+
+    path = decomposition.write(tmp_path / "decomposition.json")
+    assert test_module.CellDecomposition.model_validate_json(path.read_text()) == decomposition
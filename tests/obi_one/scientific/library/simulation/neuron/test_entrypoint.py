@@ -110,6 +110,7 @@ def test_main_calls_run_when_config_exists(monkeypatch, tmp_path):
     assert called["simulation_config"] == str(config_path)
     assert called["simulator"] == "bluecellulab"
     assert called["libnrnmech_path"] == "lib.so"
+    assert called["decomposition_file"] is None
 
 
 def test_distribute_cells_splits_ids_across_ranks(monkeypatch, tmp_path):
@@ -130,6 +131,26 @@ def test_distribute_cells_splits_ids_across_ranks(monkeypatch, tmp_path):
     assert sorted(all_gids) == list(range(10))
 
 
+def test_distribute_cells_from_decomposition_file(tmp_path):
+    decomposition_file = tmp_path / "decomposition.json"
+    decomposition_file.write_text('{"population": "popA", "ranks": [[0, 3], [1, 2, 4]]}')
+
+    n0, rank0 = test_module._distribute_cells(
+        {}, tmp_path / "cfg.json", 0, 2, decomposition_file=decomposition_file
+    )
+    n1, rank1 = test_module._distribute_cells(
+        {}, tmp_path / "cfg.json", 1, 2, decomposition_file=decomposition_file
+    )
+    assert n0 == n1 == 5
+    assert rank0 == [("popA", 0), ("popA", 3)]
+    assert rank1 == [("popA", 1), ("popA", 2), ("popA", 4)]
+
+    with pytest.raises(RuntimeError, match="Decomposition is for 2 ranks, running on 3"):
+        test_module._distribute_cells(
+            {}, tmp_path / "cfg.json", 0, 3, decomposition_file=decomposition_file
+        )
+
+
 def test_distribute_cells_missing_nodeset_raises(monkeypatch, tmp_path):
     cfg = tmp_path / "cfg.json"
     cfg.write_text("{}")
@@ -144,45 +165,47 @@ def test_distribute_cells_missing_nodeset_raises(monkeypatch, tmp_path):
         test_module._distribute_cells(fake_load_json(cfg), cfg, 0, 1)
 
 
-def test_gather_results_collects_and_gathers(monkeypatch):
+def test_write_reports_writes_from_each_rank(monkeypatch):
     calls = {}
 
-    def fake_collect_local_payload(cells, cell_ids, recording_index):
-        calls["payload_in"] = (cells, cell_ids, recording_index)
-        return {"payload": 1}
-
     def fake_collect_local_spikes(sim, cell_ids):
         calls["spikes_in"] = (sim, cell_ids)
-        return {"spikes": 2}
-
-    def fake_gather_payload_to_rank0(parallel_context, local_payload, local_spikes):
-        calls["gather_in"] = (parallel_context, local_payload, local_spikes)
-        return [{"merged": 3}], {"popA": {1: [0.1]}}
+        return {"popA": {1: [0.1]}}
 
-    monkeypatch.setattr(test_module, "collect_local_payload", fake_collect_local_payload)
     monkeypatch.setattr(test_module, "collect_local_spikes", fake_collect_local_spikes)
-    monkeypatch.setattr(test_module, "gather_payload_to_rank0", fake_gather_payload_to_rank0)
 
-    class _PC:
-        @staticmethod
-        def py_gather(obj, root):
-            assert root == 0
-            return [obj]
+    def fake_write_compartment_reports(**kwargs):
+        calls["reports"] = kwargs
 
-    process = SimpleNamespace(parallel_context=_PC())
-    sim = SimpleNamespace(cells={"k": "v"})
+    def fake_write_spike_report(**kwargs):
+        calls["spikes"] = kwargs
+
+    monkeypatch.setattr(test_module, "write_compartment_reports", fake_write_compartment_reports)
+    monkeypatch.setattr(test_module, "write_spike_report", fake_write_spike_report)
+
+    process = SimpleNamespace(parallel_context=object())
+    sim = SimpleNamespace(
+        cells={"k": "v"}, dt=0.025, circuit_access=SimpleNamespace(config="config")
+    )
 
-    gathered_sites, all_payload, all_spikes = test_module._gather_results(
+    test_module._write_reports(
         sim=sim,
         cell_ids_for_this_rank=[("popA", 1)],
         process=process,
-        recording_index={"r": 1},
         local_sites_index={"site": 1},
     )
 
-    assert gathered_sites == [{"site": 1}]
-    assert all_payload == [{"merged": 3}]
-    assert all_spikes == {"popA": {1: [0.1]}}
-    assert calls["payload_in"] == (sim.cells, [("popA", 1)], {"r": 1})
     assert calls["spikes_in"] == (sim, [("popA", 1)])
-    assert calls["gather_in"] == (process.parallel_context, {"payload": 1}, {"spikes": 2})
+    assert calls["reports"] == {
+        "config": "config",
+        "sim_dt": 0.025,
+        "cells": sim.cells,
+        "sites_index": {"site": 1},
+        "parallel_context": process.parallel_context,
+    }
+    assert calls["spikes"] == {
+        "config": "config",
+        "sim_dt": 0.025,
+        "spikes": {"popA": {1: [0.1]}},
+        "parallel_context": process.parallel_context,
+    }
@@ -0,0 +1,101 @@
+from unittest.mock import patch
+
+import pytest
+
+from obi_one.config import settings
+from obi_one.scientific.library.simulation.neuron import mechanism_cache as test_module, process
+from obi_one.scientific.library.simulation.neuron.schemas import NeuronMechanismBuild
+from obi_one.types import SimulationBackend
+
+
+@pytest.fixture
+def mech_dir(tmp_path):
+    # Avoid probing the local compiler toolchain
+    with patch.object(test_module, "toolchain_fingerprint", return_value="toolchain"):
+        yield _create_mech_dir(tmp_path)
+
+
+def _create_mech_dir(tmp_path):
+    mech_dir = tmp_path / "mech"
+    mech_dir.mkdir()
+    (mech_dir / "a.mod").write_text("NEURON { SUFFIX a }")
+    return mech_dir
+
+
+def _fake_compile(calls):
+    def compile_func(*, output_dir, mechanisms_dir, simulation_backend):
+        calls.append((output_dir, mechanisms_dir, simulation_backend))
+        so_file = output_dir / "x86_64" / "libnrnmech.so"
+        so_file.parent.mkdir(parents=True)
+        so_file.write_text("dummy")
+        return NeuronMechanismBuild(libnrnmech_path=so_file)
+
+    return compile_func
+
+
+def test_mechanisms_hash(mech_dir):
+    backend = SimulationBackend.bluecellulab
+    hash_1 = test_module.mechanisms_hash(mech_dir, backend)
+    assert hash_1 == test_module.mechanisms_hash(mech_dir, backend)
+    assert hash_1 != test_module.mechanisms_hash(mech_dir, SimulationBackend.neurodamus)
+
+    (mech_dir / "a.mod").write_text("NEURON { SUFFIX b }")
+    assert hash_1 != test_module.mechanisms_hash(mech_dir, backend)
+
+
+def test_get_or_compile(mech_dir, tmp_path):
+    cache = test_module.MechanismBuildCache(tmp_path / "cache")
+    calls = []
+
+    build_1 = cache.get_or_compile(
+        mechanisms_dir=mech_dir,
+        simulation_backend=SimulationBackend.bluecellulab,
+        compile_func=_fake_compile(calls),
+    )
+    build_2 = cache.get_or_compile(
+        mechanisms_dir=mech_dir,
+        simulation_backend=SimulationBackend.bluecellulab,
+        compile_func=_fake_compile(calls),
+    )
+
+    assert len(calls) == 1
+    assert isinstance(build_2, NeuronMechanismBuild)
+    assert build_2 == build_1
+    assert build_2.libnrnmech_path.is_relative_to(tmp_path / "cache")
+
+    (mech_dir / "b.mod").write_text("NEURON { SUFFIX b }")
+    build_3 = cache.get_or_compile(
+        mechanisms_dir=mech_dir,
+        simulation_backend=SimulationBackend.bluecellulab,
+        compile_func=_fake_compile(calls),
+    )
+    assert len(calls) == 2
+    assert build_3 != build_1
+
+
+def test_from_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings.mechanism_build_cache, "enabled", False)
+    assert test_module.MechanismBuildCache.from_settings() is None
+
+    monkeypatch.setattr(settings.mechanism_build_cache, "enabled", True)
+    monkeypatch.setattr(settings.mechanism_build_cache, "cache_dir", tmp_path)
+    assert isinstance(
+        test_module.MechanismBuildCache.from_settings(), test_module.MechanismBuildCache
+    )
+
+
+def test_compile_mechanisms_uses_cache(monkeypatch, mech_dir, tmp_path):
+    monkeypatch.setattr(settings.mechanism_build_cache, "enabled", True)
+    monkeypatch.setattr(settings.mechanism_build_cache, "cache_dir", tmp_path / "cache")
+    calls = []
+    monkeypatch.setattr(process, "_compile_mechanisms", _fake_compile(calls))
+
+    for _ in range(2):
+        mechanism_build = process.compile_mechanisms(
+            output_dir=tmp_path / "output",
+            mechanisms_dir=mech_dir,
+            simulation_backend=SimulationBackend.bluecellulab,
+        )
+
+    assert len(calls) == 1
+    assert mechanism_build.libnrnmech_path.is_relative_to(tmp_path / "cache")
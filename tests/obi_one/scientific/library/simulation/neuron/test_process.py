@@ -1,8 +1,11 @@
+from pathlib import Path
 from unittest.mock import patch
 
+import numpy as np
 import pytest
 
 from obi_one.scientific.library.simulation.neuron import process as test_module
+from obi_one.scientific.library.simulation.neuron.decomposition import CellDecomposition
 from obi_one.scientific.library.simulation.neuron.schemas import (
     BluecellulabSimulationParameters,
     NeurodamusMechanismBuild,
@@ -31,12 +34,21 @@ def _neurodamus_mechanism_build(tmp_path):
     )
 
 
-def test_get_number_of_mpi_processes():
-    assert test_module._get_number_of_mpi_processes(0) == 1
-    assert test_module._get_number_of_mpi_processes(1) == 1
-    assert test_module._get_number_of_mpi_processes(2) == 1
-    assert test_module._get_number_of_mpi_processes(5) == 2
-    assert test_module._get_number_of_mpi_processes(10) == 4  # clamped at 4
+@patch("obi_one.scientific.library.simulation.neuron.process.get_number_of_processes")
+@patch("obi_one.scientific.library.simulation.neuron.process.estimate_cell_costs")
+def test_get_number_of_mpi_processes(mock_estimate, mock_get_number, tmp_path):
+    costs = np.array([3.0, 1.0])
+    mock_estimate.return_value = ("popA", [0, 1], costs)
+    mock_get_number.return_value = 2
+
+    assert test_module._get_number_of_mpi_processes(tmp_path / "config.json") == 2
+    mock_estimate.assert_called_once_with(tmp_path / "config.json")
+    mock_get_number.assert_called_once_with(costs)
+
+
+def test_max_mpi_processes_follows_settings():
+    # Parallel simulation tasks reserve as many cores as a simulation may use MPI processes
+    assert test_module.get_max_number_of_processes() == test_module.MAX_MPI_PROCESSES
 
 
 def test_collect_simulation_outputs(tmp_path):
@@ -104,8 +116,9 @@ def test_run_simulation_neurodamus(mock_collect, mock_run, tmp_path):
     assert results == expected_results
 
 
+@patch("obi_one.scientific.library.simulation.neuron.process.decompose_simulation")
 @patch("obi_one.scientific.library.simulation.neuron.process.run_and_log")
-def test_run_bluecellulab_simulation(mock_run_and_log, tmp_path):
+def test_run_bluecellulab_simulation(mock_run_and_log, mock_decompose, tmp_path):
     mechanism_build = _neuron_mechanism_build(tmp_path)
     parameters = BluecellulabSimulationParameters(
         number_of_cells=4,
@@ -113,12 +126,24 @@ def test_run_bluecellulab_simulation(mock_run_and_log, tmp_path):
         stop_time=0.1,
         mechanism_build=mechanism_build,
     )
+    mock_decompose.return_value = CellDecomposition(population="popA", ranks=[[0, 3], [1, 2]])
+
+    def _check_decomposition_file(cmd):
+        path = Path(cmd[cmd.index("--decomposition-file") + 1])
+        assert CellDecomposition.model_validate_json(path.read_text(encoding="utf-8")).ranks == [
+            [0, 3],
+            [1, 2],
+        ]
+
+    mock_run_and_log.side_effect = _check_decomposition_file
     test_module._run_bluecellulab_simulation(
         parameters,
         tmp_path / "entry.py",
     )
+    mock_decompose.assert_called_once_with(parameters.config_file)
     mock_run_and_log.assert_called_once()
     call_cmd = mock_run_and_log.call_args[0][0]
+    decomposition_file = call_cmd[call_cmd.index("--decomposition-file") + 1]
     assert call_cmd == [
         "mpiexec",
         "-n",
@@ -131,12 +156,18 @@ def test_run_bluecellulab_simulation(mock_run_and_log, tmp_path):
         str(mechanism_build.libnrnmech_path),
         "--simulation-backend",
         "bluecellulab",
+        "--decomposition-file",
+        decomposition_file,
         "--save-nwb",
     ]
 
 
+@patch(
+    "obi_one.scientific.library.simulation.neuron.process._get_number_of_mpi_processes",
+    return_value=2,
+)
 @patch("obi_one.scientific.library.simulation.neuron.process.run_and_log")
-def test_run_neurodamus_simulation(mock_run_and_log, monkeypatch, tmp_path):
+def test_run_neurodamus_simulation(mock_run_and_log, mock_number, monkeypatch, tmp_path):
     monkeypatch.setenv("NEURODAMUS_PYTHON", "/opt/neurodamus")
     mechanism_build = _neurodamus_mechanism_build(tmp_path)
     parameters = NeurodamusSimulationParameters(
@@ -148,6 +179,8 @@ def test_run_neurodamus_simulation(mock_run_and_log, monkeypatch, tmp_path):
 
     test_module._run_neurodamus_simulation(parameters)
 
+    mock_number.assert_called_once_with(parameters.config_file)
+
     mock_run_and_log.assert_called_once()
     call_cmd = mock_run_and_log.call_args[0][0]
     assert call_cmd == [
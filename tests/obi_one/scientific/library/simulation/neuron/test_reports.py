@@ -0,0 +1,202 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import h5py
+import libsonata
+import numpy as np
+import pytest
+
+from obi_one.scientific.library.simulation.neuron import reports as test_module
+
+
+class _ThreadParallelContext:
+    """Collectives of a NEURON ParallelContext, between threads standing for the ranks."""
+
+    def __init__(self, rank, slots, barrier):
+        self.rank = rank
+        self.slots = slots
+        self.barrier_ = barrier
+
+    def id(self):
+        return self.rank
+
+    def barrier(self):
+        self.barrier_.wait()
+
+    def py_gather(self, obj, root):
+        self.slots[self.rank] = obj
+        self.barrier()
+        result = list(self.slots) if self.rank == root else None
+        self.barrier()
+        return result
+
+    def py_broadcast(self, obj, root):
+        if self.rank == root:
+            self.slots[root] = obj
+        self.barrier()
+        result = self.slots[root]
+        self.barrier()
+        return result
+
+
+def _run_ranks(function, kwargs_per_rank):
+    size = len(kwargs_per_rank)
+    slots, barrier = [None] * size, threading.Barrier(size)
+    with ThreadPoolExecutor(size) as executor:
+        futures = [
+            executor.submit(
+                function, parallel_context=_ThreadParallelContext(rank, slots, barrier), **kwargs
+            )
+            for rank, kwargs in enumerate(kwargs_per_rank)
+        ]
+        for future in futures:
+            future.result()
+
+
+def _trace(node_id, section_id):
+    return np.arange(11, dtype=np.float64) + 100 * node_id + section_id
+
+
+@pytest.fixture
+def config(tmp_path):
+    reports = {
+        "soma": {
+            "type": "compartment",
+            "cells": "All",
+            "start_time": 0.0,
+            "end_time": 1.0,
+            "dt": 0.2,
+        },
+        "lfp": {"type": "lfp", "cells": "All"},
+    }
+    return SimpleNamespace(
+        get_report_entries=lambda: reports,
+        get_node_sets=lambda: {"All": {"population": "popA"}},
+        get_compartment_sets=dict,
+        report_file_path=lambda _cfg, name: tmp_path / f"{name}.h5",
+        spikes_file_path=tmp_path / "out.h5",
+        tstart=0.0,
+        tstop=1.0,
+    )
+
+
+def _rank_cells(node_sections):
+    cells, sites_index = {}, {}
+    for node_id, section_ids in node_sections.items():
+        cell_id = ("popA", node_id)
+        traces = {f"v_{s}": _trace(node_id, s) for s in section_ids}
+        cells[cell_id] = SimpleNamespace(get_recording=traces.__getitem__)
+        sites_index[cell_id] = [
+            {"report": "soma", "rec_name": f"v_{s}", "section_id": s} for s in section_ids
+        ]
+    return cells, sites_index
+
+
+def test_get_report_window():
+    time, window = test_module.get_report_window(
+        {"start_time": 0.5, "end_time": 5.0, "dt": 0.2}, 0.1, 0.0, 2.0
+    )
+    np.testing.assert_allclose(time, [0.5, 2.0, 0.2])
+    assert window == slice(5, 20, 2)
+
+    with pytest.raises(ValueError, match="not an integer multiple"):
+        test_module.get_report_window({"dt": 0.15}, 0.1, 0.0, 2.0)
+
+
+def test_write_compartment_reports(config, tmp_path):
+    # rank 1 has no recorded cells, the cells of rank 2 precede those of rank 0 in node id
+    ranks = [_rank_cells({3: [5, 1]}), _rank_cells({}), _rank_cells({2: [0], 0: [0]})]
+    _run_ranks(
+        test_module.write_compartment_reports,
+        [
+            {"config": config, "sim_dt": 0.1, "cells": cells, "sites_index": sites_index}
+            for cells, sites_index in ranks
+        ],
+    )
+
+    assert not (tmp_path / "lfp.h5").exists()
+    with h5py.File(tmp_path / "soma.h5") as h5f:
+        mapping = h5f["report/popA/mapping"]
+        assert mapping["node_ids"][:].tolist() == [3, 0, 2]
+        assert mapping["index_pointers"][:].tolist() == [0, 2, 3, 4]
+        assert mapping["element_ids"][:].tolist() == [1, 5, 0, 0]
+        assert h5f["report/popA/data"].attrs["units"] == "mV"
+
+    report = libsonata.ElementReportReader(str(tmp_path / "soma.h5"))["popA"]
+    frame = report.get(node_ids=[0, 2, 3])
+    np.testing.assert_allclose(frame.times, [0.0, 0.2, 0.4, 0.6, 0.8])
+    for column, (node_id, section_id) in enumerate(frame.ids):
+        np.testing.assert_allclose(
+            np.asarray(frame.data)[:, column], _trace(node_id, section_id)[0:10:2]
+        )
+
+
+def test_write_compartment_reports_missing_recording(config, tmp_path):
+    cells, sites_index = _rank_cells({0: [0, 1], 1: [0]})
+    sites_index["popA", 0].append({"report": "soma", "rec_name": "missing", "section_id": 2})
+    sites_index["popA", 1] = [{"report": "soma", "rec_name": "missing", "section_id": 0}]
+    _run_ranks(
+        test_module.write_compartment_reports,
+        [{"config": config, "sim_dt": 0.1, "cells": cells, "sites_index": sites_index}],
+    )
+
+    with h5py.File(tmp_path / "soma.h5") as h5f:
+        mapping = h5f["report/popA/mapping"]
+        assert mapping["node_ids"][:].tolist() == [0]
+        assert mapping["index_pointers"][:].tolist() == [0, 2]
+        assert mapping["element_ids"][:].tolist() == [0, 1]
+
+
+@pytest.mark.parametrize(
+    ("report_cfg", "match"),
+    [
+        ({"type": "compartment"}, "'cells' must be specified"),
+        ({"type": "compartment", "cells": "All", "compartments": "some"}, "Invalid 'compartments'"),
+        ({"type": "compartment_set", "compartment_set": "cs", "cells": "All"}, "'cells' may not"),
+        ({"type": "compartment_set", "compartment_set": "cs", "sections": "soma"}, "'sections'"),
+        ({"type": "compartment_set", "compartment_set": "cs", "compartments": "all"}, "'compart"),
+    ],
+)
+def test_write_compartment_reports_invalid_config(config, report_cfg, match):
+    config.get_report_entries = lambda: {"invalid": report_cfg}
+    with pytest.raises(ValueError, match=match):
+        _run_ranks(
+            test_module.write_compartment_reports,
+            [{"config": config, "sim_dt": 0.1, "cells": {}, "sites_index": {}}],
+        )
+
+
+def test_write_compartment_reports_without_data(config, tmp_path):
+    _run_ranks(
+        test_module.write_compartment_reports,
+        [{"config": config, "sim_dt": 0.1, "cells": {}, "sites_index": {}}] * 2,
+    )
+
+    assert not (tmp_path / "soma.h5").exists()
+
+
+def test_write_spike_report(config, tmp_path, monkeypatch):
+    monkeypatch.setattr(test_module, "SPIKE_MERGE_BLOCK_SIZE", 2)
+    spikes = [
+        {"popA": {0: [0.5, 3.0], 4: [1.5]}, "popB": {0: []}},
+        {"popA": {1: [0.1, 2.0, 2.5]}},
+        {"popA": {2: []}},
+    ]
+    _run_ranks(
+        test_module.write_spike_report,
+        [{"config": config, "sim_dt": 0.1, "spikes": s} for s in spikes],
+    )
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["out.h5"]
+    reader = libsonata.SpikeReader(str(tmp_path / "out.h5"))
+    assert reader["popA"].sorting == "by_time"
+    assert reader["popA"].get() == [
+        (1, 0.1),
+        (0, 0.5),
+        (4, 1.5),
+        (1, 2.0),
+        (1, 2.5),
+        (0, 3.0),
+    ]
+    assert reader["popB"].get() == []
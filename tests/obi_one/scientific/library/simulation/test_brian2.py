@@ -9,6 +9,7 @@ import copy
 import json
 import math
 from pathlib import Path
+from types import SimpleNamespace
 
 import bluepysnap
 import brian2.units
@@ -152,6 +153,65 @@ def test_spike_replay(tmp_path):
         assert not spikes[i].any()
 
 
+def test_network_cache(tmp_path, monkeypatch):
+    monkeypatch.setitem(brian2.prefs, "codegen.runtime.cython.cache_dir", None)
+    timestamps = np.array([0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1, 1.1])
+    path = test_module._write_spikes(
+        tmp_path / "spikes.h5",
+        population_name="drosophila",
+        timestamps=timestamps,
+        node_ids=np.zeros(len(timestamps), dtype=int),
+    )
+    config = {
+        "run": {"tstop": 2, "dt": 0.1, "random_seed": 42},
+        "target_simulator": "Brian2",
+        "network": str(DATA / "circuit_config.json"),
+        "inputs": {
+            "replay": {
+                "input_type": "spikes",
+                "module": "synapse_replay",
+                "delay": 0.0,
+                "duration": 400.0,
+                "spike_file": str(path),
+                "node_set": "All",
+            },
+        },
+    }
+    config_path = tmp_path / "simulation_config.json"
+    config_path.write_text(json.dumps(config))
+
+    def _spikes(net):
+        return {k: v / brian2.units.ms for k, v in net.spike_monitor.spike_trains().items()}
+
+    expected = _spikes(test_module.run_sonata_brian2_trial(config_path))
+
+    cache = test_module.NetworkCache(tmp_path / "cache")
+    for _ in range(2):
+        net = test_module.run_sonata_brian2_trial(config_path, cache=cache)
+        npt.assert_equal(_spikes(net), expected)
+    assert len(list((tmp_path / "cache" / "connectivity").glob("*.npz"))) == 1
+    assert brian2.prefs["codegen.runtime.cython.cache_dir"] == str(tmp_path / "cache" / "cython")
+
+    # a new cache on the same directory loads the connectivity from disk; only the replay
+    # connectivity is read from the edges
+    read_connectivity = test_module._read_connectivity
+    reads = []
+
+    def _read(edge_pop, selection, synapse_template):
+        reads.append(edge_pop.name)
+        return read_connectivity(edge_pop, selection, synapse_template)
+
+    monkeypatch.setattr(test_module, "_read_connectivity", _read)
+    net = test_module.run_sonata_brian2_trial(
+        config_path, cache=test_module.NetworkCache(tmp_path / "cache")
+    )
+    npt.assert_equal(_spikes(net), expected)
+    assert len(reads) == 1
+
+    test_module.run_sonata_brian2_trial(config_path)
+    assert len(reads) == 3
+
+
 def test_poisson(tmp_path):
     config = {
         "run": {"tstop": 1, "dt": 0.1, "random_seed": 42},
@@ -172,14 +232,14 @@ def test_poisson(tmp_path):
     spike_monitor = _run_simulation(tmp_path, config)[1].spike_monitor
     spikes = dict(spike_monitor.spike_trains().items())
     assert len(spikes[0]) == 1
-    assert spikes[0] == [0.2] * brian2.units.ms
+    assert spikes[0] == [0.7] * brian2.units.ms
 
     # delay the onset of poisson stim
     config["inputs"]["poisson"]["delay"] = 0.1
     spike_monitor = _run_simulation(tmp_path, config)[1].spike_monitor
     spikes = dict(spike_monitor.spike_trains().items())
     assert len(spikes[0]) == 1
-    assert spikes[0] == [0.2 + 0.1] * brian2.units.ms
+    assert spikes[0] == [0.8] * brian2.units.ms
 
     # have duration too short to spike, delay reminas 0.1
     config["inputs"]["poisson"]["duration"] = 0.1
@@ -188,6 +248,47 @@ def test_poisson(tmp_path):
     assert len(spikes[0]) == 0
 
 
+def test_poisson_fragmented_node_set(tmp_path):
+    node_sets_path = tmp_path / "node_sets.json"
+    node_sets_path.write_text(json.dumps({"ends": {"population": "drosophila", "node_id": [0, 2]}}))
+    config = {
+        "run": {"tstop": 1, "dt": 0.1, "random_seed": 42},
+        "target_simulator": "Brian2",
+        "network": str(DATA / "circuit_config.json"),
+        "node_sets_file": str(node_sets_path),
+        "inputs": {
+            "poisson": {
+                "input_type": "spikes",
+                "module": "poisson",
+                "node_set": "ends",
+                "delay": 0.0,
+                "duration": 1000,
+                "rate": 1000,
+                "weight": 1000,
+            }
+        },
+    }
+    path = tmp_path / "simulation_config.json"
+    path.write_text(json.dumps(config))
+    simulation = bluepysnap.Simulation(path)
+
+    node_sets = test_module.NodeSetCache(simulation)
+    npt.assert_array_equal(node_sets.ids("ends"), [0, 2])
+    assert node_sets.ids("ends") is node_sets.ids("ends")
+
+    brian2.start_scope()
+    neurons = brian2.NeuronGroup(3, "v : volt")
+    poisson = test_module.InputPoisson(simulation.to_libsonata.input("poisson"), node_sets)
+    ops = poisson(0.0, SimpleNamespace(neurons=neurons))
+
+    # a single group of sources, and their synapses, for both node ranges
+    sources, synapses = ops.add
+    assert len(sources) == 2
+    npt.assert_array_equal(synapses.j[:], [0, 2])
+
+    assert poisson(1000.0, SimpleNamespace(neurons=neurons)).remove == [sources, synapses]
+
+
 def test_poisson_compartment_set_unsupported(tmp_path):
     config = {
         "run": {"tstop": 1, "dt": 0.1, "random_seed": 42},
@@ -284,6 +385,59 @@ def test_current_stim_groupby(tmp_path):
     assert 0 == len(spikes1[1]) == len(spikes1[2])
 
 
+def test_combined_currents(tmp_path):
+    linear = {
+        "input_type": "current_clamp",
+        "module": "linear",
+        "amp_start": 1,
+        "amp_end": 2,
+        "delay": 0.5,
+        "duration": 0.5,
+    }
+    pulse = {
+        "input_type": "current_clamp",
+        "module": "pulse",
+        "frequency": 2,
+        "amp_start": 3,
+        "width": 0.2,
+        "delay": 0,
+        "duration": 2,
+    }
+    config = {
+        "run": {"tstop": 2, "dt": 0.1, "random_seed": 42},
+        "target_simulator": "Brian2",
+        "network": str(DATA / "circuit_config.json"),
+        "inputs": {
+            "linear0": {**linear, "node_set": "0"},
+            "linear1": {**linear, "node_set": "0"},
+            "pulse": {**pulse, "node_set": "sugar"},
+        },
+    }
+    path = tmp_path / "simulation_config.json"
+    path.write_text(json.dumps(config))
+    simulation = bluepysnap.Simulation(path)
+    inputs = test_module.Inputs(simulation, test_module.NodeSetCache(simulation))
+
+    model, stims, indicators = inputs.update_model_and_get_stims("dv/dt = I_inj / nF : volt", 3)
+    assert "I_inj = stim(t, stim_index_0) + stim(t, stim_index_1) : amp" in model
+
+    # one zero column, one for the node set "0" (both linear ones summed), one for "sugar"
+    currents = stims["stim"].values
+    assert currents.shape == (21, 3)
+
+    # node 2 isn't stimulated, 1 only by the pulse, and 0 by the pulse and both linear ones
+    def node_current(node):
+        return sum(currents[:, index[node]] for index in indicators.values())
+
+    lin, pul = (
+        test_module._create_input(simulation.to_libsonata.input(name))._get_currents(0.1, 2)
+        for name in ("linear0", "pulse")
+    )
+    npt.assert_allclose(node_current(2), 0)
+    npt.assert_allclose(node_current(1), pul * 1e-9)
+    npt.assert_allclose(node_current(0), (2 * lin + pul) * 1e-9, rtol=1e-6)
+
+
 def test_linear_current_stim():
     config = {
         "run": {"tstop": 2, "dt": 0.1, "random_seed": 42},
@@ -433,6 +587,53 @@ def test_current_stim_report(tmp_path):
     npt.assert_allclose(soma1["drosophila", 0], soma0["drosophila", 0])
 
 
+def test_current_stim_report_window(tmp_path, monkeypatch):
+    report = {
+        "sections": "soma",
+        "type": "compartment",
+        "variable_name": "v",
+        "unit": "mV",
+    }
+    config = {
+        "run": {"tstop": 2, "dt": 0.1, "random_seed": 42},
+        "target_simulator": "Brian2",
+        "network": str(DATA / "circuit_config.json"),
+        "inputs": {
+            "linear": {
+                "input_type": "current_clamp",
+                "module": "linear",
+                "amp_start": 3000,
+                "delay": 0.1,
+                "duration": 4,
+                "node_set": "0",
+            }
+        },
+        "reports": {
+            "full": {**report, "dt": 0.1, "start_time": 0, "end_time": 5},
+            "window": {
+                **report,
+                "dt": 0.2,
+                "start_time": 0.4,
+                "end_time": 1.4,
+                "cells": "0",
+                "file_name": "window",
+            },
+        },
+    }
+    # flush every 2 frames of the `full` report, and every 6 of the `window` one
+    monkeypatch.setattr(test_module, "REPORT_BUFFER_BYTES", 8 * 6)
+    simulation, net = _run_simulation(tmp_path, config)
+
+    assert [len(r.monitor.t) for r in net.reports] == [0, 0]  # everything was flushed
+
+    full = simulation.reports["full"].filter().report
+    assert full.shape == (20, 3)
+
+    window = simulation.reports["window"].filter().report
+    npt.assert_allclose(window.index, [0.4, 0.6, 0.8, 1.0, 1.2])
+    npt.assert_allclose(window["drosophila", 0], full["drosophila", 0].iloc[4:13:2])
+
+
 def test_current_stim_report_failure(tmp_path):
     config: dict = {
         "run": {"tstop": 2, "dt": 0.1, "random_seed": 42},
@@ -462,7 +663,12 @@ def test_current_stim_report_failure(tmp_path):
         _run_simulation(tmp_path, c)
 
     c = copy.deepcopy(config)
-    c["reports"]["soma0"]["dt"] = 1
+    c["reports"]["soma0"]["dt"] = 0.15
+    with pytest.raises(RuntimeError):
+        _run_simulation(tmp_path, c)
+
+    c = copy.deepcopy(config)
+    c["reports"]["soma0"]["dt"] = 0.05
     with pytest.raises(RuntimeError):
         _run_simulation(tmp_path, c)
 
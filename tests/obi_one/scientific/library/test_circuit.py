@@ -1,9 +1,16 @@
+import json
 from types import SimpleNamespace
+from unittest.mock import MagicMock
 
 import pytest
 
 import obi_one as obi
 from obi_one.scientific.library import circuit as test_module
+from obi_one.scientific.library.sonata_circuit_helpers import (
+    add_node_set_to_circuit,
+    clear_sonata_circuit_cache,
+    is_shared_sonata_circuit,
+)
 
 from tests.utils import CIRCUIT_DIR
 
@@ -423,3 +430,64 @@ def test_circuit_resolves_morphology_name_that_already_includes_directory(monkey
     circuit = test_module.Circuit(name="c1", path=str(cfg))
 
     assert circuit.get_morphology_path(node_id=0, population="All") == morph_path
+
+
+def test_sonata_circuit_is_shared_and_invalidated_on_config_change(tmp_path):
+    circuit_dir = CIRCUIT_DIR / "nbS1-O1-E2Sst-maxNsyn-HEX0-L5"
+    cfg_dict = json.loads((circuit_dir / "circuit_config.json").read_text())
+    cfg_dict["manifest"] = {"$BASE_DIR": str(circuit_dir)}
+    cfg = tmp_path / "circuit_config.json"
+    cfg.write_text(json.dumps(cfg_dict))
+
+    circuit = obi.Circuit(name="c1", path=str(cfg))
+    sonata_circuit = circuit.sonata_circuit
+    assert circuit.sonata_circuit is sonata_circuit
+    assert obi.Circuit(name="c2", path=str(cfg)).sonata_circuit is sonata_circuit
+
+    # Modified config invalidates the cached object
+    cfg.write_text(json.dumps(cfg_dict, indent=2))
+    assert circuit.sonata_circuit is not sonata_circuit
+
+    clear_sonata_circuit_cache()
+    assert not is_shared_sonata_circuit(sonata_circuit)
+
+
+def test_writable_sonata_circuit_copy_isolates_node_sets():
+    circuit = obi.Circuit(
+        name="nbS1-O1-E2Sst-maxNsyn-HEX0-L5",
+        path=str(CIRCUIT_DIR / "nbS1-O1-E2Sst-maxNsyn-HEX0-L5" / "circuit_config.json"),
+    )
+    shared = circuit.sonata_circuit
+    pop = circuit.default_population_name
+
+    with pytest.raises(ValueError, match="shared SONATA circuit"):
+        add_node_set_to_circuit(shared, {"__new__": {"population": pop}})
+
+    writable = circuit.writable_sonata_circuit()
+    assert writable is not shared
+    add_node_set_to_circuit(writable, {"__new__": {"population": pop}})
+
+    assert "__new__" in writable.node_sets.content
+    assert "__new__" not in shared.node_sets.content
+    assert len(writable.nodes[pop].ids("__new__")) == shared.nodes[pop].size
+
+    # Copies are independent of each other
+    assert "__new__" not in circuit.writable_sonata_circuit().node_sets.content
+
+
+def test_writable_sonata_circuit_copy_does_not_reparse_config(monkeypatch):
+    circuit = obi.Circuit(
+        name="nbS1-O1-E2Sst-maxNsyn-HEX0-L5",
+        path=str(CIRCUIT_DIR / "nbS1-O1-E2Sst-maxNsyn-HEX0-L5" / "circuit_config.json"),
+    )
+    shared = circuit.sonata_circuit
+    shared_nodes = shared.nodes
+    init = MagicMock(side_effect=AssertionError("circuit config re-parsed"))
+    monkeypatch.setattr(type(shared), "__init__", init)
+
+    writable = circuit.writable_sonata_circuit()
+
+    init.assert_not_called()
+    assert writable._config is shared._config
+    assert writable.node_sets is not shared.node_sets
+    assert writable.nodes is not shared_nodes
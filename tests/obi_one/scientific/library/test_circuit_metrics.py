@@ -5,12 +5,19 @@ from pathlib import Path
 from unittest.mock import MagicMock
 from uuid import uuid4
 
+import numpy as np
 import pytest
 from entitysdk.types import FetchFileStrategy
+from libsonata import EdgeStorage
 
+from obi_one.config import settings
 from obi_one.scientific.library.circuit_metrics import (
     CircuitStatsLevelOfDetail,
+    DegreeTypes,
+    degree_stats_from_population,
+    edge_property_stats_from_population,
     get_circuit_metrics,
+    node_degrees_from_population,
 )
 
 TINY_CIRCUIT_DIR = Path("examples/data/tiny_circuits/N_10__top_nodes_dim6")
@@ -61,3 +68,99 @@ def test_get_circuit_metrics_basic(db_client):
     # Verify fetch_file was called with the correct strategy
     for call in db_client.fetch_file.call_args_list:
         assert call.kwargs["strategy"] == FetchFileStrategy.link_or_download
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 10_000_000])
+def test_node_degrees_from_population(chunk_size):
+    edges_file = TINY_CIRCUIT_DIR / "POm__S1nonbarrel_neurons__chemical" / "edges.h5"
+    pop = EdgeStorage(edges_file).open_population("POm__S1nonbarrel_neurons__chemical")
+    num_sources, num_targets = 153, 10
+
+    indegs, outdegs = node_degrees_from_population(pop, num_sources, num_targets, chunk_size)
+
+    np.testing.assert_array_equal(
+        indegs, [pop.afferent_edges(i).flat_size for i in range(num_targets)]
+    )
+    np.testing.assert_array_equal(
+        outdegs, [pop.efferent_edges(i).flat_size for i in range(num_sources)]
+    )
+    assert indegs.sum() == outdegs.sum() == pop.size
+
+
+def test_degree_stats_from_population():
+    edges_file = (
+        TINY_CIRCUIT_DIR / "S1nonbarrel_neurons__S1nonbarrel_neurons__chemical" / "edges.h5"
+    )
+    pop = EdgeStorage(edges_file).open_population(
+        "S1nonbarrel_neurons__S1nonbarrel_neurons__chemical"
+    )
+    node_stats_dict = {"S1nonbarrel_neurons": {"population_length": 10}}
+
+    stats = degree_stats_from_population(pop, node_stats_dict, chunk_size=16)
+
+    assert set(stats) == set(DegreeTypes)
+    assert stats[DegreeTypes.indegree]["mean"] == pytest.approx(pop.size / 10)
+    assert stats[DegreeTypes.degreedifference]["mean"] == pytest.approx(0.0)
+    assert stats[DegreeTypes.totaldegree]["mean"] == pytest.approx(2 * pop.size / 10)
+
+
+def test_edge_property_stats_from_population():
+    edges_file = TINY_CIRCUIT_DIR / "VPM__S1nonbarrel_neurons__chemical" / "edges.h5"
+    pop = EdgeStorage(edges_file).open_population("VPM__S1nonbarrel_neurons__chemical")
+
+    # Small population: all statistics are exact, also when read in several chunks
+    stats = edge_property_stats_from_population(pop, chunk_size=100)
+
+    assert set(stats) == set(pop.attribute_names)
+    vals = pop.get_attribute("conductance", pop.select_all())
+    assert stats["conductance"]["min"] == np.min(vals)
+    assert stats["conductance"]["max"] == np.max(vals)
+    assert stats["conductance"]["median"] == np.median(vals)
+    assert stats["conductance"]["mean"] == pytest.approx(np.mean(vals))
+    assert stats["conductance"]["std"] == pytest.approx(np.std(vals))
+
+
+def test_get_circuit_metrics_cached(db_client, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings.circuit_metrics_cache, "enabled", True)
+    monkeypatch.setattr(settings.circuit_metrics_cache, "cache_dir", tmp_path)
+    circuit_id = str(uuid4())
+
+    def _get_metrics(lod):
+        return get_circuit_metrics(
+            circuit_id=circuit_id,
+            db_client=db_client,
+            level_of_detail_nodes={"_ALL_": lod},
+            level_of_detail_edges={"_ALL_": lod},
+        )
+
+    result_full = _get_metrics(CircuitStatsLevelOfDetail.full)
+    assert db_client.fetch_file.call_count > 0
+
+    # Same request is served from the cache without fetching any assets
+    db_client.fetch_file.reset_mock()
+    assert _get_metrics(CircuitStatsLevelOfDetail.full) == result_full
+    db_client.fetch_file.assert_not_called()
+
+    # Lower level of detail is derived from the cached properties
+    result_basic = _get_metrics(CircuitStatsLevelOfDetail.basic)
+    db_client.fetch_file.assert_not_called()
+    monkeypatch.setattr(settings.circuit_metrics_cache, "enabled", False)
+    assert result_basic == _get_metrics(CircuitStatsLevelOfDetail.basic)
+
+
+def test_get_circuit_metrics_parallel(db_client):
+    def _get_metrics(max_workers):
+        return get_circuit_metrics(
+            circuit_id=str(uuid4()),
+            db_client=db_client,
+            level_of_detail_nodes={"_ALL_": CircuitStatsLevelOfDetail.advanced},
+            level_of_detail_edges={"_ALL_": CircuitStatsLevelOfDetail.advanced},
+            max_workers=max_workers,
+        )
+
+    result = _get_metrics(max_workers=4)
+
+    assert result == _get_metrics(max_workers=1)
+    assert [pop.name for pop in result.chemical_edge_populations] == (
+        result.names_of_chemical_edge_populations
+    )
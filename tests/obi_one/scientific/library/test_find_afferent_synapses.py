@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from obi_one.scientific.library import find_afferent_synapses as test_module
+
+
+class FakePathDistanceCalculator:
+    """Path distances of locations on a single, straight dendrite (offset = soma distance)."""
+
+    def __init__(self):
+        self.n_rows = 0
+
+    def path_distances(self, locs_from, locs_to=None):
+        if locs_to is None:
+            locs_to = locs_from
+        self.n_rows += len(locs_from)
+        return np.abs(
+            locs_from["afferent_segment_offset"].to_numpy()[:, None]
+            - locs_to["afferent_segment_offset"].to_numpy()[None, :]
+        )
+
+
+def _syns(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "afferent_section_id": np.ones(n, dtype=int),
+            "afferent_segment_id": np.zeros(n, dtype=int),
+            "afferent_segment_offset": rng.random(n) * 100.0,
+            "source_population": rng.choice(["pop_a", "pop_b"], n),
+            "@source_node": rng.integers(0, 10, n),
+        }
+    )
+
+
+def test_relevant_path_distances_lazy():
+    syns = _syns()
+    calculator = FakePathDistanceCalculator()
+    soma_pds, pw_pds = test_module.relevant_path_distances(calculator, syns)
+    lazy_soma_pds, lazy_pw_pds = test_module.relevant_path_distances(
+        calculator, syns, lazy_pairwise=True
+    )
+
+    np.testing.assert_array_equal(lazy_soma_pds, soma_pds)
+    np.testing.assert_array_equal(lazy_pw_pds[3], pw_pds[3])
+    np.testing.assert_array_equal(lazy_pw_pds[np.array([1, 5])], pw_pds[[1, 5]])
+    assert lazy_pw_pds.shape == pw_pds.shape
+
+
+def test_merge_multiple_syns_per_connection():
+    syns = _syns()
+    soma_pds, pw_pds = test_module.relevant_path_distances(FakePathDistanceCalculator(), syns)
+    merged, mn_soma_pds, mn_pw_pds = test_module.merge_multiple_syns_per_connection(
+        syns, soma_pds, pw_pds
+    )
+
+    groups = list(syns.groupby(["source_population", "@source_node"]).indices.values())
+    assert merged.columns.tolist() == ["source_population", "@source_node"]
+    assert len(merged) == len(groups) == mn_pw_pds.shape[0] == mn_pw_pds.shape[1]
+    np.testing.assert_allclose(mn_soma_pds, [soma_pds[idx].mean() for idx in groups])
+    np.testing.assert_allclose(
+        mn_pw_pds, [[pw_pds[np.ix_(i, j)].mean() for j in groups] for i in groups]
+    )
+
+    calculator = FakePathDistanceCalculator()
+    _, lazy_pw_pds = test_module.relevant_path_distances(calculator, syns, lazy_pairwise=True)
+    _, _, lazy_mn_pw_pds = test_module.merge_multiple_syns_per_connection(
+        syns, soma_pds, lazy_pw_pds
+    )
+    np.testing.assert_allclose(lazy_mn_pw_pds, mn_pw_pds)
+
+
+@pytest.mark.parametrize("gaussian", [False, True])
+def test_select_clusters(gaussian):
+    syns = _syns(n=200)
+    calculator = FakePathDistanceCalculator()
+    soma_pds, pw_pds = test_module.relevant_path_distances(calculator, syns)
+    _, lazy_pw_pds = test_module.relevant_path_distances(calculator, syns, lazy_pairwise=True)
+    kwargs = {"soma_pd_mean": 50.0, "soma_pd_sd": 10.0} if gaussian else {}
+
+    np.random.seed(0)  # ruff: ignore[numpy-legacy-random]
+    by_count = test_module.select_clusters_by_count(syns, soma_pds, pw_pds, 5, 8, **kwargs)
+    assert by_count.groupby("cluster_id").size().tolist() == [8] * 5
+    assert by_count.index.is_unique
+
+    np.random.seed(0)  # ruff: ignore[numpy-legacy-random]
+    calculator.n_rows = 0
+    lazy_by_count = test_module.select_clusters_by_count(
+        syns, soma_pds, lazy_pw_pds, 5, 8, **kwargs
+    )
+    pd.testing.assert_frame_equal(lazy_by_count, by_count)
+    assert calculator.n_rows == 5  # Only the rows of the cluster centers are computed
+
+    np.random.seed(0)  # ruff: ignore[numpy-legacy-random]
+    by_distance = test_module.select_clusters_by_max_distance(
+        syns, soma_pds, lazy_pw_pds, 5, 3.0, **kwargs
+    )
+    assert by_distance.index.is_unique
+    for _, cluster in by_distance.groupby("cluster_id"):
+        offsets = cluster["afferent_segment_offset"]
+        assert offsets.max() - offsets.min() < 6.0
+
+
+def test_select_clusters_insufficient():
+    syns = _syns(n=10)
+    soma_pds, pw_pds = test_module.relevant_path_distances(FakePathDistanceCalculator(), syns)
+
+    with pytest.raises(RuntimeError, match="clusters possible"):
+        test_module.select_clusters_by_count(syns, soma_pds, pw_pds, 3, 4, raise_insufficient=True)
+    clusters = test_module.select_clusters_by_count(syns, soma_pds, pw_pds, 3, 4)
+    assert clusters["cluster_id"].nunique() == 2
+
+    with pytest.raises(RuntimeError, match="clusters possible"):
+        test_module.select_clusters_by_max_distance(
+            syns, soma_pds, pw_pds, 3, 1000.0, raise_insufficient=True
+        )
+    clusters = test_module.select_clusters_by_max_distance(syns, soma_pds, pw_pds, 3, 1000.0)
+    assert (clusters["cluster_id"] == 0).all()
@@ -1,8 +1,11 @@
 """Test functionality used to map synapse locations to morphologies"""
 
+from types import SimpleNamespace
+
 import numpy as np
 import pandas as pd
 
+from obi_one.scientific.library.map_em_synapses import map_synapse_locations as test_module
 from obi_one.scientific.library.map_em_synapses.map_synapse_locations import (
     add_competing_mesh_distances,
 )
@@ -30,3 +33,128 @@ def test_competing_distances_good_solution():
     # Must be all -1 because all spine_sharing_ids are the same
     competitors = add_competing_mesh_distances(mesh_pt_df, pts)
     assert not (competitors == -1).any()
+
+
+def _random_segs(n_points, rng):
+    points = np.cumsum(rng.normal(size=(n_points, 3)) * rng.choice([0.1, 1, 5], (n_points, 1)), 0)
+    starts, ends = points[:-1].copy(), points[1:].copy()
+    ends[::7] = starts[::7]  # Include zero-length segments
+    segs = pd.DataFrame(
+        np.hstack([starts, rng.random((len(starts), 1)), ends, rng.random((len(starts), 1))]),
+        columns=[*test_module._C_SEG_S_F, *test_module._C_SEG_E_F],
+    )
+    segs["section_id"] = np.arange(len(segs)) // 10 + 1
+    segs["segment_id"] = np.arange(len(segs)) % 10
+    return segs, points
+
+
+def test_segment_index_matches_brute_force():
+    rng = np.random.default_rng(0)
+    segs, points = _random_segs(500, rng)
+    starts, ends = segs[test_module._C_SEG_S].to_numpy(), segs[test_module._C_SEG_E].to_numpy()
+    pts = points[rng.integers(0, len(points), 200)] + rng.normal(size=(200, 3)) * 2
+
+    seg_idx, dists, proj = test_module.SegmentIndex(starts, ends).nearest(pts)
+
+    all_dists, all_proj, _ = test_module._point_segment_distances(
+        pts[:, np.newaxis, :], starts[np.newaxis], ends[np.newaxis]
+    )
+    expected = np.argmin(all_dists, axis=1)
+    np.testing.assert_array_equal(seg_idx, expected)
+    np.testing.assert_array_equal(dists, all_dists[np.arange(len(pts)), expected])
+    np.testing.assert_array_equal(proj, all_proj[np.arange(len(pts)), expected])
+
+
+def test_map_points_to_segs_df():
+    segs = pd.DataFrame(
+        [[0.0, 0.0, 0.0, 1.0, 10.0, 0.0, 0.0, 1.0], [10.0, 0.0, 0.0, 0.5, 10.0, 10.0, 0.0, 0.5]],
+        columns=[*test_module._C_SEG_S_F, *test_module._C_SEG_E_F],
+    )
+    segs["section_id"] = [1, 2]
+    segs["segment_id"] = [0, 0]
+    pts = pd.DataFrame(
+        [[2.0, 3.0, 0.0], [12.0, 4.0, 0.0], [-4.0, 0.0, 3.0]],
+        columns=["x", "y", "z"],
+        index=[5, 6, 7],
+    )
+
+    res = test_module.map_points_to_segs_df(segs, pts)
+
+    assert res.index.tolist() == [5, 6, 7]
+    assert res["section_id"].tolist() == [1, 2, 1]
+    np.testing.assert_allclose(res["segment_offset"], [2.0, 4.0, 0.0], atol=1e-12)
+    np.testing.assert_allclose(res["distance"], [2.0, 1.5, 4.0], atol=1e-12)
+
+
+def test_calc_center_positions():
+    sections = [
+        SimpleNamespace(points=np.array([[0.0, 0.0, 0.0, 1.0], [2.0, 0.0, 0.0, 1.0]])),
+        SimpleNamespace(
+            points=np.array([[0.0, 0.0, 0.0, 1.0], [0.0, 2.0, 0.0, 1.0], [0.0, 2.0, 4.0, 1.0]])
+        ),
+    ]
+    morph = SimpleNamespace(
+        section=lambda i: sections[i], points=np.vstack([s.points for s in sections])
+    )
+    df = pd.DataFrame(
+        {"section_id": [2, 1, 2], "segment_id": [1, 0, 0], "segment_offset": [1.0, 0.5, 2.0]},
+        index=[3, 1, 2],
+    )
+
+    res = test_module.calc_center_positions(df, morph)
+
+    assert res.columns.tolist() == test_module._C_CENTER
+    assert res.index.tolist() == [3, 1, 2]
+    np.testing.assert_allclose(res.to_numpy(), [[0.0, 2.0, 1.0], [0.5, 0.0, 0.0], [0.0, 2.0, 0.0]])
+
+
+def test_calc_center_positions_empty():
+    df = pd.DataFrame({"section_id": [], "segment_id": [], "segment_offset": []}, dtype=float)
+
+    res = test_module.calc_center_positions(df, SimpleNamespace(points=np.empty((0, 4))))
+
+    assert res.empty
+    assert res.columns.tolist() == test_module._C_CENTER
+
+
+def test_mesh_point_index():
+    mesh_pt_df = pd.DataFrame(
+        [[0.0, 0.0, 0.0, 1], [0.0, 1.0, 0.0, 2], [0.0, 2.0, 0.0, 1], [0.0, 10.0, 0.0, 1]],
+        columns=["x", "y", "z", "spine_sharing_id"],
+    )
+    pts = pd.DataFrame([[0.0, 0.1, 0.0], [0.0, 9.0, 0.0]], columns=["x", "y", "z"], index=[5, 7])
+    index = test_module.MeshPointIndex(mesh_pt_df)
+
+    nearest = index.nearest(pts)
+    assert nearest.index.tolist() == [5, 7]
+    assert nearest["spine_sharing_id"].tolist() == [1, 1]
+    np.testing.assert_allclose(nearest["distance"], [0.1, 1.0])
+
+    # The competitor is found even if the k-th nearest point has the same id as the nearest one
+    competitors = index.competing_distances(pts, k=3)
+    assert competitors.index.tolist() == [5, 7]
+    np.testing.assert_allclose(competitors, [0.9, 8.0])
+    pd.testing.assert_series_equal(competitors, add_competing_mesh_distances(mesh_pt_df, pts))
+
+    np.testing.assert_allclose(index.resolution(), 2.75)
+
+
+def test_morph_to_spine_and_soma_df():
+    spine_points = [
+        np.array([[0.0, 0.0, 0.0], [np.nan, np.nan, np.nan], [1.0, 0.0, 0.0]]),
+        np.empty((0, 3)),
+        np.array([[2.0, 0.0, 0.0]]),
+    ]
+    morph = SimpleNamespace(
+        spines=SimpleNamespace(
+            spine_count=3,
+            spine_table=pd.DataFrame(index=[10, 11, 12]),
+            spine_mesh_points=spine_points.__getitem__,
+        ),
+        soma=SimpleNamespace(soma_mesh_points=np.array([[5.0, 5.0, 5.0]])),
+    )
+    res = test_module.morph_to_spine_and_soma_df(morph)
+    assert res.columns.tolist() == ["spine_sharing_id", "x", "y", "z"]
+    assert res.index.tolist() == [0, 1, 2, 3]
+    assert res["spine_sharing_id"].tolist() == [10, 10, 12, -1]
+    assert res["x"].tolist() == [0.0, 1.0, 2.0, 5.0]
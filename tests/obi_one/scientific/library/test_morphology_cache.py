@@ -0,0 +1,94 @@
+import morphio
+import numpy as np
+import pytest
+
+from obi_one.scientific.library import morphology_cache as test_module
+
+from tests.utils import DATA_DIR
+
+MORPHOLOGY_PATH = DATA_DIR / "ch150801A1.h5"
+
+
+@pytest.fixture
+def morphology():
+    return morphio.Morphology(MORPHOLOGY_PATH)
+
+
+def test_segment_table(morphology):
+    segments = test_module.SegmentTable.from_morphology(morphology)
+
+    expected_lengths = [
+        np.linalg.norm(np.diff(sec.points, axis=0), axis=1) for sec in morphology.sections
+    ]
+    np.testing.assert_array_equal(segments.segment_length, np.concatenate(expected_lengths))
+    np.testing.assert_array_equal(
+        segments.section_id,
+        np.concatenate(
+            [np.full(len(lengths), i + 1) for i, lengths in enumerate(expected_lengths)]
+        ),
+    )
+    np.testing.assert_array_equal(
+        segments.segment_id,
+        np.concatenate([np.arange(len(lengths)) for lengths in expected_lengths]),
+    )
+    np.testing.assert_array_equal(
+        segments.section_type,
+        np.concatenate(
+            [
+                np.full(len(lengths), int(sec.type))
+                for sec, lengths in zip(morphology.sections, expected_lengths, strict=True)
+            ]
+        ),
+    )
+
+    assert segments.segment_id.dtype == segments.section_id.dtype == np.int64
+
+    df = segments.to_frame({"section_id": "sec", "segment_length": "len"})
+    assert df.columns.tolist() == ["sec", "len"]
+    assert len(df) == len(segments.section_id)
+
+
+def test_load_lru():
+    cache = test_module.MorphologyCache(maxsize=2)
+    loads = []
+
+    def _loader(name):
+        def _load():
+            loads.append(name)
+            return morphio.Morphology(MORPHOLOGY_PATH)
+
+        return _load
+
+    a = cache.load("a.h5", "opts", _loader("a"))
+    assert cache.load("a.h5", "opts", _loader("a")) is a
+    cache.load("a.h5", "other_opts", _loader("a2"))
+    assert cache.load("a.h5", "opts", _loader("a")) is a
+    cache.load("b.h5", "opts", _loader("b"))  # Evicts the least recently used a.h5 other_opts
+    assert cache.load("a.h5", "opts", _loader("a")) is a
+    cache.load("a.h5", "other_opts", _loader("a2"))
+
+    assert loads == ["a", "a2", "b", "a2"]
+    assert cache.info() == test_module.MorphologyCacheInfo(hits=3, misses=4, maxsize=2, currsize=2)
+
+    cache.clear()
+    assert cache.info() == test_module.MorphologyCacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+
+def test_for_morphology(morphology):
+    cache = test_module.MorphologyCache(maxsize=2)
+    loaded = cache.load("a.h5", "opts", lambda: morphology)
+
+    assert cache.for_morphology(morphology) is loaded
+    other = morphio.Morphology(MORPHOLOGY_PATH)
+    entry = cache.for_morphology(other)
+    assert entry is not loaded
+    assert entry.morphology is other
+    assert cache.for_morphology(other) is entry
+    assert cache.info().hits == 2
+
+    assert entry.path_distance_calculator is entry.path_distance_calculator
+    np.testing.assert_allclose(
+        entry.section_lengths,
+        np.bincount(entry.segments.section_id - 1, entry.segments.segment_length),
+        rtol=1e-5,
+    )
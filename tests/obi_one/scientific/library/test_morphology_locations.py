@@ -0,0 +1,46 @@
+import morphio
+import numpy as np
+import pandas as pd
+
+from obi_one.scientific.library import morphology_locations as test_module
+from obi_one.scientific.library.morphology_cache import morphology_cache
+
+from tests.utils import DATA_DIR
+
+
+def test_find_normalized_interval_below_zero():
+    lo, hi = test_module.find_normalized_interval_below_zero(
+        np.array([-1.0, 1.0, -1.0, -2.0, 1.0]), np.array([1.0, -1.0, -1.0, -1.0, 1.0])
+    )
+    np.testing.assert_allclose(lo, [0.0, 0.5, 0.0, 0.0, 0.0])
+    np.testing.assert_allclose(hi, [0.5, 1.0, 0.0, 1.0, 0.0])
+
+
+def test_candidate_segments_for_center():
+    m = morphio.Morphology(DATA_DIR / "ch150801A1.h5")
+    calculator = morphology_cache.for_morphology(m).path_distance_calculator
+    soma = pd.DataFrame({"section_id": [0], "segment_id": [0], "segment_offset": [0]})
+    locs = test_module.path_distance_all_segments_from(soma, m, calculator).loc[0]
+    ids_center = pd.Index([10, 500])
+    max_dist = 30.0
+
+    cands = test_module.candidate_segments_for_center(ids_center, locs, max_dist, m, calculator)
+
+    assert cands.columns.tolist() == ["min_seg_offset", "max_seg_offset"]
+    assert cands.index.names == ["reference_loc_index", None]
+    assert {(0, 10), (1, 500)} <= set(cands.index)
+    assert (cands["min_seg_offset"] <= cands["max_seg_offset"]).all()
+    assert (
+        cands["max_seg_offset"]
+        <= locs.loc[cands.index.get_level_values(1), "segment_length"].to_numpy() + 1e-6
+    ).all()
+
+    # All candidate intervals are within max_dist of their center
+    for (i_center, i_seg), (seg_min, seg_max) in cands.iterrows():
+        segment = locs.loc[[i_seg]]
+        for offset in (seg_min, seg_max):
+            segment = segment.assign(segment_offset=offset)
+            distance = calculator.path_distances(
+                locs.loc[[ids_center[i_center]]], segment, **test_module._PD_KWARGS
+            )
+            assert distance[0, 0] <= max_dist + 1e-3
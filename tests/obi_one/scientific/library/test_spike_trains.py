@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from obi_one.scientific.library import spike_trains as test_module
+
+
+def test_homogeneous_poisson_spikes_windows_and_rate():
+    rng = np.random.default_rng(0)
+    gids = np.arange(200)
+    starts = [0.0, 1000.0]
+    node_ids, timestamps = test_module.homogeneous_poisson_spikes(rng, gids, starts, 500.0, 20.0)
+
+    assert node_ids.dtype == np.uint64
+    assert len(node_ids) == len(timestamps)
+    assert set(np.unique(node_ids)) <= set(gids)
+    in_first = (timestamps >= 0.0) & (timestamps < 500.0)
+    in_second = (timestamps >= 1000.0) & (timestamps < 1500.0)
+    assert np.all(in_first | in_second)
+
+    # Expected count: 200 gids x 2 windows x 0.5 s x 20 Hz = 4000
+    assert len(timestamps) == pytest.approx(4000, rel=0.1)
+
+
+def test_homogeneous_poisson_spikes_reproducible():
+    args = (np.arange(10), [0.0, 50.0], 200.0, 30.0)
+    ids_1, times_1 = test_module.homogeneous_poisson_spikes(np.random.default_rng(7), *args)
+    ids_2, times_2 = test_module.homogeneous_poisson_spikes(np.random.default_rng(7), *args)
+    np.testing.assert_array_equal(ids_1, ids_2)
+    np.testing.assert_array_equal(times_1, times_2)
+
+
+@pytest.mark.parametrize(
+    ("gids", "starts", "duration"),
+    [([], [0.0], 100.0), ([0, 1], [], 100.0), ([0, 1], [0.0], 0.0)],
+)
+def test_homogeneous_poisson_spikes_empty(gids, starts, duration):
+    node_ids, timestamps = test_module.homogeneous_poisson_spikes(
+        np.random.default_rng(0), gids, starts, duration, 10.0
+    )
+    assert len(node_ids) == 0
+    assert len(timestamps) == 0
+
+
+def test_sinusoidal_poisson_spikes_follow_rate():
+    rng = np.random.default_rng(1)
+    gids = np.arange(2000)
+    # 1 Hz modulation over 1 s: high rate in the first half, low rate in the second half
+    rate_params = (0.0, 20.0, 1.0, 0.0)
+    _, timestamps = test_module.sinusoidal_poisson_spikes(rng, gids, [100.0], 1000.0, rate_params)
+
+    assert np.all((timestamps >= 100.0) & (timestamps < 1100.0))
+    first_half = np.sum(timestamps < 600.0)
+    second_half = np.sum(timestamps >= 600.0)
+    assert first_half > 3 * second_half
+    # Mean rate is 10 Hz: 2000 gids x 1 s x 10 Hz = 20000
+    assert len(timestamps) == pytest.approx(20000, rel=0.05)
+
+
+def test_sinusoidal_poisson_spikes_requires_positive_max_rate():
+    with pytest.raises(ValueError, match="Maximum rate must be positive"):
+        test_module.sinusoidal_poisson_spikes(
+            np.random.default_rng(0), [0], [0.0], 100.0, (0.0, 0.0, 1.0, 0.0)
+        )
+
+
+def test_sinusoidal_rate_hz_vectorized():
+    t_ms = np.array([0.0, 250.0, 500.0, 750.0])
+    lam = test_module.sinusoidal_rate_hz(t_ms, 1.0, 9.0, 1.0, 0.0)
+    np.testing.assert_allclose(lam, [5.0, 9.0, 5.0, 1.0], atol=1e-10)
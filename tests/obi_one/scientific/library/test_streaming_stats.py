@@ -0,0 +1,61 @@
+import math
+
+import numpy as np
+import pytest
+
+from obi_one.scientific.library import streaming_stats as test_module
+
+
+def _chunks(values, chunk_size):
+    return [values[i : i + chunk_size] for i in range(0, len(values), chunk_size)]
+
+
+def test_running_stats():
+    values = np.random.default_rng(0).normal(1e6, 3.0, size=10_001)
+    stats = test_module.RunningStats()
+    for chunk in _chunks(values, 997):
+        stats.update(chunk)
+    stats.update(np.empty(0))
+
+    assert stats.count == len(values)
+    assert stats.min == np.min(values)
+    assert stats.max == np.max(values)
+    assert stats.mean == pytest.approx(np.mean(values), rel=1e-12)
+    assert stats.std == pytest.approx(np.std(values), rel=1e-9)
+
+
+def test_running_stats_empty():
+    stats = test_module.RunningStats()
+    assert stats.count == 0
+    assert math.isnan(stats.std)
+
+
+def test_quantile_sketch_exact_without_compaction():
+    values = np.arange(10, dtype=float)
+    sketch = test_module.QuantileSketch(relative_error=0.01, expected_number_of_chunks=2)
+    for chunk in _chunks(values, 5):
+        sketch.update(chunk)
+
+    assert sketch.quantile(0.5) == np.median(values)
+    assert sketch.quantile(0.0) == values[0]
+    assert sketch.quantile(1.0) == values[-1]
+
+
+@pytest.mark.parametrize("relative_error", [0.05, 0.01])
+def test_quantile_sketch_rank_error(relative_error):
+    values = np.random.default_rng(1).exponential(2.0, size=100_000)
+    chunks = _chunks(values, 5_000)
+    sketch = test_module.QuantileSketch(relative_error, expected_number_of_chunks=len(chunks))
+    for chunk in chunks:
+        sketch.update(chunk)
+
+    assert sketch.count == pytest.approx(len(values))
+    sorted_values = np.sort(values)
+    for q in [0.1, 0.5, 0.9]:
+        rank = np.searchsorted(sorted_values, sketch.quantile(q)) / len(values)
+        assert abs(rank - q) <= relative_error
+
+
+def test_quantile_sketch_invalid_error():
+    with pytest.raises(ValueError, match="Relative error must be in"):
+        test_module.QuantileSketch(relative_error=0.0)
@@ -347,3 +347,21 @@ def test_circuit_extraction_combined_neuron_set_with_defaults(tmp_path):
     # Combined = AllBiophysicalNeurons INTERSECT AllBiophysicalNeurons = all biophysical neurons
     c_orig = instance.initialize.circuit.sonata_circuit
     assert c_res.nodes["S1nonbarrel_neurons"].size == c_orig.nodes["S1nonbarrel_neurons"].size
+
+
+def test_morphology_containers_of_staged_circuits_are_not_referenced(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        obi.CircuitExtractionTask.__module__ + ".settings.circuit_extraction."
+        "reference_morphology_containers",
+        True,
+    )
+    task = obi.CircuitExtractionTask.model_construct()
+    new_circuit_path = tmp_path / "circuit_config.json"
+
+    # Local circuits are referenced
+    assert task._morphology_reference_config_path(new_circuit_path) == new_circuit_path
+
+    # Circuits staged from entitycore (temporarily or cached) are copied, and the result may be
+    # registered
+    task._circuit_entity = object()
+    assert task._morphology_reference_config_path(new_circuit_path) is None
@@ -1,5 +1,7 @@
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import Mock, patch
@@ -11,6 +13,7 @@ import pytest
 
 from obi_one.scientific.from_id.cell_morphology_from_id import CellMorphologyFromID
 from obi_one.scientific.from_id.named_tuple_from_id import EMSynapseMappingInputNamedTuple
+from obi_one.scientific.tasks.em_synapse_mapping import task as test_module
 from obi_one.scientific.tasks.em_synapse_mapping.task import (
     EMSynapseMappingTask,
 )
@@ -363,3 +366,59 @@ class TestEMSynapseMappingTask:
         # node_sets.json references the custom biophysical population.
         node_sets = json.loads((tmp_path / "out" / "SONATA" / "node_sets.json").read_text())
         assert node_sets["All"]["population"] == "my_bio_nodes"
+
+
+class TestParallelPipeline:
+    def test_resolve_neurons_in_threads(self, tmp_path, mock_db_client):
+        by_ref = {"test1": _resolved_neuron(111, "A"), "test2": _resolved_neuron(222, "B")}
+        refs = [CellMorphologyFromID(id_str="test2"), CellMorphologyFromID(id_str="test1")]
+
+        with patch(
+            f"{_TASK_MODULE}.resolve_neuron",
+            side_effect=lambda ref, *_args: by_ref[ref.id_str],
+        ):
+            resolved = test_module._resolve_neurons(
+                refs, mock_db_client, tmp_path, tmp_path, max_workers=2
+            )
+            assert [rn.pt_root_id for rn in resolved] == [222, 111]
+
+            by_ref["test1"] = _resolved_neuron(222, "C")
+            with pytest.raises(ValueError, match=r"Duplicate pt_root_id 222.*C.*B"):
+                test_module._resolve_neurons(
+                    refs, mock_db_client, tmp_path, tmp_path, max_workers=2
+                )
+
+    def test_fetch_and_map_synapses_overlapping(self, tmp_path, mock_db_client):
+        resolved = _make_resolved_pair()
+        syns = {111: _synapses_df([222, 999], 111), 222: _synapses_df([111], 222)}
+        first_fetched = threading.Event()
+
+        def fake_synapses(_em_dataset, pt_root_id, *_args):
+            # The second neuron's synapses arrive first and are mapped while waiting for the
+            # first neuron's
+            if pt_root_id == 111:
+                assert first_fetched.wait(timeout=10)
+            else:
+                first_fetched.set()
+            return syns[pt_root_id], Mock(), Mock(), [f"notice-{pt_root_id}"]
+
+        with (
+            patch(f"{_TASK_MODULE}._mapping_executor", side_effect=ThreadPoolExecutor),
+            patch(f"{_TASK_MODULE}.synapses_and_nodes_dataframes_from_EM", fake_synapses),
+            patch(f"{_TASK_MODULE}.load_morphology_with_spines", side_effect=str),
+            patch(
+                f"{_TASK_MODULE}.map_afferents_to_spiny_morphology",
+                side_effect=lambda path, syns, **_kwargs: (_mapped_df(len(syns)), path),
+            ),
+        ):
+            results = test_module._fetch_and_map_synapses(
+                resolved, tmp_path, Mock(), mock_db_client, 3, max_workers=2
+            )
+
+        assert [result[0] for result in results] == [syns[111], syns[222]]
+        assert [result[1] for result in results] == [["notice-111"], ["notice-222"]]
+        assert [len(result[2]) for result in results] == [2, 1]
+        assert [result[3] for result in results] == [
+            str(tmp_path / "morphologies/neuron_A.h5"),
+            str(tmp_path / "morphologies/neuron_B.h5"),
+        ]
@@ -1,3 +1,4 @@
+import itertools
 import json
 import re
 
@@ -603,6 +604,29 @@ def test_simulation_campaign_generation(tmp_path):
         coupled_scan2.execute()
 
 
+def test_single_configs_do_not_share_blocks_with_private_state(tmp_path):
+    sim_conf, _, _ = _setup_sim()
+    grid_scan = obi.GridScanGenerationTask(
+        form=sim_conf.validated_config(), output_root=tmp_path / "grid_scan"
+    )
+    first, second = itertools.islice(grid_scan.iter_single_configs(), 2)
+
+    # Unchanged neuron sets and timestamps are shared with the form
+    for name in ["ID10", "ID3", "VPM_input"]:
+        assert first.neuron_sets[name] is second.neuron_sets[name]
+        assert first.neuron_sets[name] is grid_scan.form.neuron_sets[name]
+    assert first.timestamps["RegularTimestamps"] is second.timestamps["RegularTimestamps"]
+
+    # Stimuli and recordings hold state set by the task (e.g., their default node set)
+    first_recording = first.recordings["VoltageRecording"]
+    second_recording = second.recordings["VoltageRecording"]
+    assert first_recording is not second_recording
+    assert first_recording.neuron_set.block is first.neuron_sets["ID10"]
+    first_recording._default_node_set = "Other"
+    assert second_recording._default_node_set == "All"
+    assert first.stimuli["PoissonInputStimulus"] is not second.stimuli["PoissonInputStimulus"]
+
+
 def test_circuit_simulation_scan_config_with_distribution_stimuli():
     """Test that CircuitSimulationScanConfig can include distribution blocks
     and InterSpikeIntervalDistributionSpikeStimulus."""
@@ -4,6 +4,8 @@ import json
 import shutil
 from unittest.mock import MagicMock, patch
 
+import bluepysnap as snap
+import h5py
 import pytest
 from entitysdk import types
 from PIL import Image
@@ -12,14 +14,19 @@ from obi_one.core.exception import OBIONEError
 from obi_one.db_sdk.registration.circuit import register_circuit, register_circuit_from_metadata
 from obi_one.scientific.library.circuit import Circuit
 from obi_one.utils.circuit import (
+    AssetTransferMode,
+    _copy_container_morphologies,
+    copy_hoc_files,
     copy_mod_files,
     generate_overview_figure,
     get_circuit_properties,
     get_circuit_size,
+    reference_morphology_container,
     run_basic_connectivity_plots,
     run_circuit_folder_compression,
     run_connectivity_matrix_extraction,
     run_validation,
+    transfer_file,
 )
 
 from tests.utils import CIRCUIT_DIR, MATRIX_DIR, SINGLE_NEURON_CIRCUIT_DIR
@@ -577,3 +584,85 @@ def test_copy_mod_files_empty_source_dir(tmp_path):
 
     # Destination directory should not be created
     assert not dest_dir.exists()
+
+
+@pytest.mark.parametrize("mode", list(AssetTransferMode))
+def test_transfer_file(tmp_path, mode):
+    src_file = tmp_path / "src.swc"
+    src_file.write_text("morphology")
+
+    transfer_file(src_file, tmp_path / "dest.swc", mode)
+
+    assert (tmp_path / "dest.swc").read_text() == "morphology"
+    is_same_file = (tmp_path / "dest.swc").samefile(src_file)
+    assert is_same_file == (mode == AssetTransferMode.hardlink)
+
+
+def test_copy_hoc_files_deduplicates_and_skips_existing(tmp_path):
+    source_dir = tmp_path / "src_hoc"
+    source_dir.mkdir()
+    for name in ("a", "b"):
+        (source_dir / f"{name}.hoc").write_text(name)
+    dest_dir = tmp_path / "dest_hoc"
+    dest_dir.mkdir()
+    (dest_dir / "b.hoc").write_text("existing")
+
+    original_circuit = MagicMock()
+    original_circuit.nodes.__getitem__.return_value.config = {
+        "biophysical_neuron_models_dir": str(source_dir)
+    }
+    pop = MagicMock()
+    pop.config = {"biophysical_neuron_models_dir": str(dest_dir)}
+    pop.get.return_value.unique.return_value = ["hoc:a", "hoc:b", "other:a"]
+
+    copy_hoc_files("pop_A", pop, original_circuit, mode=AssetTransferMode.hardlink)
+
+    assert (dest_dir / "a.hoc").samefile(source_dir / "a.hoc")
+    assert (dest_dir / "b.hoc").read_text() == "existing"
+
+    pop.get.return_value.unique.return_value = ["hoc:missing"]
+    with pytest.raises(ValueError, match="missing"):
+        copy_hoc_files("pop_A", pop, original_circuit)
+
+
+def test_copy_container_morphologies(tmp_path):
+    # Work on a copy on the same file system as the destinations, so that they can be hardlinked
+    src_container = tmp_path / "src" / "merged-morphologies.h5"
+    src_container.parent.mkdir()
+    shutil.copy2(
+        CIRCUIT_DIR / CIRCUIT_NAME / "morphologies" / "merged-morphologies.h5", src_container
+    )
+    with h5py.File(src_container) as f_src:
+        names = list(f_src.keys())
+
+    partial = tmp_path / "partial" / "morphologies.h5"
+    _copy_container_morphologies(src_container, partial, names[:3], AssetTransferMode.copy)
+    _copy_container_morphologies(src_container, partial, names[2:5], AssetTransferMode.copy)
+    with h5py.File(partial) as f_dest:
+        assert sorted(f_dest.keys()) == sorted(names[:5])
+
+    complete = tmp_path / "complete" / "morphologies.h5"
+    _copy_container_morphologies(src_container, complete, names, AssetTransferMode.hardlink)
+    assert complete.samefile(src_container)
+
+
+def test_reference_morphology_container(tmp_path):
+    circuit_path = _copy_circuit(tmp_path)
+    src_container = CIRCUIT_DIR / CIRCUIT_NAME / "morphologies" / "merged-morphologies.h5"
+
+    reference_morphology_container(circuit_path, "S1nonbarrel_neurons", src_container)
+
+    pop = snap.Circuit(circuit_path).nodes["S1nonbarrel_neurons"]
+    assert pop.config["alternate_morphologies"]["h5v1"] == str(src_container.resolve())
+    assert pop.morph.get(0, extension="h5").n_points > 0
+
+
+def test_copy_mod_files_skips_dangling_entries(tmp_path):
+    """Test that broken links to .mod files are skipped instead of failing the copy."""
+    pop, original_circuit, source_dir, dest_dir = _make_mock_circuit_with_mods(tmp_path, ["Ih.mod"])
+    (source_dir / "Missing.mod").symlink_to(tmp_path / "nonexistent.mod")
+
+    copy_mod_files("pop_A", pop, original_circuit)
+
+    assert (dest_dir / "Ih.mod").exists()
+    assert not (dest_dir / "Missing.mod").exists()
@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+
+import pytest
+
+from obi_one.utils import directory_cache as test_module
+
+
+def _populate(content: str, calls: list):
+    def create(entry_dir):
+        calls.append(entry_dir)
+        (entry_dir / "data.txt").write_text(content)
+        return {"content": content}
+
+    return create
+
+
+def test_get_or_create_populates_once(tmp_path):
+    cache = test_module.DirectoryCache(tmp_path / "cache")
+    calls = []
+
+    entry_dir, metadata = cache.get_or_create("key", _populate("abc", calls))
+    assert entry_dir == tmp_path / "cache" / "key"
+    assert metadata == {"content": "abc"}
+    assert (entry_dir / "data.txt").read_text() == "abc"
+
+    entry_dir_2, metadata_2 = cache.get_or_create("key", _populate("xyz", calls))
+    assert entry_dir_2 == entry_dir
+    assert metadata_2 == {"content": "abc"}
+    assert len(calls) == 1
+    assert cache.keys() == ["key"]
+
+
+def test_get_or_create_failure_leaves_no_entry(tmp_path):
+    cache = test_module.DirectoryCache(tmp_path)
+
+    def failing_create(entry_dir):
+        (entry_dir / "partial").write_text("x")
+        msg = "Build failed"
+        raise RuntimeError(msg)
+
+    with pytest.raises(RuntimeError, match="Build failed"):
+        cache.get_or_create("key", failing_create)
+    assert not cache.is_complete("key")
+    assert not cache.entry_dir("key").exists()
+
+
+def test_get_or_create_replaces_incomplete_entry(tmp_path):
+    cache = test_module.DirectoryCache(tmp_path)
+    stale = cache.entry_dir("key")
+    stale.mkdir()
+    (stale / "left_over").write_text("x")
+
+    entry_dir, _ = cache.get_or_create("key", _populate("abc", []))
+    assert not (entry_dir / "left_over").exists()
+    assert cache.is_complete("key")
+
+
+def test_concurrent_get_or_create_populates_once(tmp_path):
+    cache = test_module.DirectoryCache(tmp_path)
+    calls = []
+    barrier = threading.Barrier(4)
+
+    def worker():
+        barrier.wait()
+        cache.get_or_create("key", _populate("abc", calls))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+
+
+def test_evict_least_recently_used(tmp_path):
+    cache = test_module.DirectoryCache(tmp_path)
+    for idx, key in enumerate(["a", "b"]):
+        cache.get_or_create(key, _populate("12345", []))
+        marker = cache.entry_dir(key) / test_module._COMPLETE_MARKER
+        os.utime(marker, (1000 + idx, 1000 + idx))
+    # Room for exactly two entries
+    cache.max_size_bytes = 2 * test_module.path_size(cache.entry_dir("a"))
+
+    # Cache hit marks "a" as most recently used, so "b" is evicted first
+    cache.get_or_create("a", _populate("12345", []))
+    cache.get_or_create("c", _populate("12345", []))
+
+    assert cache.keys() == ["a", "c"]
+
+
+def test_evict_skips_locked_entries(tmp_path):
+    cache = test_module.DirectoryCache(tmp_path, max_size_bytes=0)
+    cache.get_or_create("a", _populate("12345", []))
+
+    with cache.lock("a"):
+        evicted = []
+        thread = threading.Thread(target=lambda: evicted.extend(cache.evict()))
+        thread.start()
+        thread.join()
+    assert evicted == []
+    assert cache.evict() == ["a"]
+
+
+def test_evict_skips_recently_used_entries(tmp_path):
+    cache = test_module.DirectoryCache(tmp_path, max_size_bytes=0, min_idle_seconds=3600)
+    for key in ["a", "b"]:
+        cache.get_or_create(key, _populate("12345", []))
+    # "a" was last used two hours ago, "b" is still within the grace period
+    os.utime(cache.entry_dir("a") / test_module._COMPLETE_MARKER, (0, time.time() - 7200))
+
+    assert cache.evict() == ["a"]
+    assert cache.keys() == ["b"]
+
+
+def test_path_size(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "f1").write_text("123")
+    (tmp_path / "f2").write_text("45")
+    assert test_module.path_size(tmp_path) == 5
+    assert test_module.path_size(tmp_path / "f2") == 2
+    assert test_module.path_size(tmp_path / "missing") == 0
+
+
+def test_get(tmp_path):
+    cache = test_module.DirectoryCache(tmp_path)
+    assert cache.get("key") is None
+
+    cache.get_or_create("key", _populate("abc", []))
+    assert cache.get("key") == {"content": "abc"}